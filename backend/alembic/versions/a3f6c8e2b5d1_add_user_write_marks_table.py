@@ -0,0 +1,46 @@
+"""add_user_write_marks_table
+
+Revision ID: a3f6c8e2b5d1
+Revises: c2e8f5a9d3b7
+Create Date: 2026-10-19 15:07:12.408921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f6c8e2b5d1'
+down_revision: Union[str, None] = 'c2e8f5a9d3b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists in the database."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade() -> None:
+    if not table_exists('user_write_marks'):
+        op.create_table('user_write_marks',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('updatedAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('userId', sa.Integer(), nullable=False),
+            sa.Column('lastWriteAt', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['userId'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('userId')
+        )
+        op.create_index(op.f('ix_user_write_marks_id'), 'user_write_marks', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_write_marks_id'), table_name='user_write_marks')
+    op.drop_table('user_write_marks')
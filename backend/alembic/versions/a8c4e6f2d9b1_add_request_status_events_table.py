@@ -0,0 +1,184 @@
+"""add_request_status_events_table
+
+Revision ID: a8c4e6f2d9b1
+Revises: f3a9d2c7e1b4
+Create Date: 2026-10-17 18:40:12.418306
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e6f2d9b1'
+down_revision: Union[str, None] = 'f3a9d2c7e1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 5000
+
+request_status_events = sa.table(
+    'request_status_events',
+    sa.column('entityType', sa.String),
+    sa.column('entityId', sa.Integer),
+    sa.column('requestId', sa.Integer),
+    sa.column('fromStatus', sa.String),
+    sa.column('toStatus', sa.String),
+    sa.column('changedAt', sa.DateTime),
+    sa.column('changedById', sa.Integer),
+)
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists in the database."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def parse_status(values):
+    """Status out of an ActivityLog oldValues/newValues JSON string."""
+    try:
+        status = json.loads(values).get('status') if values else None
+    except (ValueError, AttributeError):
+        return None
+    return status if isinstance(status, str) else None
+
+
+def backfill_from_activity_logs():
+    """Request transitions logged by the status patch and accept endpoints."""
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text("""
+            SELECT a.id, a.entityId, a.action, a.description, a.oldValues, a.newValues, a.timestamp, a.userId
+            FROM activity_logs a
+            JOIN maintenance_requests r ON r.id = a.entityId
+            WHERE a.entityType = 'MAINTENANCE_REQUEST'
+              AND a.action IN ('UPDATE', 'CREATE')
+              AND a.id > :last_id
+            ORDER BY a.id
+            LIMIT :batch_size
+        """).columns(timestamp=sa.DateTime()), {'last_id': last_id, 'batch_size': BATCH_SIZE}).fetchall()
+        if not rows:
+            return
+
+        events = []
+        for log_id, request_id, action, description, old_values, new_values, timestamp, user_id in rows:
+            last_id = log_id
+            if action == 'CREATE':
+                # Acceptance is logged as CREATE because it creates the work record
+                if not (description or '').startswith('Request accepted'):
+                    continue
+                from_status, to_status = 'PENDING', 'IN_PROGRESS'
+            else:
+                from_status, to_status = parse_status(old_values), parse_status(new_values)
+                if not to_status or from_status == to_status:
+                    continue
+            events.append({
+                'entityType': 'MAINTENANCE_REQUEST',
+                'entityId': request_id,
+                'requestId': request_id,
+                'fromStatus': from_status,
+                'toStatus': to_status,
+                'changedAt': timestamp,
+                'changedById': user_id,
+            })
+        if events:
+            op.bulk_insert(request_status_events, events)
+
+
+def upgrade() -> None:
+    if table_exists('request_status_events'):
+        return
+
+    op.create_table('request_status_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updatedAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('entityType', sa.String(length=30), nullable=False),
+        sa.Column('entityId', sa.Integer(), nullable=False),
+        sa.Column('requestId', sa.Integer(), nullable=False),
+        sa.Column('fromStatus', sa.String(length=30), nullable=True),
+        sa.Column('toStatus', sa.String(length=30), nullable=False),
+        sa.Column('changedAt', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('changedById', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['requestId'], ['maintenance_requests.id'], ),
+        sa.ForeignKeyConstraint(['changedById'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_request_status_events_id'), 'request_status_events', ['id'], unique=False)
+    op.create_index('ix_request_status_events_requestId_changedAt', 'request_status_events', ['requestId', 'changedAt'], unique=False)
+    op.create_index('ix_request_status_events_entity', 'request_status_events', ['entityType', 'entityId', 'changedAt'], unique=False)
+    op.create_index('ix_request_status_events_toStatus_changedAt', 'request_status_events', ['toStatus', 'changedAt'], unique=False)
+
+    # Every request starts as PENDING when it is raised
+    op.execute("""
+        INSERT INTO request_status_events (entityType, entityId, requestId, fromStatus, toStatus, changedAt, changedById)
+        SELECT 'MAINTENANCE_REQUEST', id, id, NULL, 'PENDING', requestedDate, requestedById
+        FROM maintenance_requests
+    """)
+
+    backfill_from_activity_logs()
+
+    # Work transitions from the recorded start and end times
+    op.execute("""
+        INSERT INTO request_status_events (entityType, entityId, requestId, fromStatus, toStatus, changedAt, changedById)
+        SELECT 'MAINTENANCE_WORK', id, requestId, NULL, 'IN_PROGRESS', startTime, assignedToId
+        FROM maintenance_works
+        WHERE startTime IS NOT NULL
+    """)
+    op.execute("""
+        INSERT INTO request_status_events (entityType, entityId, requestId, fromStatus, toStatus, changedAt, changedById)
+        SELECT 'MAINTENANCE_WORK', id, requestId, 'IN_PROGRESS', 'COMPLETED', endTime, assignedToId
+        FROM maintenance_works
+        WHERE status = 'COMPLETED' AND endTime IS NOT NULL
+    """)
+
+    # Requests accepted or completed without a logged status change
+    op.execute("""
+        INSERT INTO request_status_events (entityType, entityId, requestId, fromStatus, toStatus, changedAt, changedById)
+        SELECT 'MAINTENANCE_REQUEST', r.id, r.id, 'PENDING', 'IN_PROGRESS',
+               (SELECT MIN(w.startTime) FROM maintenance_works w WHERE w.requestId = r.id),
+               r.assignedToId
+        FROM maintenance_requests r
+        WHERE EXISTS (
+            SELECT 1 FROM maintenance_works w WHERE w.requestId = r.id AND w.startTime IS NOT NULL
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM request_status_events e
+            WHERE e.requestId = r.id AND e.entityType = 'MAINTENANCE_REQUEST' AND e.toStatus = 'IN_PROGRESS'
+        )
+    """)
+    op.execute("""
+        INSERT INTO request_status_events (entityType, entityId, requestId, fromStatus, toStatus, changedAt, changedById)
+        SELECT 'MAINTENANCE_REQUEST', r.id, r.id, 'IN_PROGRESS', 'COMPLETED',
+               COALESCE(
+                   r.actualCompletionDate,
+                   (SELECT MAX(w.endTime) FROM maintenance_works w WHERE w.requestId = r.id)
+               ),
+               r.assignedToId
+        FROM maintenance_requests r
+        WHERE r.status = 'COMPLETED'
+        AND COALESCE(
+            r.actualCompletionDate,
+            (SELECT MAX(w.endTime) FROM maintenance_works w WHERE w.requestId = r.id)
+        ) IS NOT NULL
+        AND NOT EXISTS (
+            SELECT 1 FROM request_status_events e
+            WHERE e.requestId = r.id AND e.entityType = 'MAINTENANCE_REQUEST' AND e.toStatus = 'COMPLETED'
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_request_status_events_toStatus_changedAt', table_name='request_status_events')
+    op.drop_index('ix_request_status_events_entity', table_name='request_status_events')
+    op.drop_index('ix_request_status_events_requestId_changedAt', table_name='request_status_events')
+    op.drop_index(op.f('ix_request_status_events_id'), table_name='request_status_events')
+    op.drop_table('request_status_events')
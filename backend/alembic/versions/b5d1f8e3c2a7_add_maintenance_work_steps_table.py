@@ -0,0 +1,151 @@
+"""add_maintenance_work_steps_table
+
+Revision ID: b5d1f8e3c2a7
+Revises: a8c4e6f2d9b1
+Create Date: 2026-10-17 20:15:36.902114
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1f8e3c2a7'
+down_revision: Union[str, None] = 'a8c4e6f2d9b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 5000
+
+maintenance_work_steps = sa.table(
+    'maintenance_work_steps',
+    sa.column('maintenanceWorkId', sa.Integer),
+    sa.column('stepIndex', sa.Integer),
+    sa.column('step', sa.Integer),
+    sa.column('description', sa.Text),
+    sa.column('completed', sa.Boolean),
+    sa.column('completedAt', sa.DateTime),
+)
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists in the database."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if table_name not in inspector.get_table_names():
+        return False
+    columns = [col['name'] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def parse_completed_at(value):
+    """completedAt was stored as an ISO string inside the JSON."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def explode_steps():
+    """Copy each work's maintenanceSteps JSON array into one row per step."""
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text("""
+            SELECT id, maintenanceSteps
+            FROM maintenance_works
+            WHERE maintenanceSteps IS NOT NULL AND id > :last_id
+            ORDER BY id
+            LIMIT :batch_size
+        """), {'last_id': last_id, 'batch_size': BATCH_SIZE}).fetchall()
+        if not rows:
+            return
+
+        steps = []
+        for work_id, raw_steps in rows:
+            last_id = work_id
+            if isinstance(raw_steps, str):
+                try:
+                    raw_steps = json.loads(raw_steps)
+                except ValueError:
+                    continue
+            if not isinstance(raw_steps, list):
+                continue
+            for index, step in enumerate(item for item in raw_steps if isinstance(item, dict)):
+                steps.append({
+                    'maintenanceWorkId': work_id,
+                    'stepIndex': index,
+                    'step': step.get('step') if isinstance(step.get('step'), int) else index + 1,
+                    'description': str(step.get('description') or ''),
+                    'completed': bool(step.get('completed')),
+                    'completedAt': parse_completed_at(step.get('completedAt')),
+                })
+        if steps:
+            op.bulk_insert(maintenance_work_steps, steps)
+
+
+def upgrade() -> None:
+    if not table_exists('maintenance_work_steps'):
+        op.create_table('maintenance_work_steps',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('updatedAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('maintenanceWorkId', sa.Integer(), nullable=False),
+            sa.Column('stepIndex', sa.Integer(), nullable=False),
+            sa.Column('step', sa.Integer(), nullable=False),
+            sa.Column('description', sa.Text(), nullable=False),
+            sa.Column('completed', sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column('completedAt', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['maintenanceWorkId'], ['maintenance_works.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('maintenanceWorkId', 'stepIndex', name='uq_maintenance_work_steps_work_index')
+        )
+        op.create_index(op.f('ix_maintenance_work_steps_id'), 'maintenance_work_steps', ['id'], unique=False)
+        op.create_index('ix_maintenance_work_steps_completed_completedAt', 'maintenance_work_steps', ['completed', 'completedAt'], unique=False)
+
+    if column_exists('maintenance_works', 'maintenanceSteps'):
+        explode_steps()
+        op.drop_column('maintenance_works', 'maintenanceSteps')
+
+
+def downgrade() -> None:
+    if not column_exists('maintenance_works', 'maintenanceSteps'):
+        op.add_column('maintenance_works', sa.Column('maintenanceSteps', sa.JSON(), nullable=True))
+
+    # Fold the rows back into one JSON array per work
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("""
+        SELECT maintenanceWorkId, step, description, completed, completedAt
+        FROM maintenance_work_steps
+        ORDER BY maintenanceWorkId, stepIndex
+    """).columns(completed=sa.Boolean(), completedAt=sa.DateTime())).fetchall()
+    by_work = {}
+    for work_id, step, description, completed, completed_at in rows:
+        by_work.setdefault(work_id, []).append({
+            'step': step,
+            'description': description,
+            'completed': bool(completed),
+            'completedAt': completed_at.isoformat() if completed_at else None,
+        })
+    works = sa.table('maintenance_works', sa.column('id', sa.Integer), sa.column('maintenanceSteps', sa.JSON))
+    for work_id, steps in by_work.items():
+        bind.execute(works.update().where(works.c.id == work_id).values(maintenanceSteps=steps))
+
+    op.drop_index('ix_maintenance_work_steps_completed_completedAt', table_name='maintenance_work_steps')
+    op.drop_index(op.f('ix_maintenance_work_steps_id'), table_name='maintenance_work_steps')
+    op.drop_table('maintenance_work_steps')
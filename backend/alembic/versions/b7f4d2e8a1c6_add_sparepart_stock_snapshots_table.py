@@ -0,0 +1,53 @@
+"""add_sparepart_stock_snapshots_table
+
+Revision ID: b7f4d2e8a1c6
+Revises: e9a3c5b7d2f4
+Create Date: 2026-10-18 16:52:30.104117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f4d2e8a1c6'
+down_revision: Union[str, None] = 'e9a3c5b7d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists in the database."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade() -> None:
+    # The table starts empty; python -m app.cli.stock_snapshots backfill fills in the history
+    if not table_exists('sparepart_stock_snapshots'):
+        op.create_table('sparepart_stock_snapshots',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('updatedAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('sparePartId', sa.Integer(), nullable=False),
+            sa.Column('snapshotDate', sa.Date(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('unitPrice', sa.Float(), nullable=True),
+            sa.ForeignKeyConstraint(['sparePartId'], ['spareparts.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_sparepart_stock_snapshots_id'), 'sparepart_stock_snapshots', ['id'], unique=False)
+        op.create_index(
+            'uq_sparepart_stock_snapshots_part_date', 'sparepart_stock_snapshots',
+            ['sparePartId', 'snapshotDate'], unique=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_sparepart_stock_snapshots_part_date', table_name='sparepart_stock_snapshots')
+    op.drop_index(op.f('ix_sparepart_stock_snapshots_id'), table_name='sparepart_stock_snapshots')
+    op.drop_table('sparepart_stock_snapshots')
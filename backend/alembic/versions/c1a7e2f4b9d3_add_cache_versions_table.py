@@ -0,0 +1,48 @@
+"""add_cache_versions_table
+
+Revision ID: c1a7e2f4b9d3
+Revises: b49d7c4aa8b0
+Create Date: 2026-10-17 09:12:31.184205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1a7e2f4b9d3'
+down_revision: Union[str, None] = 'b49d7c4aa8b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists in the database."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade() -> None:
+    if not table_exists('cache_versions'):
+        op.create_table('cache_versions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updatedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), onupdate=sa.text('now()'), nullable=False),
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        )
+        op.create_index(op.f('ix_cache_versions_id'), 'cache_versions', ['id'], unique=False)
+        
+        # Seed the principal cache counter bumped by user and password changes
+        op.execute("INSERT INTO cache_versions (name, version) VALUES ('principals', 0)")
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cache_versions_id'), table_name='cache_versions')
+    op.drop_table('cache_versions')
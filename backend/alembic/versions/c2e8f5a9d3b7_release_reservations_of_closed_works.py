@@ -0,0 +1,52 @@
+"""release_reservations_of_closed_works
+
+Revision ID: c2e8f5a9d3b7
+Revises: b7f4d2e8a1c6
+Create Date: 2026-10-19 10:21:44.730152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8f5a9d3b7'
+down_revision: Union[str, None] = 'b7f4d2e8a1c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CLOSED_REASON = 'Maintenance work closed before the parts were issued'
+
+
+def upgrade() -> None:
+    # Works completed or cancelled before closing released reservations left
+    # their pending and approved requests open; reject them as closing does now
+    op.get_bind().execute(sa.text("""
+        UPDATE spare_parts_requests
+        SET status = 'REJECTED', rejectionReason = :reason
+        WHERE status IN ('PENDING', 'APPROVED')
+          AND maintenanceWorkId IN (
+              SELECT w.id
+              FROM maintenance_works w
+              JOIN maintenance_requests m ON m.id = w.requestId
+              WHERE w.status IN ('COMPLETED', 'CANCELLED')
+                 OR m.status IN ('COMPLETED', 'CANCELLED')
+          )
+    """), {'reason': CLOSED_REASON})
+
+    # Every reservation left belongs to an approved request of an open work
+    op.execute("""
+        UPDATE spareparts
+        SET reservedStock = (
+            SELECT COALESCE(SUM(r.quantityRequested), 0)
+            FROM spare_parts_requests r
+            WHERE r.sparePartId = spareparts.id AND r.status = 'APPROVED'
+        )
+    """)
+
+
+def downgrade() -> None:
+    # Data only: the reservations released here were stale, so nothing is restored
+    pass
@@ -0,0 +1,103 @@
+"""unique_work_per_request_and_idempotency_keys
+
+Revision ID: c7e2a9d4f1b8
+Revises: b5d1f8e3c2a7
+Create Date: 2026-10-17 21:02:48.551730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a9d4f1b8'
+down_revision: Union[str, None] = 'b5d1f8e3c2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists in the database."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    """Check if an index exists on a table."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if table_name not in inspector.get_table_names():
+        return False
+    indexes = [idx['name'] for idx in inspector.get_indexes(table_name)]
+    return index_name in indexes
+
+
+def merge_duplicate_works():
+    """Fold extra works created by double-tapped accepts into the first work of each request."""
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text("""
+        SELECT w.id, k.keepId
+        FROM maintenance_works w
+        JOIN (
+            SELECT requestId, MIN(id) AS keepId
+            FROM maintenance_works
+            GROUP BY requestId
+            HAVING COUNT(*) > 1
+        ) k ON k.requestId = w.requestId
+        WHERE w.id <> k.keepId
+    """)).fetchall()
+
+    for drop_id, keep_id in duplicates:
+        params = {'drop_id': drop_id, 'keep_id': keep_id}
+        bind.execute(sa.text(
+            "UPDATE spare_parts_requests SET maintenanceWorkId = :keep_id WHERE maintenanceWorkId = :drop_id"
+        ), params)
+        bind.execute(sa.text(
+            "UPDATE machine_downtimes SET maintenanceWorkId = :keep_id WHERE maintenanceWorkId = :drop_id"
+        ), params)
+        bind.execute(sa.text(
+            "UPDATE request_status_events SET entityId = :keep_id "
+            "WHERE entityType = 'MAINTENANCE_WORK' AND entityId = :drop_id"
+        ), params)
+        bind.execute(sa.text("DELETE FROM maintenance_work_steps WHERE maintenanceWorkId = :drop_id"), params)
+        bind.execute(sa.text("DELETE FROM maintenance_works WHERE id = :drop_id"), params)
+
+
+def upgrade() -> None:
+    if not index_exists('maintenance_works', 'uq_maintenance_works_requestId'):
+        merge_duplicate_works()
+        op.create_index('uq_maintenance_works_requestId', 'maintenance_works', ['requestId'], unique=True)
+    # Left behind by a downgrade; the unique index now backs the foreign key
+    if index_exists('maintenance_works', 'ix_maintenance_works_requestId'):
+        op.drop_index('ix_maintenance_works_requestId', table_name='maintenance_works')
+
+    if not table_exists('idempotency_keys'):
+        op.create_table('idempotency_keys',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('updatedAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('key', sa.String(length=255), nullable=False),
+            sa.Column('userId', sa.Integer(), nullable=False),
+            sa.Column('method', sa.String(length=10), nullable=False),
+            sa.Column('path', sa.String(length=255), nullable=False),
+            sa.Column('statusCode', sa.Integer(), nullable=True),
+            sa.Column('responseBody', sa.Text(), nullable=True),
+            sa.ForeignKeyConstraint(['userId'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('userId', 'key', name='uq_idempotency_keys_user_key')
+        )
+        op.create_index(op.f('ix_idempotency_keys_id'), 'idempotency_keys', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_idempotency_keys_id'), table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
+    # MySQL refuses to drop the only index behind the requestId foreign key (error 1553),
+    # so give the key a plain index first
+    if not index_exists('maintenance_works', 'ix_maintenance_works_requestId'):
+        op.create_index('ix_maintenance_works_requestId', 'maintenance_works', ['requestId'], unique=False)
+    op.drop_index('uq_maintenance_works_requestId', table_name='maintenance_works')
@@ -0,0 +1,51 @@
+"""add_reserved_stock_to_spareparts
+
+Revision ID: d4b8e1f6a3c9
+Revises: c7e2a9d4f1b8
+Create Date: 2026-10-18 09:12:27.304518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8e1f6a3c9'
+down_revision: Union[str, None] = 'c7e2a9d4f1b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return column_name in [col['name'] for col in inspector.get_columns(table_name)]
+
+
+def upgrade() -> None:
+    if not column_exists('spareparts', 'reservedStock'):
+        op.add_column('spareparts', sa.Column('reservedStock', sa.Integer(), nullable=False, server_default='0'))
+
+    # Requests approved before reservations existed still hold their units until
+    # issued, unless their work is already closed and will never issue them
+    op.execute("""
+        UPDATE spareparts
+        SET reservedStock = (
+            SELECT COALESCE(SUM(r.quantityRequested), 0)
+            FROM spare_parts_requests r
+            JOIN maintenance_works w ON w.id = r.maintenanceWorkId
+            JOIN maintenance_requests m ON m.id = w.requestId
+            WHERE r.sparePartId = spareparts.id AND r.status = 'APPROVED'
+              AND w.status NOT IN ('COMPLETED', 'CANCELLED')
+              AND m.status NOT IN ('COMPLETED', 'CANCELLED')
+        )
+    """)
+
+
+def downgrade() -> None:
+    if column_exists('spareparts', 'reservedStock'):
+        op.drop_column('spareparts', 'reservedStock')
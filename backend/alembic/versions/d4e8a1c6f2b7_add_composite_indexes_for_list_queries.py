@@ -0,0 +1,51 @@
+"""add_composite_indexes_for_list_queries
+
+Revision ID: d4e8a1c6f2b7
+Revises: c1a7e2f4b9d3
+Create Date: 2026-10-17 10:03:47.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e8a1c6f2b7'
+down_revision: Union[str, None] = 'c1a7e2f4b9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) for the filter/sort paths of the list and report endpoints
+INDEXES = [
+    ('ix_maintenance_requests_status_requestedDate', 'maintenance_requests', ['status', 'requestedDate']),
+    ('ix_attachments_entityType_entityId', 'attachments', ['entityType', 'entityId']),
+    ('ix_inventory_transactions_sparePartId_transactionDate', 'inventory_transactions', ['sparePartId', 'transactionDate']),
+    ('ix_inventory_transactions_type_reference_date', 'inventory_transactions', ['transactionType', 'referenceType', 'transactionDate']),
+    ('ix_activity_logs_timestamp', 'activity_logs', ['timestamp']),
+    ('ix_activity_logs_entityType_entityId', 'activity_logs', ['entityType', 'entityId']),
+    ('ix_spare_parts_requests_status_createdAt', 'spare_parts_requests', ['status', 'createdAt']),
+    ('ix_machine_downtimes_machineId_startTime', 'machine_downtimes', ['machineId', 'startTime']),
+]
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    """Check if an index exists on a table."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [index['name'] for index in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    for index_name, table_name, columns in INDEXES:
+        if not index_exists(table_name, index_name):
+            op.create_index(index_name, table_name, columns, unique=False)
+
+
+def downgrade() -> None:
+    for index_name, table_name, columns in reversed(INDEXES):
+        if index_exists(table_name, index_name):
+            op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,34 @@
+"""allow_unknown_snapshot_quantity
+
+Revision ID: d6b9e3a7c4f2
+Revises: a3f6c8e2b5d1
+Create Date: 2026-10-19 17:43:05.261873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6b9e3a7c4f2'
+down_revision: Union[str, None] = 'a3f6c8e2b5d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL marks a day whose stock is not known
+    with op.batch_alter_table('sparepart_stock_snapshots') as batch_op:
+        batch_op.alter_column('quantity', existing_type=sa.Integer(), nullable=True)
+
+    # The first backfill replayed from zero before a part's first adjustment;
+    # rerun python -m app.cli.stock_snapshots backfill to redo those days
+    op.execute("UPDATE sparepart_stock_snapshots SET quantity = NULL WHERE quantity < 0")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM sparepart_stock_snapshots WHERE quantity IS NULL")
+    with op.batch_alter_table('sparepart_stock_snapshots') as batch_op:
+        batch_op.alter_column('quantity', existing_type=sa.Integer(), nullable=False)
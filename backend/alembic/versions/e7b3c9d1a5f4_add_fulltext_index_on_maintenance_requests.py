@@ -0,0 +1,44 @@
+"""add_fulltext_index_on_maintenance_requests
+
+Revision ID: e7b3c9d1a5f4
+Revises: d4e8a1c6f2b7
+Create Date: 2026-10-17 14:21:09.318426
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c9d1a5f4'
+down_revision: Union[str, None] = 'd4e8a1c6f2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = 'ft_maintenance_requests_title_description'
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    """Check if an index exists on a table."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [index['name'] for index in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    # FULLTEXT is MySQL-only; other databases search through the in-process index
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    if not index_exists('maintenance_requests', INDEX_NAME):
+        op.create_index(INDEX_NAME, 'maintenance_requests', ['title', 'description'], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    if index_exists('maintenance_requests', INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name='maintenance_requests')
@@ -0,0 +1,40 @@
+"""add_version_to_hot_entities
+
+Revision ID: e9a3c5b7d2f4
+Revises: d4b8e1f6a3c9
+Create Date: 2026-10-18 14:37:05.918264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a3c5b7d2f4'
+down_revision: Union[str, None] = 'd4b8e1f6a3c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ['spareparts', 'machines', 'maintenance_requests', 'maintenance_works']
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return column_name in [col['name'] for col in inspector.get_columns(table_name)]
+
+
+def upgrade() -> None:
+    for table_name in VERSIONED_TABLES:
+        if not column_exists(table_name, 'version'):
+            op.add_column(table_name, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    for table_name in VERSIONED_TABLES:
+        if column_exists(table_name, 'version'):
+            op.drop_column(table_name, 'version')
@@ -0,0 +1,72 @@
+"""add_queue_columns_to_maintenance_requests
+
+Revision ID: f3a9d2c7e1b4
+Revises: e7b3c9d1a5f4
+Create Date: 2026-10-17 15:02:44.870153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9d2c7e1b4'
+down_revision: Union[str, None] = 'e7b3c9d1a5f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+QUEUE_INDEX = 'ix_maintenance_requests_queue'
+ASSIGNEE_FK = 'fk_maintenance_requests_assignedToId_users'
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return column_name in [col['name'] for col in inspector.get_columns(table_name)]
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    """Check if an index exists on a table."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [index['name'] for index in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    if not column_exists('maintenance_requests', 'hasWork'):
+        op.add_column('maintenance_requests', sa.Column('hasWork', sa.Boolean(), nullable=False, server_default=sa.false()))
+    if not column_exists('maintenance_requests', 'assignedToId'):
+        op.add_column('maintenance_requests', sa.Column('assignedToId', sa.Integer(), nullable=True))
+        op.create_foreign_key(ASSIGNEE_FK, 'maintenance_requests', 'users', ['assignedToId'], ['id'])
+
+    # Backfill from existing work records; the earliest work holds the accepting technician
+    op.execute("""
+        UPDATE maintenance_requests
+        SET hasWork = 1,
+            assignedToId = (
+                SELECT w.assignedToId FROM maintenance_works w
+                WHERE w.requestId = maintenance_requests.id
+                ORDER BY w.id LIMIT 1
+            )
+        WHERE EXISTS (
+            SELECT 1 FROM maintenance_works w WHERE w.requestId = maintenance_requests.id
+        )
+    """)
+
+    if not index_exists('maintenance_requests', QUEUE_INDEX):
+        op.create_index(QUEUE_INDEX, 'maintenance_requests', ['status', 'hasWork', 'priority', 'requestedDate'], unique=False)
+
+
+def downgrade() -> None:
+    if index_exists('maintenance_requests', QUEUE_INDEX):
+        op.drop_index(QUEUE_INDEX, table_name='maintenance_requests')
+    if column_exists('maintenance_requests', 'assignedToId'):
+        op.drop_constraint(ASSIGNEE_FK, 'maintenance_requests', type_='foreignkey')
+        op.drop_column('maintenance_requests', 'assignedToId')
+    if column_exists('maintenance_requests', 'hasWork'):
+        op.drop_column('maintenance_requests', 'hasWork')
@@ -17,6 +17,8 @@ from app.api.v1.endpoints import (
     activity_logs,
     reports,
     inventory_reports,
+    events,
+    dashboard,
 )
 
 api_router = APIRouter()
@@ -71,3 +73,9 @@ api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 
 # Include inventory reports endpoints
 api_router.include_router(inventory_reports.router, prefix="/reports", tags=["inventory-reports"])
+
+# Include dashboard summary endpoint
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+
+# Include change event stream (Server-Sent Events)
+api_router.include_router(events.router, prefix="/events", tags=["events"])
@@ -11,7 +11,8 @@ import csv
 import io
 import math
 
-from app.core.database import get_db
+from app.core.replicas import get_read_db
+from app.utils.pagination import apply_keyset, keyset_page
 from app.core.deps import require_admin
 from app.models.activity_log import ActivityLog
 from app.models.user import User
@@ -30,7 +31,9 @@ async def get_activity_logs(
     startDate: Optional[datetime] = Query(None, description="Filter logs from date"),
     endDate: Optional[datetime] = Query(None, description="Filter logs to date"),
     search: Optional[str] = Query(None, description="Search in description field"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from nextCursor (empty for the first page)"),
+    includeTotal: bool = Query(False, description="Return the exact total in cursor mode"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -61,15 +64,22 @@ async def get_activity_logs(
             ActivityLog.description.contains(search)
         )
     
-    # Get total count before pagination
-    total = query.count()
-    
-    # Order by timestamp descending (newest first)
-    query = query.order_by(ActivityLog.timestamp.desc())
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    logs = query.offset(offset).limit(page_size).all()
+    if cursor is not None:
+        # Keyset mode: seek on (timestamp, id) and skip the count unless asked
+        total = query.count() if includeTotal else None
+        query = apply_keyset(query, ActivityLog.timestamp, ActivityLog.id, True, cursor)
+        logs, next_cursor = keyset_page(query.limit(page_size + 1).all(), page_size, lambda log: log.timestamp)
+    else:
+        # Get total count before pagination
+        total = query.count()
+        
+        # Order by timestamp descending (newest first)
+        query = query.order_by(ActivityLog.timestamp.desc())
+        
+        # Apply pagination
+        offset = (page - 1) * page_size
+        logs = query.offset(offset).limit(page_size).all()
+        next_cursor = None
     
     # Build response with user relationship
     log_list = []
@@ -95,14 +105,17 @@ async def get_activity_logs(
             updatedAt=log.updatedAt
         ))
     
-    total_pages = math.ceil(total / page_size) if total > 0 else 0
+    total_pages = None
+    if total is not None:
+        total_pages = math.ceil(total / page_size) if total > 0 else 0
     
     return ActivityLogListResponse(
         activityLogs=log_list,
         total=total,
         page=page,
         pageSize=page_size,
-        totalPages=total_pages
+        totalPages=total_pages,
+        nextCursor=next_cursor
     )
 
 
@@ -114,7 +127,7 @@ async def export_activity_logs(
     startDate: Optional[datetime] = Query(None, description="Filter logs from date"),
     endDate: Optional[datetime] = Query(None, description="Filter logs to date"),
     search: Optional[str] = Query(None, description="Search in description field"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
     """
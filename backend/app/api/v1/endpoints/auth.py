@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.core.security import (
     verify_password, 
     create_token_pair, 
@@ -8,6 +9,7 @@ from app.core.security import (
     get_password_hash
 )
 from app.core.deps import get_current_user, security
+from app.core.principal_cache import principal_cache, bump_principals_version
 from app.models.user import User
 from app.schemas.user import (
     LoginRequest, 
@@ -20,10 +22,11 @@ from app.schemas.user import (
 router = APIRouter()
 
 @router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Authenticate user and return access token."""
     # Find user by username
-    user = db.query(User).filter(User.username == login_data.username).first()
+    result = await db.execute(select(User).filter(User.username == login_data.username))
+    user = result.scalars().first()
     
     if not user or not verify_password(login_data.password, user.password):
         raise HTTPException(
@@ -48,12 +51,12 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     )
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(refresh_data: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(refresh_data: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
     """Refresh access token using refresh token."""
     payload = verify_refresh_token(refresh_data.refresh_token)
     
     # Get user from database
-    user = db.query(User).filter(User.id == int(payload.sub)).first()
+    user = await db.get(User, int(payload.sub))
     if not user or not user.isActive:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -80,18 +83,23 @@ async def change_password(
     old_password: str,
     new_password: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Change user password."""
+    # current_user is a cached principal without the password, load the row
+    user = await db.get(User, current_user.id)
+    
     # Verify old password
-    if not verify_password(old_password, current_user.password):
+    if not verify_password(old_password, user.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect old password"
         )
     
     # Update password
-    current_user.password = new_password
-    db.commit()
+    user.password = new_password
+    await db.execute(bump_principals_version())
+    await db.commit()
+    principal_cache.invalidate(user.id)
     
     return {"message": "Password updated successfully"}
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.schemas.dashboard import DashboardSummaryResponse
+from app.services.dashboard_service import get_dashboard_summary
+
+router = APIRouter()
+
+
+@router.get("/summary", response_model=DashboardSummaryResponse)
+async def get_summary(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Counts for the home dashboards in one call (requests, open work, spare parts requests, stock, machines)"""
+    return await get_dashboard_summary(db, current_user)
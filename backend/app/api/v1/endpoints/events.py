@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.deps import get_current_user
+from app.core.events import stream_events
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_events(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream change events (Server-Sent Events) so clients refetch only when data changes"""
+    # Authentication is done; give the connection back instead of holding it for the life of the stream
+    await db.close()
+
+    return StreamingResponse(
+        stream_events(request),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop nginx from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -1,4 +1,8 @@
 from fastapi import APIRouter
+from sqlalchemy import text
+from app.core.database import engine, async_engine
+from app.core.pool_monitor import get_pool_status
+import logging
 
 router = APIRouter()
 
@@ -8,9 +12,21 @@ async def health_check():
 
 @router.get("/detailed")
 async def detailed_health_check():
+    database_status = "connected"
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Database health check failed: {e}")
+        database_status = "unavailable"
+
     return {
-        "status": "healthy",
+        "status": "healthy" if database_status == "connected" else "degraded",
         "service": "maintenance-management-api",
         "version": "1.0.0",
-        "database": "connected",  # This will be updated when we add DB health checks
+        "database": database_status,
+        "pools": get_pool_status({
+            "primary": engine.pool,
+            "async": async_engine.sync_engine.pool,
+        }),
     }
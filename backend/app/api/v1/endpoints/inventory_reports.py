@@ -5,11 +5,12 @@ from fastapi import APIRouter, Depends, Query, Request, HTTPException
 from fastapi import status
 from sqlalchemy.orm import Session
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 import csv
 import io
 
 from app.core.database import get_db
+from app.core.replicas import get_read_db
 from app.core.deps import get_current_user
 from app.models.user import User
 from app.services.maintenance_analysis_service import (
@@ -37,14 +38,19 @@ async def get_inventory_stock_levels(
     groupNumber: Optional[str] = Query(None, description="Filter by group number"),
     groupName: Optional[str] = Query(None, description="Filter by group name"),
     location: Optional[str] = Query(None, description="Filter by location"),
+    asOf: Optional[date] = Query(None, description="Report the stock at the end of this day (UTC) instead of now"),
     export: Optional[str] = Query(None, description="Export format: csv or excel"),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
     """
     Get stock levels report for all spare parts.
     
+    With asOf, quantities are the stock at the end of that day, read from the
+    daily stock snapshots plus the transactions since the latest one.
+    
     Admin and Inventory Manager access only.
     """
     # Check if user has required role
@@ -56,21 +62,25 @@ async def get_inventory_stock_levels(
     
     # Get stock levels
     items = get_stock_levels(
-        db=db,
+        db=read_db,
         group_number=groupNumber,
         group_name=groupName,
-        location=location
+        location=location,
+        as_of=asOf
     )
     
     # Calculate summary statistics
     critical_count = sum(1 for item in items if item['status'] == 'CRITICAL')
     low_count = sum(1 for item in items if item['status'] == 'LOW')
+    unknown_count = sum(1 for item in items if item['status'] == 'UNKNOWN')
     
     response = {
         'items': items,
         'totalItems': len(items),
         'criticalCount': critical_count,
-        'lowStockCount': low_count
+        'lowStockCount': low_count,
+        'unknownCount': unknown_count,
+        'asOf': asOf
     }
     
     # Log activity
@@ -80,7 +90,7 @@ async def get_inventory_stock_levels(
         action="READ",
         entityType="STOCK_LEVELS_REPORT",
         entityId=0,
-        description=f"Accessed stock levels report",
+        description=f"Accessed stock levels report as of {asOf}" if asOf else "Accessed stock levels report",
         request=request
     )
     db.commit()
@@ -101,6 +111,7 @@ async def get_inventory_consumption(
     location: Optional[str] = Query(None, description="Filter by location"),
     export: Optional[str] = Query(None, description="Export format: csv or excel"),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
@@ -118,7 +129,7 @@ async def get_inventory_consumption(
     
     # Get consumption trends
     result = get_consumption_trends(
-        db=db,
+        db=read_db,
         date_from=dateFrom,
         date_to=dateTo,
         machine_id=machineId,
@@ -148,14 +159,19 @@ async def get_inventory_consumption(
 @router.get("/inventory/valuation", response_model=ValuationReportResponse)
 async def get_inventory_valuation(
     groupNumber: Optional[str] = Query(None, description="Filter by group number"),
+    asOf: Optional[date] = Query(None, description="Report the stock at the end of this day (UTC) instead of now"),
     export: Optional[str] = Query(None, description="Export format: csv or excel"),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
     """
     Get inventory valuation report.
     
+    With asOf, the stock and unit prices are those at the end of that day (see
+    the stock levels report).
+    
     Admin and Inventory Manager access only.
     """
     # Check if user has required role
@@ -167,9 +183,11 @@ async def get_inventory_valuation(
     
     # Get valuation
     result = calculate_inventory_valuation(
-        db=db,
-        group_number=groupNumber
+        db=read_db,
+        group_number=groupNumber,
+        as_of=asOf
     )
+    result['asOf'] = asOf
     
     # Log activity
     log_activity(
@@ -178,7 +196,7 @@ async def get_inventory_valuation(
         action="READ",
         entityType="VALUATION_REPORT",
         entityId=0,
-        description=f"Accessed valuation report",
+        description=f"Accessed valuation report as of {asOf}" if asOf else "Accessed valuation report",
         request=request
     )
     db.commit()
@@ -196,6 +214,7 @@ async def get_inventory_reorder(
     location: Optional[str] = Query(None, description="Filter by location"),
     export: Optional[str] = Query(None, description="Export format: csv or excel"),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
@@ -213,7 +232,7 @@ async def get_inventory_reorder(
     
     # Get reorder report
     items = get_reorder_report(
-        db=db,
+        db=read_db,
         group_number=groupNumber,
         location=location
     )
@@ -253,6 +272,8 @@ async def _export_stock_levels_csv(data: dict, group_number: Optional[str]):
     
     # Write header
     writer.writerow(["Report Type: Stock Levels"])
+    if data.get('asOf'):
+        writer.writerow(["As Of: {}".format(data['asOf'])])
     if group_number:
         writer.writerow(["Group: {}".format(group_number)])
     writer.writerow([])
@@ -262,6 +283,8 @@ async def _export_stock_levels_csv(data: dict, group_number: Optional[str]):
     writer.writerow(["Total Items", data['totalItems']])
     writer.writerow(["Critical Count", data['criticalCount']])
     writer.writerow(["Low Stock Count", data['lowStockCount']])
+    if data.get('unknownCount'):
+        writer.writerow(["Unknown Stock Count", data['unknownCount']])
     writer.writerow([])
     
     # Write items
@@ -285,7 +308,7 @@ async def _export_stock_levels_csv(data: dict, group_number: Optional[str]):
             item['categoryNumber'] or '',
             item['categoryName'] or '',
             item['location'] or '',
-            item['quantity'],
+            item['quantity'] if item['quantity'] is not None else '',
             item['minQuantity'],
             item['maxQuantity'] or '',
             item['unitPrice'] or '',
@@ -364,11 +387,15 @@ async def _export_valuation_csv(data: dict):
     
     # Write header
     writer.writerow(["Report Type: Inventory Valuation"])
+    if data.get('asOf'):
+        writer.writerow(["As Of: {}".format(data['asOf'])])
     writer.writerow([])
     
     # Write summary
     writer.writerow(["Summary"])
     writer.writerow(["Total Valuation", data['totalValuation']])
+    if data.get('unknownPartCount'):
+        writer.writerow(["Parts With Unknown Stock (not valued)", data['unknownPartCount']])
     writer.writerow([])
     
     # Write by group
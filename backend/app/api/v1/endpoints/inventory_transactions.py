@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy import or_, and_, func
 from typing import Optional
 from datetime import datetime
 import json
 import math
 from app.core.database import get_db
+from app.utils.pagination import apply_keyset, keyset_page
 from app.core.deps import get_current_user, require_inventory_manager, require_management
+from app.core.events import ChangeEvent, publish_event
 from app.models.inventory_transaction import InventoryTransaction, TransactionType
 from app.models.spare_part import SparePart
 from app.models.user import User
@@ -14,13 +17,23 @@ from app.schemas.inventory_transaction import (
     InventoryTransactionCreate,
     InventoryTransactionUpdate,
     InventoryTransactionResponse,
-    InventoryTransactionListResponse
+    InventoryTransactionListResponse,
+    InventoryTransactionImportRow,
+    InventoryTransactionImportError,
+    InventoryTransactionImportStockChange,
+    InventoryTransactionImportResponse
 )
 
 router = APIRouter()
 
+# Handlers that write are plain def: FastAPI runs them in its threadpool, so a
+# sync Session waiting on a row lock holds a worker thread, not the event loop
+
+# Rows parsed, resolved and written per batch by the file import
+IMPORT_CHUNK_SIZE = 500
+
 @router.get("", response_model=InventoryTransactionListResponse)
-async def list_inventory_transactions(
+def list_inventory_transactions(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(25, ge=1, le=100, description="Items per page"),
     transactionType: Optional[str] = Query(None, description="Filter by transaction type: IN, OUT, ADJUSTMENT, TRANSFER"),
@@ -32,6 +45,8 @@ async def list_inventory_transactions(
     search: Optional[str] = Query(None, description="Search in reference number or notes"),
     sort_by: Optional[str] = Query("transactionDate", description="Sort field: transactionDate, quantity, totalValue"),
     sort_order: Optional[str] = Query("desc", description="Sort order: asc, desc"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from nextCursor (empty for the first page)"),
+    includeTotal: bool = Query(False, description="Return the exact total in cursor mode"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_management)
 ):
@@ -69,9 +84,6 @@ async def list_inventory_transactions(
             )
         )
     
-    # Get total count before pagination
-    total = query.count()
-    
     # Apply sorting
     if sort_by == "transactionDate":
         order_column = InventoryTransaction.transactionDate
@@ -82,14 +94,28 @@ async def list_inventory_transactions(
     else:
         order_column = InventoryTransaction.transactionDate
     
-    if sort_order == "asc":
-        query = query.order_by(order_column.asc())
+    if cursor is not None:
+        # Keyset mode: seek on (sort column, id) and skip the count unless asked
+        total = query.count() if includeTotal else None
+        query = apply_keyset(query, order_column, InventoryTransaction.id, sort_order != "asc", cursor)
+        transactions, next_cursor = keyset_page(
+            query.limit(page_size + 1).all(),
+            page_size,
+            lambda t: getattr(t, order_column.key)
+        )
     else:
-        query = query.order_by(order_column.desc())
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    transactions = query.offset(offset).limit(page_size).all()
+        # Get total count before pagination
+        total = query.count()
+        
+        if sort_order == "asc":
+            query = query.order_by(order_column.asc())
+        else:
+            query = query.order_by(order_column.desc())
+        
+        # Apply pagination
+        offset = (page - 1) * page_size
+        transactions = query.offset(offset).limit(page_size).all()
+        next_cursor = None
     
     # Build response with related data
     transaction_list = []
@@ -113,18 +139,21 @@ async def list_inventory_transactions(
             updatedAt=trans.updatedAt
         ))
     
-    total_pages = math.ceil(total / page_size) if total > 0 else 0
+    total_pages = None
+    if total is not None:
+        total_pages = math.ceil(total / page_size) if total > 0 else 0
     
     return InventoryTransactionListResponse(
         transactions=transaction_list,
         total=total,
         page=page,
         pageSize=page_size,
-        totalPages=total_pages
+        totalPages=total_pages,
+        nextCursor=next_cursor
     )
 
 @router.get("/{transaction_id}", response_model=InventoryTransactionResponse)
-async def get_inventory_transaction(
+def get_inventory_transaction(
     transaction_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_management)
@@ -157,7 +186,7 @@ async def get_inventory_transaction(
     )
 
 @router.post("", response_model=InventoryTransactionResponse)
-async def create_inventory_transaction(
+def create_inventory_transaction(
     transaction_data: InventoryTransactionCreate,
     request: Request,
     db: Session = Depends(get_db),
@@ -173,17 +202,7 @@ async def create_inventory_transaction(
     if not spare_part.isActive:
         raise HTTPException(status_code=400, detail="Cannot create transaction for inactive spare part")
     
-    # Store before quantity for activity log
-    before_quantity = spare_part.currentStock
-    
-    # Validate stock for OUT transactions
     transaction_type = TransactionType(transaction_data.transactionType)
-    if transaction_type == TransactionType.OUT:
-        if spare_part.currentStock < transaction_data.quantity:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Insufficient stock. Current stock: {spare_part.currentStock}, Requested: {transaction_data.quantity}"
-            )
     
     # Calculate total value
     total_value = None
@@ -193,22 +212,27 @@ async def create_inventory_transaction(
     # Set transaction date
     transaction_date = transaction_data.transactionDate or datetime.utcnow()
     
-    # Calculate new quantity based on transaction type
-    if transaction_type == TransactionType.IN:
-        after_quantity = spare_part.currentStock + transaction_data.quantity
-    elif transaction_type == TransactionType.OUT:
-        after_quantity = spare_part.currentStock - transaction_data.quantity
-    elif transaction_type == TransactionType.ADJUSTMENT:
-        after_quantity = transaction_data.quantity
-    elif transaction_type == TransactionType.TRANSFER:
-        after_quantity = spare_part.currentStock - transaction_data.quantity
-        if after_quantity < 0:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Insufficient stock for transfer. Current stock: {spare_part.currentStock}, Requested: {transaction_data.quantity}"
-            )
+    # Apply the quantity change in the database so concurrent transactions cannot overwrite it
+    from app.services.stock_service import change_stock, set_stock
+    if transaction_type == TransactionType.ADJUSTMENT:
+        stock_change = set_stock(db, spare_part, transaction_data.quantity)
+        if stock_change is None:
+            detail = f"Cannot adjust stock below the {spare_part.reservedStock} units reserved for approved requests"
+            db.rollback()
+            raise HTTPException(status_code=400, detail=detail)
     else:
-        after_quantity = spare_part.currentStock
+        delta = transaction_data.quantity if transaction_type == TransactionType.IN else -transaction_data.quantity
+        stock_change = change_stock(db, spare_part, delta)
+        if stock_change is None:
+            shortfall = "Insufficient stock for transfer" if transaction_type == TransactionType.TRANSFER else "Insufficient stock"
+            detail = (
+                f"{shortfall}. Available: {spare_part.availableStock} "
+                f"({spare_part.reservedStock} of {spare_part.currentStock} reserved), Requested: {transaction_data.quantity}"
+            )
+            # Release the row lock now rather than when the session closes
+            db.rollback()
+            raise HTTPException(status_code=400, detail=detail)
+    before_quantity, after_quantity = stock_change
     
     try:
         # Create transaction record
@@ -225,9 +249,6 @@ async def create_inventory_transaction(
             performedById=current_user.id
         )
         db.add(transaction)
-        
-        # Update spare part quantity
-        spare_part.currentStock = after_quantity
         db.flush()  # Flush to get transaction ID
         
         # Create activity log
@@ -253,8 +274,12 @@ async def create_inventory_transaction(
             request=request
         )
         
+        from app.services.stock_snapshot_service import record_stock_snapshots
+        record_stock_snapshots(db, [spare_part.id], since=transaction_date)
+        
         db.commit()
         db.refresh(transaction)
+        publish_event(ChangeEvent.STOCK_CHANGED, sparePartId=transaction.sparePartId)
         
         # Return response with before/after quantities
         return InventoryTransactionResponse(
@@ -278,7 +303,202 @@ async def create_inventory_transaction(
             updatedAt=transaction.updatedAt
         )
     
+    except StaleDataError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create transaction: {str(e)}")
 
+
+@router.post("/import", response_model=InventoryTransactionImportResponse)
+def import_inventory_transactions(
+    request: Request,
+    file: UploadFile = File(...),
+    dryRun: bool = Query(False, description="Check the file and report errors without saving anything"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_inventory_manager)
+):
+    """Import inventory transactions from a CSV or XLSX file.
+    
+    The columns are the create fields with partNumber in place of sparePartId.
+    Rows are applied in file order and each one is checked against the stock
+    the rows before it leave for its part, less the units reserved for
+    approved requests. A row that fails is reported with
+    its line number and skipped; the rest are committed together.
+    
+    The file is parsed IMPORT_CHUNK_SIZE rows at a time: one query resolves
+    and locks the chunk's parts, and its transactions and activity logs are
+    inserted with one executemany each. Stock levels are written once per
+    part at the end.
+    """
+    from pydantic import ValidationError
+    from sqlalchemy import bindparam, insert, update
+    from app.services.audit_service import activity_log_values, log_activities
+    from app.services.stock_snapshot_service import record_stock_snapshots, utc_day
+    from app.utils.uploads import chunked, iter_upload_rows, validation_message
+    
+    parts = {}  # partNumber -> (id, partNumber, currentStock, reservedStock, isActive)
+    stock = {}  # sparePartId -> stock after the rows applied so far
+    touched = {}  # sparePartId -> stock before the import, for parts with an imported row
+    earliest = None  # earliest transactionDate imported, for the stock snapshots
+    errors = []
+    total_rows = 0
+    imported = 0
+    now = datetime.utcnow()
+    file_name = file.filename or "upload"
+    
+    try:
+        rows = iter_upload_rows(file, required=("partNumber", "transactionType", "quantity"))
+        for chunk in chunked(rows, IMPORT_CHUNK_SIZE):
+            total_rows += len(chunk)
+            valid_rows = []
+            for row_number, cells in chunk:
+                try:
+                    valid_rows.append((row_number, InventoryTransactionImportRow.model_validate(cells)))
+                except ValidationError as e:
+                    part_number = cells.get("partNumber")
+                    errors.append(InventoryTransactionImportError(
+                        row=row_number,
+                        partNumber=str(part_number) if part_number is not None else None,
+                        error=validation_message(e)
+                    ))
+            
+            # Parts not seen in earlier chunks; locked until the commit so the stock
+            # checked below is the stock that gets written
+            missing = {row.partNumber for _, row in valid_rows} - parts.keys()
+            if missing:
+                for part in db.query(
+                    SparePart.id, SparePart.partNumber, SparePart.currentStock, SparePart.reservedStock, SparePart.isActive
+                ).filter(SparePart.partNumber.in_(missing)).order_by(SparePart.id).with_for_update().all():
+                    parts[part.partNumber] = part
+                    stock[part.id] = part.currentStock
+            
+            transactions = []
+            activity_logs = []
+            for row_number, row in valid_rows:
+                part = parts.get(row.partNumber)
+                if part is None:
+                    errors.append(InventoryTransactionImportError(row=row_number, partNumber=row.partNumber, error="Spare part not found"))
+                    continue
+                if not part.isActive:
+                    errors.append(InventoryTransactionImportError(
+                        row=row_number, partNumber=row.partNumber, error="Cannot create transaction for inactive spare part"
+                    ))
+                    continue
+                
+                transaction_type = TransactionType(row.transactionType)
+                before_quantity = stock[part.id]
+                # Units reserved for approved requests can only leave through an issue
+                if transaction_type == TransactionType.ADJUSTMENT:
+                    if row.quantity < part.reservedStock:
+                        errors.append(InventoryTransactionImportError(
+                            row=row_number,
+                            partNumber=row.partNumber,
+                            error=f"Cannot adjust stock below the {part.reservedStock} units reserved for approved requests"
+                        ))
+                        continue
+                    after_quantity = row.quantity
+                elif transaction_type == TransactionType.IN:
+                    after_quantity = before_quantity + row.quantity
+                elif before_quantity - part.reservedStock < row.quantity:
+                    shortfall = "Insufficient stock for transfer" if transaction_type == TransactionType.TRANSFER else "Insufficient stock"
+                    errors.append(InventoryTransactionImportError(
+                        row=row_number,
+                        partNumber=row.partNumber,
+                        error=(
+                            f"{shortfall}. Available at this row: {before_quantity - part.reservedStock} "
+                            f"({part.reservedStock} of {before_quantity} reserved), Requested: {row.quantity}"
+                        )
+                    ))
+                    continue
+                else:
+                    after_quantity = before_quantity - row.quantity
+                stock[part.id] = after_quantity
+                touched.setdefault(part.id, part.currentStock)
+                
+                total_value = row.unitPrice * row.quantity if row.unitPrice else None
+                transaction_date = row.transactionDate or now
+                if earliest is None or utc_day(transaction_date) < utc_day(earliest):
+                    earliest = transaction_date
+                transactions.append({
+                    "sparePartId": part.id,
+                    "transactionType": transaction_type,
+                    "quantity": row.quantity,
+                    "unitPrice": row.unitPrice,
+                    "totalValue": total_value,
+                    "referenceType": row.referenceType,
+                    "referenceNumber": row.referenceNumber,
+                    "notes": row.notes,
+                    "transactionDate": transaction_date,
+                    "performedById": current_user.id,
+                })
+                # Rows are inserted in one executemany without their ids, so the log is kept on the part
+                activity_logs.append(activity_log_values(
+                    userId=current_user.id,
+                    action="IMPORT",
+                    entityType="SPARE_PART",
+                    entityId=part.id,
+                    description=f"Transaction {transaction_type.value} of {row.quantity} units for {part.partNumber} imported from {file_name} (row {row_number}) by {current_user.fullName}",
+                    oldValues={"quantity": {"before": before_quantity, "after": after_quantity}},
+                    newValues={
+                        "transactionType": transaction_type.value,
+                        "quantity": row.quantity,
+                        "unitPrice": row.unitPrice,
+                        "totalValue": total_value,
+                        "referenceType": row.referenceType,
+                        "referenceNumber": row.referenceNumber,
+                        "row": row_number
+                    },
+                    request=request,
+                    timestamp=now
+                ))
+            
+            imported += len(transactions)
+            if transactions and not dryRun:
+                # Core insert: the ORM one splits the batch wherever a different set of columns is None
+                db.execute(insert(InventoryTransaction.__table__), transactions)
+                log_activities(db, activity_logs)
+        
+        if dryRun or not touched:
+            db.rollback()
+        else:
+            # The parts are locked, so the final stock can be written as an absolute value
+            spareparts = SparePart.__table__
+            write_stock = (
+                update(spareparts)
+                .where(spareparts.c.id == bindparam("partId"))
+                .values(currentStock=bindparam("stock"), version=spareparts.c.version + 1)
+            )
+            for part_ids in chunked(touched, IMPORT_CHUNK_SIZE):
+                db.execute(write_stock, [{"partId": part_id, "stock": stock[part_id]} for part_id in part_ids])
+            record_stock_snapshots(db, touched, since=earliest)
+            db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to import transactions: {str(e)}")
+    
+    if touched and not dryRun:
+        publish_event(ChangeEvent.STOCK_CHANGED, sparePartIds=list(touched))
+    
+    errors.sort(key=lambda error: error.row)
+    part_numbers = {part.id: part.partNumber for part in parts.values()}
+    return InventoryTransactionImportResponse(
+        totalRows=total_rows,
+        imported=imported,
+        failed=len(errors),
+        dryRun=dryRun,
+        errors=errors,
+        stockChanges=[
+            InventoryTransactionImportStockChange(
+                sparePartId=part_id,
+                partNumber=part_numbers[part_id],
+                beforeQuantity=before_quantity,
+                afterQuantity=stock[part_id]
+            )
+            for part_id, before_quantity in touched.items()
+        ]
+    )
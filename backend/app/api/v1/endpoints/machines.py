@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, func, select
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_async_db, count_rows
 from app.core.deps import get_current_user, require_admin, require_role_list
+from app.core.etag import check_if_match, set_etag
+from app.core.events import ChangeEvent, publish_event
 from app.models.machine import Machine, MachineStatus
 from app.models.department import Department
 from app.models.user import User
@@ -38,11 +41,11 @@ async def list_machines(
     department_id: Optional[int] = Query(None),
     status: Optional[MachineStatus] = Query(None),
     location: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["ADMIN", "MAINTENANCE_MANAGER"]))
 ):
     """List machines with pagination and filtering"""
-    query = db.query(Machine)
+    query = select(Machine)
     
     # Apply filters
     if search:
@@ -62,11 +65,12 @@ async def list_machines(
         query = query.filter(Machine.location.contains(location))
     
     # Get total count
-    total = query.count()
+    total = await count_rows(db, query)
     
     # Apply pagination
     offset = (page - 1) * page_size
-    machines = query.offset(offset).limit(page_size).all()
+    result = await db.execute(query.offset(offset).limit(page_size))
+    machines = result.scalars().all()
     
     # Convert to response format
     machine_responses = [MachineResponse.model_validate(machine) for machine in machines]
@@ -82,16 +86,16 @@ async def list_machines(
 @router.get("/status-summary", response_model=MachineStatusSummaryResponse)
 async def get_machine_status_summary(
     status: Optional[List[MachineStatus]] = Query(default=None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["ADMIN", "MAINTENANCE_MANAGER", "SUPERVISOR"]))
 ):
     """Return counts of machines grouped by status."""
-    query = db.query(Machine.status, func.count(Machine.id)).group_by(Machine.status)
+    query = select(Machine.status, func.count(Machine.id)).group_by(Machine.status)
 
     if status:
         query = query.filter(Machine.status.in_(status))
 
-    results = query.all()
+    results = (await db.execute(query)).all()
 
     counts: dict[str, int] = {}
     for machine_status, count in results:
@@ -112,30 +116,31 @@ async def get_machine_status_summary(
 @router.post("", response_model=MachineResponse)
 async def create_machine(
     machine_data: MachineCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Create a new machine"""
     # Validate department exists
-    department = db.query(Department).filter(Department.id == machine_data.departmentId).first()
+    department = await db.get(Department, machine_data.departmentId)
     if not department:
         raise HTTPException(status_code=400, detail="Department not found")
     
     # Validate serial number is unique if provided
     if machine_data.serialNumber:
-        existing_machine = db.query(Machine).filter(Machine.serialNumber == machine_data.serialNumber).first()
+        result = await db.execute(select(Machine).filter(Machine.serialNumber == machine_data.serialNumber))
+        existing_machine = result.scalars().first()
         if existing_machine:
             raise HTTPException(status_code=400, detail="A machine with this serial number already exists. Please use a different serial number.")
     
     # Use provided QR code or generate unique one
     if machine_data.qrCode:
         # Validate that the provided QR code is unique
-        if not QRCodeService.validate_qr_code_uniqueness(db, machine_data.qrCode, None):
+        if not await QRCodeService.validate_qr_code_uniqueness(db, machine_data.qrCode, None):
             raise HTTPException(status_code=400, detail="QR code already exists. Please use a different QR code.")
         qr_code = machine_data.qrCode
     else:
         # Generate unique QR code
-        qr_code = QRCodeService.generate_qr_code_for_machine(db, None)
+        qr_code = await QRCodeService.generate_qr_code_for_machine(db, None)
     
     # Create machine
     machine = Machine(
@@ -150,39 +155,44 @@ async def create_machine(
     )
     
     db.add(machine)
-    db.commit()
-    db.refresh(machine)
+    await db.commit()
+    await db.refresh(machine)
     
     return MachineResponse.model_validate(machine)
 
 @router.get("/{machine_id}", response_model=MachineResponse)
 async def get_machine(
     machine_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get machine details by ID"""
-    machine = db.query(Machine).filter(Machine.id == machine_id).first()
+    machine = await db.get(Machine, machine_id)
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
     
+    set_etag(response, machine.version)
     return MachineResponse.model_validate(machine)
 
 @router.patch("/{machine_id}", response_model=MachineResponse)
 async def update_machine(
     machine_id: int,
     machine_data: MachineUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
-    """Update machine"""
-    machine = db.query(Machine).filter(Machine.id == machine_id).first()
+    """Update machine. A stale If-Match version gets 412."""
+    machine = await db.get(Machine, machine_id)
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
+    check_if_match(if_match, machine.version)
     
     # Validate department if provided
     if machine_data.departmentId:
-        department = db.query(Department).filter(Department.id == machine_data.departmentId).first()
+        department = await db.get(Department, machine_data.departmentId)
         if not department:
             raise HTTPException(status_code=400, detail="Department not found")
     
@@ -191,35 +201,40 @@ async def update_machine(
     
     # Validate QR code is unique if provided and changed
     if 'qrCode' in update_data and update_data['qrCode'] != machine.qrCode:
-        if not QRCodeService.validate_qr_code_uniqueness(db, update_data['qrCode'], machine_id):
+        if not await QRCodeService.validate_qr_code_uniqueness(db, update_data['qrCode'], machine_id):
             raise HTTPException(status_code=400, detail="QR code already exists. Please use a different QR code.")
     
     # Validate serial number is unique if provided and changed
     if 'serialNumber' in update_data and update_data['serialNumber'] != machine.serialNumber:
-        existing_machine = db.query(Machine).filter(
+        result = await db.execute(select(Machine).filter(
             Machine.serialNumber == update_data['serialNumber'],
             Machine.id != machine_id
-        ).first()
+        ))
+        existing_machine = result.scalars().first()
         if existing_machine:
             raise HTTPException(status_code=400, detail="A machine with this serial number already exists. Please use a different serial number.")
     
     # Update fields
+    old_status = machine.status
     for field, value in update_data.items():
         setattr(machine, field, value)
     
-    db.commit()
-    db.refresh(machine)
+    await db.commit()
+    await db.refresh(machine)
+    if machine.status != old_status:
+        publish_event(ChangeEvent.MACHINE_STATUS_CHANGED, id=machine.id, status=machine.status.value)
     
+    set_etag(response, machine.version)
     return MachineResponse.model_validate(machine)
 
 @router.delete("/{machine_id}")
 async def delete_machine(
     machine_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Delete machine"""
-    machine = db.query(Machine).filter(Machine.id == machine_id).first()
+    machine = await db.get(Machine, machine_id)
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
     
@@ -227,8 +242,8 @@ async def delete_machine(
     # For now, we'll allow deletion but this could be enhanced
     # to check for maintenance requests, work orders, etc.
     
-    db.delete(machine)
-    db.commit()
+    await db.delete(machine)
+    await db.commit()
     
     return {"message": "Machine deleted successfully"}
 
@@ -236,11 +251,11 @@ async def delete_machine(
 async def get_machine_qr_code(
     machine_id: int,
     size: int = Query(200, ge=100, le=500),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin)
 ):
     """Get QR code image for machine"""
-    machine = db.query(Machine).filter(Machine.id == machine_id).first()
+    machine = await db.get(Machine, machine_id)
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
     
@@ -260,7 +275,7 @@ async def get_machine_qr_code(
 @router.get("/qr/{qr_code:path}", response_model=MachineResponse)
 async def get_machine_by_qr_code(
     qr_code: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get machine by QR code (for mobile scanning)
     
@@ -272,11 +287,12 @@ async def get_machine_by_qr_code(
     logger = logging.getLogger(__name__)
     logger.info(f"Received QR code lookup request for: {repr(qr_code)} (length: {len(qr_code)})")
     
-    machine = db.query(Machine).options(joinedload(Machine.department)).filter(Machine.qrCode == qr_code).first()
+    result = await db.execute(select(Machine).options(joinedload(Machine.department)).filter(Machine.qrCode == qr_code))
+    machine = result.scalars().first()
     if not machine:
         logger.warning(f"Machine not found for QR code: {repr(qr_code)}")
         # Try to find similar QR codes for debugging
-        similar = db.query(Machine.qrCode).limit(5).all()
+        similar = (await db.execute(select(Machine.qrCode).limit(5))).all()
         logger.info(f"Sample QR codes in database: {[str(q[0])[:50] for q in similar]}")
         raise HTTPException(status_code=404, detail="Machine not found")
     
@@ -289,47 +305,51 @@ async def get_machine_detail(
     include_history: bool = Query(True, description="Include maintenance history"),
     page: int = Query(1, ge=1, description="Page number for maintenance history"),
     page_size: int = Query(10, ge=1, le=100, description="Page size for maintenance history"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get comprehensive machine detail with history, spare parts, and attachments"""
     
     # Get machine with department
-    machine = db.query(Machine).options(joinedload(Machine.department)).filter(Machine.id == machine_id).first()
+    machine = await db.get(Machine, machine_id, options=[joinedload(Machine.department)])
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
     
     # Get active maintenance requests (not completed or cancelled)
-    active_maintenance = db.query(MaintenanceRequest).filter(
+    result = await db.execute(select(MaintenanceRequest).filter(
         MaintenanceRequest.machineId == machine_id,
         MaintenanceRequest.status.in_([RequestStatus.PENDING, RequestStatus.IN_PROGRESS, RequestStatus.WAITING_PARTS])
-    ).order_by(MaintenanceRequest.requestedDate.desc()).all()
+    ).order_by(MaintenanceRequest.requestedDate.desc()))
+    active_maintenance = result.scalars().all()
     
     # Get maintenance history (completed and cancelled) with pagination
     maintenance_history = []
     total_maintenance_count = 0
     
     if include_history:
-        history_query = db.query(MaintenanceRequest).filter(
+        history_query = select(MaintenanceRequest).filter(
             MaintenanceRequest.machineId == machine_id,
             MaintenanceRequest.status.in_([RequestStatus.COMPLETED, RequestStatus.CANCELLED])
         )
         
-        total_maintenance_count = history_query.count()
+        total_maintenance_count = await count_rows(db, history_query)
         
         offset = (page - 1) * page_size
-        maintenance_history = history_query.order_by(MaintenanceRequest.requestedDate.desc()).offset(offset).limit(page_size).all()
+        result = await db.execute(history_query.order_by(MaintenanceRequest.requestedDate.desc()).offset(offset).limit(page_size))
+        maintenance_history = result.scalars().all()
     
     # Get spare parts requirements
-    spare_parts_reqs = db.query(MachineSparePart).options(joinedload(MachineSparePart.sparePart)).filter(
+    result = await db.execute(select(MachineSparePart).options(joinedload(MachineSparePart.sparePart)).filter(
         MachineSparePart.machineId == machine_id
-    ).all()
+    ))
+    spare_parts_reqs = result.scalars().all()
     
     # Get attachments
-    attachments = db.query(Attachment).options(joinedload(Attachment.uploadedBy)).filter(
+    result = await db.execute(select(Attachment).options(joinedload(Attachment.uploadedBy)).filter(
         Attachment.entityType == 'MACHINE',
         Attachment.entityId == machine_id
-    ).all()
+    ))
+    attachments = result.scalars().all()
     
     # Build response with stock status for spare parts
     spare_parts_info = []
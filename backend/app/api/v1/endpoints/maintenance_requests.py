@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, UploadFile, File, Form, Query, Request, Response
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import datetime
 import os
-from app.core.database import get_db
+from app.core.database import get_async_db, count_rows
+from app.utils.pagination import apply_keyset, keyset_page
 from app.core.deps import get_current_user, require_role_list
+from app.core.etag import check_if_match, set_etag
 from app.models.maintenance_request import MaintenanceRequest, RequestStatus, RequestPriority
 from app.models.machine import Machine, MachineStatus
 from app.models.user import User, UserRole
@@ -18,47 +22,99 @@ from app.schemas.maintenance_request import (
     MaintenanceRequestFilters
 )
 from app.schemas.attachment import AttachmentResponse
+from app.services.request_search_service import apply_search, index_request
+from app.core.events import ChangeEvent, publish_event
 import uuid
 import shutil
 
 router = APIRouter()
 
-def _build_request_response(db: Session, request: MaintenanceRequest) -> MaintenanceRequestResponse:
-    """Serialize MaintenanceRequest with attachments and requester name."""
-    attachments = db.query(Attachment).filter(
-        Attachment.entityType == "MAINTENANCE_REQUEST",
-        Attachment.entityId == request.id
-    ).all()
+async def _build_request_responses(db: AsyncSession, requests: List[MaintenanceRequest]) -> List[MaintenanceRequestResponse]:
+    """Serialize MaintenanceRequests with attachments and requester names.
 
-    requested_by_name = None
-    if getattr(request, "requestedBy", None):
-        requested_by_name = request.requestedBy.fullName
-    else:
-        # Ensure relationship is loaded if not already
-        user = db.query(User).filter(User.id == request.requestedById).first()
-        if user:
-            requested_by_name = user.fullName
+    Runs at most two queries whatever the number of requests: one IN query for
+    the attachments of every request and one for requesters that were not
+    loaded with selectinload(MaintenanceRequest.requestedBy).
+    """
+    if not requests:
+        return []
+
+    request_ids = [request.id for request in requests]
+    result = await db.execute(
+        select(Attachment).filter(
+            Attachment.entityType == "MAINTENANCE_REQUEST",
+            Attachment.entityId.in_(request_ids)
+        ).order_by(Attachment.id)
+    )
+    attachments_by_request = {}
+    for attachment in result.scalars().all():
+        attachments_by_request.setdefault(attachment.entityId, []).append(attachment)
 
-    request_dict = {
-        "id": request.id,
-        "title": request.title,
-        "description": request.description,
-        "priority": request.priority,
-        "status": request.status,
-        "requestedDate": request.requestedDate,
-        "expectedCompletionDate": request.expectedCompletionDate,
-        "actualCompletionDate": request.actualCompletionDate,
-        "machineId": request.machineId,
-        "requestedById": request.requestedById,
-        "requestedByName": requested_by_name,
-        "failureCodeId": request.failureCodeId,
-        "maintenanceTypeId": request.maintenanceTypeId,
-        "createdAt": request.createdAt,
-        "updatedAt": request.updatedAt,
-        "attachments": [AttachmentResponse.model_validate(att) for att in attachments] if attachments else []
-    }
+    requester_names = {}
+    missing_requesters = set()
+    for request in requests:
+        if "requestedBy" in inspect(request).unloaded:
+            missing_requesters.add(request.requestedById)
+        elif request.requestedBy:
+            requester_names[request.requestedById] = request.requestedBy.fullName
+    if missing_requesters:
+        result = await db.execute(
+            select(User.id, User.fullName).filter(User.id.in_(missing_requesters))
+        )
+        requester_names.update({user_id: full_name for user_id, full_name in result.all()})
+
+    return [
+        MaintenanceRequestResponse(
+            id=request.id,
+            title=request.title,
+            description=request.description,
+            priority=request.priority,
+            status=request.status,
+            requestedDate=request.requestedDate,
+            expectedCompletionDate=request.expectedCompletionDate,
+            actualCompletionDate=request.actualCompletionDate,
+            machineId=request.machineId,
+            requestedById=request.requestedById,
+            requestedByName=requester_names.get(request.requestedById),
+            hasWork=request.hasWork,
+            assignedToId=request.assignedToId,
+            failureCodeId=request.failureCodeId,
+            maintenanceTypeId=request.maintenanceTypeId,
+            createdAt=request.createdAt,
+            updatedAt=request.updatedAt,
+            version=request.version,
+            attachments=[
+                AttachmentResponse.model_validate(att)
+                for att in attachments_by_request.get(request.id, [])
+            ]
+        )
+        for request in requests
+    ]
 
-    return MaintenanceRequestResponse(**request_dict)
+async def _close_parts_requests(db: AsyncSession, request_id: int, status: RequestStatus, user_id: int, http_request: Request):
+    """Reject the unissued spare parts requests of a request that was completed or cancelled.
+
+    Returns the (request id, work id) pairs to publish after the commit.
+    """
+    if status not in (RequestStatus.COMPLETED, RequestStatus.CANCELLED):
+        return []
+    from app.models.maintenance_work import MaintenanceWork
+    from app.services.stock_service import reject_unissued_requests
+    work_ids = (await db.scalars(select(MaintenanceWork.id).filter(MaintenanceWork.requestId == request_id))).all()
+    return await db.run_sync(
+        reject_unissued_requests, work_ids, user_id,
+        f"Maintenance request {status.value.lower()} before the parts were issued", http_request
+    )
+
+def _publish_parts_rejections(rejected_requests) -> None:
+    for spare_parts_request_id, work_id in rejected_requests:
+        publish_event(ChangeEvent.SPARE_PARTS_REQUEST_REJECTED, id=spare_parts_request_id, maintenanceWorkId=work_id)
+    if rejected_requests:
+        publish_event(ChangeEvent.STOCK_CHANGED)
+
+async def _build_request_response(db: AsyncSession, request: MaintenanceRequest) -> MaintenanceRequestResponse:
+    """Serialize a single MaintenanceRequest with attachments and requester name."""
+    return (await _build_request_responses(db, [request]))[0]
 
 @router.get("/health")
 async def health_check():
@@ -76,12 +132,14 @@ async def get_maintenance_requests(
     search: Optional[str] = None,
     page: int = 1,
     limit: int = 25,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from nextCursor (empty for the first page)"),
+    includeTotal: bool = Query(False, description="Return the exact total in cursor mode"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["MAINTENANCE_MANAGER", "ADMIN", "MAINTENANCE_TECH"]))
 ):
     """Get maintenance requests with filtering and pagination"""
     # Build query
-    query = db.query(MaintenanceRequest)
+    query = select(MaintenanceRequest).options(selectinload(MaintenanceRequest.requestedBy))
     
     # Apply filters
     if status:
@@ -96,37 +154,57 @@ async def get_maintenance_requests(
         query = query.filter(MaintenanceRequest.requestedDate >= startDate)
     if endDate:
         query = query.filter(MaintenanceRequest.requestedDate <= endDate)
+    relevance = None
+    matches = None
     if search:
-        query = query.filter(
-            MaintenanceRequest.title.contains(search) | 
-            MaintenanceRequest.description.contains(search)
-        )
-    
-    # Get total count
-    total = query.count()
-    
-    # Apply pagination
-    offset = (page - 1) * limit
-    requests = query.order_by(MaintenanceRequest.requestedDate.desc()).offset(offset).limit(limit).all()
-    
-    # Fetch attachments for each request
-    from app.models.attachment import Attachment
-    for request in requests:
-        attachments = db.query(Attachment).filter(
-            Attachment.entityType == "MAINTENANCE_REQUEST",
-            Attachment.entityId == request.id
-        ).all()
-        request.attachments = attachments
+        # FULLTEXT on MySQL, in-process inverted index elsewhere
+        query, relevance, matches = await apply_search(db, query, search)
+    
+    if matches is not None:
+        # Fallback search: ranked and paged in Python, then only the page is loaded
+        if cursor is not None:
+            total = matches.total if includeTotal else None
+            page_ids, next_cursor = matches.keyset_page(cursor, limit)
+        else:
+            total = matches.total
+            page_ids = matches.page((page - 1) * limit, limit)
+            next_cursor = None
+        result = await db.execute(query.filter(MaintenanceRequest.id.in_(page_ids)))
+        by_id = {request.id: request for request in result.scalars().all()}
+        requests = [by_id[request_id] for request_id in page_ids if request_id in by_id]
+    elif cursor is not None:
+        # Keyset mode: seek on (requestedDate, id) and skip the count unless asked
+        total = await count_rows(db, query) if includeTotal else None
+        keyset_query = apply_keyset(query, MaintenanceRequest.requestedDate, MaintenanceRequest.id, True, cursor)
+        result = await db.execute(keyset_query.limit(limit + 1))
+        requests, next_cursor = keyset_page(result.scalars().all(), limit, lambda r: r.requestedDate)
+    else:
+        # Get total count
+        total = await count_rows(db, query)
+        
+        # Apply pagination
+        offset = (page - 1) * limit
+        # Searches are ranked by relevance first; cursor mode keeps date order
+        order_by = [MaintenanceRequest.requestedDate.desc(), MaintenanceRequest.id.desc()]
+        if relevance is not None:
+            order_by.insert(0, relevance.desc())
+        result = await db.execute(query.order_by(*order_by).offset(offset).limit(limit))
+        requests = result.scalars().all()
+        next_cursor = None
+    
+    # Attachments and requester names for the whole page in one pass
+    request_list = await _build_request_responses(db, requests)
     
     # Calculate total pages
-    total_pages = (total + limit - 1) // limit
+    total_pages = (total + limit - 1) // limit if total is not None else None
     
     return MaintenanceRequestListResponse(
-        requests=requests,
+        requests=request_list,
         total=total,
         page=page,
         pageSize=limit,
-        totalPages=total_pages
+        totalPages=total_pages,
+        nextCursor=next_cursor
     )
 
 def ensure_upload_dir():
@@ -139,7 +217,7 @@ def ensure_upload_dir():
 @router.post("", response_model=MaintenanceRequestResponse)
 async def create_maintenance_request(
     request: MaintenanceRequestCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["SUPERVISOR", "ADMIN", "MAINTENANCE_MANAGER", "MAINTENANCE_TECH"]))
 ):
     """Create a new maintenance request"""
@@ -148,7 +226,7 @@ async def create_maintenance_request(
     print(f"Current user ID: {current_user.id}")
     
     # Verify machine exists
-    machine = db.query(Machine).filter(Machine.id == request.machineId).first()
+    machine = await db.get(Machine, request.machineId)
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
     
@@ -167,7 +245,8 @@ async def create_maintenance_request(
                 detail=f"Invalid machine status: {request.machineStatus}"
             )
 
-        if machine.status != new_status:
+        machine_status_changed = machine.status != new_status
+        if machine_status_changed:
             machine.status = new_status
 
     # Create maintenance request
@@ -185,11 +264,28 @@ async def create_maintenance_request(
     )
     
     db.add(maintenance_request)
-    db.commit()
-    db.refresh(maintenance_request)
-    maintenance_request.requestedBy = current_user
+    await db.flush()
     
-    return _build_request_response(db, maintenance_request)
+    from app.services.audit_service import record_status_change
+    record_status_change(
+        db=db,
+        entityType="MAINTENANCE_REQUEST",
+        entityId=maintenance_request.id,
+        requestId=maintenance_request.id,
+        fromStatus=None,
+        toStatus=RequestStatus.PENDING,
+        userId=current_user.id,
+        changedAt=maintenance_request.requestedDate
+    )
+    
+    await db.commit()
+    await db.refresh(maintenance_request)
+    index_request(maintenance_request)
+    publish_event(ChangeEvent.REQUEST_CREATED, id=maintenance_request.id, machineId=maintenance_request.machineId)
+    if request.machineStatus is not None and machine_status_changed:
+        publish_event(ChangeEvent.MACHINE_STATUS_CHANGED, id=machine.id, status=machine.status.value)
+    
+    return await _build_request_response(db, maintenance_request)
 
 # Technician-specific endpoints (must be before /{request_id} to avoid route conflicts)
 @router.get("/available", response_model=MaintenanceRequestListResponse)
@@ -199,12 +295,10 @@ async def get_available_requests(
     machineId: Optional[int] = Query(None, description="Filter by machine ID"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(25, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["MAINTENANCE_TECH", "MAINTENANCE_MANAGER", "ADMIN"]))
 ):
     """Get available maintenance requests (PENDING status with no MaintenanceWork record)"""
-    from app.models.maintenance_work import MaintenanceWork
-    
     # Parse status enum from string
     filter_status = RequestStatus.PENDING
     if status:
@@ -221,8 +315,10 @@ async def get_available_requests(
         except (ValueError, AttributeError):
             raise HTTPException(status_code=400, detail=f"Invalid priority: {priority}. Valid values: {[p.value for p in RequestPriority]}")
     
-    query = db.query(MaintenanceRequest).filter(
-        MaintenanceRequest.status == filter_status
+    # hasWork is kept in step with maintenance_works, so no anti-join is needed
+    query = select(MaintenanceRequest).options(selectinload(MaintenanceRequest.requestedBy)).filter(
+        MaintenanceRequest.status == filter_status,
+        MaintenanceRequest.hasWork == False
     )
     
     # Apply additional filters
@@ -231,19 +327,16 @@ async def get_available_requests(
     if machineId:
         query = query.filter(MaintenanceRequest.machineId == machineId)
     
-    # Filter out requests that already have a MaintenanceWork record
-    requests_with_work = db.query(MaintenanceWork.requestId).distinct()
-    query = query.filter(~MaintenanceRequest.id.in_(requests_with_work))
-    
     # Get total count
-    total = query.count()
+    total = await count_rows(db, query)
     
     # Apply pagination
     offset = (page - 1) * limit
-    requests = query.order_by(MaintenanceRequest.requestedDate.desc()).offset(offset).limit(limit).all()
+    result = await db.execute(query.order_by(MaintenanceRequest.requestedDate.desc()).offset(offset).limit(limit))
+    requests = result.scalars().all()
     
-    # Fetch attachments and requester name for each request
-    request_list = [_build_request_response(db, request) for request in requests]
+    # Attachments and requester names for the whole page in one pass
+    request_list = await _build_request_responses(db, requests)
     
     # Calculate total pages
     total_pages = (total + limit - 1) // limit
@@ -262,7 +355,7 @@ async def get_my_work_requests(
     priority: Optional[str] = Query(None, description="Filter by priority"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(25, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["MAINTENANCE_TECH", "MAINTENANCE_MANAGER", "ADMIN"]))
 ):
     """Get maintenance requests assigned to current technician (IN_PROGRESS and WAITING_PARTS with their MaintenanceWork)"""
@@ -286,7 +379,7 @@ async def get_my_work_requests(
     
     # Get requests where current user has a MaintenanceWork record
     # For maintenance managers, show all work; for technicians, show only their own
-    query = db.query(MaintenanceRequest).join(
+    query = select(MaintenanceRequest).options(selectinload(MaintenanceRequest.requestedBy)).join(
         MaintenanceWork,
         MaintenanceRequest.id == MaintenanceWork.requestId
     ).filter(
@@ -302,14 +395,15 @@ async def get_my_work_requests(
         query = query.filter(MaintenanceRequest.priority == filter_priority)
     
     # Get total count
-    total = query.count()
+    total = await count_rows(db, query)
     
     # Apply pagination
     offset = (page - 1) * limit
-    requests = query.order_by(MaintenanceRequest.requestedDate.desc()).offset(offset).limit(limit).all()
+    result = await db.execute(query.order_by(MaintenanceRequest.requestedDate.desc()).offset(offset).limit(limit))
+    requests = result.scalars().all()
     
-    # Fetch attachments and requester name for each request
-    request_list = [_build_request_response(db, request) for request in requests]
+    # Attachments and requester names for the whole page in one pass
+    request_list = await _build_request_responses(db, requests)
     
     # Calculate total pages
     total_pages = (total + limit - 1) // limit
@@ -326,17 +420,21 @@ async def get_my_work_requests(
 async def accept_request(
     request_id: int,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["MAINTENANCE_TECH", "ADMIN"]))
 ):
     """Accept a maintenance request (creates MaintenanceWork and updates status to IN_PROGRESS)"""
     from app.models.maintenance_work import MaintenanceWork, WorkStatus
     from sqlalchemy.exc import IntegrityError
     
-    # Get the maintenance request
-    maintenance_request = db.query(MaintenanceRequest).filter(
-        MaintenanceRequest.id == request_id
-    ).first()
+    # Lock the request row so a concurrent accept waits and then sees it taken
+    result = await db.execute(
+        select(MaintenanceRequest)
+        .filter(MaintenanceRequest.id == request_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    maintenance_request = result.scalars().first()
     
     if not maintenance_request:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
@@ -349,9 +447,10 @@ async def accept_request(
         )
     
     # Check if request already has a MaintenanceWork record
-    existing_work = db.query(MaintenanceWork).filter(
-        MaintenanceWork.requestId == request_id
-    ).first()
+    result = await db.execute(
+        select(MaintenanceWork).filter(MaintenanceWork.requestId == request_id)
+    )
+    existing_work = result.scalars().first()
     
     if existing_work:
         raise HTTPException(
@@ -372,12 +471,37 @@ async def accept_request(
         )
         
         db.add(maintenance_work)
+        await db.flush()
         
-        # Update request status to IN_PROGRESS
+        # Update request status to IN_PROGRESS and take it out of the queue
         maintenance_request.status = RequestStatus.IN_PROGRESS
+        maintenance_request.hasWork = True
+        maintenance_request.assignedToId = current_user.id
+        
+        # Record both transitions for the lifecycle reports
+        from app.services.audit_service import log_activity, record_status_change
+        record_status_change(
+            db=db,
+            entityType="MAINTENANCE_WORK",
+            entityId=maintenance_work.id,
+            requestId=request_id,
+            fromStatus=None,
+            toStatus=WorkStatus.IN_PROGRESS,
+            userId=current_user.id,
+            changedAt=maintenance_work.startTime
+        )
+        record_status_change(
+            db=db,
+            entityType="MAINTENANCE_REQUEST",
+            entityId=request_id,
+            requestId=request_id,
+            fromStatus=RequestStatus.PENDING,
+            toStatus=RequestStatus.IN_PROGRESS,
+            userId=current_user.id,
+            changedAt=maintenance_work.startTime
+        )
         
         # Create activity log entry
-        from app.services.audit_service import log_activity
         log_activity(
             db=db,
             userId=current_user.id,
@@ -388,49 +512,52 @@ async def accept_request(
             request=request
         )
         
-        db.commit()
-        db.refresh(maintenance_request)
+        await db.commit()
+        await db.refresh(maintenance_request)
         
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=409,
             detail="Request was accepted by another technician. Please refresh and try again."
         )
     
-    return _build_request_response(db, maintenance_request)
+    publish_event(ChangeEvent.REQUEST_ACCEPTED, id=request_id, assignedToId=current_user.id)
+    
+    return await _build_request_response(db, maintenance_request)
 
 @router.get("/{request_id}", response_model=MaintenanceRequestResponse)
 async def get_maintenance_request(
     request_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific maintenance request"""
-    maintenance_request = db.query(MaintenanceRequest).filter(
-        MaintenanceRequest.id == request_id
-    ).first()
+    maintenance_request = await db.get(MaintenanceRequest, request_id)
     
     if not maintenance_request:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
     
-    return _build_request_response(db, maintenance_request)
+    set_etag(response, maintenance_request.version)
+    return await _build_request_response(db, maintenance_request)
 
 @router.patch("/{request_id}", response_model=MaintenanceRequestResponse)
 async def update_maintenance_request(
     request_id: int,
     request_data: MaintenanceRequestUpdate,
     http_request: Request,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["SUPERVISOR", "ADMIN", "MAINTENANCE_MANAGER", "MAINTENANCE_TECH"]))
 ):
-    """Update a maintenance request"""
-    maintenance_request = db.query(MaintenanceRequest).filter(
-        MaintenanceRequest.id == request_id
-    ).first()
+    """Update a maintenance request. A stale If-Match version gets 412."""
+    maintenance_request = await db.get(MaintenanceRequest, request_id)
     
     if not maintenance_request:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
+    check_if_match(if_match, maintenance_request.version)
     
     # Track status changes
     old_status = maintenance_request.status
@@ -453,12 +580,23 @@ async def update_maintenance_request(
     if request_data.actualCompletionDate is not None:
         maintenance_request.actualCompletionDate = request_data.actualCompletionDate
     
+    rejected_requests = []
     # Log status change if status was updated
     if request_data.status is not None and old_status != request_data.status:
+        rejected_requests = await _close_parts_requests(db, request_id, request_data.status, current_user.id, http_request)
         # Create activity log entry for status change
-        from app.services.audit_service import log_activity
+        from app.services.audit_service import log_activity, record_status_change
         old_values = {"status": old_status.value if hasattr(old_status, 'value') else str(old_status)}
         new_values = {"status": request_data.status.value if hasattr(request_data.status, 'value') else str(request_data.status)}
+        record_status_change(
+            db=db,
+            entityType="MAINTENANCE_REQUEST",
+            entityId=request_id,
+            requestId=request_id,
+            fromStatus=old_status,
+            toStatus=request_data.status,
+            userId=current_user.id
+        )
         log_activity(
             db=db,
             userId=current_user.id,
@@ -471,34 +609,49 @@ async def update_maintenance_request(
             request=http_request
         )
     
-    db.commit()
-    db.refresh(maintenance_request)
+    await db.commit()
+    await db.refresh(maintenance_request)
+    if request_data.title is not None or request_data.description is not None:
+        index_request(maintenance_request)
+    publish_event(ChangeEvent.REQUEST_UPDATED, id=request_id, status=maintenance_request.status.value)
+    _publish_parts_rejections(rejected_requests)
     
-    return _build_request_response(db, maintenance_request)
+    set_etag(response, maintenance_request.version)
+    return await _build_request_response(db, maintenance_request)
 
 @router.patch("/{request_id}/status", response_model=MaintenanceRequestResponse)
 async def update_request_status(
     request_id: int,
     status: RequestStatus,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["MAINTENANCE_MANAGER", "ADMIN", "MAINTENANCE_TECH"]))
 ):
     """Update maintenance request status with tracking"""
-    maintenance_request = db.query(MaintenanceRequest).filter(
-        MaintenanceRequest.id == request_id
-    ).first()
+    maintenance_request = await db.get(MaintenanceRequest, request_id)
     
     if not maintenance_request:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
     
     old_status = maintenance_request.status
     maintenance_request.status = status
+    rejected_requests = []
+    if old_status != status:
+        rejected_requests = await _close_parts_requests(db, request_id, status, current_user.id, request)
     
     # Create activity log entry for status change
-    from app.services.audit_service import log_activity
+    from app.services.audit_service import log_activity, record_status_change
     old_values = {"status": old_status.value if hasattr(old_status, 'value') else str(old_status)}
     new_values = {"status": status.value if hasattr(status, 'value') else str(status)}
+    record_status_change(
+        db=db,
+        entityType="MAINTENANCE_REQUEST",
+        entityId=request_id,
+        requestId=request_id,
+        fromStatus=old_status,
+        toStatus=status,
+        userId=current_user.id
+    )
     log_activity(
         db=db,
         userId=current_user.id,
@@ -511,24 +664,24 @@ async def update_request_status(
         request=request
     )
     
-    db.commit()
-    db.refresh(maintenance_request)
+    await db.commit()
+    await db.refresh(maintenance_request)
+    publish_event(ChangeEvent.REQUEST_UPDATED, id=request_id, status=maintenance_request.status.value)
+    _publish_parts_rejections(rejected_requests)
     
-    return _build_request_response(db, maintenance_request)
+    return await _build_request_response(db, maintenance_request)
 
 @router.post("/{request_id}/attachments", response_model=AttachmentResponse)
 async def upload_attachment(
     request_id: int,
     file: UploadFile = File(...),
     description: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role_list(["SUPERVISOR", "ADMIN", "MAINTENANCE_MANAGER"]))
 ):
     """Upload an attachment for a maintenance request"""
     # Verify request exists
-    maintenance_request = db.query(MaintenanceRequest).filter(
-        MaintenanceRequest.id == request_id
-    ).first()
+    maintenance_request = await db.get(MaintenanceRequest, request_id)
     
     if not maintenance_request:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
@@ -559,8 +712,8 @@ async def upload_attachment(
     )
     
     db.add(attachment)
-    db.commit()
-    db.refresh(attachment)
+    await db.commit()
+    await db.refresh(attachment)
     
     return attachment
 
@@ -568,10 +721,10 @@ async def upload_attachment(
 @router.get("/attachments/{attachment_id}/file")
 async def download_attachment(
     attachment_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Download a file attachment"""
-    attachment = db.query(Attachment).filter(Attachment.id == attachment_id).first()
+    attachment = await db.get(Attachment, attachment_id)
     
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
@@ -588,10 +741,10 @@ async def download_attachment(
 @router.get("/attachments/{attachment_id}/view")
 async def view_attachment(
     attachment_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """View a file attachment in browser"""
-    attachment = db.query(Attachment).filter(Attachment.id == attachment_id).first()
+    attachment = await db.get(Attachment, attachment_id)
     
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_role_list
+from app.core.etag import check_if_match, set_etag
+from app.core.events import ChangeEvent, publish_event
 from app.models.maintenance_work import MaintenanceWork
 from app.models.user import User
 from app.schemas.maintenance_work import (
@@ -11,13 +13,17 @@ from app.schemas.maintenance_work import (
     MaintenanceWorkResponse,
     MaintenanceWorkStart,
     MaintenanceWorkProgressUpdate,
-    MaintenanceWorkComplete
+    MaintenanceWorkComplete,
+    MaintenanceStepUpdate
 )
 
 router = APIRouter()
 
+# Handlers that write are plain def: FastAPI runs them in its threadpool, so a
+# sync Session waiting on a row lock holds a worker thread, not the event loop
+
 @router.get("/by-request/{request_id}", response_model=Optional[MaintenanceWorkResponse])
-async def get_work_by_request(
+def get_work_by_request(
     request_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -43,8 +49,9 @@ async def get_work_by_request(
     return maintenance_work
 
 @router.get("/{work_id}", response_model=MaintenanceWorkResponse)
-async def get_maintenance_work(
+def get_maintenance_work(
     work_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -64,21 +71,23 @@ async def get_maintenance_work(
                 detail="You can only view your own maintenance work"
             )
     
+    set_etag(response, maintenance_work.version)
     return maintenance_work
 
 @router.post("", response_model=MaintenanceWorkResponse)
-async def create_maintenance_work(
+def create_maintenance_work(
     work: MaintenanceWorkCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_list(["MAINTENANCE_TECH", "ADMIN"]))
 ):
     """Create a new maintenance work record"""
     from app.models.maintenance_request import MaintenanceRequest
+    from sqlalchemy.exc import IntegrityError
     
-    # Verify request exists
+    # Verify request exists (locked so a concurrent create waits for this one)
     maintenance_request = db.query(MaintenanceRequest).filter(
         MaintenanceRequest.id == work.requestId
-    ).first()
+    ).with_for_update().first()
     
     if not maintenance_request:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
@@ -106,20 +115,44 @@ async def create_maintenance_work(
     )
     
     db.add(maintenance_work)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Maintenance work already exists for this request"
+        )
+    maintenance_request.hasWork = True
+    maintenance_request.assignedToId = current_user.id
+    
+    from app.services.audit_service import record_status_change
+    record_status_change(
+        db=db,
+        entityType="MAINTENANCE_WORK",
+        entityId=maintenance_work.id,
+        requestId=maintenance_work.requestId,
+        fromStatus=None,
+        toStatus=WorkStatus.IN_PROGRESS,
+        userId=current_user.id
+    )
     db.commit()
     db.refresh(maintenance_work)
+    publish_event(ChangeEvent.REQUEST_ACCEPTED, id=maintenance_work.requestId, assignedToId=current_user.id)
     
     return maintenance_work
 
 @router.patch("/{work_id}", response_model=MaintenanceWorkResponse)
-async def update_maintenance_work(
+def update_maintenance_work(
     work_id: int,
     work_update: MaintenanceWorkUpdate,
     request: Request,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_list(["MAINTENANCE_TECH", "ADMIN"]))
 ):
-    """Update maintenance work progress"""
+    """Update maintenance work progress. A stale If-Match version gets 412."""
     maintenance_work = db.query(MaintenanceWork).filter(
         MaintenanceWork.id == work_id
     ).first()
@@ -134,6 +167,7 @@ async def update_maintenance_work(
                 status_code=403,
                 detail="You can only update your own maintenance work"
             )
+    check_if_match(if_match, maintenance_work.version)
     
     # Update fields
     if work_update.startedAt is not None:
@@ -142,6 +176,7 @@ async def update_maintenance_work(
         maintenance_work.workDescription = work_update.workDescription
     if work_update.completedAt is not None:
         maintenance_work.endTime = work_update.completedAt
+    old_work_status = maintenance_work.status
     if work_update.status is not None:
         maintenance_work.status = work_update.status
     
@@ -149,8 +184,26 @@ async def update_maintenance_work(
     if work_update.maintenanceSteps is not None:
         maintenance_work.maintenanceSteps = [step.dict() for step in work_update.maintenanceSteps]
     
+    from app.models.maintenance_work import WorkStatus
+    rejected_requests = []
+    if maintenance_work.status in (WorkStatus.COMPLETED, WorkStatus.CANCELLED) and old_work_status != maintenance_work.status:
+        from app.services.stock_service import reject_unissued_requests
+        rejected_requests = reject_unissued_requests(
+            db, [work_id], current_user.id,
+            f"Maintenance work {maintenance_work.status.value.lower()} before the parts were issued", request
+        )
+    
     # Create activity log entry
-    from app.services.audit_service import log_activity
+    from app.services.audit_service import log_activity, record_status_change
+    record_status_change(
+        db=db,
+        entityType="MAINTENANCE_WORK",
+        entityId=work_id,
+        requestId=maintenance_work.requestId,
+        fromStatus=old_work_status,
+        toStatus=maintenance_work.status,
+        userId=current_user.id
+    )
     log_activity(
         db=db,
         userId=current_user.id,
@@ -163,11 +216,17 @@ async def update_maintenance_work(
     
     db.commit()
     db.refresh(maintenance_work)
+    publish_event(ChangeEvent.WORK_UPDATED, id=work_id, requestId=maintenance_work.requestId)
+    for spare_parts_request_id, _ in rejected_requests:
+        publish_event(ChangeEvent.SPARE_PARTS_REQUEST_REJECTED, id=spare_parts_request_id, maintenanceWorkId=work_id)
+    if rejected_requests:
+        publish_event(ChangeEvent.STOCK_CHANGED)
     
+    set_etag(response, maintenance_work.version)
     return maintenance_work
 
 @router.patch("/{work_id}/start", response_model=MaintenanceWorkResponse)
-async def start_maintenance_work(
+def start_maintenance_work(
     work_id: int,
     work_start: MaintenanceWorkStart,
     request: Request,
@@ -180,7 +239,7 @@ async def start_maintenance_work(
     
     maintenance_work = db.query(MaintenanceWork).filter(
         MaintenanceWork.id == work_id
-    ).first()
+    ).with_for_update().first()
     
     if not maintenance_work:
         raise HTTPException(status_code=404, detail="Maintenance work not found")
@@ -216,11 +275,32 @@ async def start_maintenance_work(
         MaintenanceRequest.id == maintenance_work.requestId
     ).first()
     
+    from app.services.audit_service import log_activity, record_status_change
+    record_status_change(
+        db=db,
+        entityType="MAINTENANCE_WORK",
+        entityId=work_id,
+        requestId=maintenance_work.requestId,
+        fromStatus=WorkStatus.PENDING,
+        toStatus=WorkStatus.IN_PROGRESS,
+        userId=current_user.id,
+        changedAt=maintenance_work.startTime
+    )
+    
     if maintenance_request:
+        record_status_change(
+            db=db,
+            entityType="MAINTENANCE_REQUEST",
+            entityId=maintenance_request.id,
+            requestId=maintenance_request.id,
+            fromStatus=maintenance_request.status,
+            toStatus=RequestStatus.IN_PROGRESS,
+            userId=current_user.id,
+            changedAt=maintenance_work.startTime
+        )
         maintenance_request.status = RequestStatus.IN_PROGRESS
     
     # Create activity log entry
-    from app.services.audit_service import log_activity
     log_activity(
         db=db,
         userId=current_user.id,
@@ -233,18 +313,21 @@ async def start_maintenance_work(
     
     db.commit()
     db.refresh(maintenance_work)
+    publish_event(ChangeEvent.WORK_UPDATED, id=work_id, requestId=maintenance_work.requestId)
     
     return maintenance_work
 
 @router.patch("/{work_id}/update-progress", response_model=MaintenanceWorkResponse)
-async def update_maintenance_work_progress(
+def update_maintenance_work_progress(
     work_id: int,
     progress_update: MaintenanceWorkProgressUpdate,
     request: Request,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_list(["MAINTENANCE_TECH", "ADMIN"]))
 ):
-    """Update maintenance work progress"""
+    """Update maintenance work progress. A stale If-Match version gets 412."""
     from app.models.maintenance_work import WorkStatus
     from datetime import datetime
     
@@ -262,6 +345,7 @@ async def update_maintenance_work_progress(
                 status_code=403,
                 detail="You can only update your own maintenance work"
             )
+    check_if_match(if_match, maintenance_work.version)
     
     # Validate work status
     if maintenance_work.status == WorkStatus.COMPLETED:
@@ -283,13 +367,12 @@ async def update_maintenance_work_progress(
                 )
     
     # Update maintenance steps with timestamps for completed steps
+    # (only the step rows that actually changed are written)
     updated_steps = []
     for step in steps:
         step_dict = step.dict()
         if step.completed and not step.completedAt:
-            step_dict['completedAt'] = datetime.utcnow().isoformat()
-        elif step_dict.get('completedAt') and isinstance(step_dict['completedAt'], datetime):
-            step_dict['completedAt'] = step_dict['completedAt'].isoformat()
+            step_dict['completedAt'] = datetime.utcnow()
         updated_steps.append(step_dict)
     
     maintenance_work.maintenanceSteps = updated_steps
@@ -309,11 +392,107 @@ async def update_maintenance_work_progress(
     
     db.commit()
     db.refresh(maintenance_work)
+    publish_event(ChangeEvent.WORK_UPDATED, id=work_id, requestId=maintenance_work.requestId)
+    
+    set_etag(response, maintenance_work.version)
+    return maintenance_work
+
+@router.patch("/{work_id}/steps/{step_index}", response_model=MaintenanceWorkResponse)
+def update_maintenance_work_step(
+    work_id: int,
+    step_index: int,
+    step_update: MaintenanceStepUpdate,
+    request: Request,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role_list(["MAINTENANCE_TECH", "ADMIN"]))
+):
+    """
+    Update a single maintenance step (0-based index) without resending the whole checklist.
+    Any step change bumps the work's version; a stale If-Match version gets 412.
+    """
+    from app.models.maintenance_work import WorkStatus
+    from app.models.maintenance_work_step import MaintenanceWorkStep
+    from datetime import datetime
+    
+    maintenance_work = db.query(MaintenanceWork).filter(
+        MaintenanceWork.id == work_id
+    ).first()
+    
+    if not maintenance_work:
+        raise HTTPException(status_code=404, detail="Maintenance work not found")
+    
+    # Technicians can only update their own work (unless admin/manager)
+    if current_user.role not in ["ADMIN", "MAINTENANCE_MANAGER"]:
+        if maintenance_work.assignedToId != current_user.id:
+            raise HTTPException(
+                status_code=403,
+                detail="You can only update your own maintenance work"
+            )
+    check_if_match(if_match, maintenance_work.version)
+    
+    if maintenance_work.status == WorkStatus.COMPLETED:
+        raise HTTPException(
+            status_code=400,
+            detail="Cannot update progress on completed work"
+        )
+    
+    # The step and its neighbours, so the completion sequence can be checked
+    neighbours = {
+        row.stepIndex: row
+        for row in db.query(MaintenanceWorkStep).filter(
+            MaintenanceWorkStep.maintenanceWorkId == work_id,
+            MaintenanceWorkStep.stepIndex.between(step_index - 1, step_index + 1)
+        ).all()
+    }
+    step = neighbours.get(step_index)
+    if not step:
+        raise HTTPException(status_code=404, detail="Maintenance step not found")
+    
+    if step_update.completed is True and not step.completed:
+        prev_step = neighbours.get(step_index - 1)
+        if prev_step and not prev_step.completed:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Step {step.step} cannot be completed before step {prev_step.step}"
+            )
+        step.completed = True
+        step.completedAt = datetime.utcnow()
+    elif step_update.completed is False and step.completed:
+        next_step = neighbours.get(step_index + 1)
+        if next_step and next_step.completed:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Step {step.step} cannot be reopened while step {next_step.step} is completed"
+            )
+        step.completed = False
+        step.completedAt = None
+    
+    if step_update.description is not None:
+        step.description = step_update.description
+    
+    # Create activity log entry
+    from app.services.audit_service import log_activity
+    log_activity(
+        db=db,
+        userId=current_user.id,
+        action="UPDATE",
+        entityType="MAINTENANCE_WORK",
+        entityId=work_id,
+        description=f"Maintenance step {step.step} updated by {current_user.fullName}. Completed: {step.completed}",
+        request=request
+    )
+    
+    db.commit()
+    db.refresh(maintenance_work)
+    publish_event(ChangeEvent.WORK_UPDATED, id=work_id, requestId=maintenance_work.requestId)
     
+    set_etag(response, maintenance_work.version)
     return maintenance_work
 
 @router.patch("/{work_id}/complete", response_model=MaintenanceWorkResponse)
-async def complete_maintenance_work(
+def complete_maintenance_work(
     work_id: int,
     work_complete: MaintenanceWorkComplete,
     request: Request,
@@ -324,9 +503,10 @@ async def complete_maintenance_work(
     from app.models.maintenance_work import WorkStatus
     from datetime import datetime
     
+    # Lock the work row first so a repeated completion waits and then sees COMPLETED
     maintenance_work = db.query(MaintenanceWork).filter(
         MaintenanceWork.id == work_id
-    ).first()
+    ).with_for_update().first()
     
     if not maintenance_work:
         raise HTTPException(status_code=404, detail="Maintenance work not found")
@@ -353,6 +533,7 @@ async def complete_maintenance_work(
         )
     
     # Update work details
+    old_work_status = maintenance_work.status
     maintenance_work.status = WorkStatus.COMPLETED
     maintenance_work.endTime = datetime.utcnow()
     maintenance_work.workDescription = work_complete.workDescription
@@ -363,9 +544,7 @@ async def complete_maintenance_work(
         for step in work_complete.maintenanceSteps:
             step_dict = step.dict()
             if not step.completedAt:
-                step_dict['completedAt'] = datetime.utcnow().isoformat()
-            elif step_dict.get('completedAt') and isinstance(step_dict['completedAt'], datetime):
-                step_dict['completedAt'] = step_dict['completedAt'].isoformat()
+                step_dict['completedAt'] = datetime.utcnow()
             step_dict['completed'] = True
             updated_steps.append(step_dict)
         maintenance_work.maintenanceSteps = updated_steps
@@ -374,7 +553,7 @@ async def complete_maintenance_work(
     from app.models.maintenance_request import MaintenanceRequest, RequestStatus
     maintenance_request = db.query(MaintenanceRequest).filter(
         MaintenanceRequest.id == maintenance_work.requestId
-    ).first()
+    ).with_for_update().first()
     
     if not maintenance_request:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
@@ -386,14 +565,37 @@ async def complete_maintenance_work(
             detail=f"Cannot complete work when request status is {maintenance_request.status}. Request must be IN_PROGRESS or WAITING_PARTS."
         )
     
+    # Record both transitions for the lifecycle reports
+    from app.services.audit_service import log_activity, record_status_change
+    record_status_change(
+        db=db,
+        entityType="MAINTENANCE_WORK",
+        entityId=work_id,
+        requestId=maintenance_request.id,
+        fromStatus=old_work_status,
+        toStatus=WorkStatus.COMPLETED,
+        userId=current_user.id,
+        changedAt=maintenance_work.endTime
+    )
+    record_status_change(
+        db=db,
+        entityType="MAINTENANCE_REQUEST",
+        entityId=maintenance_request.id,
+        requestId=maintenance_request.id,
+        fromStatus=maintenance_request.status,
+        toStatus=RequestStatus.COMPLETED,
+        userId=current_user.id,
+        changedAt=maintenance_work.endTime
+    )
+    
     # Update request status to COMPLETED
     maintenance_request.status = RequestStatus.COMPLETED
-    maintenance_request.actualCompletionDate = datetime.utcnow()
+    maintenance_request.actualCompletionDate = maintenance_work.endTime
     
     # Update machine status - change to OPERATIONAL if no other active maintenance requests
     from app.models.machine import Machine, MachineStatus
-    from app.services.audit_service import log_activity
-    machine = db.query(Machine).filter(Machine.id == maintenance_work.machineId).first()
+    machine = db.query(Machine).filter(Machine.id == maintenance_work.machineId).with_for_update().first()
+    machine_status_changed = False
     
     if machine:
         # Check if there are other active maintenance requests for this machine
@@ -411,6 +613,7 @@ async def complete_maintenance_work(
         if other_active_requests == 0 and machine.status in [MachineStatus.MAINTENANCE, MachineStatus.DOWN]:
             old_machine_status = machine.status
             machine.status = MachineStatus.OPERATIONAL
+            machine_status_changed = True
             
             # Log machine status change
             log_activity(
@@ -461,6 +664,12 @@ async def complete_maintenance_work(
         request=request
     )
     
+    # Parts still waiting to be approved or issued are no longer needed
+    from app.services.stock_service import reject_unissued_requests
+    rejected_requests = reject_unissued_requests(
+        db, [work_id], current_user.id, "Maintenance work completed before the parts were issued", request
+    )
+    
     # Notification stub - log completion for stakeholders (AC: 5)
     # TODO: Implement actual notification mechanism (email, SMS, etc.)
     import logging
@@ -474,6 +683,13 @@ async def complete_maintenance_work(
     
     db.commit()
     db.refresh(maintenance_work)
+    publish_event(ChangeEvent.WORK_COMPLETED, id=work_id, requestId=maintenance_work.requestId, machineId=maintenance_work.machineId)
+    if machine_status_changed:
+        publish_event(ChangeEvent.MACHINE_STATUS_CHANGED, id=machine.id, status=machine.status.value)
+    for spare_parts_request_id, _ in rejected_requests:
+        publish_event(ChangeEvent.SPARE_PARTS_REQUEST_REJECTED, id=spare_parts_request_id, maintenanceWorkId=work_id)
+    if rejected_requests:
+        publish_event(ChangeEvent.STOCK_CHANGED)
     
     return maintenance_work
 
@@ -10,12 +10,14 @@ import csv
 import io
 
 from app.core.database import get_db
+from app.core.replicas import get_read_db
 from app.core.deps import get_current_user, require_role_list
 from app.models.user import User
 from app.services.maintenance_analysis_service import (
     get_downtime_statistics,
     calculate_maintenance_costs,
     analyze_failure_patterns,
+    get_request_lifecycle_metrics,
     get_stock_levels,
     get_consumption_trends,
     calculate_inventory_valuation,
@@ -25,6 +27,7 @@ from app.schemas.report import (
     DowntimeReportResponse,
     MaintenanceCostReportResponse,
     FailureAnalysisReportResponse,
+    RequestLifecycleReportResponse,
     StockLevelsReportResponse,
     ConsumptionReportResponse,
     ValuationReportResponse,
@@ -53,6 +56,7 @@ async def get_downtime_report(
     endDate: Optional[datetime] = Query(None, description="Filter to date"),
     export: Optional[str] = Query(None, description="Export format: csv or excel"),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
@@ -70,7 +74,7 @@ async def get_downtime_report(
     
     # Get downtime statistics
     stats = get_downtime_statistics(
-        db=db,
+        db=read_db,
         machine_id=machineId,
         department_id=departmentId,
         start_date=startDate,
@@ -104,6 +108,7 @@ async def get_maintenance_cost_report(
     endDate: Optional[datetime] = Query(None, description="Filter to date"),
     export: Optional[str] = Query(None, description="Export format: csv or excel"),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
@@ -121,7 +126,7 @@ async def get_maintenance_cost_report(
     
     # Get cost analysis
     costs = calculate_maintenance_costs(
-        db=db,
+        db=read_db,
         machine_id=machineId,
         maintenance_type_id=maintenanceTypeId,
         start_date=startDate,
@@ -156,6 +161,7 @@ async def get_failure_analysis_report(
     failureCategory: Optional[str] = Query(None, description="Filter by failure category"),
     export: Optional[str] = Query(None, description="Export format: csv or excel"),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
 ):
@@ -173,7 +179,7 @@ async def get_failure_analysis_report(
     
     # Get failure analysis
     analysis = analyze_failure_patterns(
-        db=db,
+        db=read_db,
         machine_id=machineId,
         department_id=departmentId,
         start_date=startDate,
@@ -200,6 +206,52 @@ async def get_failure_analysis_report(
     return analysis
 
 
+@router.get("/request-lifecycle", response_model=RequestLifecycleReportResponse)
+async def get_request_lifecycle_report(
+    machineId: Optional[int] = Query(None, description="Filter by machine ID"),
+    departmentId: Optional[int] = Query(None, description="Filter by department ID"),
+    startDate: Optional[datetime] = Query(None, description="Filter from date"),
+    endDate: Optional[datetime] = Query(None, description="Filter to date"),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    request: Request = None
+):
+    """
+    Get MTTA, MTTR and time-in-status for maintenance requests.
+    
+    Admin and Maintenance Manager access only.
+    """
+    # Check if user has required role
+    if current_user.role not in REPORT_ALLOWED_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions"
+        )
+    
+    metrics = get_request_lifecycle_metrics(
+        db=read_db,
+        machine_id=machineId,
+        department_id=departmentId,
+        start_date=startDate,
+        end_date=endDate
+    )
+    
+    # Log activity
+    log_activity(
+        db=db,
+        userId=current_user.id,
+        action="READ",
+        entityType="LIFECYCLE_REPORT",
+        entityId=0,
+        description=f"Accessed request lifecycle report",
+        request=request
+    )
+    db.commit()
+    
+    return metrics
+
+
 async def _export_downtime_csv(stats: dict, start_date: Optional[datetime], end_date: Optional[datetime]):
     """Export downtime report to CSV."""
     from fastapi.responses import StreamingResponse
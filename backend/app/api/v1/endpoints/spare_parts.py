@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, and_, func, select
 from typing import Optional
 from datetime import datetime
 import json
 import math
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db, count_rows
+from app.utils.pagination import apply_keyset, keyset_page
 from app.core.deps import get_current_user, require_inventory_manager
+from app.core.etag import check_if_match, set_etag
+from app.core.events import ChangeEvent, publish_event
 from app.models.spare_part import SparePart
 from app.models.inventory_transaction import InventoryTransaction
 from app.models.spare_part_category import SparePartCategory
@@ -15,7 +19,8 @@ from app.schemas.spare_part import (
     SparePartCreate,
     SparePartUpdate,
     SparePartResponse,
-    SparePartListResponse
+    SparePartListResponse,
+    SparePartImportResponse
 )
 
 router = APIRouter()
@@ -42,11 +47,13 @@ async def list_spare_parts(
     is_active: Optional[bool] = Query(True, description="Filter by active status"),
     sort_by: Optional[str] = Query("partNumber", description="Sort field: partNumber, partName, currentStock, categoryName"),
     sort_order: Optional[str] = Query("asc", description="Sort order: asc, desc"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from nextCursor (empty for the first page)"),
+    includeTotal: bool = Query(False, description="Return the exact total in cursor mode"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_inventory_manager)
 ):
     """List spare parts with pagination and filtering"""
-    query = db.query(SparePart).options(joinedload(SparePart.category)).outerjoin(SparePartCategory)
+    query = select(SparePart).options(joinedload(SparePart.category)).outerjoin(SparePartCategory)
     
     # Filter by active status
     if is_active is not None:
@@ -109,9 +116,6 @@ async def list_spare_parts(
         if status_conditions:
             query = query.filter(or_(*status_conditions))
     
-    # Get total count before pagination
-    total = query.count()
-    
     # Apply sorting
     if sort_by == "partNumber":
         order_column = SparePart.partNumber
@@ -124,27 +128,43 @@ async def list_spare_parts(
     else:
         order_column = SparePart.partNumber
     
-    if sort_order.lower() == "desc":
-        order_column = order_column.desc()
-    
-    query = query.order_by(order_column)
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    spare_parts = query.offset(offset).limit(page_size).all()
+    if cursor is not None:
+        # Keyset mode: seek on (sort column, id) and skip the count unless asked
+        total = await count_rows(db, query) if includeTotal else None
+        if order_column is SparePartCategory.name:
+            sort_value = lambda sp: sp.category.name if sp.category else None
+        else:
+            sort_value = lambda sp: getattr(sp, order_column.key)
+        keyset_query = apply_keyset(query, order_column, SparePart.id, sort_order.lower() == "desc", cursor)
+        result = await db.execute(keyset_query.limit(page_size + 1))
+        spare_parts, next_cursor = keyset_page(result.scalars().all(), page_size, sort_value)
+    else:
+        # Get total count before pagination
+        total = await count_rows(db, query)
+        
+        if sort_order.lower() == "desc":
+            order_column = order_column.desc()
+        
+        query = query.order_by(order_column)
+        
+        # Apply pagination
+        offset = (page - 1) * page_size
+        result = await db.execute(query.offset(offset).limit(page_size))
+        spare_parts = result.scalars().all()
+        next_cursor = None
     
     # Get transaction counts for all spare parts in this page
     spare_part_ids = [sp.id for sp in spare_parts]
     transaction_counts = {}
     if spare_part_ids:
-        counts_query = db.query(
+        counts_query = select(
             InventoryTransaction.sparePartId,
             func.count(InventoryTransaction.id).label('count')
         ).filter(
             InventoryTransaction.sparePartId.in_(spare_part_ids)
         ).group_by(InventoryTransaction.sparePartId)
         
-        for result in counts_query.all():
+        for result in (await db.execute(counts_query)).all():
             transaction_counts[result.sparePartId] = result.count
     
     # Convert to response format with transaction counts
@@ -154,12 +174,17 @@ async def list_spare_parts(
         sp_dict['transactionCount'] = transaction_counts.get(sp.id, 0)
         spare_part_responses.append(SparePartResponse(**sp_dict))
     
+    total_pages = None
+    if total is not None:
+        total_pages = math.ceil(total / page_size) if total > 0 else 0
+    
     return SparePartListResponse(
         spareParts=spare_part_responses,
         total=total,
         page=page,
         pageSize=page_size,
-        totalPages=math.ceil(total / page_size) if total > 0 else 0
+        totalPages=total_pages,
+        nextCursor=next_cursor
     )
 
 @router.get("/available", response_model=SparePartListResponse)
@@ -168,15 +193,15 @@ async def get_available_spare_parts(
     page_size: int = Query(25, ge=1, le=1000, description="Items per page"),
     search: Optional[str] = Query(None, description="Search in partNumber, name, description"),
     category_id: Optional[str] = Query(None, alias="categoryId", description="Filter by category id (comma-separated)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get available spare parts (active parts with stock > 0)"""
-    query = db.query(SparePart).options(joinedload(SparePart.category)).outerjoin(SparePartCategory)
+    """Get available spare parts (active parts with unreserved stock > 0)"""
+    query = select(SparePart).options(joinedload(SparePart.category)).outerjoin(SparePartCategory)
     
-    # Filter by active status and available stock
+    # Filter by active status and available stock (on hand minus reserved, computed in SQL)
     query = query.filter(SparePart.isActive == True)
-    query = query.filter(SparePart.currentStock > 0)
+    query = query.filter(SparePart.availableStock > 0)
     
     # Apply search filter
     if search:
@@ -195,27 +220,28 @@ async def get_available_spare_parts(
             query = query.filter(SparePart.categoryId.in_(category_ids))
     
     # Get total count before pagination
-    total = query.count()
+    total = await count_rows(db, query)
     
     # Apply sorting (default by partNumber)
     query = query.order_by(SparePart.partNumber)
     
     # Apply pagination
     offset = (page - 1) * page_size
-    spare_parts = query.offset(offset).limit(page_size).all()
+    result = await db.execute(query.offset(offset).limit(page_size))
+    spare_parts = result.scalars().all()
     
     # Get transaction counts for all spare parts in this page
     spare_part_ids = [sp.id for sp in spare_parts]
     transaction_counts = {}
     if spare_part_ids:
-        counts_query = db.query(
+        counts_query = select(
             InventoryTransaction.sparePartId,
             func.count(InventoryTransaction.id).label('count')
         ).filter(
             InventoryTransaction.sparePartId.in_(spare_part_ids)
         ).group_by(InventoryTransaction.sparePartId)
         
-        for result in counts_query.all():
+        for result in (await db.execute(counts_query)).all():
             transaction_counts[result.sparePartId] = result.count
     
     # Convert to response format with transaction counts
@@ -239,11 +265,11 @@ async def get_low_stock_parts(
     page_size: int = Query(25, ge=1, le=100, description="Items per page"),
     search: Optional[str] = Query(None, description="Search in partNumber, name, description"),
     category_id: Optional[str] = Query(None, alias="categoryId", description="Filter by category id (comma-separated)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_inventory_manager)
 ):
     """Get spare parts with current stock below minimum stock level"""
-    query = db.query(SparePart).options(joinedload(SparePart.category)).outerjoin(SparePartCategory).filter(
+    query = select(SparePart).options(joinedload(SparePart.category)).outerjoin(SparePartCategory).filter(
         SparePart.isActive == True,
         SparePart.currentStock < SparePart.minimumStock
     )
@@ -265,24 +291,25 @@ async def get_low_stock_parts(
             query = query.filter(SparePart.categoryId.in_(category_ids))
     
     # Get total count
-    total = query.count()
+    total = await count_rows(db, query)
     
     # Apply pagination
     offset = (page - 1) * page_size
-    spare_parts = query.order_by(SparePart.currentStock.asc()).offset(offset).limit(page_size).all()
+    result = await db.execute(query.order_by(SparePart.currentStock.asc()).offset(offset).limit(page_size))
+    spare_parts = result.scalars().all()
     
     # Get transaction counts for all spare parts in this page
     spare_part_ids = [sp.id for sp in spare_parts]
     transaction_counts = {}
     if spare_part_ids:
-        counts_query = db.query(
+        counts_query = select(
             InventoryTransaction.sparePartId,
             func.count(InventoryTransaction.id).label('count')
         ).filter(
             InventoryTransaction.sparePartId.in_(spare_part_ids)
         ).group_by(InventoryTransaction.sparePartId)
         
-        for result in counts_query.all():
+        for result in (await db.execute(counts_query)).all():
             transaction_counts[result.sparePartId] = result.count
     
     # Convert to response format with transaction counts
@@ -303,45 +330,44 @@ async def get_low_stock_parts(
 @router.get("/{part_id}", response_model=SparePartResponse)
 async def get_spare_part(
     part_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get spare part details by ID"""
-    spare_part = (
-        db.query(SparePart)
-        .options(joinedload(SparePart.category))
-        .filter(SparePart.id == part_id)
-        .first()
-    )
+    spare_part = await db.get(SparePart, part_id, options=[joinedload(SparePart.category)])
     if not spare_part:
         raise HTTPException(status_code=404, detail="Spare part not found")
     
     # Get transaction count
-    transaction_count = db.query(func.count(InventoryTransaction.id)).filter(
-        InventoryTransaction.sparePartId == part_id
-    ).scalar() or 0
+    transaction_count = await db.scalar(
+        select(func.count(InventoryTransaction.id)).filter(
+            InventoryTransaction.sparePartId == part_id
+        )
+    ) or 0
     
     # Convert to response format with transaction count
     sp_dict = SparePartResponse.model_validate(spare_part).model_dump()
     sp_dict['transactionCount'] = transaction_count
+    set_etag(response, spare_part.version)
     return SparePartResponse(**sp_dict)
 
 @router.post("", response_model=SparePartResponse)
 async def create_spare_part(
     spare_part_data: SparePartCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_inventory_manager)
 ):
     """Create a new spare part"""
     # Validate partNumber uniqueness
-    existing_part = db.query(SparePart).filter(SparePart.partNumber == spare_part_data.partNumber).first()
+    existing_part = await db.scalar(select(SparePart).filter(SparePart.partNumber == spare_part_data.partNumber))
     if existing_part:
         raise HTTPException(status_code=409, detail="A spare part with this part number already exists")
     
     category = None
     if spare_part_data.categoryId is not None:
-        category = db.query(SparePartCategory).filter(SparePartCategory.id == spare_part_data.categoryId).first()
+        category = await db.get(SparePartCategory, spare_part_data.categoryId)
         if category is None or not category.isActive:
             raise HTTPException(status_code=400, detail="Spare part category not found or inactive")
 
@@ -362,8 +388,8 @@ async def create_spare_part(
     )
     
     db.add(spare_part)
-    db.commit()
-    db.refresh(spare_part)
+    await db.commit()
+    await db.refresh(spare_part, ["category"])
     
     # Create activity log entry
     from app.services.audit_service import log_activity
@@ -385,29 +411,77 @@ async def create_spare_part(
         newValues=new_values,
         request=request
     )
-    db.commit()
+    # Opening stock is set outside the ledger, so the snapshot is the only record of it
+    from app.services.stock_snapshot_service import record_stock_snapshots
+    await db.run_sync(record_stock_snapshots, [spare_part.id])
+    await db.commit()
     
-    spare_part = (
-        db.query(SparePart)
-        .options(joinedload(SparePart.category))
-        .filter(SparePart.id == spare_part.id)
-        .first()
-    )
+    publish_event(ChangeEvent.STOCK_CHANGED, sparePartId=spare_part.id)
+    
+    spare_part = await db.get(SparePart, spare_part.id, options=[joinedload(SparePart.category)], populate_existing=True)
     
     return SparePartResponse.model_validate(spare_part)
 
+@router.post("/import", response_model=SparePartImportResponse)
+def import_spare_parts(
+    request: Request,
+    file: UploadFile = File(...),
+    createCategories: bool = Query(False, description="Create categories whose code is not found instead of rejecting the row"),
+    logEachRow: bool = Query(False, description="Write an activity log per part instead of one per batch"),
+    dryRun: bool = Query(False, description="Check the file and report errors without saving anything"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_inventory_manager)
+):
+    """Create or update spare parts in bulk from a CSV or XLSX file, keyed on partNumber.
+    
+    Columns are the create fields with categoryCode (and optionally
+    categoryName) in place of categoryId; partNumber and partName are
+    required. Existing parts get the columns present in the file. See
+    app.services.catalog_import_service.
+    
+    A plain def on the sync session: parsing and validating a large file
+    runs in the threadpool instead of holding up the event loop.
+    """
+    from app.services.catalog_import_service import import_catalog
+    from app.utils.uploads import iter_upload_rows
+    
+    try:
+        rows = iter_upload_rows(file, required=("partNumber", "partName"))
+        result = import_catalog(
+            db, rows, current_user.id, file.filename or "upload",
+            createCategories, logEachRow, dryRun, request
+        )
+        if dryRun:
+            db.rollback()
+        else:
+            db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to import spare parts: {str(e)}")
+    
+    if not dryRun and (result.created or result.updated):
+        publish_event(ChangeEvent.STOCK_CHANGED)
+    
+    return result
+
 @router.patch("/{part_id}", response_model=SparePartResponse)
 async def update_spare_part(
     part_id: int,
     spare_part_data: SparePartUpdate,
     request: Request,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_inventory_manager)
 ):
-    """Update spare part"""
-    spare_part = db.query(SparePart).filter(SparePart.id == part_id).first()
+    """Update spare part. Send the ETag from the last read as If-Match to get 412 instead of overwriting a newer edit."""
+    spare_part = await db.get(SparePart, part_id, options=[joinedload(SparePart.category)])
     if not spare_part:
         raise HTTPException(status_code=404, detail="Spare part not found")
+    check_if_match(if_match, spare_part.version)
     
     # Store old values for activity log
     old_values = {
@@ -425,10 +499,12 @@ async def update_spare_part(
     # Validate partNumber uniqueness if being changed
     update_data = spare_part_data.model_dump(exclude_unset=True)
     if 'partNumber' in update_data and update_data['partNumber'] != spare_part.partNumber:
-        existing_part = db.query(SparePart).filter(
-            SparePart.partNumber == update_data['partNumber'],
-            SparePart.id != part_id
-        ).first()
+        existing_part = await db.scalar(
+            select(SparePart).filter(
+                SparePart.partNumber == update_data['partNumber'],
+                SparePart.id != part_id
+            )
+        )
         if existing_part:
             raise HTTPException(status_code=409, detail="A spare part with this part number already exists")
 
@@ -436,7 +512,7 @@ async def update_spare_part(
     if 'categoryId' in update_data:
         category_id = update_data['categoryId']
         if category_id is not None:
-            category = db.query(SparePartCategory).filter(SparePartCategory.id == category_id).first()
+            category = await db.get(SparePartCategory, category_id)
             if category is None or not category.isActive:
                 raise HTTPException(status_code=400, detail="Spare part category not found or inactive")
     
@@ -449,8 +525,11 @@ async def update_spare_part(
     for field, value in update_data.items():
         setattr(spare_part, field, value)
     
-    db.commit()
-    db.refresh(spare_part)
+    if stock_changed or 'unitPrice' in update_data:
+        from app.services.stock_snapshot_service import record_stock_snapshots
+        await db.run_sync(record_stock_snapshots, [part_id])
+    await db.commit()
+    await db.refresh(spare_part, ["category"])
     
     # Store new values for activity log
     new_values = {
@@ -483,26 +562,24 @@ async def update_spare_part(
         newValues=new_values,
         request=request
     )
-    db.commit()
+    await db.commit()
     
-    spare_part = (
-        db.query(SparePart)
-        .options(joinedload(SparePart.category))
-        .filter(SparePart.id == part_id)
-        .first()
-    )
+    publish_event(ChangeEvent.STOCK_CHANGED, sparePartId=part_id)
+    
+    spare_part = await db.get(SparePart, part_id, options=[joinedload(SparePart.category)], populate_existing=True)
     
+    set_etag(response, spare_part.version)
     return SparePartResponse.model_validate(spare_part)
 
 @router.delete("/{part_id}")
 async def delete_spare_part(
     part_id: int,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_inventory_manager)
 ):
     """Delete spare part (soft delete by setting isActive=False)"""
-    spare_part = db.query(SparePart).filter(SparePart.id == part_id).first()
+    spare_part = await db.get(SparePart, part_id)
     if not spare_part:
         raise HTTPException(status_code=404, detail="Spare part not found")
     
@@ -519,8 +596,7 @@ async def delete_spare_part(
     # Soft delete - set isActive to False
     spare_part.isActive = False
     
-    db.commit()
-    db.refresh(spare_part)
+    await db.commit()
     
     # Create activity log entry
     from app.services.audit_service import log_activity
@@ -535,7 +611,9 @@ async def delete_spare_part(
         newValues={"isActive": False},
         request=request
     )
-    db.commit()
+    await db.commit()
+    
+    publish_event(ChangeEvent.STOCK_CHANGED, sparePartId=part_id)
     
     return {"message": "Spare part deleted successfully"}
 
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
-from typing import Optional
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import or_, and_, func, insert, inspect
+from typing import List, Optional
 from datetime import datetime
 import json
 import math
 from app.core.database import get_db
-from app.core.deps import get_current_user, require_maintenance_tech, require_maintenance_manager, require_inventory_manager
+from app.utils.pagination import apply_keyset, keyset_page
+from app.core.deps import get_current_user, require_maintenance_tech, require_maintenance_manager, require_inventory_manager, require_management
+from app.core.events import ChangeEvent, publish_event
 from app.models.spare_parts_request import SparePartsRequest, SparePartsRequestStatus
 from app.models.maintenance_work import MaintenanceWork, WorkStatus
 from app.models.spare_part import SparePart
@@ -18,13 +21,88 @@ from app.schemas.spare_parts_request import (
     SparePartsRequestResponse,
     SparePartsRequestListResponse,
     ApproveRequest,
-    RejectRequest
+    RejectRequest,
+    SparePartsRequestBulkAction,
+    SparePartsRequestBulkRequest,
+    SparePartsRequestBulkItemResult,
+    SparePartsRequestBulkResponse
 )
 
 router = APIRouter()
 
+# Handlers that write are plain def: FastAPI runs them in its threadpool, so a
+# sync Session waiting on a row lock holds a worker thread, not the event loop
+
+# Everything SparePartsRequestResponse shows besides the request's own columns
+SPARE_PARTS_REQUEST_RELATIONS = (
+    joinedload(SparePartsRequest.maintenanceWork).load_only(MaintenanceWork.workDescription),
+    joinedload(SparePartsRequest.sparePart).load_only(
+        SparePart.partNumber, SparePart.partName, SparePart.currentStock, SparePart.reservedStock
+    ),
+    joinedload(SparePartsRequest.requestedByUser).load_only(User.fullName),
+    joinedload(SparePartsRequest.approvedByUser).load_only(User.fullName),
+)
+RELATION_NAMES = {"maintenanceWork", "sparePart", "requestedByUser", "approvedByUser"}
+
+def _closed_work_status(maintenance_work: Optional[MaintenanceWork], maintenance_request: Optional[MaintenanceRequest]) -> Optional[str]:
+    """Status of a completed or cancelled work (or of its request); None while parts can still be approved."""
+    if maintenance_work and maintenance_work.status in (WorkStatus.COMPLETED, WorkStatus.CANCELLED):
+        return maintenance_work.status.value
+    if maintenance_request and maintenance_request.status in (RequestStatus.COMPLETED, RequestStatus.CANCELLED):
+        return maintenance_request.status.value
+    return None
+
+def _build_spare_parts_request_responses(db: Session, requests: List[SparePartsRequest]) -> List[SparePartsRequestResponse]:
+    """Serialize SparePartsRequests with work, spare part and user details.
+
+    Requests queried with SPARE_PARTS_REQUEST_RELATIONS are used as they are.
+    The rest (including ones expired by a commit) are reloaded with those
+    relations in a single IN query, so any number of requests costs at most
+    one extra query.
+    """
+    # Identity keys, since reading .id off an expired request would refresh it row by row
+    stale_ids = [state.identity[0] for state in map(inspect, requests) if RELATION_NAMES & state.unloaded]
+    if stale_ids:
+        db.query(SparePartsRequest).options(*SPARE_PARTS_REQUEST_RELATIONS).filter(
+            SparePartsRequest.id.in_(stale_ids)
+        ).populate_existing().all()
+    
+    responses = []
+    for req in requests:
+        maintenance_work = req.maintenanceWork
+        spare_part = req.sparePart
+        responses.append(SparePartsRequestResponse(
+            id=req.id,
+            maintenanceWorkId=req.maintenanceWorkId,
+            sparePartId=req.sparePartId,
+            quantityRequested=req.quantityRequested,
+            status=req.status.value,
+            requestedBy=req.requestedBy,
+            requestedByName=req.requestedByUser.fullName if req.requestedByUser else None,
+            approvedBy=req.approvedBy,
+            approvedByName=req.approvedByUser.fullName if req.approvedByUser else None,
+            approvedAt=req.approvedAt,
+            rejectionReason=req.rejectionReason,
+            approvalNotes=req.approvalNotes,
+            isRequestedReturn=req.isRequestedReturn,
+            returnDate=req.returnDate,
+            isReturned=req.isReturned,
+            maintenanceWorkDescription=maintenance_work.workDescription if maintenance_work else None,
+            sparePartNumber=spare_part.partNumber if spare_part else None,
+            sparePartName=spare_part.partName if spare_part else None,
+            currentStock=spare_part.currentStock if spare_part else None,
+            availableStock=spare_part.availableStock if spare_part else None,
+            createdAt=req.createdAt,
+            updatedAt=req.updatedAt
+        ))
+    return responses
+
+def _build_spare_parts_request_response(db: Session, request: SparePartsRequest) -> SparePartsRequestResponse:
+    """Serialize a single SparePartsRequest with work, spare part and user details."""
+    return _build_spare_parts_request_responses(db, [request])[0]
+
 @router.get("", response_model=SparePartsRequestListResponse)
-async def list_spare_parts_requests(
+def list_spare_parts_requests(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(25, ge=1, le=100, description="Items per page"),
     status: Optional[str] = Query(None, description="Filter by status: PENDING, APPROVED, REJECTED, ISSUED"),
@@ -33,11 +111,13 @@ async def list_spare_parts_requests(
     requestedBy: Optional[int] = Query(None, description="Filter by requester user ID"),
     isRequestedReturn: Optional[bool] = Query(None, description="Filter by return requested flag"),
     isReturned: Optional[bool] = Query(None, description="Filter by returned flag"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from nextCursor (empty for the first page)"),
+    includeTotal: bool = Query(False, description="Return the exact total in cursor mode"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List spare parts requests with pagination and filtering"""
-    query = db.query(SparePartsRequest)
+    query = db.query(SparePartsRequest).options(*SPARE_PARTS_REQUEST_RELATIONS)
     
     # Apply filters
     if status:
@@ -62,100 +142,53 @@ async def list_spare_parts_requests(
     if isReturned is not None:
         query = query.filter(SparePartsRequest.isReturned == isReturned)
     
-    # Get total count before pagination
-    total = query.count()
-    
-    # Apply pagination
-    skip = (page - 1) * page_size
-    requests = query.order_by(SparePartsRequest.createdAt.desc()).offset(skip).limit(page_size).all()
-    
-    # Build response with related entity info
-    request_responses = []
-    for req in requests:
-        # Eager load relationships
-        maintenance_work = db.query(MaintenanceWork).filter(MaintenanceWork.id == req.maintenanceWorkId).first()
-        spare_part = db.query(SparePart).filter(SparePart.id == req.sparePartId).first()
-        requested_by_user = db.query(User).filter(User.id == req.requestedBy).first()
-        approved_by_user = db.query(User).filter(User.id == req.approvedBy).first() if req.approvedBy else None
+    if cursor is not None:
+        # Keyset mode: seek on (createdAt, id) and skip the count unless asked
+        total = query.count() if includeTotal else None
+        query = apply_keyset(query, SparePartsRequest.createdAt, SparePartsRequest.id, True, cursor)
+        requests, next_cursor = keyset_page(query.limit(page_size + 1).all(), page_size, lambda r: r.createdAt)
+    else:
+        # Get total count before pagination
+        total = query.count()
         
-        request_responses.append(SparePartsRequestResponse(
-            id=req.id,
-            maintenanceWorkId=req.maintenanceWorkId,
-            sparePartId=req.sparePartId,
-            quantityRequested=req.quantityRequested,
-            status=req.status.value,
-            requestedBy=req.requestedBy,
-            requestedByName=requested_by_user.fullName if requested_by_user else None,
-            approvedBy=req.approvedBy,
-            approvedByName=approved_by_user.fullName if approved_by_user else None,
-            approvedAt=req.approvedAt,
-            rejectionReason=req.rejectionReason,
-            approvalNotes=req.approvalNotes,
-            isRequestedReturn=req.isRequestedReturn,
-            returnDate=req.returnDate,
-            isReturned=req.isReturned,
-            maintenanceWorkDescription=maintenance_work.workDescription if maintenance_work else None,
-            sparePartNumber=spare_part.partNumber if spare_part else None,
-            sparePartName=spare_part.partName if spare_part else None,
-            currentStock=spare_part.currentStock if spare_part else None,
-            createdAt=req.createdAt,
-            updatedAt=req.updatedAt
-        ))
+        # Apply pagination
+        skip = (page - 1) * page_size
+        requests = query.order_by(SparePartsRequest.createdAt.desc()).offset(skip).limit(page_size).all()
+        next_cursor = None
     
-    total_pages = math.ceil(total / page_size) if total > 0 else 0
+    request_responses = _build_spare_parts_request_responses(db, requests)
+    
+    total_pages = None
+    if total is not None:
+        total_pages = math.ceil(total / page_size) if total > 0 else 0
     
     return SparePartsRequestListResponse(
         requests=request_responses,
         total=total,
         page=page,
         pageSize=page_size,
-        totalPages=total_pages
+        totalPages=total_pages,
+        nextCursor=next_cursor
     )
 
 @router.get("/{request_id}", response_model=SparePartsRequestResponse)
-async def get_spare_parts_request(
+def get_spare_parts_request(
     request_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a single spare parts request by ID"""
-    request = db.query(SparePartsRequest).filter(SparePartsRequest.id == request_id).first()
+    request = db.query(SparePartsRequest).options(*SPARE_PARTS_REQUEST_RELATIONS).filter(
+        SparePartsRequest.id == request_id
+    ).first()
     
     if not request:
         raise HTTPException(status_code=404, detail="Spare parts request not found")
     
-    # Load related entities
-    maintenance_work = db.query(MaintenanceWork).filter(MaintenanceWork.id == request.maintenanceWorkId).first()
-    spare_part = db.query(SparePart).filter(SparePart.id == request.sparePartId).first()
-    requested_by_user = db.query(User).filter(User.id == request.requestedBy).first()
-    approved_by_user = db.query(User).filter(User.id == request.approvedBy).first() if request.approvedBy else None
-    
-    return SparePartsRequestResponse(
-        id=request.id,
-        maintenanceWorkId=request.maintenanceWorkId,
-        sparePartId=request.sparePartId,
-        quantityRequested=request.quantityRequested,
-        status=request.status.value,
-        requestedBy=request.requestedBy,
-        requestedByName=requested_by_user.fullName if requested_by_user else None,
-        approvedBy=request.approvedBy,
-        approvedByName=approved_by_user.fullName if approved_by_user else None,
-        approvedAt=request.approvedAt,
-        rejectionReason=request.rejectionReason,
-        approvalNotes=request.approvalNotes,
-        isRequestedReturn=request.isRequestedReturn,
-        returnDate=request.returnDate,
-        isReturned=request.isReturned,
-        maintenanceWorkDescription=maintenance_work.workDescription if maintenance_work else None,
-        sparePartNumber=spare_part.partNumber if spare_part else None,
-        sparePartName=spare_part.partName if spare_part else None,
-        currentStock=spare_part.currentStock if spare_part else None,
-        createdAt=request.createdAt,
-        updatedAt=request.updatedAt
-    )
+    return _build_spare_parts_request_response(db, request)
 
 @router.post("", response_model=SparePartsRequestResponse)
-async def create_spare_parts_request(
+def create_spare_parts_request(
     request_data: SparePartsRequestCreate,
     request: Request,
     db: Session = Depends(get_db),
@@ -172,6 +205,12 @@ async def create_spare_parts_request(
     if current_user.role != UserRole.ADMIN and maintenance_work.assignedToId != current_user.id:
         raise HTTPException(status_code=403, detail="You can only request parts for your assigned maintenance work")
     
+    closed_status = _closed_work_status(
+        maintenance_work, db.query(MaintenanceRequest).filter(MaintenanceRequest.id == maintenance_work.requestId).first()
+    )
+    if closed_status:
+        raise HTTPException(status_code=400, detail=f"Cannot request parts for work that is {closed_status}")
+    
     # Validate spare part exists and is active
     spare_part = db.query(SparePart).filter(SparePart.id == request_data.sparePartId).first()
     if not spare_part:
@@ -196,6 +235,16 @@ async def create_spare_parts_request(
         if maintenance_work.status == WorkStatus.IN_PROGRESS:
             maintenance_request = db.query(MaintenanceRequest).filter(MaintenanceRequest.id == maintenance_work.requestId).first()
             if maintenance_request and maintenance_request.status == RequestStatus.IN_PROGRESS:
+                from app.services.audit_service import record_status_change
+                record_status_change(
+                    db=db,
+                    entityType="MAINTENANCE_REQUEST",
+                    entityId=maintenance_request.id,
+                    requestId=maintenance_request.id,
+                    fromStatus=RequestStatus.IN_PROGRESS,
+                    toStatus=RequestStatus.WAITING_PARTS,
+                    userId=current_user.id
+                )
                 maintenance_request.status = RequestStatus.WAITING_PARTS
                 db.add(maintenance_request)
         
@@ -219,41 +268,253 @@ async def create_spare_parts_request(
         )
         
         db.commit()
-        db.refresh(spare_parts_request)
+        response = _build_spare_parts_request_response(db, spare_parts_request)
+        publish_event(ChangeEvent.SPARE_PARTS_REQUEST_CREATED, id=response.id, maintenanceWorkId=response.maintenanceWorkId)
         
-        # Load related entities for response
-        requested_by_user = db.query(User).filter(User.id == spare_parts_request.requestedBy).first()
-        
-        return SparePartsRequestResponse(
-            id=spare_parts_request.id,
-            maintenanceWorkId=spare_parts_request.maintenanceWorkId,
-            sparePartId=spare_parts_request.sparePartId,
-            quantityRequested=spare_parts_request.quantityRequested,
-            status=spare_parts_request.status.value,
-            requestedBy=spare_parts_request.requestedBy,
-            requestedByName=requested_by_user.fullName if requested_by_user else None,
-            approvedBy=spare_parts_request.approvedBy,
-            approvedByName=None,
-            approvedAt=spare_parts_request.approvedAt,
-            rejectionReason=spare_parts_request.rejectionReason,
-            approvalNotes=spare_parts_request.approvalNotes,
-            isRequestedReturn=spare_parts_request.isRequestedReturn,
-            returnDate=spare_parts_request.returnDate,
-            isReturned=spare_parts_request.isReturned,
-            maintenanceWorkDescription=maintenance_work.workDescription,
-            sparePartNumber=spare_part.partNumber,
-            sparePartName=spare_part.partName,
-            currentStock=spare_part.currentStock,
-            createdAt=spare_parts_request.createdAt,
-            updatedAt=spare_parts_request.updatedAt
-        )
+        return response
     
+    except StaleDataError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create request: {str(e)}")
 
+@router.post("/bulk", response_model=SparePartsRequestBulkResponse)
+def bulk_process_requests(
+    bulk_data: SparePartsRequestBulkRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_management)
+):
+    """Approve, reject or issue many spare parts requests in one transaction.
+    
+    Items are applied in order with the same rules as the single-item endpoints.
+    An item that fails validation is reported in its result and skipped; the
+    rest are committed together.
+    """
+    from app.services.audit_service import activity_log_values, log_activities, record_status_change
+    
+    items = bulk_data.items
+    spare_parts_requests = {
+        req.id: req
+        for req in db.query(SparePartsRequest).filter(
+            SparePartsRequest.id.in_({item.id for item in items})
+        ).with_for_update().all()
+    }
+    
+    # Lock every spare part the batch reserves, releases or issues, in one query and in id order;
+    # the reservation checks below then run against these rows
+    stock_part_ids = {
+        spare_parts_requests[item.id].sparePartId
+        for item in items
+        if item.id in spare_parts_requests
+        and (item.action != SparePartsRequestBulkAction.REJECT
+             or spare_parts_requests[item.id].status == SparePartsRequestStatus.APPROVED)
+    }
+    spare_parts = {}
+    if stock_part_ids:
+        spare_parts = {
+            part.id: part
+            for part in db.query(SparePart).filter(
+                SparePart.id.in_(stock_part_ids)
+            ).order_by(SparePart.id).with_for_update().populate_existing().all()
+        }
+    
+    # Works and their maintenance requests, for moving WAITING_PARTS back to IN_PROGRESS
+    works = {
+        work.id: work
+        for work in db.query(MaintenanceWork).filter(
+            MaintenanceWork.id.in_({req.maintenanceWorkId for req in spare_parts_requests.values()})
+        ).all()
+    } if spare_parts_requests else {}
+    maintenance_requests = {
+        maintenance_request.id: maintenance_request
+        for maintenance_request in db.query(MaintenanceRequest).filter(
+            MaintenanceRequest.id.in_({work.requestId for work in works.values()})
+        ).all()
+    } if works else {}
+    
+    can_approve = current_user.role in (UserRole.MAINTENANCE_MANAGER, UserRole.ADMIN)
+    can_issue = current_user.role in (UserRole.INVENTORY_MANAGER, UserRole.ADMIN)
+    now = datetime.utcnow()
+    results = []
+    processed = {}
+    transactions = []
+    activity_logs = []
+    
+    def resume_request(spare_parts_request):
+        maintenance_work = works.get(spare_parts_request.maintenanceWorkId)
+        maintenance_request = maintenance_requests.get(maintenance_work.requestId) if maintenance_work else None
+        if maintenance_request and maintenance_request.status == RequestStatus.WAITING_PARTS:
+            record_status_change(
+                db=db,
+                entityType="MAINTENANCE_REQUEST",
+                entityId=maintenance_request.id,
+                requestId=maintenance_request.id,
+                fromStatus=RequestStatus.WAITING_PARTS,
+                toStatus=RequestStatus.IN_PROGRESS,
+                userId=current_user.id,
+                changedAt=now
+            )
+            maintenance_request.status = RequestStatus.IN_PROGRESS
+    
+    for index, item in enumerate(items):
+        spare_parts_request = spare_parts_requests.get(item.id)
+        error = None
+        if not spare_parts_request:
+            error = "Spare parts request not found"
+        elif item.action == SparePartsRequestBulkAction.ISSUE:
+            spare_part = spare_parts.get(spare_parts_request.sparePartId)
+            if not can_issue:
+                error = "Insufficient permissions"
+            elif spare_parts_request.status != SparePartsRequestStatus.APPROVED:
+                error = f"Cannot issue request with status {spare_parts_request.status.value}"
+            elif not spare_part:
+                error = "Spare part not found"
+            elif spare_part.currentStock < spare_parts_request.quantityRequested:
+                # Stock already taken by earlier items in the batch counts too
+                error = f"Insufficient stock. Available: {spare_part.currentStock}, Requested: {spare_parts_request.quantityRequested}"
+        elif not can_approve:
+            error = "Insufficient permissions"
+        elif item.action == SparePartsRequestBulkAction.APPROVE:
+            spare_part = spare_parts.get(spare_parts_request.sparePartId)
+            maintenance_work = works.get(spare_parts_request.maintenanceWorkId)
+            closed_status = _closed_work_status(
+                maintenance_work, maintenance_requests.get(maintenance_work.requestId) if maintenance_work else None
+            )
+            if spare_parts_request.status != SparePartsRequestStatus.PENDING:
+                error = f"Cannot approve request with status {spare_parts_request.status.value}"
+            elif closed_status:
+                error = f"Cannot approve parts for work that is {closed_status}"
+            elif not spare_part:
+                error = "Spare part not found"
+            elif spare_part.availableStock < spare_parts_request.quantityRequested:
+                # Units reserved by earlier items in the batch count too
+                error = f"Insufficient available stock. Available: {spare_part.availableStock}, Requested: {spare_parts_request.quantityRequested}"
+        elif spare_parts_request.status not in (SparePartsRequestStatus.PENDING, SparePartsRequestStatus.APPROVED):
+            error = f"Cannot reject request with status {spare_parts_request.status.value}"
+        elif not (item.notes or "").strip():
+            error = "A rejection reason is required to reject"
+        
+        results.append(SparePartsRequestBulkItemResult(id=item.id, action=item.action, success=error is None, error=error))
+        if error:
+            continue
+        
+        old_status = spare_parts_request.status.value
+        if item.action == SparePartsRequestBulkAction.APPROVE:
+            spare_parts[spare_parts_request.sparePartId].reservedStock += spare_parts_request.quantityRequested
+            spare_parts_request.status = SparePartsRequestStatus.APPROVED
+            spare_parts_request.approvedBy = current_user.id
+            spare_parts_request.approvedAt = now
+            spare_parts_request.approvalNotes = item.notes
+            activity_logs.append(activity_log_values(
+                userId=current_user.id,
+                action="APPROVE",
+                entityType="SPARE_PARTS_REQUEST",
+                entityId=spare_parts_request.id,
+                description=f"Spare parts request approved by {current_user.fullName}",
+                oldValues={"status": old_status},
+                newValues={
+                    "status": "APPROVED",
+                    "approvedBy": current_user.id,
+                    "approvalNotes": item.notes,
+                    "reservedQuantity": spare_parts_request.quantityRequested
+                },
+                request=request,
+                timestamp=now
+            ))
+        elif item.action == SparePartsRequestBulkAction.REJECT:
+            rejection_reason = item.notes.strip()
+            spare_part = spare_parts.get(spare_parts_request.sparePartId)
+            if spare_parts_request.status == SparePartsRequestStatus.APPROVED and spare_part:
+                spare_part.reservedStock = max(0, spare_part.reservedStock - spare_parts_request.quantityRequested)
+            spare_parts_request.status = SparePartsRequestStatus.REJECTED
+            spare_parts_request.approvedBy = current_user.id
+            spare_parts_request.approvedAt = now
+            spare_parts_request.rejectionReason = rejection_reason
+            maintenance_work = works.get(spare_parts_request.maintenanceWorkId)
+            if maintenance_work and maintenance_work.status == WorkStatus.IN_PROGRESS:
+                resume_request(spare_parts_request)
+            activity_logs.append(activity_log_values(
+                userId=current_user.id,
+                action="REJECT",
+                entityType="SPARE_PARTS_REQUEST",
+                entityId=spare_parts_request.id,
+                description=f"Spare parts request rejected by {current_user.fullName}: {rejection_reason}",
+                oldValues={"status": old_status},
+                newValues={"status": "REJECTED", "approvedBy": current_user.id, "rejectionReason": rejection_reason},
+                request=request,
+                timestamp=now
+            ))
+        else:
+            spare_part = spare_parts[spare_parts_request.sparePartId]
+            quantity = spare_parts_request.quantityRequested
+            before_quantity = spare_part.currentStock
+            unit_price = spare_part.unitPrice or 0.0
+            reference_number = f"SPR-{spare_parts_request.id}"
+            spare_parts_request.status = SparePartsRequestStatus.ISSUED
+            spare_part.currentStock = before_quantity - quantity
+            spare_part.reservedStock = max(0, spare_part.reservedStock - quantity)
+            transactions.append({
+                "sparePartId": spare_part.id,
+                "transactionType": TransactionType.OUT,
+                "quantity": quantity,
+                "unitPrice": unit_price,
+                "totalValue": unit_price * quantity,
+                "referenceType": "MAINTENANCE",
+                "referenceNumber": reference_number,
+                "notes": f"Issued for maintenance work {spare_parts_request.maintenanceWorkId}",
+                "transactionDate": now,
+                "performedById": current_user.id,
+            })
+            resume_request(spare_parts_request)
+            activity_logs.append(activity_log_values(
+                userId=current_user.id,
+                action="ISSUE",
+                entityType="SPARE_PARTS_REQUEST",
+                entityId=spare_parts_request.id,
+                description=f"Spare parts issued: {quantity} units of {spare_part.partNumber} by {current_user.fullName}",
+                oldValues={"status": old_status, "stock": {"before": before_quantity, "after": spare_part.currentStock}},
+                # Rows are inserted in one executemany, so the transaction is identified by its reference number
+                newValues={"status": "ISSUED", "referenceNumber": reference_number, "quantityIssued": quantity},
+                request=request,
+                timestamp=now
+            ))
+        processed[index] = spare_parts_request
+    
+    if processed:
+        try:
+            if transactions:
+                db.execute(insert(InventoryTransaction), transactions)
+                from app.services.stock_snapshot_service import record_stock_snapshots
+                record_stock_snapshots(db, {transaction["sparePartId"] for transaction in transactions})
+            log_activities(db, activity_logs)
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            raise
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to process requests: {str(e)}")
+        
+        responses = _build_spare_parts_request_responses(db, list(processed.values()))
+        events = {
+            SparePartsRequestBulkAction.APPROVE: ChangeEvent.SPARE_PARTS_REQUEST_APPROVED,
+            SparePartsRequestBulkAction.REJECT: ChangeEvent.SPARE_PARTS_REQUEST_REJECTED,
+            SparePartsRequestBulkAction.ISSUE: ChangeEvent.SPARE_PARTS_REQUEST_ISSUED,
+        }
+        for index, response in zip(processed, responses):
+            results[index].request = response
+            publish_event(events[items[index].action], id=response.id, maintenanceWorkId=response.maintenanceWorkId)
+        for spare_part_id in {transaction["sparePartId"] for transaction in transactions}:
+            publish_event(ChangeEvent.STOCK_CHANGED, sparePartId=spare_part_id)
+    
+    succeeded = len(processed)
+    return SparePartsRequestBulkResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
 @router.patch("/{request_id}/approve", response_model=SparePartsRequestResponse)
-async def approve_request(
+def approve_request(
     request_id: int,
     approval_data: ApproveRequest,
     request: Request,
@@ -262,13 +523,37 @@ async def approve_request(
 ):
     """Approve a spare parts request (maintenance managers only)"""
     
-    spare_parts_request = db.query(SparePartsRequest).filter(SparePartsRequest.id == request_id).first()
+    # Lock the request so it cannot be approved (and reserved) twice
+    spare_parts_request = db.query(SparePartsRequest).filter(
+        SparePartsRequest.id == request_id
+    ).with_for_update().populate_existing().first()
     if not spare_parts_request:
         raise HTTPException(status_code=404, detail="Spare parts request not found")
     
     if spare_parts_request.status != SparePartsRequestStatus.PENDING:
         raise HTTPException(status_code=400, detail=f"Cannot approve request with status {spare_parts_request.status.value}")
     
+    # A closed work would hold the reservation forever
+    maintenance_work = db.query(MaintenanceWork).filter(MaintenanceWork.id == spare_parts_request.maintenanceWorkId).first()
+    closed_status = _closed_work_status(
+        maintenance_work,
+        db.query(MaintenanceRequest).filter(MaintenanceRequest.id == maintenance_work.requestId).first() if maintenance_work else None
+    )
+    if closed_status:
+        raise HTTPException(status_code=400, detail=f"Cannot approve parts for work that is {closed_status}")
+    
+    spare_part = db.query(SparePart).filter(SparePart.id == spare_parts_request.sparePartId).first()
+    if not spare_part:
+        raise HTTPException(status_code=404, detail="Spare part not found")
+    
+    # Approval reserves the units so another approved request cannot claim them
+    from app.services.stock_service import reserve_stock
+    if not reserve_stock(db, spare_part, spare_parts_request.quantityRequested):
+        detail = f"Insufficient available stock. Available: {spare_part.availableStock}, Requested: {spare_parts_request.quantityRequested}"
+        # Release the row locks now rather than when the session closes
+        db.rollback()
+        raise HTTPException(status_code=400, detail=detail)
+    
     try:
         old_status = spare_parts_request.status.value
         
@@ -292,68 +577,54 @@ async def approve_request(
             newValues={
                 "status": "APPROVED",
                 "approvedBy": current_user.id,
-                "approvalNotes": approval_data.approvalNotes
+                "approvalNotes": approval_data.approvalNotes,
+                "reservedQuantity": spare_parts_request.quantityRequested
             },
             request=request
         )
         
         db.commit()
-        db.refresh(spare_parts_request)
+        response = _build_spare_parts_request_response(db, spare_parts_request)
+        publish_event(ChangeEvent.SPARE_PARTS_REQUEST_APPROVED, id=response.id, maintenanceWorkId=response.maintenanceWorkId)
         
-        # Load related entities for response
-        maintenance_work = db.query(MaintenanceWork).filter(MaintenanceWork.id == spare_parts_request.maintenanceWorkId).first()
-        spare_part = db.query(SparePart).filter(SparePart.id == spare_parts_request.sparePartId).first()
-        requested_by_user = db.query(User).filter(User.id == spare_parts_request.requestedBy).first()
-        approved_by_user = db.query(User).filter(User.id == spare_parts_request.approvedBy).first()
-        
-        return SparePartsRequestResponse(
-            id=spare_parts_request.id,
-            maintenanceWorkId=spare_parts_request.maintenanceWorkId,
-            sparePartId=spare_parts_request.sparePartId,
-            quantityRequested=spare_parts_request.quantityRequested,
-            status=spare_parts_request.status.value,
-            requestedBy=spare_parts_request.requestedBy,
-            requestedByName=requested_by_user.fullName if requested_by_user else None,
-            approvedBy=spare_parts_request.approvedBy,
-            approvedByName=approved_by_user.fullName if approved_by_user else None,
-            approvedAt=spare_parts_request.approvedAt,
-            rejectionReason=spare_parts_request.rejectionReason,
-            approvalNotes=spare_parts_request.approvalNotes,
-            isRequestedReturn=spare_parts_request.isRequestedReturn,
-            returnDate=spare_parts_request.returnDate,
-            isReturned=spare_parts_request.isReturned,
-            maintenanceWorkDescription=maintenance_work.workDescription if maintenance_work else None,
-            sparePartNumber=spare_part.partNumber if spare_part else None,
-            sparePartName=spare_part.partName if spare_part else None,
-            currentStock=spare_part.currentStock if spare_part else None,
-            createdAt=spare_parts_request.createdAt,
-            updatedAt=spare_parts_request.updatedAt
-        )
+        return response
     
+    except StaleDataError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to approve request: {str(e)}")
 
 @router.patch("/{request_id}/reject", response_model=SparePartsRequestResponse)
-async def reject_request(
+def reject_request(
     request_id: int,
     rejection_data: RejectRequest,
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_maintenance_manager)
 ):
-    """Reject a spare parts request (maintenance managers only)"""
+    """Reject a pending or approved (not yet issued) spare parts request (maintenance managers only)"""
     
-    spare_parts_request = db.query(SparePartsRequest).filter(SparePartsRequest.id == request_id).first()
+    spare_parts_request = db.query(SparePartsRequest).filter(
+        SparePartsRequest.id == request_id
+    ).with_for_update().populate_existing().first()
     if not spare_parts_request:
         raise HTTPException(status_code=404, detail="Spare parts request not found")
     
-    if spare_parts_request.status != SparePartsRequestStatus.PENDING:
+    if spare_parts_request.status not in (SparePartsRequestStatus.PENDING, SparePartsRequestStatus.APPROVED):
         raise HTTPException(status_code=400, detail=f"Cannot reject request with status {spare_parts_request.status.value}")
     
     try:
         old_status = spare_parts_request.status.value
         
+        # Withdrawing an approval gives its reserved units back
+        if spare_parts_request.status == SparePartsRequestStatus.APPROVED:
+            from app.services.stock_service import release_stock
+            spare_part = db.query(SparePart).filter(SparePart.id == spare_parts_request.sparePartId).first()
+            if spare_part:
+                release_stock(db, spare_part, spare_parts_request.quantityRequested)
+        
         # Update request
         spare_parts_request.status = SparePartsRequestStatus.REJECTED
         spare_parts_request.approvedBy = current_user.id
@@ -366,6 +637,16 @@ async def reject_request(
         if maintenance_work and maintenance_work.status == WorkStatus.IN_PROGRESS:
             maintenance_request = db.query(MaintenanceRequest).filter(MaintenanceRequest.id == maintenance_work.requestId).first()
             if maintenance_request and maintenance_request.status == RequestStatus.WAITING_PARTS:
+                from app.services.audit_service import record_status_change
+                record_status_change(
+                    db=db,
+                    entityType="MAINTENANCE_REQUEST",
+                    entityId=maintenance_request.id,
+                    requestId=maintenance_request.id,
+                    fromStatus=RequestStatus.WAITING_PARTS,
+                    toStatus=RequestStatus.IN_PROGRESS,
+                    userId=current_user.id
+                )
                 maintenance_request.status = RequestStatus.IN_PROGRESS
                 db.add(maintenance_request)
         
@@ -388,43 +669,20 @@ async def reject_request(
         )
         
         db.commit()
-        db.refresh(spare_parts_request)
+        response = _build_spare_parts_request_response(db, spare_parts_request)
+        publish_event(ChangeEvent.SPARE_PARTS_REQUEST_REJECTED, id=response.id, maintenanceWorkId=response.maintenanceWorkId)
         
-        # Load related entities for response
-        spare_part = db.query(SparePart).filter(SparePart.id == spare_parts_request.sparePartId).first()
-        requested_by_user = db.query(User).filter(User.id == spare_parts_request.requestedBy).first()
-        approved_by_user = db.query(User).filter(User.id == spare_parts_request.approvedBy).first()
-        
-        return SparePartsRequestResponse(
-            id=spare_parts_request.id,
-            maintenanceWorkId=spare_parts_request.maintenanceWorkId,
-            sparePartId=spare_parts_request.sparePartId,
-            quantityRequested=spare_parts_request.quantityRequested,
-            status=spare_parts_request.status.value,
-            requestedBy=spare_parts_request.requestedBy,
-            requestedByName=requested_by_user.fullName if requested_by_user else None,
-            approvedBy=spare_parts_request.approvedBy,
-            approvedByName=approved_by_user.fullName if approved_by_user else None,
-            approvedAt=spare_parts_request.approvedAt,
-            rejectionReason=spare_parts_request.rejectionReason,
-            approvalNotes=spare_parts_request.approvalNotes,
-            isRequestedReturn=spare_parts_request.isRequestedReturn,
-            returnDate=spare_parts_request.returnDate,
-            isReturned=spare_parts_request.isReturned,
-            maintenanceWorkDescription=maintenance_work.workDescription if maintenance_work else None,
-            sparePartNumber=spare_part.partNumber if spare_part else None,
-            sparePartName=spare_part.partName if spare_part else None,
-            currentStock=spare_part.currentStock if spare_part else None,
-            createdAt=spare_parts_request.createdAt,
-            updatedAt=spare_parts_request.updatedAt
-        )
+        return response
     
+    except StaleDataError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to reject request: {str(e)}")
 
 @router.patch("/{request_id}/issue", response_model=SparePartsRequestResponse)
-async def issue_request(
+def issue_request(
     request_id: int,
     request: Request,
     db: Session = Depends(get_db),
@@ -432,7 +690,10 @@ async def issue_request(
 ):
     """Issue approved spare parts (inventory managers only)"""
     
-    spare_parts_request = db.query(SparePartsRequest).filter(SparePartsRequest.id == request_id).first()
+    # Lock the request so two issues of it cannot both pass the status check
+    spare_parts_request = db.query(SparePartsRequest).filter(
+        SparePartsRequest.id == request_id
+    ).with_for_update().populate_existing().first()
     if not spare_parts_request:
         raise HTTPException(status_code=404, detail="Spare parts request not found")
     
@@ -444,17 +705,20 @@ async def issue_request(
     if not spare_part:
         raise HTTPException(status_code=404, detail="Spare part not found")
     
-    # Validate sufficient stock
-    if spare_part.currentStock < spare_parts_request.quantityRequested:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Insufficient stock. Available: {spare_part.currentStock}, Requested: {spare_parts_request.quantityRequested}"
-        )
+    # Take the stock and its reservation in one conditional UPDATE; no row matches when there is not enough
+    from app.services.stock_service import change_stock
+    stock_change = change_stock(
+        db, spare_part, -spare_parts_request.quantityRequested, reserved=spare_parts_request.quantityRequested
+    )
+    if stock_change is None:
+        detail = f"Insufficient stock. Available: {spare_part.currentStock}, Requested: {spare_parts_request.quantityRequested}"
+        # Release the row locks now rather than when the session closes
+        db.rollback()
+        raise HTTPException(status_code=400, detail=detail)
+    before_quantity, after_quantity = stock_change
     
     try:
         old_status = spare_parts_request.status.value
-        before_quantity = spare_part.currentStock
-        after_quantity = before_quantity - spare_parts_request.quantityRequested
         unit_price = spare_part.unitPrice or 0.0
         total_value = unit_price * spare_parts_request.quantityRequested
         
@@ -485,12 +749,18 @@ async def issue_request(
         db.add(transaction)
         db.flush()
         
-        # Update spare part quantity
-        spare_part.currentStock = after_quantity
-        db.add(spare_part)
-        
         # Update maintenance request status back to IN_PROGRESS
         if maintenance_request and maintenance_request.status == RequestStatus.WAITING_PARTS:
+            from app.services.audit_service import record_status_change
+            record_status_change(
+                db=db,
+                entityType="MAINTENANCE_REQUEST",
+                entityId=maintenance_request.id,
+                requestId=maintenance_request.id,
+                fromStatus=RequestStatus.WAITING_PARTS,
+                toStatus=RequestStatus.IN_PROGRESS,
+                userId=current_user.id
+            )
             maintenance_request.status = RequestStatus.IN_PROGRESS
             db.add(maintenance_request)
         
@@ -515,43 +785,25 @@ async def issue_request(
             request=request
         )
         
-        db.commit()
-        db.refresh(spare_parts_request)
+        from app.services.stock_snapshot_service import record_stock_snapshots
+        record_stock_snapshots(db, [spare_part.id])
         
-        # Load related entities for response
-        requested_by_user = db.query(User).filter(User.id == spare_parts_request.requestedBy).first()
-        approved_by_user = db.query(User).filter(User.id == spare_parts_request.approvedBy).first() if spare_parts_request.approvedBy else None
+        db.commit()
+        response = _build_spare_parts_request_response(db, spare_parts_request)
+        publish_event(ChangeEvent.SPARE_PARTS_REQUEST_ISSUED, id=response.id, maintenanceWorkId=response.maintenanceWorkId)
+        publish_event(ChangeEvent.STOCK_CHANGED, sparePartId=response.sparePartId)
         
-        return SparePartsRequestResponse(
-            id=spare_parts_request.id,
-            maintenanceWorkId=spare_parts_request.maintenanceWorkId,
-            sparePartId=spare_parts_request.sparePartId,
-            quantityRequested=spare_parts_request.quantityRequested,
-            status=spare_parts_request.status.value,
-            requestedBy=spare_parts_request.requestedBy,
-            requestedByName=requested_by_user.fullName if requested_by_user else None,
-            approvedBy=spare_parts_request.approvedBy,
-            approvedByName=approved_by_user.fullName if approved_by_user else None,
-            approvedAt=spare_parts_request.approvedAt,
-            rejectionReason=spare_parts_request.rejectionReason,
-            approvalNotes=spare_parts_request.approvalNotes,
-            isRequestedReturn=spare_parts_request.isRequestedReturn,
-            returnDate=spare_parts_request.returnDate,
-            isReturned=spare_parts_request.isReturned,
-            maintenanceWorkDescription=maintenance_work.workDescription if maintenance_work else None,
-            sparePartNumber=spare_part.partNumber,
-            sparePartName=spare_part.partName,
-            currentStock=spare_part.currentStock,
-            createdAt=spare_parts_request.createdAt,
-            updatedAt=spare_parts_request.updatedAt
-        )
+        return response
     
+    except StaleDataError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to issue request: {str(e)}")
 
 @router.post("/{request_id}/return-request", response_model=SparePartsRequestResponse)
-async def request_return(
+def request_return(
     request_id: int,
     request: Request,
     db: Session = Depends(get_db),
@@ -603,43 +855,20 @@ async def request_return(
         )
         
         db.commit()
-        db.refresh(spare_parts_request)
-        
-        # Load related entities for response
-        spare_part = db.query(SparePart).filter(SparePart.id == spare_parts_request.sparePartId).first()
-        requested_by_user = db.query(User).filter(User.id == spare_parts_request.requestedBy).first()
-        approved_by_user = db.query(User).filter(User.id == spare_parts_request.approvedBy).first() if spare_parts_request.approvedBy else None
+        response = _build_spare_parts_request_response(db, spare_parts_request)
+        publish_event(ChangeEvent.SPARE_PARTS_REQUEST_RETURN_REQUESTED, id=response.id, maintenanceWorkId=response.maintenanceWorkId)
         
-        return SparePartsRequestResponse(
-            id=spare_parts_request.id,
-            maintenanceWorkId=spare_parts_request.maintenanceWorkId,
-            sparePartId=spare_parts_request.sparePartId,
-            quantityRequested=spare_parts_request.quantityRequested,
-            status=spare_parts_request.status.value,
-            requestedBy=spare_parts_request.requestedBy,
-            requestedByName=requested_by_user.fullName if requested_by_user else None,
-            approvedBy=spare_parts_request.approvedBy,
-            approvedByName=approved_by_user.fullName if approved_by_user else None,
-            approvedAt=spare_parts_request.approvedAt,
-            rejectionReason=spare_parts_request.rejectionReason,
-            approvalNotes=spare_parts_request.approvalNotes,
-            isRequestedReturn=spare_parts_request.isRequestedReturn,
-            returnDate=spare_parts_request.returnDate,
-            isReturned=spare_parts_request.isReturned,
-            maintenanceWorkDescription=maintenance_work.workDescription if maintenance_work else None,
-            sparePartNumber=spare_part.partNumber if spare_part else None,
-            sparePartName=spare_part.partName if spare_part else None,
-            currentStock=spare_part.currentStock if spare_part else None,
-            createdAt=spare_parts_request.createdAt,
-            updatedAt=spare_parts_request.updatedAt
-        )
+        return response
     
+    except StaleDataError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to request return: {str(e)}")
 
 @router.patch("/{request_id}/process-return", response_model=SparePartsRequestResponse)
-async def process_return(
+def process_return(
     request_id: int,
     request: Request,
     db: Session = Depends(get_db),
@@ -647,7 +876,10 @@ async def process_return(
 ):
     """Process return of spare parts (inventory managers only)"""
     
-    spare_parts_request = db.query(SparePartsRequest).filter(SparePartsRequest.id == request_id).first()
+    # Lock the request so a return cannot be processed twice
+    spare_parts_request = db.query(SparePartsRequest).filter(
+        SparePartsRequest.id == request_id
+    ).with_for_update().populate_existing().first()
     if not spare_parts_request:
         raise HTTPException(status_code=404, detail="Spare parts request not found")
     
@@ -666,9 +898,10 @@ async def process_return(
     # Load maintenance work for reference
     maintenance_work = db.query(MaintenanceWork).filter(MaintenanceWork.id == spare_parts_request.maintenanceWorkId).first()
     
+    from app.services.stock_service import change_stock
+    before_quantity, after_quantity = change_stock(db, spare_part, spare_parts_request.quantityRequested)
+    
     try:
-        before_quantity = spare_part.currentStock
-        after_quantity = before_quantity + spare_parts_request.quantityRequested
         unit_price = spare_part.unitPrice or 0.0
         total_value = unit_price * spare_parts_request.quantityRequested
         
@@ -688,10 +921,6 @@ async def process_return(
         db.add(transaction)
         db.flush()
         
-        # Update spare part quantity
-        spare_part.currentStock = after_quantity
-        db.add(spare_part)
-        
         # Update request - set isReturned to True and returnDate
         spare_parts_request.isReturned = True
         spare_parts_request.returnDate = datetime.utcnow()
@@ -720,37 +949,19 @@ async def process_return(
             request=request
         )
         
-        db.commit()
-        db.refresh(spare_parts_request)
+        from app.services.stock_snapshot_service import record_stock_snapshots
+        record_stock_snapshots(db, [spare_part.id])
         
-        # Load related entities for response
-        requested_by_user = db.query(User).filter(User.id == spare_parts_request.requestedBy).first()
-        approved_by_user = db.query(User).filter(User.id == spare_parts_request.approvedBy).first() if spare_parts_request.approvedBy else None
+        db.commit()
+        response = _build_spare_parts_request_response(db, spare_parts_request)
+        publish_event(ChangeEvent.SPARE_PARTS_REQUEST_RETURNED, id=response.id, maintenanceWorkId=response.maintenanceWorkId)
+        publish_event(ChangeEvent.STOCK_CHANGED, sparePartId=response.sparePartId)
         
-        return SparePartsRequestResponse(
-            id=spare_parts_request.id,
-            maintenanceWorkId=spare_parts_request.maintenanceWorkId,
-            sparePartId=spare_parts_request.sparePartId,
-            quantityRequested=spare_parts_request.quantityRequested,
-            status=spare_parts_request.status.value,
-            requestedBy=spare_parts_request.requestedBy,
-            requestedByName=requested_by_user.fullName if requested_by_user else None,
-            approvedBy=spare_parts_request.approvedBy,
-            approvedByName=approved_by_user.fullName if approved_by_user else None,
-            approvedAt=spare_parts_request.approvedAt,
-            rejectionReason=spare_parts_request.rejectionReason,
-            approvalNotes=spare_parts_request.approvalNotes,
-            isRequestedReturn=spare_parts_request.isRequestedReturn,
-            returnDate=spare_parts_request.returnDate,
-            isReturned=spare_parts_request.isReturned,
-            maintenanceWorkDescription=maintenance_work.workDescription if maintenance_work else None,
-            sparePartNumber=spare_part.partNumber,
-            sparePartName=spare_part.partName,
-            currentStock=spare_part.currentStock,
-            createdAt=spare_parts_request.createdAt,
-            updatedAt=spare_parts_request.updatedAt
-        )
+        return response
     
+    except StaleDataError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to process return: {str(e)}")
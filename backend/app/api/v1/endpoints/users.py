@@ -6,6 +6,7 @@ from app.core.deps import get_current_user, require_admin
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
 from app.core.security import get_password_hash
+from app.core.principal_cache import principal_cache, bump_principals_version
 from pydantic import ValidationError
 import math
 
@@ -86,8 +87,10 @@ async def create_user(
         )
         
         db.add(new_user)
+        db.execute(bump_principals_version())
         db.commit()
         db.refresh(new_user)
+        principal_cache.invalidate(new_user.id)
         
         return UserResponse.model_validate(new_user)
         
@@ -158,8 +161,10 @@ async def update_user(
         for field, value in update_data.items():
             setattr(user, field, value)
         
+        db.execute(bump_principals_version())
         db.commit()
         db.refresh(user)
+        principal_cache.invalidate(user.id)
         
         return UserResponse.model_validate(user)
         
@@ -192,6 +197,8 @@ async def delete_user(
     
     # Soft delete by setting isActive=False
     user.isActive = False
+    db.execute(bump_principals_version())
     db.commit()
+    principal_cache.invalidate(user.id)
     
     return {"message": "User deleted successfully"}
@@ -0,0 +1,118 @@
+"""Concurrent load benchmark for the hot read endpoints.
+
+Run it against a live server before and after a change and compare the output:
+
+    python -m app.bench.concurrency --base-url http://localhost:8000 \
+        --username admin --password secret --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/maintenance-requests?page=1&page_size=20",
+    "/api/v1/spare-parts?page=1&page_size=20",
+    "/api/v1/machines?page=1&page_size=20",
+    "/api/v1/auth/me",
+]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post("/api/v1/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["tokens"]["access_token"]
+
+
+async def run(base_url: str, username: str, password: str, paths: List[str], concurrency: int, total_requests: int) -> Dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        token = await _login(client, username, password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        latencies: Dict[str, List[float]] = {path: [] for path in paths}
+        errors = 0
+        counter = iter(range(total_requests))
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                path = paths[i % len(paths)]
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, headers=headers)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies[path].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "baseUrl": base_url,
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "elapsedSeconds": round(elapsed, 3),
+        "requestsPerSecond": round(total_requests / elapsed, 1) if elapsed else 0.0,
+        "latencyMs": {
+            "mean": round(statistics.fmean(all_samples), 2) if all_samples else 0.0,
+            "p50": round(_percentile(all_samples, 50), 2),
+            "p95": round(_percentile(all_samples, 95), 2),
+            "p99": round(_percentile(all_samples, 99), 2),
+        },
+        "endpoints": {
+            path: {
+                "count": len(samples),
+                "p50": round(_percentile(samples, 50), 2),
+                "p95": round(_percentile(samples, 95), 2),
+            }
+            for path, samples in latencies.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput and latency of the API under concurrent load")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", action="append", dest="paths", help="Endpoint path to hit (repeatable)")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(
+        args.base_url,
+        args.username,
+        args.password,
+        args.paths or DEFAULT_PATHS,
+        args.concurrency,
+        args.requests,
+    ))
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
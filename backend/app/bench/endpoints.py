@@ -0,0 +1,215 @@
+"""Latency benchmark for every list, detail, report and export endpoint.
+
+Seed a database with app.bench.seed, start the API against it and run:
+
+    python -m app.bench.endpoints --base-url http://localhost:8000 \
+        --username bench_admin --password bench --output results/before.json
+
+Each endpoint is called sequentially --rounds times after --warmup calls.
+The JSON output holds the git revision, per-endpoint timings and the
+X-DB-Queries count. Pass --compare with an earlier result file to print the
+change in median latency per endpoint.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+# Detail paths take {id} placeholders filled from the first row of the list
+# endpoint they are paired with.
+LIST_ENDPOINTS = {
+    "maintenance_requests.list": "/api/v1/maintenance-requests?page=1&page_size=20",
+    "maintenance_requests.list.filtered": "/api/v1/maintenance-requests?page=1&page_size=20&status=PENDING",
+    "maintenance_requests.search": "/api/v1/maintenance-requests?page=1&page_size=20&search=bearing",
+    "maintenance_requests.available": "/api/v1/maintenance-requests/available?page=1&page_size=20",
+    "machines.list": "/api/v1/machines?page=1&page_size=20",
+    "machines.status_summary": "/api/v1/machines/status-summary",
+    "dashboard.summary": "/api/v1/dashboard/summary",
+    "spare_parts.list": "/api/v1/spare-parts?page=1&page_size=20",
+    "spare_parts.low_stock": "/api/v1/spare-parts/low-stock?page=1&page_size=20",
+    "spare_parts_requests.list": "/api/v1/spare-parts-requests?page=1&page_size=20",
+    "inventory_transactions.list": "/api/v1/inventory-transactions?page=1&page_size=20",
+    "activity_logs.list": "/api/v1/activity-logs?page=1&page_size=25",
+    "departments.list": "/api/v1/departments",
+    "users.list": "/api/v1/users",
+}
+
+DETAIL_ENDPOINTS = {
+    "maintenance_requests.detail": ("maintenance_requests.list", "/api/v1/maintenance-requests/{id}"),
+    "maintenance_work.by_request": ("maintenance_requests.list", "/api/v1/maintenance-work/by-request/{id}"),
+    "machines.detail": ("machines.list", "/api/v1/machines/{id}"),
+    "machines.full_detail": ("machines.list", "/api/v1/machines/{id}/detail"),
+    "spare_parts.detail": ("spare_parts.list", "/api/v1/spare-parts/{id}"),
+    "spare_parts_requests.detail": ("spare_parts_requests.list", "/api/v1/spare-parts-requests/{id}"),
+    "inventory_transactions.detail": ("inventory_transactions.list", "/api/v1/inventory-transactions/{id}"),
+}
+
+
+def report_endpoints(days: int) -> Dict[str, str]:
+    end = datetime.utcnow().replace(microsecond=0)
+    start = end - timedelta(days=days)
+    dates = f"startDate={start.isoformat()}&endDate={end.isoformat()}"
+    inventory_dates = f"dateFrom={start.isoformat()}&dateTo={end.isoformat()}"
+    return {
+        "reports.downtime": f"/api/v1/reports/downtime?{dates}",
+        "reports.maintenance_costs": f"/api/v1/reports/maintenance-costs?{dates}",
+        "reports.failure_analysis": f"/api/v1/reports/failure-analysis?{dates}",
+        "reports.inventory.stock_levels": "/api/v1/reports/inventory/stock-levels",
+        "reports.inventory.consumption": f"/api/v1/reports/inventory/consumption?{inventory_dates}",
+        "reports.inventory.valuation": "/api/v1/reports/inventory/valuation",
+        "reports.inventory.reorder": "/api/v1/reports/inventory/reorder",
+        "export.downtime_csv": f"/api/v1/reports/downtime?{dates}&export=csv",
+        "export.maintenance_costs_csv": f"/api/v1/reports/maintenance-costs?{dates}&export=csv",
+        "export.consumption_csv": f"/api/v1/reports/inventory/consumption?{inventory_dates}&export=csv",
+        "export.activity_logs_csv": "/api/v1/activity-logs/export",
+    }
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _first_id(client: httpx.Client, path: str) -> Optional[int]:
+    response = client.get(path)
+    if response.status_code != 200:
+        return None
+    body = response.json()
+    items = next((value for value in body.values() if isinstance(value, list)), [])
+    return items[0]["id"] if items else None
+
+
+def measure(client: httpx.Client, path: str, rounds: int, warmup: int) -> Dict:
+    for _ in range(warmup):
+        try:
+            client.get(path)
+        except httpx.HTTPError:
+            pass
+
+    samples: List[float] = []
+    queries: List[int] = []
+    statuses = set()
+    size = 0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        try:
+            response = client.get(path)
+        except httpx.HTTPError as exc:
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses.add(type(exc).__name__)
+            continue
+        samples.append((time.perf_counter() - started) * 1000)
+        statuses.add(response.status_code)
+        size = len(response.content)
+        if "X-DB-Queries" in response.headers:
+            queries.append(int(response.headers["X-DB-Queries"]))
+
+    return {
+        "path": path,
+        "status": sorted(statuses, key=str),
+        "rounds": rounds,
+        "bytes": size,
+        "dbQueries": max(queries) if queries else None,
+        "latencyMs": {
+            "min": round(min(samples), 2),
+            "mean": round(statistics.fmean(samples), 2),
+            "median": round(statistics.median(samples), 2),
+            "p95": round(_percentile(samples, 95), 2),
+            "max": round(max(samples), 2),
+            "stdev": round(statistics.stdev(samples), 2) if len(samples) > 1 else 0.0,
+        },
+    }
+
+
+def run(base_url: str, username: str, password: str, rounds: int, warmup: int, report_days: int, only: Optional[str]) -> Dict:
+    results: Dict[str, Dict] = {}
+    with httpx.Client(base_url=base_url, timeout=300.0) as client:
+        response = client.post("/api/v1/auth/login", json={"username": username, "password": password})
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['tokens']['access_token']}"
+
+        endpoints = dict(LIST_ENDPOINTS)
+        for name, (list_name, template) in DETAIL_ENDPOINTS.items():
+            row_id = _first_id(client, LIST_ENDPOINTS[list_name])
+            if row_id is None:
+                print(f"skip       {name}: no rows to look up", file=sys.stderr)
+                continue
+            endpoints[name] = template.format(id=row_id)
+        endpoints.update(report_endpoints(report_days))
+
+        for name, path in endpoints.items():
+            if only and only not in name:
+                continue
+            results[name] = measure(client, path, rounds, warmup)
+            latency = results[name]["latencyMs"]
+            print(f"{name:40} median {latency['median']:>9.2f} ms  p95 {latency['p95']:>9.2f} ms  queries {results[name]['dbQueries']}", file=sys.stderr)
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "revision": _git_revision(),
+        "baseUrl": base_url,
+        "rounds": rounds,
+        "warmup": warmup,
+        "endpoints": results,
+    }
+
+
+def compare(previous: Dict, current: Dict) -> List[str]:
+    lines = [f"{'endpoint':40} {'before':>10} {'after':>10} {'change':>8}"]
+    for name, result in current["endpoints"].items():
+        before = previous["endpoints"].get(name)
+        after_ms = result["latencyMs"]["median"]
+        if before is None:
+            lines.append(f"{name:40} {'-':>10} {after_ms:>10.2f} {'new':>8}")
+            continue
+        before_ms = before["latencyMs"]["median"]
+        change = (after_ms - before_ms) / before_ms * 100 if before_ms else 0.0
+        lines.append(f"{name:40} {before_ms:>10.2f} {after_ms:>10.2f} {change:>+7.1f}%")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list, detail, report and export endpoints")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="bench_admin")
+    parser.add_argument("--password", default="bench")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--report-days", type=int, default=90, help="Date range used for report and export calls")
+    parser.add_argument("--only", help="Only run endpoints whose name contains this text")
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    parser.add_argument("--compare", help="Earlier JSON result to compare median latencies against")
+    args = parser.parse_args()
+
+    result = run(args.base_url, args.username, args.password, args.rounds, args.warmup, args.report_days, args.only)
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print("\n".join(compare(previous, result)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
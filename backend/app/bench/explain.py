@@ -0,0 +1,146 @@
+"""EXPLAIN the list and report queries and fail on full table scans.
+
+Point DATABASE_URL at a seeded database (MySQL or SQLite) and run:
+
+    python -m app.bench.explain
+
+Each case mirrors the filter and sort of an endpoint query. The script exits
+with status 1 when any plan reads a whole table instead of using an index.
+"""
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+
+from sqlalchemy import event, select, func
+from sqlalchemy.engine import Connection
+
+from app.core.database import engine
+from app.models.activity_log import ActivityLog
+from app.models.attachment import Attachment
+from app.models.inventory_transaction import InventoryTransaction, TransactionType
+from app.models.machine_downtime import MachineDowntime
+from app.models.maintenance_request import MaintenanceRequest, RequestPriority, RequestStatus
+from app.models.spare_parts_request import SparePartsRequest, SparePartsRequestStatus
+
+
+def build_cases() -> Dict[str, object]:
+    since = datetime.utcnow() - timedelta(days=30)
+    until = datetime.utcnow()
+    return {
+        "maintenance_requests by status": (
+            select(MaintenanceRequest)
+            .filter(MaintenanceRequest.status == RequestStatus.PENDING)
+            .order_by(MaintenanceRequest.requestedDate.desc())
+            .limit(20)
+        ),
+        "available requests queue": (
+            select(MaintenanceRequest)
+            .filter(
+                MaintenanceRequest.status == RequestStatus.PENDING,
+                MaintenanceRequest.hasWork == False,
+                MaintenanceRequest.priority == RequestPriority.HIGH,
+            )
+            .order_by(MaintenanceRequest.requestedDate.desc())
+            .limit(25)
+        ),
+        "attachments for entity": (
+            select(Attachment)
+            .filter(Attachment.entityType == "MAINTENANCE_REQUEST", Attachment.entityId == 1)
+        ),
+        "inventory_transactions for part": (
+            select(InventoryTransaction)
+            .filter(InventoryTransaction.sparePartId == 1)
+            .order_by(InventoryTransaction.transactionDate.desc())
+            .limit(20)
+        ),
+        "consumption report": (
+            select(InventoryTransaction.sparePartId, func.sum(InventoryTransaction.quantity))
+            .filter(
+                InventoryTransaction.transactionType == TransactionType.OUT,
+                InventoryTransaction.referenceType == "MAINTENANCE_WORK",
+                InventoryTransaction.transactionDate >= since,
+                InventoryTransaction.transactionDate <= until,
+            )
+            .group_by(InventoryTransaction.sparePartId)
+        ),
+        "activity_logs newest first": (
+            select(ActivityLog)
+            .order_by(ActivityLog.timestamp.desc())
+            .limit(25)
+        ),
+        "activity_logs for entity": (
+            select(ActivityLog)
+            .filter(ActivityLog.entityType == "MAINTENANCE_REQUEST", ActivityLog.entityId == 1)
+        ),
+        "spare_parts_requests by status": (
+            select(SparePartsRequest)
+            .filter(SparePartsRequest.status == SparePartsRequestStatus.PENDING)
+            .order_by(SparePartsRequest.createdAt.desc())
+            .limit(20)
+        ),
+        "downtime for machine": (
+            select(MachineDowntime)
+            .filter(
+                MachineDowntime.machineId == 1,
+                MachineDowntime.startTime >= since,
+                MachineDowntime.startTime <= until,
+            )
+        ),
+    }
+
+
+def explain(conn: Connection, statement) -> List[dict]:
+    """Run the statement and capture the plan the database chose for it."""
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    captured: List[dict] = []
+
+    def capture_plan(connection, cursor, sql, parameters, context, executemany):
+        explain_cursor = connection.connection.cursor()
+        try:
+            explain_cursor.execute(prefix + sql, parameters)
+            columns = [column[0] for column in explain_cursor.description]
+            captured.extend(dict(zip(columns, row)) for row in explain_cursor.fetchall())
+        finally:
+            explain_cursor.close()
+
+    event.listen(conn, "before_cursor_execute", capture_plan)
+    try:
+        conn.execute(statement).fetchall()
+    finally:
+        event.remove(conn, "before_cursor_execute", capture_plan)
+    return captured
+
+
+def full_scans(dialect: str, plan: List[dict]) -> Set[str]:
+    """Return the tables read in full according to the plan."""
+    scanned = set()
+    for row in plan:
+        if dialect == "sqlite":
+            detail = row.get("detail", "")
+            if detail.startswith("SCAN ") and "USING" not in detail:
+                scanned.add(detail.split()[1])
+        elif row.get("type") == "ALL":
+            scanned.add(row.get("table"))
+    return scanned
+
+
+def main() -> int:
+    failures = 0
+    with engine.connect() as conn:
+        for name, statement in build_cases().items():
+            plan = explain(conn, statement)
+            scanned = full_scans(conn.dialect.name, plan)
+            if scanned:
+                failures += 1
+                print(f"FULL SCAN  {name}: {', '.join(sorted(scanned))}")
+                for row in plan:
+                    print(f"           {row}")
+            else:
+                print(f"OK         {name}")
+
+    print(f"{failures} quer{'y' if failures == 1 else 'ies'} with full table scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Check that list endpoints run a constant number of queries per page.
+
+Start the API against a seeded database and run:
+
+    python -m app.bench.query_counts --base-url http://localhost:8000 \
+        --username bench_admin --password bench
+
+Every endpoint is fetched with a small and a large page size and the
+X-DB-Queries header of both is compared. A page that costs more queries when
+it holds more rows has an N+1 loop; the script exits with status 1 if it
+finds one.
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional
+
+import httpx
+
+# {size} is replaced with the page size under test
+DEFAULT_PATHS = [
+    "/api/v1/maintenance-requests?limit={size}",
+    "/api/v1/maintenance-requests?limit={size}&cursor=",
+    "/api/v1/maintenance-requests/available?limit={size}",
+    "/api/v1/maintenance-requests/my-work?limit={size}",
+]
+
+
+def query_count(client: httpx.Client, path: str, attempts: int) -> Optional[int]:
+    """Fewest X-DB-Queries seen over a few calls.
+
+    Taking the minimum ignores statements that only run now and then, such
+    as the periodic principal cache version check.
+    """
+    counts: List[int] = []
+    for _ in range(attempts):
+        response = client.get(path)
+        response.raise_for_status()
+        if "X-DB-Queries" not in response.headers:
+            return None
+        counts.append(int(response.headers["X-DB-Queries"]))
+    return min(counts)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail when list endpoints run more queries for larger pages")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="bench_admin")
+    parser.add_argument("--password", default="bench")
+    parser.add_argument("--small", type=int, default=5, help="Small page size")
+    parser.add_argument("--large", type=int, default=100, help="Large page size")
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--path", action="append", dest="paths", help="Path template with {size} (repeatable)")
+    args = parser.parse_args()
+
+    failures = 0
+    with httpx.Client(base_url=args.base_url, timeout=120.0) as client:
+        response = client.post("/api/v1/auth/login", json={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['tokens']['access_token']}"
+
+        for template in args.paths or DEFAULT_PATHS:
+            counts: Dict[int, Optional[int]] = {
+                size: query_count(client, template.format(size=size), args.attempts)
+                for size in (args.small, args.large)
+            }
+            if None in counts.values():
+                print(f"SKIP       {template}: no X-DB-Queries header")
+                continue
+            if counts[args.large] > counts[args.small]:
+                failures += 1
+                print(f"GROWS      {template}: {counts[args.small]} -> {counts[args.large]} queries")
+            else:
+                print(f"CONSTANT   {template}: {counts[args.large]} queries")
+
+    print(f"{failures} endpoint{'' if failures == 1 else 's'} with per-row queries")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+"""Fill a database with a synthetic factory dataset for benchmarking.
+
+    python -m app.bench.seed --create-tables            # full volumes
+    python -m app.bench.seed --create-tables --scale 0.01
+
+Uses DATABASE_URL (MySQL or SQLite). Rows are inserted through the ORM
+models with explicit ids so related rows can point at each other without a
+round trip, in batches of --batch-size. Run it against an empty database:
+ids start after the current maximum of each table, but unique values such as
+usernames and part numbers are not checked.
+
+Every generated user has the password "bench"; bench_admin is an ADMIN.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator
+
+from sqlalchemy import case, func, insert, literal, null, select, update
+from sqlalchemy.orm import Session
+
+from app.core.database import Base, SessionLocal, engine
+from app.models import (
+    ActivityLog,
+    CacheVersion,
+    Department,
+    FailureCode,
+    InventoryTransaction,
+    Machine,
+    MachineDowntime,
+    MachineSparePart,
+    MaintenanceRequest,
+    MaintenanceType,
+    MaintenanceWork,
+    MaintenanceWorkStep,
+    RequestStatusEvent,
+    SparePart,
+    SparePartCategory,
+    SparePartsRequest,
+    User,
+)
+from app.models.inventory_transaction import TransactionType
+from app.models.machine import MachineStatus
+from app.models.maintenance_request import RequestPriority, RequestStatus
+from app.models.maintenance_work import WorkStatus
+from app.models.spare_parts_request import SparePartsRequestStatus
+from app.models.user import UserRole
+
+# Row counts at --scale 1.0
+VOLUMES = {
+    "departments": 25,
+    "technicians": 120,
+    "categories": 60,
+    "spare_parts": 20_000,
+    "machines": 2_000,
+    "machine_spare_parts": 10_000,
+    "maintenance_requests": 500_000,
+    "machine_downtimes": 150_000,
+    "spare_parts_requests": 100_000,
+    "inventory_transactions": 2_000_000,
+    "activity_logs": 5_000_000,
+}
+
+PASSWORD = "bench"
+HISTORY_DAYS = 3 * 365
+
+ACTIONS = ["CREATE", "UPDATE", "DELETE", "READ", "APPROVE", "REJECT", "ISSUE", "COMPLETE"]
+ENTITY_TYPES = ["MAINTENANCE_REQUEST", "MAINTENANCE_WORK", "MACHINE", "SPARE_PART", "SPARE_PARTS_REQUEST", "INVENTORY_TRANSACTION"]
+REFERENCE_TYPES = ["MAINTENANCE", "MAINTENANCE_WORK", "PURCHASE_ORDER", "RETURN", "ADJUSTMENT"]
+REQUEST_TITLES = ["Oil leak", "Bearing noise", "Overheating", "Belt slipping", "Sensor fault", "Hydraulic pressure drop", "Vibration", "Electrical trip"]
+
+
+class Seeder:
+    def __init__(self, db: Session, scale: float, batch_size: int, rng: random.Random):
+        self.db = db
+        self.batch_size = batch_size
+        self.rng = rng
+        self.volumes = {name: max(1, int(count * scale)) for name, count in VOLUMES.items()}
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.start = self.now - timedelta(days=HISTORY_DAYS)
+        self.ids: Dict[str, range] = {}
+        self.timings: Dict[str, float] = {}
+
+    def random_time(self) -> datetime:
+        return self.start + timedelta(seconds=self.rng.randrange(HISTORY_DAYS * 86400))
+
+    def insert(self, name: str, model, count: int, make_row: Callable[[int, int], dict]):
+        """Insert count rows of model; make_row(row_id, index) builds each row."""
+        first_id = (self.db.scalar(select(func.max(model.id))) or 0) + 1
+        self.ids[name] = range(first_id, first_id + count)
+        started = time.perf_counter()
+
+        def rows() -> Iterator[dict]:
+            for index, row_id in enumerate(self.ids[name]):
+                yield make_row(row_id, index)
+
+        batch = []
+        for row in rows():
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.db.execute(insert(model), batch)
+                self.db.commit()
+                batch = []
+        if batch:
+            self.db.execute(insert(model), batch)
+            self.db.commit()
+
+        self.timings[name] = round(time.perf_counter() - started, 2)
+        print(f"{name}: {count} rows in {self.timings[name]}s")
+
+    def pick(self, name: str) -> int:
+        ids = self.ids[name]
+        return ids[self.rng.randrange(len(ids))]
+
+    def stamped(self, row: dict, created: datetime) -> dict:
+        row["createdAt"] = created
+        row["updatedAt"] = created
+        return row
+
+    def insert_work_steps(self):
+        """One "Inspect" step per seeded work, completed when the work is."""
+        started = time.perf_counter()
+        work_ids = self.ids["maintenance_works"]
+        completed = MaintenanceWork.status == WorkStatus.COMPLETED
+        self.db.execute(insert(MaintenanceWorkStep).from_select(
+            ["maintenanceWorkId", "stepIndex", "step", "description", "completed", "completedAt"],
+            select(MaintenanceWork.id, literal(0), literal(1), literal("Inspect"), completed,
+                   case((completed, MaintenanceWork.endTime), else_=null()))
+            .filter(MaintenanceWork.id.between(work_ids.start, work_ids.stop - 1))
+        ))
+        self.db.commit()
+        self.timings["maintenance_work_steps"] = round(time.perf_counter() - started, 2)
+        print(f"maintenance_work_steps: derived in {self.timings['maintenance_work_steps']}s")
+
+    def reserve_approved_stock(self):
+        """reservedStock per part from the seeded APPROVED requests, as approving them would have."""
+        started = time.perf_counter()
+        reserved = (
+            select(func.coalesce(func.sum(SparePartsRequest.quantityRequested), 0))
+            .filter(
+                SparePartsRequest.sparePartId == SparePart.id,
+                SparePartsRequest.status == SparePartsRequestStatus.APPROVED
+            )
+            .scalar_subquery()
+        )
+        self.db.execute(update(SparePart).values(reservedStock=reserved))
+        self.db.commit()
+        self.timings["reserved_stock"] = round(time.perf_counter() - started, 2)
+        print(f"reserved_stock: derived in {self.timings['reserved_stock']}s")
+
+    def insert_status_events(self):
+        """Lifecycle rows (raised, accepted, completed) derived from the seeded requests and works."""
+        started = time.perf_counter()
+        columns = ["entityType", "entityId", "requestId", "fromStatus", "toStatus", "changedAt", "changedById"]
+        request_ids = self.ids["maintenance_requests"]
+        new_requests = MaintenanceRequest.id.between(request_ids.start, request_ids.stop - 1)
+        new_works = MaintenanceWork.requestId.between(request_ids.start, request_ids.stop - 1)
+        completed = MaintenanceWork.status == WorkStatus.COMPLETED
+        selects = [
+            select(literal("MAINTENANCE_REQUEST"), MaintenanceRequest.id, MaintenanceRequest.id, null(),
+                   literal("PENDING"), MaintenanceRequest.requestedDate, MaintenanceRequest.requestedById).filter(new_requests),
+            select(literal("MAINTENANCE_REQUEST"), MaintenanceWork.requestId, MaintenanceWork.requestId, literal("PENDING"),
+                   literal("IN_PROGRESS"), MaintenanceWork.startTime, MaintenanceWork.assignedToId).filter(new_works),
+            select(literal("MAINTENANCE_WORK"), MaintenanceWork.id, MaintenanceWork.requestId, null(),
+                   literal("IN_PROGRESS"), MaintenanceWork.startTime, MaintenanceWork.assignedToId).filter(new_works),
+            select(literal("MAINTENANCE_WORK"), MaintenanceWork.id, MaintenanceWork.requestId, literal("IN_PROGRESS"),
+                   literal("COMPLETED"), MaintenanceWork.endTime, MaintenanceWork.assignedToId).filter(new_works, completed),
+            select(literal("MAINTENANCE_REQUEST"), MaintenanceWork.requestId, MaintenanceWork.requestId, literal("IN_PROGRESS"),
+                   literal("COMPLETED"), MaintenanceWork.endTime, MaintenanceWork.assignedToId).filter(new_works, completed),
+        ]
+        for query in selects:
+            self.db.execute(insert(RequestStatusEvent).from_select(columns, query))
+        self.db.commit()
+        self.timings["request_status_events"] = round(time.perf_counter() - started, 2)
+        print(f"request_status_events: derived in {self.timings['request_status_events']}s")
+
+    def run(self):
+        v = self.volumes
+        rng = self.rng
+
+        self.insert("users", User, 4 + v["technicians"], lambda row_id, i: self.stamped({
+            "id": row_id,
+            "username": ["bench_admin", "bench_manager", "bench_inventory", "bench_supervisor"][i] if i < 4 else f"bench_tech_{i - 3}",
+            "fullName": ["Bench Admin", "Bench Manager", "Bench Inventory", "Bench Supervisor"][i] if i < 4 else f"Technician {i - 3}",
+            "password": PASSWORD,
+            "role": [UserRole.ADMIN, UserRole.MAINTENANCE_MANAGER, UserRole.INVENTORY_MANAGER, UserRole.SUPERVISOR][i] if i < 4 else UserRole.MAINTENANCE_TECH,
+            "isActive": True,
+        }, self.start))
+        technicians = self.ids["users"][4:]
+
+        if self.db.scalar(select(func.count(CacheVersion.id)).filter(CacheVersion.name == "principals")) == 0:
+            self.db.add(CacheVersion(name="principals", version=0))
+            self.db.commit()
+
+        self.insert("departments", Department, v["departments"], lambda row_id, i: self.stamped({
+            "id": row_id, "name": f"Bench Department {i + 1}", "description": f"Production hall {i + 1}",
+        }, self.start))
+        self.insert("failure_codes", FailureCode, 40, lambda row_id, i: self.stamped({
+            "id": row_id, "code": f"BF{i + 1:03d}", "description": f"Failure mode {i + 1}", "category": rng.choice(["MECHANICAL", "ELECTRICAL", "HYDRAULIC"]), "isActive": True,
+        }, self.start))
+        self.insert("maintenance_types", MaintenanceType, 8, lambda row_id, i: self.stamped({
+            "id": row_id, "name": f"Bench type {i + 1}", "description": None, "category": rng.choice(["CORRECTIVE", "PREVENTIVE"]), "isActive": True,
+        }, self.start))
+        self.insert("categories", SparePartCategory, v["categories"], lambda row_id, i: self.stamped({
+            "id": row_id, "name": f"Category {i + 1}", "code": f"BC{i + 1:04d}", "description": None, "isActive": True,
+        }, self.start))
+
+        def spare_part(row_id, i):
+            minimum = rng.randint(2, 40)
+            return self.stamped({
+                "id": row_id,
+                "partNumber": f"BP-{i + 1:07d}",
+                "partName": f"Part {i + 1} {rng.choice(['bearing', 'belt', 'seal', 'sensor', 'valve', 'motor', 'filter'])}",
+                "description": "Synthetic benchmark part",
+                "categoryId": self.pick("categories"),
+                "currentStock": rng.randint(0, minimum * 4),
+                "minimumStock": minimum,
+                "maximumStock": minimum * 5,
+                "unitPrice": round(rng.uniform(1, 2500), 2),
+                "supplier": f"Supplier {rng.randint(1, 200)}",
+                "location": f"Rack {rng.randint(1, 80)}",
+                "isActive": rng.random() > 0.02,
+            }, self.random_time())
+        self.insert("spare_parts", SparePart, v["spare_parts"], spare_part)
+
+        self.insert("machines", Machine, v["machines"], lambda row_id, i: self.stamped({
+            "id": row_id,
+            "qrCode": f"BENCH-{i + 1:06d}",
+            "name": f"Machine {i + 1}",
+            "model": f"M-{rng.randint(100, 999)}",
+            "serialNumber": f"SN-BENCH-{i + 1:06d}",
+            "departmentId": self.pick("departments"),
+            "location": f"Line {rng.randint(1, 60)}",
+            "installationDate": (self.start - timedelta(days=rng.randint(0, 3650))).date(),
+            "status": rng.choices(list(MachineStatus), weights=[85, 6, 7, 2])[0],
+        }, self.start))
+        self.insert("machine_spare_parts", MachineSparePart, v["machine_spare_parts"], lambda row_id, i: self.stamped({
+            "id": row_id, "machineId": self.pick("machines"), "sparePartId": self.pick("spare_parts"), "quantityRequired": rng.randint(1, 6), "notes": None,
+        }, self.start))
+
+        statuses = list(RequestStatus)
+        request_meta = {}
+
+        def maintenance_request(row_id, i):
+            requested = self.random_time()
+            status = rng.choices(statuses, weights=[10, 8, 4, 70, 8])[0]
+            machine_id = self.pick("machines")
+            assignee = technicians[rng.randrange(len(technicians))] if status != RequestStatus.PENDING else None
+            request_meta[row_id] = (status, machine_id, requested, assignee)
+            return self.stamped({
+                "id": row_id,
+                "title": rng.choice(REQUEST_TITLES),
+                "description": f"Synthetic request {i + 1}",
+                "priority": rng.choice(list(RequestPriority)),
+                "status": status,
+                "requestedDate": requested,
+                "actualCompletionDate": requested + timedelta(hours=rng.randint(1, 240)) if status == RequestStatus.COMPLETED else None,
+                "machineId": machine_id,
+                "requestedById": self.pick("users"),
+                "failureCodeId": self.pick("failure_codes") if rng.random() < 0.6 else None,
+                "hasWork": assignee is not None,
+                "assignedToId": assignee,
+            }, requested)
+        self.insert("maintenance_requests", MaintenanceRequest, v["maintenance_requests"], maintenance_request)
+
+        # One work order per request that left PENDING
+        worked = [row_id for row_id, meta in request_meta.items() if meta[0] != RequestStatus.PENDING]
+        work_status = {
+            RequestStatus.IN_PROGRESS: WorkStatus.IN_PROGRESS,
+            RequestStatus.WAITING_PARTS: WorkStatus.ON_HOLD,
+            RequestStatus.COMPLETED: WorkStatus.COMPLETED,
+            RequestStatus.CANCELLED: WorkStatus.CANCELLED,
+        }
+
+        def maintenance_work(row_id, i):
+            request_id = worked[i]
+            status, machine_id, requested, assignee = request_meta[request_id]
+            started = requested + timedelta(hours=rng.randint(1, 48))
+            hours = round(rng.uniform(0.5, 30), 1)
+            labor = round(hours * 35, 2)
+            material = round(rng.uniform(0, 1500), 2)
+            return self.stamped({
+                "id": row_id,
+                "workDescription": "Synthetic work order",
+                "status": work_status[status],
+                "startTime": started,
+                "endTime": started + timedelta(hours=hours) if status == RequestStatus.COMPLETED else None,
+                "estimatedHours": hours,
+                "actualHours": hours if status == RequestStatus.COMPLETED else None,
+                "laborCost": labor,
+                "materialCost": material,
+                "totalCost": labor + material,
+                "requestId": request_id,
+                "machineId": machine_id,
+                "assignedToId": assignee,
+            }, started)
+        self.insert("maintenance_works", MaintenanceWork, len(worked), maintenance_work)
+        request_meta.clear()
+        self.insert_work_steps()
+        self.insert_status_events()
+
+        def downtime(row_id, i):
+            started = self.random_time()
+            hours = round(rng.uniform(0.1, 72), 2)
+            return self.stamped({
+                "id": row_id,
+                "reason": rng.choice(REQUEST_TITLES),
+                "startTime": started,
+                "endTime": started + timedelta(hours=hours),
+                "duration": hours,
+                "productionLoss": round(hours * rng.uniform(5, 50), 1),
+                "costImpact": round(hours * rng.uniform(50, 500), 2),
+                "machineId": self.pick("machines"),
+                "maintenanceWorkId": self.pick("maintenance_works") if rng.random() < 0.7 else None,
+            }, started)
+        self.insert("machine_downtimes", MachineDowntime, v["machine_downtimes"], downtime)
+
+        def spare_parts_request(row_id, i):
+            created = self.random_time()
+            status = rng.choices(list(SparePartsRequestStatus), weights=[15, 10, 10, 65])[0]
+            return self.stamped({
+                "id": row_id,
+                "maintenanceWorkId": self.pick("maintenance_works"),
+                "sparePartId": self.pick("spare_parts"),
+                "quantityRequested": rng.randint(1, 10),
+                "status": status,
+                "requestedBy": technicians[rng.randrange(len(technicians))],
+                "approvedBy": self.ids["users"][2] if status != SparePartsRequestStatus.PENDING else None,
+                "approvedAt": created + timedelta(hours=rng.randint(1, 24)) if status != SparePartsRequestStatus.PENDING else None,
+                "isRequestedReturn": False,
+                "isReturned": False,
+            }, created)
+        self.insert("spare_parts_requests", SparePartsRequest, v["spare_parts_requests"], spare_parts_request)
+        self.reserve_approved_stock()
+
+        def inventory_transaction(row_id, i):
+            transaction_type = rng.choices(list(TransactionType), weights=[35, 55, 8, 2])[0]
+            quantity = rng.randint(1, 25)
+            price = round(rng.uniform(1, 2500), 2)
+            happened = self.random_time()
+            reference_type = rng.choice(REFERENCE_TYPES)
+            # Same reference formats the API writes; reports parse them back
+            if reference_type == "MAINTENANCE_WORK":
+                reference_number = str(self.pick("maintenance_works"))
+            elif reference_type == "MAINTENANCE":
+                reference_number = f"SPR-{self.pick('spare_parts_requests')}"
+            else:
+                reference_number = f"REF-{rng.randint(1, 999999):06d}"
+            return self.stamped({
+                "id": row_id,
+                "transactionType": transaction_type,
+                "quantity": quantity,
+                "unitPrice": price,
+                "totalValue": round(quantity * price, 2),
+                "referenceType": reference_type,
+                "referenceNumber": reference_number,
+                "notes": None,
+                "transactionDate": happened,
+                "sparePartId": self.pick("spare_parts"),
+                "performedById": self.pick("users"),
+            }, happened)
+        self.insert("inventory_transactions", InventoryTransaction, v["inventory_transactions"], inventory_transaction)
+
+        def activity_log(row_id, i):
+            happened = self.random_time()
+            action = rng.choice(ACTIONS)
+            entity_type = rng.choice(ENTITY_TYPES)
+            return self.stamped({
+                "id": row_id,
+                "action": action,
+                "entityType": entity_type,
+                "entityId": rng.randint(1, 500_000),
+                "description": f"{action.title()} {entity_type.lower().replace('_', ' ')}",
+                "newValues": json.dumps({"status": "COMPLETED"}) if action == "UPDATE" else None,
+                "ipAddress": f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                "userAgent": "bench-seed",
+                "timestamp": happened,
+                "userId": self.pick("users"),
+            }, happened)
+        self.insert("activity_logs", ActivityLog, v["activity_logs"], activity_log)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic factory dataset for benchmarks")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every default volume (e.g. 0.01 for a quick run)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed so datasets are reproducible")
+    parser.add_argument("--create-tables", action="store_true", help="Create missing tables from the models first (use on scratch databases)")
+    args = parser.parse_args()
+
+    if args.create_tables:
+        Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        seeder = Seeder(db, args.scale, args.batch_size, random.Random(args.seed))
+        started = time.perf_counter()
+        seeder.run()
+        print(json.dumps({
+            "scale": args.scale,
+            "seconds": round(time.perf_counter() - started, 1),
+            "volumes": {name: len(ids) for name, ids in seeder.ids.items()},
+        }, indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Parallel stock movement test for one spare part.
+
+Sets the part's stock to --initial-stock with an ADJUSTMENT, then fires
+--requests OUT and IN transactions of one unit each (three OUT to every IN)
+with --concurrency in flight, so the OUTs run the part dry while other
+requests are still adding stock. Afterwards it checks the database: the final
+stock must equal the adjusted stock plus the INs and minus the OUTs recorded in
+the ledger for this run, every 200 response must have its ledger row and the
+stock must never go below zero.
+
+    python -m app.bench.stock_race --base-url http://localhost:8000 \
+        --username inventory --password secret --requests 400 --concurrency 50
+
+Run the server with several workers (uvicorn --workers 4) so requests really
+overlap. Exits non-zero when any check fails.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.models import InventoryTransaction, SparePart
+from app.models.inventory_transaction import TransactionType
+
+
+async def _login(client: httpx.AsyncClient, username: str, password: str) -> Dict[str, str]:
+    response = await client.post("/api/v1/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['tokens']['access_token']}"}
+
+
+def _pick_part(part_id: Optional[int]) -> int:
+    with SessionLocal() as db:
+        query = select(SparePart.id).filter(SparePart.isActive == True)
+        if part_id is not None:
+            query = query.filter(SparePart.id == part_id)
+        found = db.scalar(query.order_by(SparePart.id).limit(1))
+    if found is None:
+        raise SystemExit("Need an active spare part (run app.bench.seed first)")
+    return found
+
+
+def _ledger(part_id: int, run_id: str) -> Dict[str, int]:
+    with SessionLocal() as db:
+        totals = dict(db.execute(
+            select(InventoryTransaction.transactionType, func.coalesce(func.sum(InventoryTransaction.quantity), 0))
+            .filter(
+                InventoryTransaction.sparePartId == part_id,
+                InventoryTransaction.referenceNumber.like(f"RACE-{run_id}-%")
+            )
+            .group_by(InventoryTransaction.transactionType)
+        ).all())
+        stock = db.scalar(select(SparePart.currentStock).filter(SparePart.id == part_id))
+    return {
+        "in": int(totals.get(TransactionType.IN, 0)),
+        "out": int(totals.get(TransactionType.OUT, 0)),
+        "stock": stock,
+    }
+
+
+async def run(base_url: str, username: str, password: str, part_id: Optional[int],
+              initial_stock: int, request_count: int, concurrency: int) -> Dict:
+    part_id = _pick_part(part_id)
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        headers = await _login(client, username, password)
+        adjustment = await client.post("/api/v1/inventory-transactions", headers=headers, json={
+            "sparePartId": part_id,
+            "transactionType": "ADJUSTMENT",
+            "quantity": initial_stock,
+            "referenceNumber": f"RACE-{run_id}-start",
+        })
+        adjustment.raise_for_status()
+
+        semaphore = asyncio.Semaphore(concurrency)
+        outcomes = Counter()
+        lowest_seen = [initial_stock]
+
+        async def move(index: int):
+            transaction_type = "IN" if index % 4 == 3 else "OUT"
+            async with semaphore:
+                try:
+                    response = await client.post("/api/v1/inventory-transactions", headers=headers, json={
+                        "sparePartId": part_id,
+                        "transactionType": transaction_type,
+                        "quantity": 1,
+                        "referenceNumber": f"RACE-{run_id}-{index}",
+                    })
+                except httpx.HTTPError as e:
+                    outcomes[f"{transaction_type} {type(e).__name__}"] += 1
+                    return
+            outcomes[f"{transaction_type} {response.status_code}"] += 1
+            if response.status_code == 200:
+                lowest_seen[0] = min(lowest_seen[0], response.json()["afterQuantity"])
+
+        await asyncio.gather(*(move(index) for index in range(request_count)))
+
+    ledger = _ledger(part_id, run_id)
+    expected_stock = initial_stock + ledger["in"] - ledger["out"]
+    failures = []
+    if ledger["stock"] != expected_stock:
+        failures.append(f"final stock {ledger['stock']}, ledger says {expected_stock}")
+    if ledger["in"] != outcomes["IN 200"]:
+        failures.append(f"{outcomes['IN 200']} INs succeeded but the ledger has {ledger['in']}")
+    if ledger["out"] != outcomes["OUT 200"]:
+        failures.append(f"{outcomes['OUT 200']} OUTs succeeded but the ledger has {ledger['out']}")
+    if lowest_seen[0] < 0 or ledger["stock"] < 0:
+        failures.append(f"stock went negative ({min(lowest_seen[0], ledger['stock'])})")
+    unexpected = {outcome: count for outcome, count in outcomes.items() if not outcome.endswith((" 200", " 400"))}
+    if unexpected:
+        failures.append(f"unexpected responses: {unexpected}")
+
+    return {
+        "baseUrl": base_url,
+        "sparePartId": part_id,
+        "concurrency": concurrency,
+        "initialStock": initial_stock,
+        "responses": dict(outcomes),
+        "ledger": ledger,
+        "expectedStock": expected_stock,
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fire parallel stock movements at one part and reconcile it with the ledger")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True, help="Inventory manager or admin account")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--part-id", type=int, help="Spare part to use (default: the first active part)")
+    parser.add_argument("--initial-stock", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(
+        args.base_url, args.username, args.password, args.part_id,
+        args.initial_stock, args.requests, args.concurrency
+    ))
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
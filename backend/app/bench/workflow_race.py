@@ -0,0 +1,163 @@
+"""Double-tap race test for accepting requests and completing work.
+
+For each of --requests PENDING requests it fires --concurrency parallel accepts
+spread across the active technicians (each technician reuses one
+Idempotency-Key, as the app does on a retry), then --concurrency parallel
+completes of the resulting work, half of them with a shared key. Afterwards it
+checks the database: one work per request, one downtime row per completed work
+and one accepted/completed status event per request.
+
+    python -m app.bench.workflow_race --base-url http://localhost:8000 \
+        --password bench --requests 5 --concurrency 50
+
+Exits non-zero when any check fails.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.models import MachineDowntime, MaintenanceRequest, MaintenanceWork, RequestStatusEvent, User, UserRole
+from app.models.maintenance_request import RequestStatus
+
+
+async def _login(client: httpx.AsyncClient, username: str, password: str) -> Dict[str, str]:
+    response = await client.post("/api/v1/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['tokens']['access_token']}"}
+
+
+def _outcome(response: httpx.Response) -> str:
+    if response.headers.get("idempotent-replayed") == "true":
+        return f"{response.status_code} replayed"
+    return str(response.status_code)
+
+
+def _pick_targets(count: int):
+    with SessionLocal() as db:
+        technicians = db.scalars(
+            select(User.username).filter(User.role == UserRole.MAINTENANCE_TECH, User.isActive == True).order_by(User.id)
+        ).all()
+        request_ids = db.scalars(
+            select(MaintenanceRequest.id)
+            .filter(MaintenanceRequest.status == RequestStatus.PENDING, MaintenanceRequest.hasWork == False)
+            .order_by(MaintenanceRequest.id.desc())
+            .limit(count)
+        ).all()
+    return list(technicians), list(request_ids)
+
+
+def _check_database(request_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    with SessionLocal() as db:
+        checks = {}
+        for request_id in request_ids:
+            work_ids = db.scalars(select(MaintenanceWork.id).filter(MaintenanceWork.requestId == request_id)).all()
+            events = dict(db.execute(
+                select(RequestStatusEvent.toStatus, func.count(RequestStatusEvent.id))
+                .filter(RequestStatusEvent.requestId == request_id, RequestStatusEvent.entityType == "MAINTENANCE_REQUEST")
+                .group_by(RequestStatusEvent.toStatus)
+            ).all())
+            checks[request_id] = {
+                "works": len(work_ids),
+                "downtimes": db.scalar(
+                    select(func.count(MachineDowntime.id)).filter(MachineDowntime.maintenanceWorkId.in_(work_ids))
+                ) if work_ids else 0,
+                "acceptedEvents": events.get("IN_PROGRESS", 0),
+                "completedEvents": events.get("COMPLETED", 0),
+            }
+    return checks
+
+
+async def run(base_url: str, password: str, request_count: int, concurrency: int) -> Dict:
+    technicians, request_ids = _pick_targets(request_count)
+    if not technicians or not request_ids:
+        raise SystemExit("Need active technicians and PENDING requests without work (run app.bench.seed first)")
+
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        headers = {}
+        for username in technicians[:concurrency]:
+            headers[username] = await _login(client, username, password)
+        racers = list(headers)
+
+        results = {}
+        for request_id in request_ids:
+            accepts = await asyncio.gather(*(
+                client.post(
+                    f"/api/v1/maintenance-requests/{request_id}/accept",
+                    headers={**headers[racers[i % len(racers)]], "Idempotency-Key": f"{run_id}-accept-{request_id}"}
+                )
+                for i in range(concurrency)
+            ))
+            accept_outcomes = Counter(_outcome(response) for response in accepts)
+            winners = {racers[i % len(racers)] for i, response in enumerate(accepts) if response.status_code == 200}
+
+            completes = []
+            work = await client.get(f"/api/v1/maintenance-work/by-request/{request_id}", headers=headers[racers[0]])
+            if len(winners) == 1 and work.status_code == 200:
+                winner_headers = headers[winners.pop()]
+                work_id = work.json()["id"]
+                completes = await asyncio.gather(*(
+                    client.patch(
+                        f"/api/v1/maintenance-work/{work_id}/complete",
+                        json={"workDescription": f"Race test {run_id}"},
+                        headers={**winner_headers, "Idempotency-Key": f"{run_id}-complete-{work_id}"} if i % 2 else winner_headers
+                    )
+                    for i in range(concurrency)
+                ))
+            results[request_id] = {
+                "accept": dict(accept_outcomes),
+                "complete": dict(Counter(_outcome(response) for response in completes)),
+            }
+
+    failures = []
+    for request_id, checks in _check_database(request_ids).items():
+        results[request_id]["database"] = checks
+        fresh_accepts = results[request_id]["accept"].get("200", 0)
+        fresh_completes = results[request_id]["complete"].get("200", 0)
+        expected = {"works": 1, "downtimes": 1, "acceptedEvents": 1, "completedEvents": 1}
+        if fresh_accepts != 1:
+            failures.append(f"request {request_id}: {fresh_accepts} accepts succeeded")
+        if fresh_completes != 1:
+            failures.append(f"request {request_id}: {fresh_completes} completions succeeded")
+        for name, value in expected.items():
+            if checks[name] != value:
+                failures.append(f"request {request_id}: {checks[name]} {name}, expected {value}")
+
+    return {
+        "baseUrl": base_url,
+        "concurrency": concurrency,
+        "technicians": len(racers),
+        "requests": results,
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fire parallel accepts and completions and check nothing is duplicated")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--password", required=True, help="Password shared by the technician accounts")
+    parser.add_argument("--requests", type=int, default=5, help="PENDING requests to race on")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--output", help="Write the JSON result to this file as well as stdout")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.base_url, args.password, args.requests, args.concurrency))
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Create or update spare parts in bulk from a CSV or XLSX file.
+
+    python -m app.cli.import_spare_parts catalog.xlsx --username admin
+    python -m app.cli.import_spare_parts parts.csv --username admin \
+        --create-categories --log-each-row --dry-run
+
+Same rules as POST /api/v1/spare-parts/import (see
+app.services.catalog_import_service), run directly against DATABASE_URL.
+Activity logs are recorded as --username. Prints the import report as JSON
+and exits non-zero when any row was rejected.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.catalog_import_service import import_catalog
+from app.utils.uploads import SpreadsheetRows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upsert spare parts from a CSV or XLSX file, keyed on partNumber")
+    parser.add_argument("file", help="Path of the .csv or .xlsx file")
+    parser.add_argument("--username", required=True, help="User the activity logs are recorded for")
+    parser.add_argument("--create-categories", action="store_true", help="Create categories whose code is not found")
+    parser.add_argument("--log-each-row", action="store_true", help="One activity log per part instead of one per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Check the file and report errors without saving anything")
+    args = parser.parse_args()
+
+    with SessionLocal() as db, open(args.file, "rb") as f:
+        user_id = db.scalar(select(User.id).filter(User.username == args.username, User.isActive == True))
+        if user_id is None:
+            raise SystemExit(f"No active user named {args.username}")
+        started = time.perf_counter()
+        try:
+            rows = SpreadsheetRows(f, os.path.basename(args.file), required=("partNumber", "partName"))
+            result = import_catalog(
+                db, rows, user_id, os.path.basename(args.file),
+                create_categories=args.create_categories,
+                log_each_row=args.log_each_row,
+                dry_run=args.dry_run,
+            )
+        except HTTPException as e:
+            raise SystemExit(e.detail)
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+
+    print(json.dumps({**result.model_dump(), "seconds": round(time.perf_counter() - started, 1)}, indent=2))
+    sys.exit(1 if result.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Maintain the daily spare part stock snapshots behind the asOf inventory reports.
+
+    python -m app.cli.stock_snapshots take
+    python -m app.cli.stock_snapshots backfill
+
+take writes today's row for every part. Schedule it nightly, e.g. from cron
+shortly after midnight UTC:
+
+    5 0 * * * cd /app && python -m app.cli.stock_snapshots take
+
+backfill walks inventory_transactions back from the current stock into rows
+for the days before the table existed; run it once after the migration, and
+again after upgrading past d6b9e3a7c4f2. It commits one batch of parts at a
+time, so it can be stopped and run again. See
+app.services.stock_snapshot_service for how the rows are used.
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.spare_part import SparePart
+from app.services.stock_snapshot_service import (
+    SNAPSHOT_CHUNK_SIZE,
+    backfill_stock_snapshots,
+    take_stock_snapshots,
+)
+from app.utils.uploads import chunked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the daily spare part stock snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("take", help="Write today's snapshot of every part (the nightly job)")
+    commands.add_parser("backfill", help="Replay the inventory transactions into past snapshots")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        if args.command == "take":
+            result = {"parts": take_stock_snapshots(db)}
+            db.commit()
+        else:
+            part_ids = db.scalars(select(SparePart.id).order_by(SparePart.id)).all()
+            rows = 0
+            for chunk in chunked(part_ids, SNAPSHOT_CHUNK_SIZE):
+                rows += backfill_stock_snapshots(db, chunk)
+                # Commit each batch so the part locks are held briefly
+                db.commit()
+            result = {"parts": len(part_ids), "rows": rows}
+
+    print(json.dumps({**result, "seconds": round(time.perf_counter() - started, 1)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
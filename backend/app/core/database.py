@@ -1,19 +1,78 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.pool_monitor import TimedQueuePool, TimedAsyncAdaptedQueuePool, instrument_pool
+from app.core.query_monitor import instrument_engine
+
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching asyncio driver."""
+    if url.startswith("mysql+pymysql://"):
+        return "mysql+aiomysql://" + url[len("mysql+pymysql://"):]
+    if url.startswith("mysql://"):
+        return "mysql+aiomysql://" + url[len("mysql://"):]
+    if url.startswith("sqlite:///") or url == "sqlite://":
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+
+# SQLite needs to be shared between the threadpool and the event loop in local runs
+connect_args = {"check_same_thread": False} if is_sqlite else {}
+
+
+def get_pool_options(url: str, poolclass) -> dict:
+    """Pool sizing from settings; SQLite keeps SQLAlchemy's default pool."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
 
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    pool_recycle=300,
-    echo=False  # Set to True for SQL query logging
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args=connect_args,
+    echo=False,  # Set to True for SQL query logging
+    **get_pool_options(settings.DATABASE_URL, TimedQueuePool)
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the routers that run on the event loop
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    echo=False,
+    **get_pool_options(settings.DATABASE_URL, TimedAsyncAdaptedQueuePool)
+)
+
+# Pool telemetry exposed on /health/detailed
+instrument_pool(engine.pool, "primary")
+instrument_pool(async_engine.sync_engine.pool, "async")
+
+# Per-request statement counting (X-DB-Queries / X-DB-Time)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+# expire_on_commit=False so committed objects can still be serialized without lazy IO
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -24,3 +83,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def count_rows(db: AsyncSession, query) -> int:
+    """Count the rows an ORM select would return."""
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
@@ -1,8 +1,9 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.principal_cache import principal_cache
 from app.core.security import verify_token, verify_refresh_token
 from app.models.user import User, UserRole
 from app.schemas.user import TokenPayload
@@ -10,15 +11,31 @@ from app.schemas.user import TokenPayload
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
-def get_current_user(
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[User]:
+    """Return the token's user from the principal cache, loading it on a miss.
+    
+    The returned User is a detached copy holding only username, fullName,
+    role and isActive; load the row from the session to change it.
+    """
+    await principal_cache.sync_version(db)
+    user = principal_cache.get(user_id)
+    if user is None:
+        db_user = await db.get(User, user_id)
+        if db_user is None:
+            return None
+        principal_cache.put(db_user)
+        user = principal_cache.get(user_id)
+    return user
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get the current authenticated user from JWT token."""
     token = credentials.credentials
     payload = verify_token(token)
     
-    user = db.query(User).filter(User.id == int(payload.sub)).first()
+    user = await load_principal(db, int(payload.sub))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,9 +56,9 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     """Get the current active user."""
     return current_user
 
-def get_current_user_optional(
+async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     """Get the current user if authenticated, otherwise return None."""
     if not credentials:
@@ -50,7 +67,7 @@ def get_current_user_optional(
     try:
         token = credentials.credentials
         payload = verify_token(token)
-        user = db.query(User).filter(User.id == int(payload.sub)).first()
+        user = await load_principal(db, int(payload.sub))
         return user if user and user.isActive else None
     except HTTPException:
         return None
@@ -0,0 +1,53 @@
+"""
+ETag / If-Match support for the versioned entities.
+
+SparePart, Machine, MaintenanceRequest and MaintenanceWork carry a version
+column that SQLAlchemy checks and bumps on every update. GET and PATCH return
+it as the ETag header. A PATCH that sends If-Match with a version that is no
+longer current gets 412 instead of overwriting the other edit.
+
+A write whose versioned row changed between being read and being written
+fails its commit with StaleDataError, on any route. stale_version_response,
+registered as the app's handler for it, answers 412 when the request sent
+If-Match and 409 otherwise; the session dependency rolls the session back.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
+
+PRECONDITION_FAILED_DETAIL = "This record was changed by someone else. Reload it and try again."
+
+
+def format_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def set_etag(response: Response, version: int) -> None:
+    response.headers["ETag"] = format_etag(version)
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(status_code=412, detail=PRECONDITION_FAILED_DETAIL)
+
+
+def check_if_match(if_match: Optional[str], version: int) -> None:
+    """Raise 412 unless the If-Match header is absent, "*" or names the current version."""
+    if if_match is None:
+        return
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return
+        # Weak tags compare equal here: the version is the whole representation
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == str(version):
+            return
+    raise precondition_failed()
+
+
+async def stale_version_response(request: Request, exc: StaleDataError) -> JSONResponse:
+    status_code = 412 if request.headers.get("if-match") is not None else 409
+    return JSONResponse(status_code=status_code, content={"detail": PRECONDITION_FAILED_DETAIL})
@@ -0,0 +1,199 @@
+"""
+Change events pushed to browsers over Server-Sent Events (/api/v1/events).
+
+Write paths call publish_event() after their commit. Every open /events
+stream receives the event and the frontend invalidates the matching React
+Query caches instead of polling the list endpoints.
+
+The default broker fans events out inside the worker that published them.
+With several uvicorn workers set EVENT_BROKER_URL=redis://... so events are
+relayed through Redis pub/sub to the streams held by the other workers; the
+in-process broker stands in for it in local and single-worker setups.
+"""
+import asyncio
+import enum
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Optional, Set
+
+from fastapi import Request
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeEvent(str, enum.Enum):
+    REQUEST_CREATED = "maintenance_request.created"
+    REQUEST_ACCEPTED = "maintenance_request.accepted"
+    REQUEST_UPDATED = "maintenance_request.updated"
+    WORK_UPDATED = "maintenance_work.updated"
+    WORK_COMPLETED = "maintenance_work.completed"
+    SPARE_PARTS_REQUEST_CREATED = "spare_parts_request.created"
+    SPARE_PARTS_REQUEST_APPROVED = "spare_parts_request.approved"
+    SPARE_PARTS_REQUEST_REJECTED = "spare_parts_request.rejected"
+    SPARE_PARTS_REQUEST_ISSUED = "spare_parts_request.issued"
+    SPARE_PARTS_REQUEST_RETURN_REQUESTED = "spare_parts_request.return_requested"
+    SPARE_PARTS_REQUEST_RETURNED = "spare_parts_request.returned"
+    STOCK_CHANGED = "stock.changed"
+    MACHINE_STATUS_CHANGED = "machine.status_changed"
+    # Sent to a stream that fell too far behind; the client refetches everything
+    RESYNC = "resync"
+
+
+class InProcessBroker:
+    """Fan events out to the streams open in this process."""
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        # Bumped for every event this worker sees; lets caches tell they are stale
+        self.generation = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, event: dict):
+        self.deliver(event)
+
+    def deliver(self, event: dict):
+        self.generation += 1
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client: drop what it has not read and have it refetch instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": ChangeEvent.RESYNC.value, "data": {}})
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+
+class RedisBroker(InProcessBroker):
+    """Relay events between workers through a Redis pub/sub channel."""
+
+    CHANNEL = "maintenance:events"
+
+    def __init__(self, url: str):
+        super().__init__()
+        # Only needed when EVENT_BROKER_URL points at Redis
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "EVENT_BROKER_URL points at Redis but the redis package is not installed; "
+                "pip install -r requirements.txt"
+            ) from exc
+
+        self._redis = redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+        await self._redis.close()
+
+    async def publish(self, event: dict):
+        await self._redis.publish(self.CHANNEL, json.dumps(event))
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.deliver(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event broker connection lost, reconnecting")
+                # Streams may have missed events while disconnected
+                self.deliver({"type": ChangeEvent.RESYNC.value, "data": {}})
+                await asyncio.sleep(1)
+
+
+def create_broker() -> InProcessBroker:
+    if settings.EVENT_BROKER_URL.startswith(("redis://", "rediss://")):
+        return RedisBroker(settings.EVENT_BROKER_URL)
+    return InProcessBroker()
+
+
+broker = create_broker()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+# Keeps publish tasks referenced until they finish
+_pending: Set = set()
+
+
+async def start_broker():
+    global _loop
+    _loop = asyncio.get_running_loop()
+    await broker.start()
+
+
+async def stop_broker():
+    await broker.stop()
+
+
+def _log_failure(future):
+    _pending.discard(future)
+    if not future.cancelled() and future.exception():
+        logger.error("Failed to publish change event", exc_info=future.exception())
+
+
+def publish_event(event_type: ChangeEvent, **data):
+    """Send a change event to every /events stream.
+
+    Call it after the commit so clients never refetch stale data. Safe to
+    call from async endpoints and from sync code running in the threadpool.
+    """
+    event = {"type": event_type.value, "data": data, "at": datetime.utcnow().isoformat()}
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop is not None:
+        future = loop.create_task(broker.publish(event))
+    elif _loop is not None:
+        future = asyncio.run_coroutine_threadsafe(broker.publish(event), _loop)
+    else:
+        return
+    _pending.add(future)
+    future.add_done_callback(_log_failure)
+
+
+def format_event(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_events(request: Request) -> AsyncIterator[str]:
+    """Yield SSE frames for one client until it disconnects."""
+    queue = broker.subscribe()
+    try:
+        # Reconnect after 5s if the connection drops
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(queue)
@@ -0,0 +1,145 @@
+"""
+Idempotency-Key support for the work order mutations.
+
+Technicians on flaky Wi-Fi often send the same accept or complete twice. When
+such a request carries an Idempotency-Key header, the first successful
+response is stored per user and key, and a retry with the same key gets that
+response back (marked Idempotent-Replayed: true) instead of running the
+handler again. A retry that arrives while the first request is still running
+gets 409. Failed responses are not stored, so the client can retry them with
+the same key.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+import anyio
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import get_route_template
+from app.core.security import verify_token
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENT_ROUTES = {
+    ("POST", f"{settings.API_V1_STR}/maintenance-requests/{{request_id}}/accept"),
+    ("POST", f"{settings.API_V1_STR}/maintenance-work"),
+    ("PATCH", f"{settings.API_V1_STR}/maintenance-work/{{work_id}}/start"),
+    ("PATCH", f"{settings.API_V1_STR}/maintenance-work/{{work_id}}/complete"),
+}
+MAX_KEY_LENGTH = 255
+
+
+def _user_id(request: Request) -> Optional[int]:
+    authorization = request.headers.get("authorization", "")
+    if not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return int(verify_token(authorization[7:]).sub)
+    except Exception:
+        return None
+
+
+def _expired(record: IdempotencyKey) -> bool:
+    created_at = record.createdAt.replace(tzinfo=None)
+    return created_at < datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def _in_progress() -> JSONResponse:
+    return JSONResponse(
+        status_code=409,
+        content={"detail": "A request with this Idempotency-Key is still being processed"}
+    )
+
+
+async def _reserve(user_id: int, key: str, method: str, path: str) -> Optional[Response]:
+    """Claim the key for this request, or return the response a retry should get instead."""
+    async with AsyncSessionLocal() as db:
+        # Two passes: the row can be released or expire between the insert and the lookup
+        for _ in range(2):
+            record = await db.scalar(
+                select(IdempotencyKey).filter(IdempotencyKey.userId == user_id, IdempotencyKey.key == key)
+            )
+            if record is not None and _expired(record):
+                await db.delete(record)
+                await db.commit()
+                record = None
+
+            if record is None:
+                db.add(IdempotencyKey(key=key, userId=user_id, method=method, path=path))
+                try:
+                    await db.commit()
+                    return None
+                except IntegrityError:
+                    await db.rollback()
+                    continue
+
+            if record.method != method or record.path != path:
+                return JSONResponse(
+                    status_code=422,
+                    content={"detail": "Idempotency-Key was already used for a different request"}
+                )
+            if record.statusCode is None:
+                return _in_progress()
+            return Response(
+                content=record.responseBody,
+                status_code=record.statusCode,
+                media_type="application/json",
+                headers={"Idempotent-Replayed": "true"}
+            )
+    return _in_progress()
+
+
+async def _finish(user_id: int, key: str, status_code: Optional[int] = None, body: Optional[str] = None):
+    """Store the response for replay, or release the key when there is nothing to replay."""
+    match = (IdempotencyKey.userId == user_id, IdempotencyKey.key == key)
+    async with AsyncSessionLocal() as db:
+        if status_code is None:
+            await db.execute(delete(IdempotencyKey).where(*match))
+        else:
+            await db.execute(update(IdempotencyKey).where(*match).values(statusCode=status_code, responseBody=body))
+        await db.commit()
+
+
+async def track_idempotency(request: Request, call_next):
+    """Middleware that replays the stored response for a retried Idempotency-Key."""
+    key = request.headers.get("idempotency-key")
+    if not key or (request.method, get_route_template(request)) not in IDEMPOTENT_ROUTES:
+        return await call_next(request)
+    if len(key) > MAX_KEY_LENGTH:
+        return JSONResponse(
+            status_code=400,
+            content={"detail": f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"}
+        )
+
+    user_id = _user_id(request)
+    if user_id is None:
+        # Unauthenticated; let the route reject it
+        return await call_next(request)
+
+    replay = await _reserve(user_id, key, request.method, request.url.path)
+    if replay is not None:
+        return replay
+
+    replay = None
+    try:
+        response = await call_next(request)
+        if response.status_code < 400:
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            replay = Response(content=body, status_code=response.status_code)
+            # Keep repeated headers (Set-Cookie, Vary) as sent
+            replay.raw_headers = list(response.raw_headers)
+    finally:
+        # Also runs when the client disconnects or the task is cancelled, so a
+        # retry is never locked out by a key left in progress; shielded because
+        # a cancelled scope would otherwise cancel the release as well
+        with anyio.CancelScope(shield=True):
+            if replay is None:
+                await _finish(user_id, key)
+            else:
+                await _finish(user_id, key, replay.status_code, replay.body.decode())
+
+    return response if replay is None else replay
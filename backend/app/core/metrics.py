@@ -0,0 +1,125 @@
+"""
+Prometheus metrics served from /metrics.
+
+Requests are labelled by the matched route template (for example
+/api/v1/maintenance-requests/{request_id}) so the label set stays bounded.
+When PROMETHEUS_MULTIPROC_DIR is set (required with several uvicorn
+workers) each worker writes its samples there and /metrics aggregates them.
+"""
+import os
+import time
+
+from fastapi import Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.routing import Match
+
+from app.core.database import engine, async_engine
+from app.core.pool_monitor import get_pool_status
+from app.core.replicas import replica_engines
+
+REPORT_PREFIXES = ("/api/v1/reports",)
+REPORT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+REPORT_DURATION = Histogram(
+    "report_generation_duration_seconds",
+    "Time spent building reports and exports",
+    ["route", "format"],
+    buckets=REPORT_BUCKETS,
+)
+POOL_SIZE = Gauge("db_pool_size", "Configured connection pool size", ["pool"], multiprocess_mode="livesum")
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["pool"], multiprocess_mode="livesum")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Overflow connections currently open", ["pool"], multiprocess_mode="livesum")
+POOL_WAIT_MAX = Gauge("db_pool_checkout_wait_max_seconds", "Longest wait for a pooled connection", ["pool"], multiprocess_mode="livemax")
+
+
+def get_route_template(request: Request) -> str:
+    """Return the path template of the route that will handle the request."""
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
+
+def _is_report(route: str) -> bool:
+    return route.startswith(REPORT_PREFIXES) or route.endswith("/export")
+
+
+def update_pool_gauges():
+    pools = {"primary": engine.pool, "async": async_engine.sync_engine.pool}
+    for index, replica_engine in enumerate(replica_engines):
+        pools[f"replica-{index}"] = replica_engine.pool
+
+    for name, stats in get_pool_status(pools).items():
+        POOL_SIZE.labels(name).set(stats.get("size", 0))
+        POOL_CHECKED_OUT.labels(name).set(stats["checkedOut"])
+        POOL_OVERFLOW.labels(name).set(stats.get("overflow", 0))
+        POOL_WAIT_MAX.labels(name).set(stats["checkoutWaitMaxMs"] / 1000)
+
+
+async def track_metrics(request: Request, call_next):
+    """Middleware that records request count, latency and in-flight gauges."""
+    route = get_route_template(request)
+    if route == "/metrics":
+        return await call_next(request)
+
+    method = request.method
+    in_progress = IN_PROGRESS.labels(method, route)
+    in_progress.inc()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        in_progress.dec()
+        REQUESTS.labels(method, route, str(status_code)).inc()
+        REQUEST_LATENCY.labels(method, route).observe(elapsed)
+        if _is_report(route):
+            report_format = "csv" if route.endswith("/export") else (request.query_params.get("export") or "json").lower()
+            REPORT_DURATION.labels(route, report_format).observe(elapsed)
+        update_pool_gauges()
+
+
+def render_metrics() -> Response:
+    """Render all metrics in the Prometheus text exposition format."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+        update_pool_gauges()
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_exited():
+    """Drop this worker's live gauges from the shared multiprocess directory."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
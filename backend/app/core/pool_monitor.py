@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolStats:
+    """Running counters for one connection pool, updated from pool events."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waitCount = 0
+        self.waitTotalSeconds = 0.0
+        self.waitMaxSeconds = 0.0
+        self.lastWaitSeconds = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waitCount += 1
+            self.waitTotalSeconds += seconds
+            self.lastWaitSeconds = seconds
+            if seconds > self.waitMaxSeconds:
+                self.waitMaxSeconds = seconds
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool: Pool) -> Dict:
+        with self._lock:
+            data = {
+                "pool": type(pool).__name__,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checkoutWaitAvgMs": round(self.waitTotalSeconds / self.waitCount * 1000, 3) if self.waitCount else 0.0,
+                "checkoutWaitMaxMs": round(self.waitMaxSeconds * 1000, 3),
+                "checkoutWaitLastMs": round(self.lastWaitSeconds * 1000, 3),
+            }
+        # Size counters are only meaningful for queue-based pools
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checkedOut": pool.checkedout(),
+                "checkedIn": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "maxOverflow": pool._max_overflow,
+            })
+        else:
+            data["checkedOut"] = self.checkouts - self.checkins
+        return data
+
+
+# Stats registered per engine name ("primary", "async", ...)
+pool_stats: Dict[str, PoolStats] = {}
+
+
+class _TimedCheckoutMixin:
+    """Measures how long callers wait to get a connection out of the pool."""
+
+    _stats: PoolStats = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            if self._stats is not None:
+                self._stats.increment("timeouts")
+            raise
+        finally:
+            if self._stats is not None:
+                self._stats.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool._stats = self._stats
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(pool: Pool, name: str) -> PoolStats:
+    """Attach event listeners to a pool and register its stats under name."""
+    stats = PoolStats(name)
+    if isinstance(pool, _TimedCheckoutMixin):
+        pool._stats = stats
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.increment("connects")
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.increment("checkouts")
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        stats.increment("checkins")
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.increment("invalidations")
+
+    pool_stats[name] = stats
+    return stats
+
+
+def get_pool_status(engines: Dict[str, Pool]) -> Dict[str, Dict]:
+    """Snapshot the counters for every instrumented pool."""
+    return {
+        name: pool_stats[name].snapshot(pool)
+        for name, pool in engines.items()
+        if name in pool_stats
+    }
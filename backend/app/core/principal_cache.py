@@ -0,0 +1,85 @@
+"""
+In-process cache of authenticated principals.
+
+get_current_user runs on every authenticated request, so the user row it
+needs (role, isActive, fullName, username) is cached per worker for
+PRINCIPAL_CACHE_TTL_SECONDS. Writers invalidate the local entry directly and
+bump the "principals" row in cache_versions in the same transaction; every
+worker re-reads that counter at most every PRINCIPAL_VERSION_CHECK_SECONDS
+and drops its cache when it has moved, so a deactivated user is locked out
+on all workers within a few seconds.
+"""
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.cache_version import CacheVersion
+from app.models.user import User
+
+PRINCIPALS_VERSION = "principals"
+
+
+class PrincipalCache:
+    def __init__(self):
+        self._entries: Dict[int, Tuple[float, dict]] = {}
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+
+    def get(self, user_id: int) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, fields = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(user_id, None)
+            return None
+        # Detached copy so callers never share state across requests
+        return User(id=user_id, **fields)
+
+    def put(self, user: User):
+        self._entries[user.id] = (
+            time.monotonic() + settings.PRINCIPAL_CACHE_TTL_SECONDS,
+            {
+                "username": user.username,
+                "fullName": user.fullName,
+                "role": user.role,
+                "isActive": user.isActive,
+            },
+        )
+
+    def invalidate(self, user_id: Optional[int] = None):
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+
+    async def sync_version(self, db: AsyncSession):
+        """Drop every entry if another worker bumped the shared version."""
+        now = time.monotonic()
+        if now - self._version_checked_at < settings.PRINCIPAL_VERSION_CHECK_SECONDS:
+            return
+        self._version_checked_at = now
+        version = await db.scalar(
+            select(CacheVersion.version).filter(CacheVersion.name == PRINCIPALS_VERSION)
+        )
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+
+principal_cache = PrincipalCache()
+
+
+def bump_principals_version():
+    """UPDATE statement that tells the other workers to drop cached principals.
+
+    Execute it in the same transaction as the user change.
+    """
+    return (
+        update(CacheVersion)
+        .filter(CacheVersion.name == PRINCIPALS_VERSION)
+        .values(version=CacheVersion.version + 1)
+    )
@@ -0,0 +1,107 @@
+"""
+Per-request SQL instrumentation.
+
+Every statement executed while a request is in flight is counted and timed
+through cursor execute events. The totals are returned in the X-DB-Queries
+and X-DB-Time (milliseconds) response headers, and a warning is logged when
+one statement shape runs more than DB_QUERY_REPEAT_WARN_THRESHOLD times in a
+single request, which is the usual sign of a per-row lookup (N+1).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_NUMBER = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM_LIST = re.compile(r"\((\s*(\?|%s|:\w+)\s*,?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """Statements executed during one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.totalSeconds = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, seconds: float, executemany: bool = False):
+        self.count += 1
+        self.totalSeconds += seconds
+        # A chunked executemany repeats by design; only single statements can be an N+1
+        if not executemany:
+            self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int):
+        return [(shape, count) for shape, count in self.fingerprints.most_common() if count > threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def fingerprint(statement: str) -> str:
+    """Reduce a SQL statement to its shape so repeated lookups group together."""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PARAM_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started, executemany)
+
+
+def instrument_engine(engine: Engine):
+    """Attach the cursor execute listeners to an engine (use .sync_engine for async engines)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def track_queries(request: Request, call_next):
+    """Middleware that counts and times the SQL run by each request."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time"] = f"{stats.totalSeconds * 1000:.2f}"
+
+    for shape, count in stats.repeated(settings.DB_QUERY_REPEAT_WARN_THRESHOLD):
+        logger.warning(
+            f"{request.method} {request.url.path} ran the same statement {count} times: {shape[:300]}"
+        )
+    return response
+
+
+def assert_query_budget(response, max_queries: int):
+    """Test helper: fail when a response used more statements than its budget.
+
+    Usage in pytest with the TestClient:
+        response = client.get("/api/v1/maintenance-requests", headers=auth)
+        assert_query_budget(response, 5)
+    """
+    used = int(response.headers["X-DB-Queries"])
+    assert used <= max_queries, (
+        f"{response.request.method} {response.request.url.path} ran {used} queries, budget is {max_queries}"
+    )
@@ -0,0 +1,149 @@
+"""
+Read-replica routing for read-heavy endpoints.
+
+Reports and audit-log listings read through get_read_db, which hands out a
+session bound to one of DATABASE_REPLICA_URLS. Requests fall back to the
+primary when no replica is configured, when every replica is marked down, or
+when the user wrote something within the last REPLICA_READ_YOUR_WRITES_SECONDS
+(so they never see a report that is missing their own change).
+
+Write timestamps live in the user_write_marks table on the primary, so the
+window holds whichever worker or host serves the user's next read. The
+timestamps come from the API hosts' clocks, which are expected to agree to
+well within the window.
+"""
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal, get_pool_options
+from app.core.deps import get_current_user
+from app.core.pool_monitor import TimedQueuePool, instrument_pool
+from app.core.query_monitor import instrument_engine
+from app.core.security import verify_token
+from app.models.user import User
+from app.models.user_write_mark import UserWriteMark
+
+logger = logging.getLogger(__name__)
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+replica_engines = [
+    create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+        echo=False,
+        **get_pool_options(url, TimedQueuePool)
+    )
+    for url in settings.DATABASE_REPLICA_URLS
+]
+ReplicaSessions = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    for replica_engine in replica_engines
+]
+for index, replica_engine in enumerate(replica_engines):
+    instrument_pool(replica_engine.pool, f"replica-{index}")
+    instrument_engine(replica_engine)
+
+_lock = threading.Lock()
+_rotation = itertools.cycle(range(len(ReplicaSessions))) if ReplicaSessions else None
+_down_until: Dict[int, float] = {}
+
+
+async def mark_user_write(user_id: int):
+    """Start the read-your-writes window for a user."""
+    async with AsyncSessionLocal() as db:
+        table = UserWriteMark.__table__
+        mysql = db.get_bind().dialect.name == "mysql"
+        if mysql:
+            from sqlalchemy.dialects.mysql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(table).values(userId=user_id, lastWriteAt=datetime.utcnow())
+        if mysql:
+            statement = statement.on_duplicate_key_update(lastWriteAt=statement.inserted.lastWriteAt)
+        else:
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.userId], set_={"lastWriteAt": statement.excluded.lastWriteAt}
+            )
+        await db.execute(statement)
+        await db.commit()
+
+
+def has_recent_write(user_id: int) -> bool:
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.REPLICA_READ_YOUR_WRITES_SECONDS)
+    with SessionLocal() as db:
+        last_write = db.scalar(select(UserWriteMark.lastWriteAt).where(UserWriteMark.userId == user_id))
+    return last_write is not None and last_write > cutoff
+
+
+def _next_replica() -> Optional[int]:
+    """Round-robin over replicas that are not marked down."""
+    now = time.monotonic()
+    with _lock:
+        for _ in range(len(ReplicaSessions)):
+            index = next(_rotation)
+            if _down_until.get(index, 0) <= now:
+                return index
+    return None
+
+
+def _mark_replica_down(index: int):
+    with _lock:
+        _down_until[index] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+
+def open_read_session(user_id: Optional[int] = None) -> Session:
+    """Open a session on a healthy replica, or on the primary when that is not safe."""
+    if not ReplicaSessions or (user_id is not None and has_recent_write(user_id)):
+        return SessionLocal()
+
+    for _ in range(len(ReplicaSessions)):
+        index = _next_replica()
+        if index is None:
+            break
+        db = ReplicaSessions[index]()
+        try:
+            # Check out the connection now so a dead replica is caught here
+            db.connection()
+            return db
+        except DBAPIError as e:
+            db.close()
+            logger.warning(f"Read replica {index} unavailable, skipping for {settings.REPLICA_RETRY_SECONDS}s: {e}")
+            _mark_replica_down(index)
+
+    return SessionLocal()
+
+
+# Dependency to get a read-only database session
+def get_read_db(current_user: User = Depends(get_current_user)):
+    db = open_read_session(current_user.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def track_user_writes(request: Request, call_next):
+    """Middleware that records successful mutations for the read-your-writes window."""
+    response = await call_next(request)
+    if ReplicaSessions and request.method in MUTATING_METHODS and response.status_code < 400:
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            try:
+                user_id = int(verify_token(authorization[7:]).sub)
+            except Exception:
+                return response
+            await mark_user_write(user_id)
+    return response
@@ -1,7 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm.exc import StaleDataError
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core.replicas import track_user_writes
+from app.core.query_monitor import track_queries
+from app.core.metrics import track_metrics, render_metrics, mark_worker_exited
+from app.core.events import start_broker, stop_broker
+from app.core.idempotency import track_idempotency
+from app.core.etag import stale_version_response
 
 app = FastAPI(
     title="Maintenance Management API",
@@ -19,6 +26,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Replay the stored response when an accept/complete is retried with the same Idempotency-Key
+app.middleware("http")(track_idempotency)
+
+# Route a user's reads to the primary for a short window after they write
+app.middleware("http")(track_user_writes)
+
+# Count and time SQL per request (X-DB-Queries / X-DB-Time headers)
+app.middleware("http")(track_queries)
+
+# Prometheus request metrics, labelled by route template
+app.middleware("http")(track_metrics)
+
+# A commit that lost a version race answers 412/409 from every route
+app.add_exception_handler(StaleDataError, stale_version_response)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -29,3 +51,16 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return render_metrics()
+
+@app.on_event("startup")
+async def startup():
+    await start_broker()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_broker()
+    mark_worker_exited()
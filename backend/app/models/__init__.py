@@ -5,6 +5,7 @@ from app.models.department import Department
 from app.models.machine import Machine
 from app.models.maintenance_request import MaintenanceRequest, RequestPriority, RequestStatus
 from app.models.maintenance_work import MaintenanceWork, WorkStatus
+from app.models.maintenance_work_step import MaintenanceWorkStep
 from app.models.spare_part_category import SparePartCategory
 from app.models.spare_part import SparePart
 from app.models.inventory_transaction import InventoryTransaction, TransactionType
@@ -17,6 +18,11 @@ from app.models.activity_log import ActivityLog
 from app.models.preventive_maintenance_task import PreventiveMaintenanceTask
 from app.models.preventive_maintenance_log import PreventiveMaintenanceLog
 from app.models.spare_parts_request import SparePartsRequest, SparePartsRequestStatus
+from app.models.cache_version import CacheVersion
+from app.models.request_status_event import RequestStatusEvent
+from app.models.idempotency_key import IdempotencyKey
+from app.models.sparepart_stock_snapshot import SparePartStockSnapshot
+from app.models.user_write_mark import UserWriteMark
 
 # Export all models
 __all__ = [
@@ -30,6 +36,7 @@ __all__ = [
     "RequestStatus",
     "MaintenanceWork",
     "WorkStatus",
+    "MaintenanceWorkStep",
     "SparePartCategory",
     "SparePart",
     "InventoryTransaction",
@@ -44,4 +51,9 @@ __all__ = [
     "PreventiveMaintenanceLog",
     "SparePartsRequest",
     "SparePartsRequestStatus",
+    "CacheVersion",
+    "RequestStatusEvent",
+    "IdempotencyKey",
+    "SparePartStockSnapshot",
+    "UserWriteMark",
 ]
\ No newline at end of file
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Integer
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Integer, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
 class ActivityLog(BaseModel):
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        Index("ix_activity_logs_timestamp", "timestamp"),
+        Index("ix_activity_logs_entityType_entityId", "entityType", "entityId"),
+    )
     
     # Activity details
     action = Column(String(100), nullable=False)
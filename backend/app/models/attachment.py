@@ -1,9 +1,12 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Integer, Float
+from sqlalchemy import Column, String, Text, ForeignKey, Integer, Float, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
 class Attachment(BaseModel):
     __tablename__ = "attachments"
+    __table_args__ = (
+        Index("ix_attachments_entityType_entityId", "entityType", "entityId"),
+    )
     
     # File information
     fileName = Column(String(255), nullable=False)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Integer
+from app.models.base import BaseModel
+
+class CacheVersion(BaseModel):
+    __tablename__ = "cache_versions"
+    
+    # Bumped by writers so every worker can tell its in-process cache is stale
+    name = Column(String(50), nullable=False, unique=True)
+    version = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<CacheVersion(name='{self.name}', version={self.version})>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Text, ForeignKey, Integer, UniqueConstraint
+from app.models.base import BaseModel
+
+class IdempotencyKey(BaseModel):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("userId", "key", name="uq_idempotency_keys_user_key"),
+    )
+    
+    # Client-chosen Idempotency-Key header, scoped to the user who sent it
+    key = Column(String(255), nullable=False)
+    userId = Column(Integer, ForeignKey("users.id"), nullable=False)
+    method = Column(String(10), nullable=False)
+    path = Column(String(255), nullable=False)
+    
+    # Stored response; statusCode stays None while the first request is still running
+    statusCode = Column(Integer, nullable=True)
+    responseBody = Column(Text, nullable=True)
+    
+    def __repr__(self):
+        return f"<IdempotencyKey(user={self.userId}, key='{self.key}', status={self.statusCode})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Enum, Integer, Float, DateTime
+from sqlalchemy import Column, String, Text, ForeignKey, Enum, Integer, Float, DateTime, Index
 from sqlalchemy.orm import relationship
 import enum
 from app.models.base import BaseModel
@@ -11,6 +11,10 @@ class TransactionType(str, enum.Enum):
 
 class InventoryTransaction(BaseModel):
     __tablename__ = "inventory_transactions"
+    __table_args__ = (
+        Index("ix_inventory_transactions_sparePartId_transactionDate", "sparePartId", "transactionDate"),
+        Index("ix_inventory_transactions_type_reference_date", "transactionType", "referenceType", "transactionDate"),
+    )
     
     # Transaction details
     transactionType = Column(Enum(TransactionType), nullable=False)
@@ -25,6 +25,10 @@ class Machine(BaseModel):
     # Status tracking
     status = Column(Enum(MachineStatus), nullable=False, default=MachineStatus.OPERATIONAL)
     
+    # Row version for optimistic concurrency (see SparePart.version)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    
     # Department relationship
     departmentId = Column(Integer, ForeignKey("departments.id"), nullable=False)
     department = relationship("Department", back_populates="machines")
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Float, Integer
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Float, Integer, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
 class MachineDowntime(BaseModel):
     __tablename__ = "machine_downtimes"
+    __table_args__ = (
+        Index("ix_machine_downtimes_machineId_startTime", "machineId", "startTime"),
+    )
     
     # Downtime details
     reason = Column(Text, nullable=False)
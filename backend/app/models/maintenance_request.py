@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Enum, DateTime, Integer
+from sqlalchemy import Column, String, Text, ForeignKey, Enum, DateTime, Integer, Index, Boolean, false
 from sqlalchemy.orm import relationship
 import enum
 from app.models.base import BaseModel
@@ -18,6 +18,13 @@ class RequestStatus(str, enum.Enum):
 
 class MaintenanceRequest(BaseModel):
     __tablename__ = "maintenance_requests"
+    __table_args__ = (
+        Index("ix_maintenance_requests_status_requestedDate", "status", "requestedDate"),
+        # Technician queue: status + hasWork (+ priority) is one range scan, already in date order
+        Index("ix_maintenance_requests_queue", "status", "hasWork", "priority", "requestedDate"),
+        # Search index; other databases use the in-process fallback in request_search_service
+        Index("ft_maintenance_requests_title_description", "title", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
     
     # Request details
     title = Column(String(200), nullable=False)
@@ -30,12 +37,20 @@ class MaintenanceRequest(BaseModel):
     expectedCompletionDate = Column(DateTime(timezone=True), nullable=True)
     actualCompletionDate = Column(DateTime(timezone=True), nullable=True)
     
+    # Row version for optimistic concurrency (see SparePart.version)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    
     # Relationships
     machineId = Column(Integer, ForeignKey("machines.id"), nullable=False)
     machine = relationship("Machine", back_populates="maintenanceRequests")
     
     requestedById = Column(Integer, ForeignKey("users.id"), nullable=False)
-    requestedBy = relationship("User", back_populates="maintenanceRequests")
+    requestedBy = relationship("User", foreign_keys=[requestedById], back_populates="maintenanceRequests")
+    
+    # Denormalized from maintenance_works; set when a technician accepts the request
+    hasWork = Column(Boolean, nullable=False, default=False, server_default=false())
+    assignedToId = Column(Integer, ForeignKey("users.id"), nullable=True)
     
     # Foreign keys for failure code and maintenance type
     failureCodeId = Column(Integer, ForeignKey("failurecodes.id"), nullable=True)
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Enum, DateTime, Integer, Float, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, ForeignKey, Enum, DateTime, Integer, Float, Index, event, func
+from sqlalchemy.orm import Session, attributes, relationship
+from datetime import datetime
 import enum
 from app.models.base import BaseModel
+from app.models.maintenance_work_step import MaintenanceWorkStep
 
 class WorkStatus(str, enum.Enum):
     PENDING = "PENDING"
@@ -12,11 +14,14 @@ class WorkStatus(str, enum.Enum):
 
 class MaintenanceWork(BaseModel):
     __tablename__ = "maintenance_works"
+    __table_args__ = (
+        # One work order per request; a second accept fails on insert
+        Index("uq_maintenance_works_requestId", "requestId", unique=True),
+    )
     
     # Work details
     workDescription = Column(Text, nullable=False)
     status = Column(Enum(WorkStatus), nullable=False, default=WorkStatus.PENDING)
-    maintenanceSteps = Column(JSON, nullable=True)  # Array of MaintenanceStep objects
     
     # Time tracking
     startTime = Column(DateTime(timezone=True), nullable=True)
@@ -29,6 +34,10 @@ class MaintenanceWork(BaseModel):
     materialCost = Column(Float, nullable=True, default=0.0)
     totalCost = Column(Float, nullable=True, default=0.0)
     
+    # Row version for optimistic concurrency (see SparePart.version)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    
     # Relationships
     requestId = Column(Integer, ForeignKey("maintenance_requests.id"), nullable=False)
     request = relationship("MaintenanceRequest", back_populates="maintenanceWorks")
@@ -50,5 +59,76 @@ class MaintenanceWork(BaseModel):
     # Spare parts requests relationship
     sparePartsRequests = relationship("SparePartsRequest", back_populates="maintenanceWork")
     
+    # Checklist rows, one per step (see maintenanceSteps for the API shape)
+    steps = relationship(
+        "MaintenanceWorkStep",
+        back_populates="maintenanceWork",
+        order_by="MaintenanceWorkStep.stepIndex",
+        cascade="all, delete-orphan"
+    )
+    
+    @property
+    def maintenanceSteps(self):
+        """Steps as the list of MaintenanceStep objects the API has always returned."""
+        if not self.steps:
+            return None
+        return [
+            {
+                "step": step.step,
+                "description": step.description,
+                "completed": step.completed,
+                "completedAt": step.completedAt,
+            }
+            for step in self.steps
+        ]
+    
+    @maintenanceSteps.setter
+    def maintenanceSteps(self, steps):
+        """Replace the checklist, updating rows in place so unchanged steps are not rewritten."""
+        steps = steps or []
+        for index, data in enumerate(steps):
+            if index < len(self.steps):
+                row = self.steps[index]
+            else:
+                row = MaintenanceWorkStep(stepIndex=index)
+                self.steps.append(row)
+            completed_at = data.get("completedAt")
+            if isinstance(completed_at, str):
+                completed_at = datetime.fromisoformat(completed_at)
+            row.step = data["step"]
+            row.description = data["description"]
+            row.completed = bool(data.get("completed"))
+            row.completedAt = completed_at
+        del self.steps[len(steps):]
+    
     def __repr__(self):
         return f"<MaintenanceWork(description='{self.workDescription[:50]}...', status='{self.status}')>"
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_works_with_changed_steps(session, flush_context, instances):
+    """
+    The checklist is part of the work, so a step row that is added, changed or
+    removed updates its work row too. That UPDATE bumps the work's version,
+    which is what If-Match and concurrent step edits are checked against.
+    """
+    works = set()
+    for row in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(row, MaintenanceWork):
+            # Steps dropped from the list are only deleted as orphans during the flush
+            if row in session.dirty and attributes.get_history(row, "steps").deleted:
+                works.add(row)
+            continue
+        if not isinstance(row, MaintenanceWorkStep):
+            continue
+        if row in session.dirty and not session.is_modified(row):
+            continue
+        # A removed step no longer points at its work; fall back to the key
+        work = row.maintenanceWork
+        if work is None and row.maintenanceWorkId is not None:
+            work = session.get(MaintenanceWork, row.maintenanceWorkId)
+        if work is not None and work not in session.new and work not in session.deleted:
+            works.add(work)
+    for work in works:
+        work.updatedAt = func.now()
+
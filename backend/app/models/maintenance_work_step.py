@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Text, ForeignKey, DateTime, Integer, Boolean, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+class MaintenanceWorkStep(BaseModel):
+    __tablename__ = "maintenance_work_steps"
+    __table_args__ = (
+        UniqueConstraint("maintenanceWorkId", "stepIndex", name="uq_maintenance_work_steps_work_index"),
+        Index("ix_maintenance_work_steps_completed_completedAt", "completed", "completedAt"),
+    )
+    
+    maintenanceWorkId = Column(Integer, ForeignKey("maintenance_works.id", ondelete="CASCADE"), nullable=False)
+    stepIndex = Column(Integer, nullable=False)  # 0-based position in the work's step list
+    
+    # Step details (the MaintenanceStep shape returned by the API)
+    step = Column(Integer, nullable=False)
+    description = Column(Text, nullable=False)
+    completed = Column(Boolean, nullable=False, default=False)
+    completedAt = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    maintenanceWork = relationship("MaintenanceWork", back_populates="steps")
+    
+    def __repr__(self):
+        return f"<MaintenanceWorkStep(work={self.maintenanceWorkId}, step={self.step}, completed={self.completed})>"
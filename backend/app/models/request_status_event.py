@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Index
+from app.models.base import BaseModel
+
+class RequestStatusEvent(BaseModel):
+    __tablename__ = "request_status_events"
+    __table_args__ = (
+        # Lifecycle of one request (MTTA/MTTR, time in status)
+        Index("ix_request_status_events_requestId_changedAt", "requestId", "changedAt"),
+        Index("ix_request_status_events_entity", "entityType", "entityId", "changedAt"),
+        Index("ix_request_status_events_toStatus_changedAt", "toStatus", "changedAt"),
+    )
+
+    # MAINTENANCE_REQUEST or MAINTENANCE_WORK, same names as ActivityLog.entityType
+    entityType = Column(String(30), nullable=False)
+    entityId = Column(Integer, nullable=False)
+    # The request the entity belongs to (equal to entityId for request events)
+    requestId = Column(Integer, ForeignKey("maintenance_requests.id"), nullable=False)
+
+    fromStatus = Column(String(30), nullable=True)  # None when the entity was created
+    toStatus = Column(String(30), nullable=False)
+    changedAt = Column(DateTime(timezone=True), nullable=False)
+    changedById = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    def __repr__(self):
+        return f"<RequestStatusEvent({self.entityType} {self.entityId}: {self.fromStatus} -> {self.toStatus})>"
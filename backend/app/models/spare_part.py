@@ -1,5 +1,6 @@
 from sqlalchemy import Column, String, Text, Float, Integer, Boolean, ForeignKey
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from app.models.base import BaseModel
 
 class SparePart(BaseModel):
@@ -13,6 +14,8 @@ class SparePart(BaseModel):
     
     # Inventory information
     currentStock = Column(Integer, nullable=False, default=0)
+    # Units held by approved requests that have not been issued yet
+    reservedStock = Column(Integer, nullable=False, default=0, server_default="0")
     minimumStock = Column(Integer, nullable=False, default=0)
     maximumStock = Column(Integer, nullable=True)
     unitPrice = Column(Float, nullable=True)
@@ -27,6 +30,11 @@ class SparePart(BaseModel):
     # Status
     isActive = Column(Boolean, default=True, nullable=False)
     
+    # Row version for optimistic concurrency: SQLAlchemy adds it to the WHERE
+    # clause of every UPDATE and bumps it, so a write based on a stale read fails
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    
     # Relationships
     inventoryTransactions = relationship("InventoryTransaction", back_populates="sparePart")
     machineSpareParts = relationship("MachineSparePart", back_populates="sparePart")
@@ -36,6 +44,11 @@ class SparePart(BaseModel):
     def __repr__(self):
         return f"<SparePart(partNumber='{self.partNumber}', partName='{self.partName}')>"
 
+    @hybrid_property
+    def availableStock(self):
+        """Stock that can still be approved: on hand minus reserved."""
+        return self.currentStock - self.reservedStock
+
     @property
     def categoryNumber(self):
         return self.category.code if self.category else None
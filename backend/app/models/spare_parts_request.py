@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Enum, DateTime, Integer, Boolean
+from sqlalchemy import Column, String, Text, ForeignKey, Enum, DateTime, Integer, Boolean, Index
 from sqlalchemy.orm import relationship
 import enum
 from app.models.base import BaseModel
@@ -11,6 +11,9 @@ class SparePartsRequestStatus(str, enum.Enum):
 
 class SparePartsRequest(BaseModel):
     __tablename__ = "spare_parts_requests"
+    __table_args__ = (
+        Index("ix_spare_parts_requests_status_createdAt", "status", "createdAt"),
+    )
     
     # Request details
     maintenanceWorkId = Column(Integer, ForeignKey("maintenance_works.id"), nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, Index
+from app.models.base import BaseModel
+
+class SparePartStockSnapshot(BaseModel):
+    __tablename__ = "sparepart_stock_snapshots"
+    __table_args__ = (
+        # One row per part per day; also serves "latest snapshot on or before a day"
+        Index("uq_sparepart_stock_snapshots_part_date", "sparePartId", "snapshotDate", unique=True),
+    )
+
+    sparePartId = Column(Integer, ForeignKey("spareparts.id"), nullable=False)
+    # UTC day the row describes; quantity is the stock at the end of that day,
+    # NULL when the backfill could not work it out
+    snapshotDate = Column(Date, nullable=False)
+    quantity = Column(Integer, nullable=True)
+    # The part's unit price on that day, for valuation
+    unitPrice = Column(Float, nullable=True)
+
+    def __repr__(self):
+        return f"<SparePartStockSnapshot(part={self.sparePartId}, date={self.snapshotDate}, quantity={self.quantity})>"
@@ -23,7 +23,7 @@ class User(BaseModel):
     isActive = Column(Boolean, default=True, nullable=False)
     
     # Relationships
-    maintenanceRequests = relationship("MaintenanceRequest", back_populates="requestedBy")
+    maintenanceRequests = relationship("MaintenanceRequest", foreign_keys="MaintenanceRequest.requestedById", back_populates="requestedBy")
     maintenanceWorks = relationship("MaintenanceWork", back_populates="assignedTo")
     activityLogs = relationship("ActivityLog", back_populates="user")
     sparePartsRequestsRequested = relationship("SparePartsRequest", foreign_keys="SparePartsRequest.requestedBy", back_populates="requestedByUser")
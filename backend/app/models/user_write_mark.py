@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from app.models.base import BaseModel
+
+class UserWriteMark(BaseModel):
+    __tablename__ = "user_write_marks"
+    
+    # When the user last changed something, shared by every worker so the
+    # read-your-writes window of app.core.replicas holds across processes
+    userId = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
+    lastWriteAt = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<UserWriteMark(user={self.userId}, lastWriteAt={self.lastWriteAt})>"
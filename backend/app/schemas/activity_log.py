@@ -31,8 +31,9 @@ class ActivityLogResponse(BaseModel):
 class ActivityLogListResponse(BaseModel):
     """Response schema for paginated activity logs list"""
     activityLogs: List[ActivityLogResponse]
-    total: int
+    total: Optional[int] = None  # omitted in cursor mode unless includeTotal=true
     page: int
     pageSize: int
-    totalPages: int
+    totalPages: Optional[int] = None
+    nextCursor: Optional[str] = None  # pass as cursor= to fetch the next page
 
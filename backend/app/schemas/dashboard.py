@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+
+
+class TechnicianWorkload(BaseModel):
+    technicianId: int
+    technicianName: str
+    openWork: int
+
+
+class SparePartsRequestCounts(BaseModel):
+    pending: int
+    approved: int
+
+
+class DashboardSummaryResponse(BaseModel):
+    # Sections the caller's role may not see are null (see dashboard_service.SUMMARY_SECTIONS)
+    # status -> priority -> count, every combination present
+    requestCounts: Optional[Dict[str, Dict[str, int]]] = None
+    requestTotals: Optional[Dict[str, int]] = None
+    # PENDING requests no technician has accepted yet (the /available queue)
+    availableRequests: Optional[int] = None
+    # IN_PROGRESS and WAITING_PARTS requests per assigned technician
+    openWorkByTechnician: Optional[List[TechnicianWorkload]] = None
+    # The caller's own open work; everyone's for managers and admins
+    myOpenWork: Optional[int] = None
+    sparePartsRequests: Optional[SparePartsRequestCounts] = None
+    # Active parts below their minimum stock
+    criticalStockCount: Optional[int] = None
+    machineStatusCounts: Optional[Dict[str, int]] = None
+    generatedAt: datetime
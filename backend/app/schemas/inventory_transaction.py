@@ -3,8 +3,8 @@ from typing import Optional, List
 from datetime import datetime
 from app.models.inventory_transaction import TransactionType
 
-class InventoryTransactionCreate(BaseModel):
-    sparePartId: int = Field(..., description="ID of the spare part")
+class InventoryTransactionFields(BaseModel):
+    """Transaction fields shared by the create endpoint and the file import."""
     transactionType: str = Field(..., description="Type of transaction: IN, OUT, ADJUSTMENT, TRANSFER")
     quantity: int = Field(..., gt=0, description="Transaction quantity (must be positive)")
     unitPrice: Optional[float] = Field(None, ge=0, description="Unit price of the transaction")
@@ -28,6 +28,13 @@ class InventoryTransactionCreate(BaseModel):
                 raise ValueError(f'referenceType must be one of: {", ".join(valid_types)}')
         return v
 
+class InventoryTransactionCreate(InventoryTransactionFields):
+    sparePartId: int = Field(..., description="ID of the spare part")
+
+class InventoryTransactionImportRow(InventoryTransactionFields):
+    """One line of an import file; the part is identified by its part number."""
+    partNumber: str = Field(..., min_length=1, max_length=100, description="Part number of the spare part")
+
 class InventoryTransactionUpdate(BaseModel):
     unitPrice: Optional[float] = Field(None, ge=0, description="Unit price (for corrections)")
     notes: Optional[str] = Field(None, description="Additional notes (for corrections)")
@@ -57,8 +64,27 @@ class InventoryTransactionResponse(BaseModel):
 
 class InventoryTransactionListResponse(BaseModel):
     transactions: List[InventoryTransactionResponse]
-    total: int
+    total: Optional[int] = None  # omitted in cursor mode unless includeTotal=true
     page: int
     pageSize: int
-    totalPages: int
+    totalPages: Optional[int] = None
+    nextCursor: Optional[str] = None  # pass as cursor= to fetch the next page
+
+class InventoryTransactionImportError(BaseModel):
+    row: int  # line number in the file; the header is row 1
+    partNumber: Optional[str] = None
+    error: str
+
+class InventoryTransactionImportStockChange(BaseModel):
+    sparePartId: int
+    partNumber: str
+    beforeQuantity: int
+    afterQuantity: int
 
+class InventoryTransactionImportResponse(BaseModel):
+    totalRows: int
+    imported: int
+    failed: int
+    dryRun: bool
+    errors: List[InventoryTransactionImportError]  # one entry per rejected row, in file order
+    stockChanges: List[InventoryTransactionImportStockChange]
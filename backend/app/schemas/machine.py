@@ -116,6 +116,7 @@ class MachineResponse(BaseModel):
     departmentId: int
     createdAt: datetime
     updatedAt: datetime
+    version: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -43,10 +43,13 @@ class MaintenanceRequestResponse(BaseModel):
     machineId: int
     requestedById: int
     requestedByName: Optional[str] = None
+    hasWork: bool = False
+    assignedToId: Optional[int] = None
     failureCodeId: Optional[int] = None
     maintenanceTypeId: Optional[int] = None
     createdAt: datetime
     updatedAt: datetime
+    version: Optional[int] = None
     attachments: Optional[List[AttachmentResponse]] = []
 
     class Config:
@@ -55,10 +58,11 @@ class MaintenanceRequestResponse(BaseModel):
 # Dashboard-specific schemas
 class MaintenanceRequestListResponse(BaseModel):
     requests: List[MaintenanceRequestResponse]
-    total: int
+    total: Optional[int] = None  # omitted in cursor mode unless includeTotal=true
     page: int
     pageSize: int
-    totalPages: int
+    totalPages: Optional[int] = None
+    nextCursor: Optional[str] = None  # pass as cursor= to fetch the next page
 
 class MaintenanceRequestFilters(BaseModel):
     status: Optional[RequestStatus] = None
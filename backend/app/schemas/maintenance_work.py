@@ -43,6 +43,14 @@ class MaintenanceWorkProgressUpdate(BaseModel):
     class Config:
         extra = "forbid"
 
+class MaintenanceStepUpdate(BaseModel):
+    """Schema for updating a single maintenance step"""
+    description: Optional[str] = Field(None, min_length=1)
+    completed: Optional[bool] = None
+    
+    class Config:
+        extra = "forbid"
+
 class MaintenanceWorkComplete(BaseModel):
     """Schema for completing maintenance work"""
     workDescription: str = Field(..., min_length=1, description="Work description is required when completing")
@@ -71,6 +79,7 @@ class MaintenanceWorkResponse(BaseModel):
     maintenanceSteps: Optional[List[MaintenanceStep]] = None
     createdAt: datetime
     updatedAt: datetime
+    version: Optional[int] = None
     
     class Config:
         from_attributes = True
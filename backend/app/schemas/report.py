@@ -2,7 +2,7 @@
 Report schemas for maintenance analytics and reporting.
 """
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel
 
 
@@ -17,18 +17,20 @@ class StockLevelItem(BaseModel):
     description: Optional[str]
     categoryNumber: Optional[str]
     categoryName: Optional[str]
-    quantity: int
+    quantity: Optional[int]  # None when the stock on the asOf day is not known
     minQuantity: int
     maxQuantity: Optional[int]
     unitPrice: Optional[float]
     location: Optional[str]
-    status: str  # CRITICAL, LOW, ADEQUATE, EXCESS
+    status: str  # CRITICAL, LOW, ADEQUATE, EXCESS, UNKNOWN
 
 class StockLevelsReportResponse(BaseModel):
     items: List[StockLevelItem]
     totalItems: int
     criticalCount: int
     lowStockCount: int
+    unknownCount: int = 0  # Parts whose stock on the asOf day is not known
+    asOf: Optional[date] = None  # Day the stock is reported for; None for the current stock
 
 
 class ConsumptionItem(BaseModel):
@@ -56,6 +58,8 @@ class ValuationByGroup(BaseModel):
 class ValuationReportResponse(BaseModel):
     totalValuation: float
     byGroup: List[ValuationByGroup]
+    unknownPartCount: int = 0  # Parts left out because their stock on the asOf day is not known
+    asOf: Optional[date] = None
 
 
 class ReorderItem(BaseModel):
@@ -151,3 +155,27 @@ class FailureAnalysisReportResponse(BaseModel):
     failurePatterns: List[FailurePattern]
     recurringIssues: List[FailurePattern]
 
+
+class LifecyclePriorityStats(BaseModel):
+    priority: str
+    requestCount: int
+    acknowledgedCount: int
+    resolvedCount: int
+    mttaMinutes: Optional[float]
+    mttrMinutes: Optional[float]
+
+class TimeInStatusItem(BaseModel):
+    entityType: str  # MAINTENANCE_REQUEST or MAINTENANCE_WORK
+    status: str
+    transitions: int  # finished stays in this status
+    avgMinutes: Optional[float]
+    totalMinutes: float
+
+class RequestLifecycleReportResponse(BaseModel):
+    requestCount: int
+    acknowledgedCount: int
+    resolvedCount: int
+    mttaMinutes: Optional[float]  # mean time from request to first IN_PROGRESS
+    mttrMinutes: Optional[float]  # mean time from request to COMPLETED
+    byPriority: List[LifecyclePriorityStats]
+    timeInStatus: List[TimeInStatusItem]
@@ -5,12 +5,11 @@ from datetime import datetime
 from app.schemas.spare_part_category import SparePartCategoryResponse
 
 
-class SparePartCreate(BaseModel):
+class SparePartCatalogFields(BaseModel):
+    """Catalog fields shared by the create endpoint and the catalog import."""
     partNumber: str = Field(..., min_length=1, max_length=100, description="Part number is required and must be unique")
     partName: str = Field(..., min_length=1, max_length=200, description="Part name is required")
     description: Optional[str] = Field(None, description="Part description")
-    categoryId: Optional[int] = Field(None, description="Spare part category ID")
-    currentStock: int = Field(0, ge=0, description="Current stock quantity")
     minimumStock: int = Field(0, ge=0, description="Minimum stock level")
     maximumStock: Optional[int] = Field(None, ge=0, description="Maximum stock level")
     unitPrice: Optional[float] = Field(None, ge=0, description="Unit price")
@@ -33,6 +32,18 @@ class SparePartCreate(BaseModel):
         return v
 
 
+class SparePartCreate(SparePartCatalogFields):
+    categoryId: Optional[int] = Field(None, description="Spare part category ID")
+    currentStock: int = Field(0, ge=0, description="Current stock quantity")
+
+
+class SparePartImportRow(SparePartCatalogFields):
+    """One line of a catalog import file; the category is identified by its code."""
+    categoryCode: Optional[str] = Field(None, max_length=50, description="Code of the spare part category")
+    categoryName: Optional[str] = Field(None, max_length=200, description="Name for the category if it has to be created")
+    isActive: bool = Field(True, description="Active status")
+
+
 class SparePartUpdate(BaseModel):
     partNumber: Optional[str] = Field(None, min_length=1, max_length=100, description="Part number")
     partName: Optional[str] = Field(None, min_length=1, max_length=200, description="Part name")
@@ -71,6 +82,8 @@ class SparePartResponse(BaseModel):
     description: Optional[str]
     categoryId: Optional[int]
     currentStock: int
+    reservedStock: int = 0
+    availableStock: int = 0
     minimumStock: int
     maximumStock: Optional[int]
     unitPrice: Optional[float]
@@ -81,16 +94,34 @@ class SparePartResponse(BaseModel):
     transactionCount: Optional[int] = 0
     createdAt: datetime
     updatedAt: datetime
+    version: Optional[int] = None
     category: Optional[SparePartCategoryResponse] = None
 
     class Config:
         from_attributes = True
 
 
+class SparePartImportError(BaseModel):
+    row: int  # line number in the file; the header is row 1
+    partNumber: Optional[str] = None
+    error: str
+
+
+class SparePartImportResponse(BaseModel):
+    totalRows: int
+    created: int
+    updated: int
+    failed: int
+    dryRun: bool
+    categoriesCreated: List[str]  # codes of the categories the import added
+    errors: List[SparePartImportError]  # one entry per rejected row, in file order
+
+
 class SparePartListResponse(BaseModel):
     spareParts: List[SparePartResponse]
-    total: int
+    total: Optional[int] = None  # omitted in cursor mode unless includeTotal=true
     page: int
     pageSize: int
-    totalPages: int
+    totalPages: Optional[int] = None
+    nextCursor: Optional[str] = None  # pass as cursor= to fetch the next page
 
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from datetime import datetime
+import enum
 from app.models.spare_parts_request import SparePartsRequestStatus
 
 class SparePartsRequestCreate(BaseModel):
@@ -48,6 +49,7 @@ class SparePartsRequestResponse(BaseModel):
     sparePartNumber: Optional[str] = None
     sparePartName: Optional[str] = None
     currentStock: Optional[int] = None
+    availableStock: Optional[int] = None  # currentStock minus units reserved by approved requests
     createdAt: datetime
     updatedAt: datetime
 
@@ -56,8 +58,33 @@ class SparePartsRequestResponse(BaseModel):
 
 class SparePartsRequestListResponse(BaseModel):
     requests: List[SparePartsRequestResponse]
-    total: int
+    total: Optional[int] = None  # omitted in cursor mode unless includeTotal=true
     page: int
     pageSize: int
-    totalPages: int
+    totalPages: Optional[int] = None
+    nextCursor: Optional[str] = None  # pass as cursor= to fetch the next page
 
+class SparePartsRequestBulkAction(str, enum.Enum):
+    APPROVE = "APPROVE"
+    REJECT = "REJECT"
+    ISSUE = "ISSUE"
+
+class SparePartsRequestBulkItem(BaseModel):
+    id: int = Field(..., description="ID of the spare parts request")
+    action: SparePartsRequestBulkAction
+    notes: Optional[str] = Field(None, description="Approval notes, or the rejection reason (required to reject)")
+
+class SparePartsRequestBulkRequest(BaseModel):
+    items: List[SparePartsRequestBulkItem] = Field(..., min_length=1, max_length=500)
+
+class SparePartsRequestBulkItemResult(BaseModel):
+    id: int
+    action: SparePartsRequestBulkAction
+    success: bool
+    error: Optional[str] = None
+    request: Optional[SparePartsRequestResponse] = None  # the updated request when success is true
+
+class SparePartsRequestBulkResponse(BaseModel):
+    results: List[SparePartsRequestBulkItemResult]  # same order as the submitted items
+    succeeded: int
+    failed: int
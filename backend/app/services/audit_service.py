@@ -2,15 +2,18 @@
 Audit service for centralized activity logging.
 
 This service provides a helper function to log activities with automatic
-IP address and user agent extraction from FastAPI Request objects.
+IP address and user agent extraction from FastAPI Request objects, and one
+to record request/work status transitions for the lifecycle reports.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from fastapi import Request
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 import json
 
 from app.models.activity_log import ActivityLog
+from app.models.request_status_event import RequestStatusEvent
 
 
 def get_client_ip(request: Optional[Request]) -> Optional[str]:
@@ -81,32 +84,112 @@ def log_activity(
     Returns:
         ActivityLog: The created activity log record
     """
-    # Extract IP address and user agent from request
-    ip_address = get_client_ip(request)
-    user_agent = get_user_agent(request)
-    
-    # Serialize old and new values as JSON strings
-    old_values_json = json.dumps(oldValues) if oldValues else None
-    new_values_json = json.dumps(newValues) if newValues else None
-    
-    # Use provided timestamp or default to current UTC time
-    log_timestamp = timestamp or datetime.utcnow()
-    
-    # Create activity log entry
-    activity_log = ActivityLog(
+    activity_log = ActivityLog(**activity_log_values(
         userId=userId,
         action=action,
         entityType=entityType,
         entityId=entityId,
         description=description,
-        oldValues=old_values_json,
-        newValues=new_values_json,
-        ipAddress=ip_address,
-        userAgent=user_agent,
-        timestamp=log_timestamp
-    )
+        oldValues=oldValues,
+        newValues=newValues,
+        request=request,
+        timestamp=timestamp
+    ))
     
     db.add(activity_log)
     # Note: Don't commit here - let the caller handle transaction management
     return activity_log
 
+
+def activity_log_values(
+    userId: int,
+    action: str,
+    entityType: str,
+    entityId: int,
+    description: Optional[str] = None,
+    oldValues: Optional[Dict[str, Any]] = None,
+    newValues: Optional[Dict[str, Any]] = None,
+    request: Optional[Request] = None,
+    timestamp: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Column values for one activity log row, stored the same way as log_activity.
+    
+    Collect these for a batch and pass them to log_activities.
+    """
+    return {
+        "userId": userId,
+        "action": action,
+        "entityType": entityType,
+        "entityId": entityId,
+        "description": description,
+        # Serialize old and new values as JSON strings
+        "oldValues": json.dumps(oldValues) if oldValues else None,
+        "newValues": json.dumps(newValues) if newValues else None,
+        # Extract IP address and user agent from request
+        "ipAddress": get_client_ip(request),
+        "userAgent": get_user_agent(request),
+        # Use provided timestamp or default to current UTC time
+        "timestamp": timestamp or datetime.utcnow(),
+    }
+
+
+def log_activities(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert many activity_log_values() rows with a single executemany.
+    
+    Like log_activity, this does not commit.
+    """
+    if rows:
+        db.execute(insert(ActivityLog), rows)
+
+
+
+def record_status_change(
+    db: Session,
+    entityType: str,
+    entityId: int,
+    requestId: int,
+    fromStatus: Optional[Any],
+    toStatus: Any,
+    userId: Optional[int] = None,
+    changedAt: Optional[datetime] = None
+) -> Optional[RequestStatusEvent]:
+    """
+    Record a MaintenanceRequest or MaintenanceWork status transition.
+    
+    Rows go to request_status_events, which the lifecycle reports (MTTA,
+    MTTR, time in status) aggregate directly. Nothing is recorded when the
+    status did not change.
+    
+    Args:
+        db: SQLAlchemy database session (sync or async)
+        entityType: "MAINTENANCE_REQUEST" or "MAINTENANCE_WORK"
+        entityId: ID of the request or work
+        requestId: ID of the request the entity belongs to
+        fromStatus: Previous status (None when the entity is being created)
+        toStatus: New status
+        userId: ID of the user making the change
+        changedAt: Optional timestamp (defaults to current UTC time)
+    
+    Returns:
+        RequestStatusEvent: The created event, or None if the status is unchanged
+    """
+    from_value = getattr(fromStatus, 'value', fromStatus)
+    to_value = getattr(toStatus, 'value', toStatus)
+    if from_value == to_value:
+        return None
+    
+    event = RequestStatusEvent(
+        entityType=entityType,
+        entityId=entityId,
+        requestId=requestId,
+        fromStatus=from_value,
+        toStatus=to_value,
+        changedAt=changedAt or datetime.utcnow(),
+        changedById=userId
+    )
+    
+    db.add(event)
+    # Note: Don't commit here - let the caller handle transaction management
+    return event
@@ -0,0 +1,226 @@
+"""
+Bulk create-or-update of the spare parts catalog from a CSV or XLSX file.
+
+Used by POST /spare-parts/import and by python -m app.cli.import_spare_parts.
+Rows are keyed on partNumber: a new part number inserts a part, and a known
+one updates the catalog columns present in the file. Blank cells clear the
+field or reset it to its default. Stock is never touched; opening stock goes
+through /inventory-transactions/import so it appears in the ledger.
+
+The file is processed CATALOG_CHUNK_SIZE rows at a time. For each chunk:
+- one IN query resolves the category codes not seen yet, creating missing
+  categories when asked to;
+- one IN query finds which part numbers already exist;
+- one executemany INSERT ... ON DUPLICATE KEY UPDATE writes the rows (ON
+  CONFLICT DO UPDATE on SQLite).
+Each chunk gets one summary activity log, or one log per row when asked.
+
+Nothing here commits; the caller commits or, for a dry run, rolls back.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.spare_part import SparePart
+from app.models.spare_part_category import SparePartCategory
+from app.schemas.spare_part import SparePartImportError, SparePartImportResponse, SparePartImportRow
+from app.services.audit_service import activity_log_values, log_activities
+from app.utils.uploads import SpreadsheetRows, chunked, validation_message
+
+CATALOG_CHUNK_SIZE = 500
+
+# Columns an import row can set, besides partNumber and categoryId
+CATALOG_COLUMNS = [
+    "partName", "description", "minimumStock", "maximumStock", "unitPrice",
+    "supplier", "supplierPartNumber", "location", "isActive",
+]
+
+
+def _upsert_statement(db: Session, update_columns: List[str]):
+    """INSERT of a spare part row that updates update_columns when the partNumber exists."""
+    spareparts = SparePart.__table__
+    mysql = db.get_bind().dialect.name == "mysql"
+    if mysql:
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(spareparts)
+    new_row = statement.inserted if mysql else statement.excluded
+    # onupdate defaults do not run for the update branch of an upsert, so set them here
+    values = {column: new_row[column] for column in update_columns}
+    values["updatedAt"] = func.now()
+    values["version"] = spareparts.c.version + 1
+    if mysql:
+        return statement.on_duplicate_key_update(values)
+    return statement.on_conflict_do_update(index_elements=[spareparts.c.partNumber], set_=values)
+
+
+def import_catalog(
+    db: Session,
+    rows: SpreadsheetRows,
+    user_id: int,
+    source: str,
+    create_categories: bool = False,
+    log_each_row: bool = False,
+    dry_run: bool = False,
+    request: Optional[Request] = None,
+) -> SparePartImportResponse:
+    """
+    Upsert the parts in rows and report the rows that could not be imported.
+
+    source names the file in the activity logs. Rows that fail validation or
+    name an unknown or inactive category are skipped; the rest are written.
+    """
+    update_columns = [column for column in CATALOG_COLUMNS if column in rows.columns]
+    # Parts created by this import keep the defaults of columns the file does not have
+    insert_columns = ["partNumber", *CATALOG_COLUMNS]
+    has_category = "categoryCode" in rows.columns
+    if has_category:
+        update_columns.append("categoryId")
+        insert_columns.append("categoryId")
+    upsert = _upsert_statement(db, update_columns)
+
+    categories: Dict[str, Any] = {}  # casefolded code -> (id, code, isActive)
+    categories_created: List[str] = []
+    seen_parts = set()  # casefolded part numbers that exist or were created earlier in the file
+    errors: List[SparePartImportError] = []
+    total_rows = created = updated = 0
+    now = datetime.utcnow()
+
+    for batch, chunk in enumerate(chunked(rows, CATALOG_CHUNK_SIZE), start=1):
+        total_rows += len(chunk)
+        valid_rows = []
+        for row_number, cells in chunk:
+            try:
+                valid_rows.append((row_number, SparePartImportRow.model_validate(cells)))
+            except ValidationError as e:
+                part_number = cells.get("partNumber")
+                errors.append(SparePartImportError(
+                    row=row_number,
+                    partNumber=str(part_number) if part_number is not None else None,
+                    error=validation_message(e)
+                ))
+
+        # Codes are matched case-insensitively, as MySQL's unique index on code does
+        missing_codes = {
+            row.categoryCode for _, row in valid_rows
+            if row.categoryCode and row.categoryCode.casefold() not in categories
+        } if has_category else set()
+        if missing_codes:
+            for category in db.execute(
+                select(SparePartCategory.id, SparePartCategory.code, SparePartCategory.isActive)
+                .filter(SparePartCategory.code.in_(missing_codes))
+            ):
+                categories[category.code.casefold()] = category
+            if create_categories:
+                new_categories = {}
+                for _, row in valid_rows:
+                    key = row.categoryCode.casefold() if row.categoryCode else None
+                    if key and key not in categories and key not in new_categories:
+                        new_categories[key] = {"code": row.categoryCode, "name": row.categoryName or row.categoryCode, "isActive": True}
+                if new_categories:
+                    db.execute(insert(SparePartCategory.__table__), list(new_categories.values()))
+                    for category in db.execute(
+                        select(SparePartCategory.id, SparePartCategory.code, SparePartCategory.isActive)
+                        .filter(SparePartCategory.code.in_([values["code"] for values in new_categories.values()]))
+                    ):
+                        categories[category.code.casefold()] = category
+                    categories_created.extend(values["code"] for values in new_categories.values())
+
+        existing = {
+            part_number.casefold()
+            for part_number in db.scalars(
+                select(SparePart.partNumber).filter(SparePart.partNumber.in_({row.partNumber for _, row in valid_rows}))
+            )
+        } if valid_rows else set()
+        seen_parts |= existing
+
+        values = []
+        written = []  # (row number, row, created)
+        for row_number, row in valid_rows:
+            category_id = None
+            if has_category and row.categoryCode:
+                category = categories.get(row.categoryCode.casefold())
+                if category is None:
+                    errors.append(SparePartImportError(
+                        row=row_number, partNumber=row.partNumber, error=f"Spare part category '{row.categoryCode}' not found"
+                    ))
+                    continue
+                if not category.isActive:
+                    errors.append(SparePartImportError(
+                        row=row_number, partNumber=row.partNumber, error=f"Spare part category '{row.categoryCode}' is inactive"
+                    ))
+                    continue
+                category_id = category.id
+
+            row_values = row.model_dump(include=set(insert_columns))
+            if has_category:
+                row_values["categoryId"] = category_id
+            values.append(row_values)
+            is_new = row.partNumber.casefold() not in seen_parts
+            seen_parts.add(row.partNumber.casefold())
+            written.append((row_number, row, is_new))
+
+        if not values:
+            continue
+        db.execute(upsert, values)
+        batch_created = [row.partNumber for _, row, is_new in written if is_new]
+        batch_updated = [row.partNumber for _, row, is_new in written if not is_new]
+        created += len(batch_created)
+        updated += len(batch_updated)
+
+        if log_each_row:
+            part_ids = {
+                part_number.casefold(): part_id
+                for part_id, part_number in db.execute(
+                    select(SparePart.id, SparePart.partNumber)
+                    .filter(SparePart.partNumber.in_({row.partNumber for _, row, _ in written}))
+                )
+            }
+            log_activities(db, [
+                activity_log_values(
+                    userId=user_id,
+                    action="CREATE" if is_new else "UPDATE",
+                    entityType="SPARE_PART",
+                    entityId=part_ids[row.partNumber.casefold()],
+                    description=f"Spare part '{row.partNumber}' {'created' if is_new else 'updated'} by catalog import from {source} (row {row_number})",
+                    newValues={
+                        **row.model_dump(include={"partNumber", "categoryCode", *update_columns}, mode="json"),
+                        "row": row_number
+                    },
+                    request=request,
+                    timestamp=now
+                )
+                for row_number, row, is_new in written
+            ])
+        else:
+            log_activities(db, [activity_log_values(
+                userId=user_id,
+                action="IMPORT",
+                entityType="SPARE_PART",
+                entityId=0,
+                description=f"Catalog import from {source}, batch {batch}: {len(batch_created)} parts created, {len(batch_updated)} updated",
+                newValues={
+                    "rows": [written[0][0], written[-1][0]],
+                    "created": batch_created,
+                    "updated": batch_updated,
+                },
+                request=request,
+                timestamp=now
+            )])
+
+    errors.sort(key=lambda error: error.row)
+    return SparePartImportResponse(
+        totalRows=total_rows,
+        created=created,
+        updated=updated,
+        failed=len(errors),
+        dryRun=dry_run,
+        categoriesCreated=categories_created,
+        errors=errors,
+    )
@@ -0,0 +1,164 @@
+"""
+Aggregated counts for the home dashboards.
+
+The whole summary comes from five GROUP BY / COUNT queries and is kept per
+worker for DASHBOARD_CACHE_TTL_SECONDS. A change event seen by this worker
+(see app.core.events) makes the cached copy stale straight away, so the
+refetch the frontend does on that event returns fresh numbers.
+
+One summary is cached for everyone; each caller gets only the sections their
+role could already read through the list endpoints (SUMMARY_SECTIONS), the
+others are null.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.events import broker
+from app.models.machine import Machine, MachineStatus
+from app.models.maintenance_request import MaintenanceRequest, RequestPriority, RequestStatus
+from app.models.spare_part import SparePart
+from app.models.spare_parts_request import SparePartsRequest, SparePartsRequestStatus
+from app.models.user import User, UserRole
+from app.schemas.dashboard import DashboardSummaryResponse, SparePartsRequestCounts, TechnicianWorkload
+
+OPEN_WORK_STATUSES = [RequestStatus.IN_PROGRESS, RequestStatus.WAITING_PARTS]
+
+REQUEST_SECTIONS = {"requestCounts", "requestTotals", "openWorkByTechnician"}
+WORK_QUEUE_SECTIONS = {"availableRequests", "myOpenWork"}
+# Admins see every section
+SUMMARY_SECTIONS = {
+    UserRole.SUPERVISOR: REQUEST_SECTIONS | {"machineStatusCounts"},
+    UserRole.MAINTENANCE_MANAGER: REQUEST_SECTIONS | WORK_QUEUE_SECTIONS | {"sparePartsRequests", "machineStatusCounts"},
+    UserRole.MAINTENANCE_TECH: WORK_QUEUE_SECTIONS,
+    UserRole.INVENTORY_MANAGER: {"sparePartsRequests", "criticalStockCount"},
+}
+
+
+def _key(value) -> str:
+    return value.value if hasattr(value, "value") else str(value)
+
+
+async def build_dashboard_summary(db: AsyncSession) -> DashboardSummaryResponse:
+    request_counts = {
+        request_status.value: {priority.value: 0 for priority in RequestPriority}
+        for request_status in RequestStatus
+    }
+    available = 0
+    rows = await db.execute(
+        select(
+            MaintenanceRequest.status,
+            MaintenanceRequest.priority,
+            MaintenanceRequest.hasWork,
+            func.count(MaintenanceRequest.id),
+        ).group_by(MaintenanceRequest.status, MaintenanceRequest.priority, MaintenanceRequest.hasWork)
+    )
+    for request_status, priority, has_work, count in rows.all():
+        request_counts[_key(request_status)][_key(priority)] += count
+        if _key(request_status) == RequestStatus.PENDING.value and not has_work:
+            available += count
+
+    workload_rows = await db.execute(
+        select(User.id, User.fullName, func.count(MaintenanceRequest.id))
+        .join(User, MaintenanceRequest.assignedToId == User.id)
+        .filter(MaintenanceRequest.status.in_(OPEN_WORK_STATUSES))
+        .group_by(User.id, User.fullName)
+        .order_by(func.count(MaintenanceRequest.id).desc())
+    )
+    workload = [
+        TechnicianWorkload(technicianId=user_id, technicianName=full_name, openWork=count)
+        for user_id, full_name, count in workload_rows.all()
+    ]
+
+    spare_parts_counts = {parts_status.value: 0 for parts_status in SparePartsRequestStatus}
+    rows = await db.execute(
+        select(SparePartsRequest.status, func.count(SparePartsRequest.id))
+        .filter(SparePartsRequest.status.in_([SparePartsRequestStatus.PENDING, SparePartsRequestStatus.APPROVED]))
+        .group_by(SparePartsRequest.status)
+    )
+    for parts_status, count in rows.all():
+        spare_parts_counts[_key(parts_status)] = count
+
+    # Same rule as /spare-parts/low-stock and the CRITICAL stock status
+    critical_stock = await db.scalar(
+        select(func.count(SparePart.id)).filter(
+            SparePart.isActive == True,
+            SparePart.currentStock < SparePart.minimumStock
+        )
+    )
+
+    machine_counts = {machine_status.value: 0 for machine_status in MachineStatus}
+    rows = await db.execute(select(Machine.status, func.count(Machine.id)).group_by(Machine.status))
+    for machine_status, count in rows.all():
+        machine_counts[_key(machine_status)] = count
+
+    return DashboardSummaryResponse(
+        requestCounts=request_counts,
+        requestTotals={request_status: sum(by_priority.values()) for request_status, by_priority in request_counts.items()},
+        availableRequests=available,
+        openWorkByTechnician=workload,
+        myOpenWork=0,
+        sparePartsRequests=SparePartsRequestCounts(
+            pending=spare_parts_counts[SparePartsRequestStatus.PENDING.value],
+            approved=spare_parts_counts[SparePartsRequestStatus.APPROVED.value],
+        ),
+        criticalStockCount=critical_stock or 0,
+        machineStatusCounts=machine_counts,
+        generatedAt=datetime.utcnow(),
+    )
+
+
+class DashboardSummaryCache:
+    def __init__(self):
+        # (expires at, broker generation, summary)
+        self._entry: Optional[Tuple[float, int, DashboardSummaryResponse]] = None
+        # Concurrent misses wait for one rebuild instead of each running the queries
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> Optional[DashboardSummaryResponse]:
+        if self._entry is None:
+            return None
+        expires_at, generation, summary = self._entry
+        if expires_at < time.monotonic() or generation != broker.generation:
+            return None
+        return summary
+
+    async def get(self, db: AsyncSession) -> DashboardSummaryResponse:
+        summary = self._fresh()
+        if summary is not None:
+            return summary
+        async with self._lock:
+            summary = self._fresh()
+            if summary is None:
+                generation = broker.generation
+                summary = await build_dashboard_summary(db)
+                self._entry = (time.monotonic() + settings.DASHBOARD_CACHE_TTL_SECONDS, generation, summary)
+            return summary
+
+
+dashboard_summary_cache = DashboardSummaryCache()
+
+
+async def get_dashboard_summary(db: AsyncSession, current_user: User) -> DashboardSummaryResponse:
+    """Cached summary with myOpenWork filled in for the caller and the sections their role may not see left out."""
+    summary = await dashboard_summary_cache.get(db)
+    if current_user.role == UserRole.MAINTENANCE_TECH:
+        my_open_work = next(
+            (item.openWork for item in summary.openWorkByTechnician if item.technicianId == current_user.id),
+            0
+        )
+    else:
+        my_open_work = sum(item.openWork for item in summary.openWorkByTechnician)
+    summary = summary.model_copy(update={"myOpenWork": my_open_work})
+    if current_user.role == UserRole.ADMIN:
+        return summary
+    visible = SUMMARY_SECTIONS.get(current_user.role, set())
+    return DashboardSummaryResponse(
+        **{section: getattr(summary, section) for section in visible},
+        generatedAt=summary.generatedAt
+    )
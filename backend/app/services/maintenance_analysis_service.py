@@ -5,9 +5,9 @@ This service provides helper functions for generating maintenance analytics
 including downtime calculations, cost analysis, and failure pattern analysis.
 """
 from typing import Optional, List, Dict, Any
-from datetime import datetime
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_, or_
+from datetime import date, datetime
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from sqlalchemy import func, and_, or_, case, select, text
 
 from app.models.machine_downtime import MachineDowntime
 from app.models.maintenance_request import MaintenanceRequest
@@ -18,6 +18,8 @@ from app.models.failure_code import FailureCode
 from app.models.department import Department
 from app.models.spare_part import SparePart
 from app.models.spare_part_category import SparePartCategory
+from app.models.request_status_event import RequestStatusEvent
+from app.services.stock_snapshot_service import end_of_day, stock_as_of, utc_day
 
 
 def get_downtime_statistics(
@@ -266,7 +268,9 @@ def analyze_failure_patterns(
         and recurring issues identification.
     """
     # Get maintenance requests with failure codes
-    query = db.query(MaintenanceRequest).join(FailureCode).filter(
+    query = db.query(MaintenanceRequest).join(FailureCode).options(
+        contains_eager(MaintenanceRequest.failureCode)
+    ).filter(
         MaintenanceRequest.failureCodeId.isnot(None)
     )
     
@@ -289,6 +293,24 @@ def analyze_failure_patterns(
     
     requests = query.all()
     
+    # Resolution time (request creation to COMPLETED) per failure code in one grouped query
+    lifecycle = request_lifecycle_subquery()
+    resolution_seconds = seconds_between(MaintenanceRequest.requestedDate, lifecycle.c.resolvedAt, db)
+    resolution_rows = query.join(
+        lifecycle, lifecycle.c.requestId == MaintenanceRequest.id
+    ).filter(
+        MaintenanceRequest.status == 'COMPLETED',
+        lifecycle.c.resolvedAt.isnot(None)
+    ).with_entities(
+        MaintenanceRequest.failureCodeId,
+        func.count(MaintenanceRequest.id),
+        func.sum(resolution_seconds)
+    ).group_by(MaintenanceRequest.failureCodeId).all()
+    resolution_by_code = {
+        code_id: (count, (total_seconds or 0) / 60)
+        for code_id, count, total_seconds in resolution_rows
+    }
+    
     # Group by failure code
     failure_patterns = {}
     for request in requests:
@@ -308,16 +330,12 @@ def analyze_failure_patterns(
                 'resolutionCount': 0
             }
         
+            resolution_count, total_resolution_time = resolution_by_code.get(code_id, (0, 0))
+            failure_patterns[code_id]['resolutionCount'] = resolution_count
+            failure_patterns[code_id]['totalResolutionTime'] = total_resolution_time
+        
         failure_patterns[code_id]['frequency'] += 1
         failure_patterns[code_id]['affectedMachines'].add(request.machineId)
-        
-        # Calculate resolution time if work completed
-        if request.status == 'COMPLETED' and request.maintenanceWorks:
-            work = request.maintenanceWorks[0]  # Get first work record
-            if work.startTime and work.endTime:
-                resolution_time = (work.endTime - request.requestedDate).total_seconds() / 60
-                failure_patterns[code_id]['totalResolutionTime'] += resolution_time
-                failure_patterns[code_id]['resolutionCount'] += 1
     
     # Convert sets to lists and calculate averages
     for pattern in failure_patterns.values():
@@ -344,18 +362,171 @@ def analyze_failure_patterns(
     }
 
 
+def seconds_between(start, end, db: Session):
+    """SQL expression for the seconds from start to end on the session's database."""
+    if db.get_bind().dialect.name == 'sqlite':
+        return (func.julianday(end) - func.julianday(start)) * 86400
+    return func.timestampdiff(text('SECOND'), start, end)
+
+
+def request_lifecycle_subquery():
+    """
+    One row per request with the moments that matter for MTTA and MTTR.
+    
+    acknowledgedAt is the first move to IN_PROGRESS (a technician accepted
+    the request) and resolvedAt the last move to COMPLETED.
+    """
+    request_event = RequestStatusEvent.entityType == 'MAINTENANCE_REQUEST'
+    return select(
+        RequestStatusEvent.requestId.label('requestId'),
+        func.min(case(
+            (and_(request_event, RequestStatusEvent.toStatus == 'IN_PROGRESS'), RequestStatusEvent.changedAt)
+        )).label('acknowledgedAt'),
+        func.max(case(
+            (and_(request_event, RequestStatusEvent.toStatus == 'COMPLETED'), RequestStatusEvent.changedAt)
+        )).label('resolvedAt')
+    ).group_by(RequestStatusEvent.requestId).subquery('request_lifecycle')
+
+
+def _filter_requests(query, machine_id, department_id, start_date, end_date):
+    if machine_id:
+        query = query.filter(MaintenanceRequest.machineId == machine_id)
+    if start_date:
+        query = query.filter(MaintenanceRequest.requestedDate >= start_date)
+    if end_date:
+        query = query.filter(MaintenanceRequest.requestedDate <= end_date)
+    if department_id:
+        query = query.join(Machine, MaintenanceRequest.machineId == Machine.id).filter(Machine.departmentId == department_id)
+    return query
+
+
+def get_request_lifecycle_metrics(
+    db: Session,
+    machine_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Calculate MTTA, MTTR and time in status from request_status_events.
+    
+    MTTA (mean time to acknowledge) runs from the request being raised to
+    its first IN_PROGRESS, MTTR (mean time to resolve) to COMPLETED. Both
+    come from one grouped query per priority; time in status from one
+    windowed query over the transitions of the filtered requests.
+    
+    Returns:
+        Dictionary with overall and per-priority MTTA/MTTR in minutes and
+        the average time spent in each request and work status.
+    """
+    lifecycle = request_lifecycle_subquery()
+    ack_seconds = seconds_between(MaintenanceRequest.requestedDate, lifecycle.c.acknowledgedAt, db)
+    resolve_seconds = seconds_between(MaintenanceRequest.requestedDate, lifecycle.c.resolvedAt, db)
+    
+    query = db.query(
+        MaintenanceRequest.priority,
+        func.count(MaintenanceRequest.id),
+        func.count(lifecycle.c.acknowledgedAt),
+        func.sum(ack_seconds),
+        func.count(lifecycle.c.resolvedAt),
+        func.sum(resolve_seconds)
+    ).outerjoin(lifecycle, lifecycle.c.requestId == MaintenanceRequest.id)
+    query = _filter_requests(query, machine_id, department_id, start_date, end_date)
+    
+    def minutes(total_seconds, count):
+        return (total_seconds or 0) / 60 / count if count else None
+    
+    by_priority = []
+    totals = {'requests': 0, 'acknowledged': 0, 'ackSeconds': 0, 'resolved': 0, 'resolveSeconds': 0}
+    for priority, requests, acknowledged, ack_total, resolved, resolve_total in query.group_by(MaintenanceRequest.priority).all():
+        by_priority.append({
+            'priority': priority.value if hasattr(priority, 'value') else str(priority),
+            'requestCount': requests,
+            'acknowledgedCount': acknowledged,
+            'resolvedCount': resolved,
+            'mttaMinutes': minutes(ack_total, acknowledged),
+            'mttrMinutes': minutes(resolve_total, resolved)
+        })
+        totals['requests'] += requests
+        totals['acknowledged'] += acknowledged
+        totals['ackSeconds'] += ack_total or 0
+        totals['resolved'] += resolved
+        totals['resolveSeconds'] += resolve_total or 0
+    
+    # Each transition lasts until the next one of the same request or work
+    left_at = func.lead(RequestStatusEvent.changedAt).over(
+        partition_by=(RequestStatusEvent.entityType, RequestStatusEvent.entityId),
+        order_by=(RequestStatusEvent.changedAt, RequestStatusEvent.id)
+    )
+    transitions = _filter_requests(
+        db.query(
+            RequestStatusEvent.entityType.label('entityType'),
+            RequestStatusEvent.toStatus.label('status'),
+            RequestStatusEvent.changedAt.label('enteredAt'),
+            left_at.label('leftAt')
+        ).join(MaintenanceRequest, RequestStatusEvent.requestId == MaintenanceRequest.id),
+        machine_id, department_id, start_date, end_date
+    ).subquery('transitions')
+    status_seconds = seconds_between(transitions.c.enteredAt, transitions.c.leftAt, db)
+    time_in_status = [
+        {
+            'entityType': entity_type,
+            'status': entity_status,
+            'transitions': count,
+            'avgMinutes': minutes(total_seconds, count),
+            'totalMinutes': (total_seconds or 0) / 60
+        }
+        for entity_type, entity_status, count, total_seconds in db.query(
+            transitions.c.entityType,
+            transitions.c.status,
+            func.count(transitions.c.leftAt),
+            func.sum(status_seconds)
+        ).group_by(transitions.c.entityType, transitions.c.status).order_by(transitions.c.entityType, transitions.c.status).all()
+    ]
+    
+    return {
+        'requestCount': totals['requests'],
+        'acknowledgedCount': totals['acknowledged'],
+        'resolvedCount': totals['resolved'],
+        'mttaMinutes': minutes(totals['ackSeconds'], totals['acknowledged']),
+        'mttrMinutes': minutes(totals['resolveSeconds'], totals['resolved']),
+        'byPriority': by_priority,
+        'timeInStatus': time_in_status
+    }
+
+
 # =============================================================================
 # Inventory Analysis Functions
 # =============================================================================
 
+def _stock_as_of(db: Session, as_of: Optional[date]):
+    """
+    A part -> (stock, unit price) function for the end of day as_of.
+
+    Without as_of, or for today or later, that is the current stock and price.
+    For a past day it comes from the stock snapshots (see
+    stock_snapshot_service.stock_as_of), and is None for parts that did not
+    exist yet: created later and without a snapshot or transaction by then.
+    The stock itself is None when it is not known for that day.
+    """
+    if as_of is None or as_of >= utc_day():
+        return lambda part: (part.currentStock, part.unitPrice)
+    levels = stock_as_of(db, as_of)
+    existed_before = end_of_day(as_of)
+    return lambda part: levels.get(part.id) or (
+        (0, part.unitPrice) if part.createdAt is None or part.createdAt.replace(tzinfo=None) < existed_before else None
+    )
+
+
 def get_stock_levels(
     db: Session,
     group_number: Optional[str] = None,
     group_name: Optional[str] = None,
-    location: Optional[str] = None
+    location: Optional[str] = None,
+    as_of: Optional[date] = None
 ) -> List[Dict[str, Any]]:
     """
-    Get current stock levels for spare parts.
+    Get stock levels for spare parts, now or at the end of day as_of.
     
     Returns:
         List of dictionaries with part information and stock levels.
@@ -366,6 +537,7 @@ def get_stock_levels(
         .outerjoin(SparePartCategory)
         .filter(SparePart.isActive == True)
     )
+    stock_of = _stock_as_of(db, as_of)
     
     # Apply filters
     if group_number:
@@ -381,6 +553,10 @@ def get_stock_levels(
     
     result = []
     for part in parts:
+        stock = stock_of(part)
+        if stock is None:
+            continue
+        quantity, unit_price = stock
         result.append({
             'id': part.id,
             'partNumber': part.partNumber,
@@ -388,12 +564,12 @@ def get_stock_levels(
             'description': part.description,
             'categoryNumber': part.category.code if part.category else None,
             'categoryName': part.category.name if part.category else None,
-            'quantity': part.currentStock,
+            'quantity': quantity,
             'minQuantity': part.minimumStock,
             'maxQuantity': part.maximumStock,
-            'unitPrice': part.unitPrice,
+            'unitPrice': unit_price,
             'location': part.location,
-            'status': _calculate_stock_status(part.currentStock, part.minimumStock, part.maximumStock)
+            'status': _calculate_stock_status(quantity, part.minimumStock, part.maximumStock) if quantity is not None else 'UNKNOWN'
         })
     
     return result
@@ -476,10 +652,11 @@ def get_consumption_trends(
 
 def calculate_inventory_valuation(
     db: Session,
-    group_number: Optional[str] = None
+    group_number: Optional[str] = None,
+    as_of: Optional[date] = None
 ) -> Dict[str, Any]:
     """
-    Calculate current inventory valuation.
+    Calculate inventory valuation, now or at the end of day as_of.
     
     Returns:
         Dictionary with valuation data grouped by category.
@@ -490,6 +667,7 @@ def calculate_inventory_valuation(
         .outerjoin(SparePartCategory)
         .filter(SparePart.isActive == True)
     )
+    stock_of = _stock_as_of(db, as_of)
     
     if group_number:
         query = query.filter(SparePartCategory.code == group_number)
@@ -497,10 +675,19 @@ def calculate_inventory_valuation(
     parts = query.all()
     
     total_valuation = 0
+    unknown_count = 0
     by_group = {}
     
     for part in parts:
-        valuation = (part.currentStock or 0) * (part.unitPrice or 0)
+        stock = stock_of(part)
+        if stock is None:
+            continue
+        quantity, unit_price = stock
+        if quantity is None:
+            # Stock on that day is not known; counted, not valued
+            unknown_count += 1
+            continue
+        valuation = quantity * (unit_price or 0)
         total_valuation += valuation
         
         group_key = (part.category.code if part.category else None) or 'Other'
@@ -519,7 +706,8 @@ def calculate_inventory_valuation(
     
     return {
         'totalValuation': total_valuation,
-        'byGroup': list(by_group.values())
+        'byGroup': list(by_group.values()),
+        'unknownPartCount': unknown_count
     }
 
 
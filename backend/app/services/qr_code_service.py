@@ -4,7 +4,8 @@ import uuid
 import base64
 import io
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.machine import Machine
 
 class QRCodeService:
@@ -47,21 +48,21 @@ class QRCodeService:
         return qr_code
     
     @staticmethod
-    def validate_qr_code_uniqueness(db: Session, qr_code: str, exclude_id: Optional[int] = None) -> bool:
+    async def validate_qr_code_uniqueness(db: AsyncSession, qr_code: str, exclude_id: Optional[int] = None) -> bool:
         """Check if QR code is unique in the database"""
-        query = db.query(Machine).filter(Machine.qrCode == qr_code)
+        query = select(Machine.id).filter(Machine.qrCode == qr_code)
         if exclude_id:
             query = query.filter(Machine.id != exclude_id)
         
-        return query.first() is None
+        return (await db.scalar(query.limit(1))) is None
     
     @staticmethod
-    def generate_qr_code_for_machine(db: Session, machine_id: int, exclude_id: Optional[int] = None) -> str:
+    async def generate_qr_code_for_machine(db: AsyncSession, machine_id: int, exclude_id: Optional[int] = None) -> str:
         """Generate a unique QR code for a machine"""
         max_attempts = 10
         for _ in range(max_attempts):
             qr_code = QRCodeService.generate_unique_qr_code()
-            if QRCodeService.validate_qr_code_uniqueness(db, qr_code, exclude_id):
+            if await QRCodeService.validate_qr_code_uniqueness(db, qr_code, exclude_id):
                 return qr_code
         
         raise ValueError("Unable to generate unique QR code after multiple attempts")
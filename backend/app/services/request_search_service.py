@@ -0,0 +1,234 @@
+"""
+Full-text search over maintenance request titles and descriptions.
+
+On MySQL the search runs as MATCH ... AGAINST in boolean mode on the
+ft_maintenance_requests_title_description FULLTEXT index and is ranked by
+relevance. Other databases (SQLite in development) use an in-process
+inverted index instead. It is built from the table on the first search and
+updated by the create/update endpoints. Every later search also picks up
+rows inserted since, and rows whose updatedAt moved, so edits made through
+other worker processes or scripts reach it too.
+
+Both paths match whole words or word prefixes ("bear" finds "bearing"), and
+every word of the search has to match.
+
+The fallback does not put the matching ids into the page query. The index
+keeps each request's requestedDate, so the matches are ranked and paged in
+Python (see SearchMatches); the list's other filters, when there are any,
+are applied with one query over the id range the matches span. Only the ids
+of one page reach the query that loads the rows.
+"""
+import asyncio
+import re
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_engine
+from app.models.maintenance_request import MaintenanceRequest
+from app.utils.pagination import decode_cursor, encode_cursor
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Words shorter than innodb_ft_min_token_size are not in the FULLTEXT index
+MIN_FULLTEXT_TOKEN = 3
+TITLE_WEIGHT = 2
+LOAD_BATCH_SIZE = 10000
+# Rows updated this long before the newest updatedAt seen are loaded again, in
+# case their transaction committed after a later one
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [token.lower() for token in TOKEN_PATTERN.findall(text or "")]
+
+
+def uses_fulltext() -> bool:
+    return async_engine.dialect.name == "mysql"
+
+
+class SearchMatch(NamedTuple):
+    id: int
+    score: int
+    requestedDate: datetime
+
+
+class InvertedIndex:
+    def __init__(self):
+        self._title: Dict[str, Set[int]] = {}
+        self._description: Dict[str, Set[int]] = {}
+        self._documents: Dict[int, Tuple[Set[str], Set[str]]] = {}
+        self._requested_dates: Dict[int, datetime] = {}
+        self._vocabulary: List[str] = []
+        self._max_id = 0
+        self._updated_since: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    def add(self, request_id: int, title: Optional[str], description: Optional[str], requested_date: datetime):
+        """Index a request, replacing whatever was indexed for it before."""
+        self.remove(request_id)
+        title_tokens = set(tokenize(title))
+        description_tokens = set(tokenize(description))
+        self._documents[request_id] = (title_tokens, description_tokens)
+        self._requested_dates[request_id] = requested_date
+        for postings, tokens in ((self._title, title_tokens), (self._description, description_tokens)):
+            for token in tokens:
+                if token not in self._title and token not in self._description:
+                    insort(self._vocabulary, token)
+                postings.setdefault(token, set()).add(request_id)
+
+    def remove(self, request_id: int):
+        document = self._documents.pop(request_id, None)
+        self._requested_dates.pop(request_id, None)
+        if document is None:
+            return
+        for postings, tokens in zip((self._title, self._description), document):
+            for token in tokens:
+                postings.get(token, set()).discard(request_id)
+
+    def _load(self, rows):
+        for request_id, title, description, requested_date, updated_at in rows:
+            self.add(request_id, title, description, requested_date)
+            if self._updated_since is None or updated_at > self._updated_since:
+                self._updated_since = updated_at
+
+    async def sync(self, db: AsyncSession):
+        """Load rows added to the table or updated since the last sync."""
+        columns = (
+            MaintenanceRequest.id, MaintenanceRequest.title, MaintenanceRequest.description,
+            MaintenanceRequest.requestedDate, MaintenanceRequest.updatedAt
+        )
+        async with self._lock:
+            if self._updated_since is not None:
+                result = await db.execute(
+                    select(*columns).filter(
+                        MaintenanceRequest.id <= self._max_id,
+                        MaintenanceRequest.updatedAt >= self._updated_since - SYNC_OVERLAP
+                    )
+                )
+                self._load(result.all())
+            while True:
+                result = await db.execute(
+                    select(*columns)
+                    .filter(MaintenanceRequest.id > self._max_id)
+                    .order_by(MaintenanceRequest.id)
+                    .limit(LOAD_BATCH_SIZE)
+                )
+                rows = result.all()
+                self._load(rows)
+                if rows:
+                    self._max_id = rows[-1][0]
+                if len(rows) < LOAD_BATCH_SIZE:
+                    return
+
+    def _prefix_matches(self, postings: Dict[str, Set[int]], term: str) -> Set[int]:
+        matches: Set[int] = set()
+        index = bisect_left(self._vocabulary, term)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(term):
+            matches |= postings.get(self._vocabulary[index], set())
+            index += 1
+        return matches
+
+    def search(self, terms: List[str]) -> List[SearchMatch]:
+        """Requests matching every term, scored; title hits weigh more."""
+        scores: Optional[Dict[int, int]] = None
+        for term in terms:
+            term_scores = {request_id: TITLE_WEIGHT for request_id in self._prefix_matches(self._title, term)}
+            for request_id in self._prefix_matches(self._description, term):
+                term_scores[request_id] = term_scores.get(request_id, 0) + 1
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {request_id: scores[request_id] + score for request_id, score in term_scores.items() if request_id in scores}
+            if not scores:
+                return []
+        return [
+            SearchMatch(request_id, score, self._requested_dates[request_id])
+            for request_id, score in (scores or {}).items()
+        ]
+
+
+request_search_index = InvertedIndex()
+
+
+def index_request(request: MaintenanceRequest):
+    """Keep the fallback index current after a create or update."""
+    if not uses_fulltext():
+        request_search_index.add(request.id, request.title, request.description, request.requestedDate)
+
+
+class SearchMatches:
+    """Fallback search results that passed the list's filters, ranked and paged in Python."""
+
+    def __init__(self, matches: List[SearchMatch]):
+        self._matches = matches
+
+    @property
+    def total(self) -> int:
+        return len(self._matches)
+
+    def page(self, offset: int, limit: int) -> List[int]:
+        """Ids of an offset page, by relevance, then date, newest first."""
+        ranked = sorted(self._matches, key=lambda m: (m.score, m.requestedDate, m.id), reverse=True)
+        return [m.id for m in ranked[offset:offset + limit]]
+
+    def keyset_page(self, cursor: Optional[str], limit: int) -> Tuple[List[int], Optional[str]]:
+        """Ids of a cursor page and the next cursor; cursor mode keeps date order."""
+        ordered = sorted(self._matches, key=lambda m: (m.requestedDate, m.id), reverse=True)
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            ordered = [m for m in ordered if (m.requestedDate, m.id) < (value, last_id)]
+        page = ordered[:limit]
+        next_cursor = encode_cursor(page[-1].requestedDate, page[-1].id) if len(ordered) > limit else None
+        return [m.id for m in page], next_cursor
+
+
+async def _filter_matches(db: AsyncSession, query, matches: List[SearchMatch]) -> List[SearchMatch]:
+    """Keep the matches that also pass the query's filters.
+
+    One query returns the ids in the range the matches span that pass the
+    filters; no match ids are bound into it.
+    """
+    if query.whereclause is None or not matches:
+        return matches
+    ids = [m.id for m in matches]
+    result = await db.scalars(
+        select(MaintenanceRequest.id)
+        .where(query.whereclause, MaintenanceRequest.id.between(min(ids), max(ids)))
+    )
+    passing = set(result.all())
+    return [m for m in matches if m.id in passing]
+
+
+async def apply_search(db: AsyncSession, query, search: str):
+    """Filter a MaintenanceRequest select by search text.
+
+    Returns (query, relevance, matches). With FULLTEXT, query is filtered
+    and relevance is the expression to order by. Searches without indexable
+    words filter query with LIKE and have no relevance. On the fallback
+    index, query is returned as it was and matches holds the ranked results
+    (SearchMatches); page those and load the page's ids.
+    """
+    terms = tokenize(search)
+
+    if uses_fulltext():
+        terms = [term for term in terms if len(term) >= MIN_FULLTEXT_TOKEN]
+        if terms:
+            relevance = match(
+                MaintenanceRequest.title,
+                MaintenanceRequest.description,
+                against=" ".join(f"+{term}*" for term in terms),
+            ).in_boolean_mode()
+            return query.filter(relevance > 0), relevance, None
+    elif terms:
+        await request_search_index.sync(db)
+        matches = request_search_index.search(terms)
+        return query, None, SearchMatches(await _filter_matches(db, query, matches))
+
+    return query.filter(
+        MaintenanceRequest.title.contains(search) |
+        MaintenanceRequest.description.contains(search)
+    ), None, None
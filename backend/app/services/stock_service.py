@@ -0,0 +1,170 @@
+"""
+Stock service for changing spare part stock levels.
+
+currentStock and reservedStock are changed with a single conditional UPDATE
+rather than being read into Python, modified and written back, so concurrent
+approvals, issues, returns and inventory transactions on the same part cannot
+overwrite each other.
+
+Units are reserved when a request is approved and released when it is
+issued, rejected, or left unissued by a work that closes.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from fastapi import Request
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from app.models.spare_part import SparePart
+from app.models.spare_parts_request import SparePartsRequest, SparePartsRequestStatus
+from app.services.audit_service import activity_log_values, log_activities
+
+
+# version is bumped by every UPDATE here as well, so a PATCH based on an older
+# read of the part fails its version check (see SparePart.version)
+STOCK_ATTRIBUTES = ["currentStock", "reservedStock", "version"]
+
+
+def _release(quantity: int):
+    """reservedStock minus quantity, floored at zero."""
+    return case(
+        (SparePart.reservedStock >= quantity, SparePart.reservedStock - quantity),
+        else_=0
+    )
+
+
+def change_stock(db: Session, spare_part: SparePart, delta: int, reserved: int = 0) -> Optional[Tuple[int, int]]:
+    """
+    Add delta (negative to take stock out) to a part's currentStock.
+
+    The stock never goes below zero: a decrement larger than the stock on hand
+    matches no row and returns None. Otherwise returns the (before, after)
+    stock. reserved is the number of reserved units the change consumes (an
+    approved request being issued); a decrement that consumes no reservation
+    may only take available units, so it cannot take stock held for approved
+    requests. Either way the part's stock attributes are refreshed to the
+    stored values.
+    """
+    conditions = [SparePart.id == spare_part.id]
+    if delta < 0:
+        on_hand = SparePart.currentStock if reserved else SparePart.availableStock
+        conditions.append(on_hand >= -delta)
+    values = {"currentStock": SparePart.currentStock + delta, "version": SparePart.version + 1}
+    if reserved:
+        values["reservedStock"] = _release(reserved)
+    result = db.execute(
+        update(SparePart)
+        .where(*conditions)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    # The UPDATE holds the row lock until commit, so this reads our own write
+    db.refresh(spare_part, STOCK_ATTRIBUTES)
+    if result.rowcount != 1:
+        return None
+    return spare_part.currentStock - delta, spare_part.currentStock
+
+
+def reserve_stock(db: Session, spare_part: SparePart, quantity: int) -> bool:
+    """
+    Reserve quantity units of a part for an approved request.
+
+    Fails (returns False) when fewer than quantity units are available, that is
+    on hand and not already reserved.
+    """
+    result = db.execute(
+        update(SparePart)
+        .where(SparePart.id == spare_part.id, SparePart.availableStock >= quantity)
+        .values(reservedStock=SparePart.reservedStock + quantity, version=SparePart.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.refresh(spare_part, STOCK_ATTRIBUTES)
+    return result.rowcount == 1
+
+
+def release_stock(db: Session, spare_part: SparePart, quantity: int) -> None:
+    """Give back units reserved by a request that will no longer be issued."""
+    db.execute(
+        update(SparePart)
+        .where(SparePart.id == spare_part.id)
+        .values(reservedStock=_release(quantity), version=SparePart.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.refresh(spare_part, STOCK_ATTRIBUTES)
+
+
+def set_stock(db: Session, spare_part: SparePart, quantity: int) -> Optional[Tuple[int, int]]:
+    """
+    Set a part's currentStock to an absolute quantity (stock count adjustment).
+
+    The row is locked before the current stock is read, so the returned
+    (before, after) pair is not affected by concurrent changes. A quantity
+    below the units reserved for approved requests is refused with None.
+    """
+    db.refresh(spare_part, STOCK_ATTRIBUTES, with_for_update=True)
+    if quantity < spare_part.reservedStock:
+        return None
+    before_quantity = spare_part.currentStock
+    spare_part.currentStock = quantity
+    db.flush()
+    return before_quantity, quantity
+
+
+def reject_unissued_requests(
+    db: Session,
+    work_ids: Iterable[int],
+    user_id: int,
+    reason: str,
+    request: Optional[Request] = None
+) -> List[Tuple[int, int]]:
+    """
+    Reject the pending and approved requests of works that were closed before they were issued.
+
+    Approved requests give their reserved units back, so a completed or
+    cancelled work never holds stock. Returns the (request id, work id) of the
+    rejected requests, for the change events sent after the commit.
+    """
+    work_ids = list(work_ids)
+    if not work_ids:
+        return []
+    spare_parts_requests = db.query(SparePartsRequest).filter(
+        SparePartsRequest.maintenanceWorkId.in_(work_ids),
+        SparePartsRequest.status.in_([SparePartsRequestStatus.PENDING, SparePartsRequestStatus.APPROVED])
+    ).order_by(SparePartsRequest.id).with_for_update().populate_existing().all()
+
+    reserved = defaultdict(int)
+    for spare_parts_request in spare_parts_requests:
+        if spare_parts_request.status == SparePartsRequestStatus.APPROVED:
+            reserved[spare_parts_request.sparePartId] += spare_parts_request.quantityRequested
+    # Parts in id order, like every other path that locks several of them
+    for spare_part_id, quantity in sorted(reserved.items()):
+        db.execute(
+            update(SparePart)
+            .where(SparePart.id == spare_part_id)
+            .values(reservedStock=_release(quantity), version=SparePart.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    now = datetime.utcnow()
+    activity_logs = []
+    for spare_parts_request in spare_parts_requests:
+        old_status = spare_parts_request.status.value
+        spare_parts_request.status = SparePartsRequestStatus.REJECTED
+        spare_parts_request.approvedBy = user_id
+        spare_parts_request.approvedAt = now
+        spare_parts_request.rejectionReason = reason
+        activity_logs.append(activity_log_values(
+            userId=user_id,
+            action="REJECT",
+            entityType="SPARE_PARTS_REQUEST",
+            entityId=spare_parts_request.id,
+            description=f"Spare parts request rejected automatically: {reason}",
+            oldValues={"status": old_status},
+            newValues={"status": "REJECTED", "approvedBy": user_id, "rejectionReason": reason},
+            request=request,
+            timestamp=now
+        ))
+    log_activities(db, activity_logs)
+    db.flush()
+    return [(spare_parts_request.id, spare_parts_request.maintenanceWorkId) for spare_parts_request in spare_parts_requests]
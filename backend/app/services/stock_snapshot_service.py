@@ -0,0 +1,338 @@
+"""
+Daily stock snapshots of the spare parts, for point-in-time inventory reports.
+
+sparepart_stock_snapshots holds one row per part per UTC day: the part's stock
+at the end of that day and its unit price. A NULL quantity means the stock on
+that day is not known (see backfill_stock_snapshots). The rows come from:
+- the stock write paths, which call record_stock_snapshots so today's row
+  always matches the part's current stock;
+- the nightly job (python -m app.cli.stock_snapshots take), which writes
+  today's row for every part, including the ones that did not move;
+- the backfill (python -m app.cli.stock_snapshots backfill), which walks
+  inventory_transactions back for the days before the table existed.
+
+stock_as_of answers "what was the stock at the end of day D" from each part's
+latest snapshot on or before D plus the ledger rows dated after it, so a day
+without a row only makes the delta longer. A transaction dated before today
+drops the part's rows from its day on, and reads fall back to the row before.
+Stock is never reported below zero: a level that would be is unknown.
+
+Nothing here commits; the caller commits.
+"""
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, and_, delete, exists, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.activity_log import ActivityLog
+from app.models.inventory_transaction import InventoryTransaction, TransactionType
+from app.models.spare_part import SparePart
+from app.models.sparepart_stock_snapshot import SparePartStockSnapshot
+from app.utils.uploads import chunked
+
+SNAPSHOT_CHUNK_SIZE = 500
+
+
+def utc_day(moment: Optional[datetime] = None) -> date:
+    """UTC calendar day of moment (now by default). Snapshots and the ledger are bucketed by it."""
+    if moment is None:
+        return datetime.utcnow().date()
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+def end_of_day(day: date) -> datetime:
+    """First moment after day, as the naive UTC datetimes the tables store."""
+    return datetime.combine(day + timedelta(days=1), time.min)
+
+
+def _apply(stock: Optional[int], transaction_type: TransactionType, quantity: int) -> Optional[int]:
+    """
+    Stock after one ledger row: ADJUSTMENT sets it, IN adds, OUT and TRANSFER take out.
+
+    None is unknown stock, and stays unknown until an ADJUSTMENT. A result
+    below zero means the starting level was wrong, so it is unknown too.
+    """
+    if transaction_type == TransactionType.ADJUSTMENT:
+        return quantity
+    if stock is None:
+        return None
+    stock = stock + quantity if transaction_type == TransactionType.IN else stock - quantity
+    return stock if stock >= 0 else None
+
+
+def _unapply(stock: Optional[int], transaction, before_adjustment: Optional[int]) -> Optional[int]:
+    """
+    Stock before one ledger row, given the stock after it (walking the ledger backwards).
+
+    An ADJUSTMENT does not say what it replaced; before_adjustment is the
+    stock it found, from its activity log, or None when that is not known.
+    """
+    if transaction.transactionType == TransactionType.ADJUSTMENT:
+        return before_adjustment
+    if stock is None:
+        return None
+    if transaction.transactionType == TransactionType.IN:
+        stock -= transaction.quantity
+    else:
+        stock += transaction.quantity
+    return stock if stock >= 0 else None
+
+
+def _upsert_statement(db: Session, day: Optional[date] = None, part_ids: Optional[Sequence[int]] = None):
+    """
+    INSERT of snapshot rows that overwrites the quantity and price of an existing (part, day).
+
+    Given day and part_ids it copies those parts' current stock and price into
+    the day's rows; otherwise it takes executemany values.
+    """
+    snapshots = SparePartStockSnapshot.__table__
+    mysql = db.get_bind().dialect.name == "mysql"
+    if mysql:
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(snapshots)
+    if part_ids is not None:
+        statement = statement.from_select(
+            ["sparePartId", "snapshotDate", "quantity", "unitPrice"],
+            select(SparePart.id, literal(day, Date), SparePart.currentStock, SparePart.unitPrice)
+            .where(SparePart.id.in_(part_ids))
+        )
+    new_row = statement.inserted if mysql else statement.excluded
+    values = {"quantity": new_row.quantity, "unitPrice": new_row.unitPrice, "updatedAt": func.now()}
+    if mysql:
+        return statement.on_duplicate_key_update(values)
+    return statement.on_conflict_do_update(
+        index_elements=[snapshots.c.sparePartId, snapshots.c.snapshotDate], set_=values
+    )
+
+
+def record_stock_snapshots(db: Session, part_ids: Iterable[int], since: Optional[datetime] = None) -> None:
+    """
+    Bring today's snapshot of each part in line with its current stock.
+
+    Called by the stock write paths after they change currentStock. since is
+    the earliest transactionDate among the ledger rows just written: when it
+    is before today, the parts' rows from that day on do not include it and
+    are dropped.
+    """
+    part_ids = list(part_ids)
+    if not part_ids:
+        return
+    # Stock changed through the ORM must reach the database before the INSERT ... SELECT
+    db.flush()
+    today = utc_day()
+    if since is not None and utc_day(since) < today:
+        db.execute(
+            delete(SparePartStockSnapshot)
+            .where(
+                SparePartStockSnapshot.sparePartId.in_(part_ids),
+                SparePartStockSnapshot.snapshotDate >= utc_day(since)
+            )
+            .execution_options(synchronize_session=False)
+        )
+    for chunk in chunked(part_ids, SNAPSHOT_CHUNK_SIZE):
+        db.execute(_upsert_statement(db, today, chunk))
+
+
+def take_stock_snapshots(db: Session) -> int:
+    """
+    Write today's row for every spare part; returns the number of parts.
+
+    This is the nightly job. The write paths keep today's row current, so it
+    can run at any time of day; run shortly after midnight UTC it gives each
+    part its row for the new day.
+    """
+    part_ids = db.scalars(select(SparePart.id).order_by(SparePart.id)).all()
+    today = utc_day()
+    for chunk in chunked(part_ids, SNAPSHOT_CHUNK_SIZE):
+        db.execute(_upsert_statement(db, today, chunk))
+    return len(part_ids)
+
+
+def _end_of_day_stock(
+    current_stock: int,
+    created_day: Optional[date],
+    transactions,
+    adjustment_before: Dict[int, int]
+) -> Dict[date, Optional[int]]:
+    """
+    End-of-day stock of one part for each day it has transactions, and its creation day.
+
+    The ledger is walked back from current_stock, so stock the part got
+    outside the ledger (opening stock typed into the part) is carried back to
+    its creation. Each ADJUSTMENT is passed using the stock it replaced,
+    adjustment_before[transaction id]. Without that, or when the walk would go
+    below zero, the days before are unknown (None) rather than guessed.
+    """
+    levels = {}
+    stock = current_stock
+    for transaction in reversed(transactions):
+        if transaction.transactionType == TransactionType.ADJUSTMENT:
+            # Its quantity is the stock after it, whatever is known of the later rows
+            stock = transaction.quantity
+        day = utc_day(transaction.transactionDate)
+        # Walking backwards, the first row seen for a day is its last one
+        if day not in levels:
+            levels[day] = stock
+        stock = _unapply(stock, transaction, adjustment_before.get(transaction.id))
+
+    first_day = min(levels) if levels else None
+    if created_day is not None and (first_day is None or created_day < first_day):
+        levels[created_day] = stock
+    return levels
+
+
+def _adjustment_before_quantities(db: Session, transaction_ids: Sequence[int]) -> Dict[int, int]:
+    """
+    Stock each ADJUSTMENT replaced, keyed by transaction id, for those that recorded it.
+
+    create_inventory_transaction logs it as oldValues.quantity.before; imported
+    adjustments are logged against the part without the transaction id, so
+    they have no entry here.
+    """
+    before = {}
+    for chunk in chunked(list(transaction_ids), SNAPSHOT_CHUNK_SIZE):
+        for entity_id, old_values in db.execute(
+            select(ActivityLog.entityId, ActivityLog.oldValues)
+            .where(
+                ActivityLog.entityType == "INVENTORY_TRANSACTION",
+                ActivityLog.action == "CREATE",
+                ActivityLog.entityId.in_(chunk)
+            )
+        ):
+            try:
+                quantity = json.loads(old_values)["quantity"]["before"]
+            except (TypeError, ValueError, KeyError):
+                continue
+            if isinstance(quantity, int) and quantity >= 0:
+                before[entity_id] = quantity
+    return before
+
+
+def backfill_stock_snapshots(db: Session, part_ids: Sequence[int]) -> int:
+    """
+    Write the snapshot rows the ledger implies for the given parts; returns the number of rows.
+
+    The parts are locked while their ledger is read, so the walk back and the
+    current stock it starts from agree. Rows are written for each day a part
+    has transactions and for the day it was created; today's row is taken
+    from the current stock. Days whose stock cannot be worked out get a NULL
+    quantity, so reads report them as unknown instead of replaying the ledger
+    from zero. Existing rows for those days are overwritten. There is no
+    price history, so every row carries the part's current price.
+    """
+    parts = db.execute(
+        select(SparePart.id, SparePart.currentStock, SparePart.unitPrice, SparePart.createdAt)
+        .where(SparePart.id.in_(part_ids))
+        .order_by(SparePart.id)
+        .with_for_update()
+    ).all()
+    ledgers: Dict[int, List] = {part.id: [] for part in parts}
+    for transaction in db.execute(
+        select(
+            InventoryTransaction.id, InventoryTransaction.sparePartId, InventoryTransaction.transactionType,
+            InventoryTransaction.quantity, InventoryTransaction.transactionDate
+        )
+        .where(InventoryTransaction.sparePartId.in_(ledgers))
+        .order_by(InventoryTransaction.sparePartId, InventoryTransaction.transactionDate, InventoryTransaction.id)
+    ):
+        ledgers[transaction.sparePartId].append(transaction)
+    adjustment_before = _adjustment_before_quantities(db, [
+        transaction.id
+        for ledger in ledgers.values()
+        for transaction in ledger
+        if transaction.transactionType == TransactionType.ADJUSTMENT
+    ])
+
+    today = utc_day()
+    values = []
+    for part in parts:
+        created_day = utc_day(part.createdAt) if part.createdAt else None
+        levels = _end_of_day_stock(part.currentStock, created_day, ledgers[part.id], adjustment_before)
+        values.extend(
+            {"sparePartId": part.id, "snapshotDate": day, "quantity": quantity, "unitPrice": part.unitPrice}
+            for day, quantity in levels.items()
+            if day < today
+        )
+    if values:
+        db.execute(_upsert_statement(db), values)
+    if parts:
+        db.execute(_upsert_statement(db, today, [part.id for part in parts]))
+    return len(values) + len(parts)
+
+
+def stock_as_of(db: Session, as_of: date) -> Dict[int, Tuple[int, Optional[float]]]:
+    """
+    (stock, unit price) of the parts at the end of day as_of, keyed by part id.
+
+    Each part starts from its latest snapshot on or before as_of and replays
+    its transactions dated after that snapshot's day, up to the end of as_of.
+    Parts without such a snapshot replay their ledger from zero and are
+    priced at their current price. Parts with neither are left out; their
+    stock is zero. The stock is None where it is not known: a NULL snapshot
+    not followed by an ADJUSTMENT, or a replay that went below zero.
+    """
+    latest = (
+        select(
+            SparePartStockSnapshot.sparePartId,
+            func.max(SparePartStockSnapshot.snapshotDate).label("snapshotDate")
+        )
+        .where(SparePartStockSnapshot.snapshotDate <= as_of)
+        .group_by(SparePartStockSnapshot.sparePartId)
+        .subquery()
+    )
+    levels = {}
+    first_day = None
+    for row in db.execute(
+        select(
+            SparePartStockSnapshot.sparePartId, SparePartStockSnapshot.snapshotDate,
+            SparePartStockSnapshot.quantity, SparePartStockSnapshot.unitPrice
+        )
+        .join(latest, and_(
+            latest.c.sparePartId == SparePartStockSnapshot.sparePartId,
+            latest.c.snapshotDate == SparePartStockSnapshot.snapshotDate
+        ))
+    ):
+        levels[row.sparePartId] = (row.quantity, row.unitPrice)
+        first_day = row.snapshotDate if first_day is None else min(first_day, row.snapshotDate)
+
+    transactions = InventoryTransaction
+    ledger_columns = (transactions.sparePartId, transactions.transactionType, transactions.quantity)
+    ordering = (transactions.sparePartId, transactions.transactionDate, transactions.id)
+    delta_queries = []
+    if first_day is not None and first_day < as_of:
+        # The range on transactionDate bounds the index scan; DATE() then
+        # keeps each part's rows after its own snapshot
+        delta_queries.append(
+            select(*ledger_columns, literal(None).label("unitPrice"))
+            .join(latest, latest.c.sparePartId == transactions.sparePartId)
+            .where(
+                transactions.transactionDate >= end_of_day(first_day),
+                transactions.transactionDate < end_of_day(as_of),
+                func.date(transactions.transactionDate) > latest.c.snapshotDate
+            )
+            .order_by(*ordering)
+        )
+    delta_queries.append(
+        select(*ledger_columns, SparePart.unitPrice)
+        .join(SparePart, SparePart.id == transactions.sparePartId)
+        .where(
+            transactions.transactionDate < end_of_day(as_of),
+            ~exists().where(
+                SparePartStockSnapshot.sparePartId == transactions.sparePartId,
+                SparePartStockSnapshot.snapshotDate <= as_of
+            )
+        )
+        .order_by(*ordering)
+    )
+    for query in delta_queries:
+        for row in db.execute(query):
+            quantity, unit_price = levels.get(row.sparePartId, (0, row.unitPrice))
+            levels[row.sparePartId] = (_apply(quantity, row.transactionType, row.quantity), unit_price)
+    return levels
@@ -0,0 +1,90 @@
+"""
+Keyset (cursor) pagination helpers.
+
+List endpoints keep their page/page_size offset mode; passing cursor= switches
+to seeking on (sort column, id), which costs the same for every page. The
+cursor is an opaque base64 token holding the sort value and id of the last
+row returned.
+
+NULL sort values follow MySQL and SQLite ordering: first when ascending, last
+when descending.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(value: Any, row_id: int) -> str:
+    if isinstance(value, datetime):
+        payload = {"t": "datetime", "v": value.isoformat(), "id": row_id}
+    elif isinstance(value, date):
+        payload = {"t": "date", "v": value.isoformat(), "id": row_id}
+    else:
+        payload = {"v": getattr(value, "value", value), "id": row_id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = payload["v"]
+        if payload.get("t") == "datetime":
+            value = datetime.fromisoformat(value)
+        elif payload.get("t") == "date":
+            value = date.fromisoformat(value)
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(query, sort_column, id_column, descending: bool, cursor: Optional[str]):
+    """Order by (sort_column, id) and, when a cursor is given, seek past it.
+
+    Works for both ORM Query and select() objects.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        if descending:
+            if value is None:
+                condition = and_(sort_column.is_(None), id_column < last_id)
+            else:
+                condition = or_(
+                    sort_column < value,
+                    and_(sort_column == value, id_column < last_id),
+                    sort_column.is_(None),
+                )
+        else:
+            if value is None:
+                condition = or_(
+                    and_(sort_column.is_(None), id_column > last_id),
+                    sort_column.isnot(None),
+                )
+            else:
+                condition = or_(
+                    sort_column > value,
+                    and_(sort_column == value, id_column > last_id),
+                )
+        query = query.filter(condition)
+
+    if descending:
+        return query.order_by(sort_column.desc(), id_column.desc())
+    return query.order_by(sort_column.asc(), id_column.asc())
+
+
+def keyset_page(rows: Sequence, limit: int, sort_value: Callable[[Any], Any]) -> Tuple[List, Optional[str]]:
+    """Trim the extra look-ahead row and build nextCursor from the last row kept.
+
+    Fetch limit + 1 rows so the presence of a following page is known without
+    a count.
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort_value(last), last.id)
@@ -0,0 +1,124 @@
+"""
+Row-by-row reading of CSV and XLSX files for the bulk imports.
+
+Rows are parsed as they are iterated, so an import never holds the whole file
+in memory. The first row is the header. Each data row comes back as a dict
+keyed by the stripped header names, with blank cells left out and blank rows
+skipped. CSV cells are strings. XLSX cells are strings too, except dates,
+which openpyxl already parses.
+"""
+import csv
+import io
+import os
+from datetime import date
+from itertools import islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+
+T = TypeVar("T")
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Split an iterable into lists of at most size items without materializing it."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validation_message(error: ValidationError) -> str:
+    """One-line description of why a row failed its schema, for the import error reports."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" if item['loc'] else item['msg']
+        for item in error.errors()
+    )
+
+
+def _csv_rows(file: IO[bytes]) -> Iterator[Sequence[Any]]:
+    # utf-8-sig drops the byte order mark Excel puts in front of "CSV UTF-8" files
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV files must be UTF-8 encoded")
+    except csv.Error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {e}")
+    finally:
+        # Leave the upload's own file object open for FastAPI to close
+        if not file.closed:
+            text.detach()
+
+
+def _xlsx_cell(value: Any) -> Any:
+    if isinstance(value, bool) or isinstance(value, date) or value is None:
+        return value
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _xlsx_rows(file: IO[bytes]) -> Iterator[Sequence[Any]]:
+    from openpyxl import load_workbook
+
+    try:
+        # read_only streams the sheet XML instead of building the whole workbook
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid XLSX file")
+    try:
+        for values in workbook.active.iter_rows(values_only=True):
+            yield [_xlsx_cell(value) for value in values]
+    finally:
+        workbook.close()
+
+
+class SpreadsheetRows:
+    """
+    The data rows of a .csv or .xlsx file, parsed as they are iterated.
+
+    The header is read up front, so a file that is not a spreadsheet or lacks
+    a required column fails on construction (415/400) before any row is
+    processed. columns is the header. Iterating yields (row number, cells);
+    the header is row 1.
+    """
+
+    def __init__(self, file: IO[bytes], filename: Optional[str], content_type: Optional[str] = None,
+                 required: Sequence[str] = ()):
+        extension = os.path.splitext(filename or "")[1].lower()
+        if extension == ".xlsx" or content_type == XLSX_CONTENT_TYPE:
+            self._rows = _xlsx_rows(file)
+        elif extension == ".csv" or content_type in CSV_CONTENT_TYPES:
+            self._rows = _csv_rows(file)
+        else:
+            raise HTTPException(status_code=415, detail="Upload a .csv or .xlsx file")
+
+        header = next(self._rows, None)
+        if header is None:
+            raise HTTPException(status_code=400, detail="The file is empty")
+        self.columns = [str(name).strip() if name is not None else "" for name in header]
+        missing = [name for name in required if name not in self.columns]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(missing)}")
+
+    def __iter__(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for row_number, values in enumerate(self._rows, start=2):
+            cells = {}
+            for name, value in zip(self.columns, values):
+                if isinstance(value, str):
+                    value = value.strip()
+                if name and value is not None and value != "":
+                    cells[name] = value
+            if cells:
+                yield row_number, cells
+
+
+def iter_upload_rows(upload: UploadFile, required: Sequence[str] = ()) -> SpreadsheetRows:
+    """Rows of an uploaded .csv or .xlsx file (see SpreadsheetRows)."""
+    return SpreadsheetRows(upload.file, upload.filename, upload.content_type, required)
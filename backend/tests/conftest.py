@@ -0,0 +1,158 @@
+"""
+Shared fixtures: the API over a throwaway SQLite database.
+
+DATABASE_URL is pointed at a temporary file before the app is imported. The
+schema comes from the models (the early migrations only run on MySQL), and
+one user per role is seeded with the password "secret"; log in through the
+auth fixture. The database lives for the whole session, so tests create the
+rows they need instead of counting on an empty table.
+
+Run from backend/: pytest
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+_db_dir = tempfile.mkdtemp(prefix="maintenance-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["ASYNC_DATABASE_URL"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ["EVENT_BROKER_URL"] = ""
+# Keep principals cached for the whole run so query counts do not depend on timing
+os.environ["PRINCIPAL_CACHE_TTL_SECONDS"] = "3600"
+os.environ["PRINCIPAL_VERSION_CHECK_SECONDS"] = "3600"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.principal_cache import PRINCIPALS_VERSION
+from app.main import app
+from app.models import (
+    Attachment,
+    CacheVersion,
+    Department,
+    Machine,
+    MaintenanceRequest,
+    RequestPriority,
+    RequestStatus,
+    SparePart,
+    SparePartCategory,
+    User,
+    UserRole,
+)
+
+PASSWORD = "secret"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        for role in UserRole:
+            db.add(User(username=role.value.lower(), fullName=role.value.title(), password=PASSWORD, role=role))
+        db.add(CacheVersion(name=PRINCIPALS_VERSION, version=0))
+        db.add(Department(name="Press shop"))
+        db.add(SparePartCategory(name="Bearings", code="BR"))
+        db.commit()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def auth(client):
+    """auth(role) -> Authorization headers for the seeded user with that role."""
+    tokens = {}
+
+    def headers(role: str = "ADMIN") -> dict:
+        if role not in tokens:
+            response = client.post("/api/v1/auth/login", json={"username": role.lower(), "password": PASSWORD})
+            assert response.status_code == 200, response.text
+            tokens[role] = {"Authorization": "Bearer " + response.json()["tokens"]["access_token"]}
+            # Load the principal cache so query counts of later calls start warm
+            assert client.get("/api/v1/auth/me", headers=tokens[role]).status_code == 200
+        return tokens[role]
+
+    return headers
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+def user_id(db, role: str) -> int:
+    return db.query(User.id).filter(User.username == role.lower()).scalar()
+
+
+def add_attachments(db, request_ids, role="SUPERVISOR"):
+    uploaded_by = user_id(db, role)
+    db.add_all(
+        Attachment(
+            fileName=f"photo-{request_id}.jpg", originalFileName="photo.jpg", filePath=f"uploads/photo-{request_id}.jpg",
+            fileSize=1024, mimeType="image/jpeg", entityType="MAINTENANCE_REQUEST", entityId=request_id,
+            uploadedById=uploaded_by
+        )
+        for request_id in request_ids
+    )
+    db.commit()
+
+
+@pytest.fixture
+def machine(db):
+    """A fresh machine, so list filters on machineId only see this test's requests."""
+    department_id = db.query(Department.id).scalar()
+    count = db.query(Machine).count()
+    machine = Machine(qrCode=f"TEST-{count + 1:05d}", name=f"Test machine {count + 1}", departmentId=department_id)
+    db.add(machine)
+    db.commit()
+    return machine
+
+
+@pytest.fixture
+def make_requests(db, machine):
+    """make_requests(n, role) -> ids of n PENDING requests on the test's machine, newest first."""
+    def make(count: int, role: str = "SUPERVISOR"):
+        requested_by = user_id(db, role)
+        start = datetime(2026, 1, 1)
+        requests = [
+            MaintenanceRequest(
+                title=f"Request {index}",
+                description="Created by the tests",
+                priority=RequestPriority.MEDIUM,
+                status=RequestStatus.PENDING,
+                requestedDate=start + timedelta(minutes=index),
+                machineId=machine.id,
+                requestedById=requested_by,
+            )
+            for index in range(count)
+        ]
+        db.add_all(requests)
+        db.commit()
+        return [request.id for request in reversed(requests)]
+
+    return make
+
+
+@pytest.fixture
+def make_part(db):
+    """make_part(stock) -> a fresh active spare part."""
+    def make(stock: int = 10) -> SparePart:
+        category_id = db.query(SparePartCategory.id).scalar()
+        count = db.query(SparePart).count()
+        part = SparePart(
+            partNumber=f"TEST-{count + 1:05d}", partName=f"Test part {count + 1}",
+            currentStock=stock, minimumStock=2, unitPrice=5.0, categoryId=category_id
+        )
+        db.add(part)
+        db.commit()
+        return part
+
+    return make
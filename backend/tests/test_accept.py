@@ -0,0 +1,134 @@
+"""
+Accepting a request creates exactly one work order, however often it is sent.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from app.core.idempotency import track_idempotency
+from app.main import app
+from app.models import MaintenanceWork, RequestStatus, WorkStatus
+
+from conftest import user_id
+
+
+def works_of(db, request_id):
+    return db.query(MaintenanceWork).filter(MaintenanceWork.requestId == request_id).all()
+
+
+def accept(client, auth, request_id, key=None, role="MAINTENANCE_TECH"):
+    headers = {**auth(role), **({"Idempotency-Key": key} if key else {})}
+    return client.post(f"/api/v1/maintenance-requests/{request_id}/accept", headers=headers)
+
+
+def test_retried_accept_replays_the_first_response(client, auth, db, make_requests):
+    request_id, = make_requests(1)
+    first = accept(client, auth, request_id, key=f"accept-{request_id}")
+    retry = accept(client, auth, request_id, key=f"accept-{request_id}")
+
+    assert first.status_code == 200, first.text
+    assert first.json()["status"] == RequestStatus.IN_PROGRESS.value
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert len(works_of(db, request_id)) == 1
+
+
+def test_second_accept_without_a_key_is_refused(client, auth, db, make_requests):
+    request_id, = make_requests(1)
+    assert accept(client, auth, request_id).status_code == 200
+    again = accept(client, auth, request_id, role="ADMIN")
+
+    assert again.status_code == 400
+    works = works_of(db, request_id)
+    assert len(works) == 1
+    assert works[0].status == WorkStatus.IN_PROGRESS
+
+
+def test_key_reused_for_another_request_is_rejected(client, auth, make_requests):
+    first_id, second_id = make_requests(2)
+    assert accept(client, auth, first_id, key="shared-key").status_code == 200
+    assert accept(client, auth, second_id, key="shared-key").status_code == 422
+
+
+def test_failed_accept_is_not_replayed(client, auth):
+    assert accept(client, auth, 999999, key="accept-missing").status_code == 404
+
+    # The key was released with the failure, so the retry runs the route again
+    retry = accept(client, auth, 999999, key="accept-missing")
+    assert retry.status_code == 404
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+def run_tracked(auth, request_id, key, call_next):
+    """Send an accept through the idempotency middleware alone, with call_next standing in for the app."""
+    request = Request({
+        "type": "http", "app": app, "method": "POST", "scheme": "http", "server": ("testserver", 80),
+        "path": f"/api/v1/maintenance-requests/{request_id}/accept", "root_path": "", "query_string": b"",
+        "headers": [
+            (b"authorization", auth("MAINTENANCE_TECH")["Authorization"].encode()),
+            (b"idempotency-key", key.encode()),
+        ],
+    })
+    return asyncio.run(track_idempotency(request, call_next))
+
+
+def test_cancelled_accept_releases_its_key(client, auth, db, make_requests):
+    request_id, = make_requests(1)
+
+    async def disconnected(request):
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        run_tracked(auth, request_id, f"cancelled-{request_id}", disconnected)
+
+    # The retry runs the route instead of waiting out the key as "in progress"
+    retry = accept(client, auth, request_id, key=f"cancelled-{request_id}")
+    assert retry.status_code == 200, retry.text
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+def test_stored_response_keeps_repeated_headers(auth, make_requests):
+    request_id, = make_requests(1)
+
+    async def with_cookies(request):
+        # call_next hands the middleware a streamed response
+        response = StreamingResponse(iter([b"{}"]), media_type="application/json")
+        response.set_cookie("first", "1")
+        response.set_cookie("second", "2")
+        return response
+
+    response = run_tracked(auth, request_id, f"cookies-{request_id}", with_cookies)
+    cookies = [value for name, value in response.raw_headers if name == b"set-cookie"]
+    assert len(cookies) == 2
+
+
+def test_retried_complete_replays_the_first_response(client, auth, db, make_requests):
+    request_id, = make_requests(1)
+    assert accept(client, auth, request_id).status_code == 200
+    work = works_of(db, request_id)[0]
+
+    url = f"/api/v1/maintenance-work/{work.id}/complete"
+    headers = {**auth("MAINTENANCE_TECH"), "Idempotency-Key": f"complete-{work.id}"}
+    first = client.patch(url, json={"workDescription": "Replaced the bearing"}, headers=headers)
+    retry = client.patch(url, json={"workDescription": "Replaced the bearing"}, headers=headers)
+
+    assert first.status_code == 200, first.text
+    assert first.json()["status"] == WorkStatus.COMPLETED.value
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+
+def test_database_refuses_a_second_work_for_a_request(db, make_requests, machine):
+    request_id, = make_requests(1)
+    for _ in range(2):
+        db.add(MaintenanceWork(
+            requestId=request_id, machineId=machine.id, assignedToId=user_id(db, "MAINTENANCE_TECH"),
+            workDescription="Double-tapped accept", status=WorkStatus.IN_PROGRESS
+        ))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
@@ -0,0 +1,22 @@
+"""
+The dashboard summary only carries the sections the caller's role can read.
+"""
+import pytest
+
+SECTIONS = [
+    "requestCounts", "requestTotals", "availableRequests", "openWorkByTechnician", "myOpenWork",
+    "sparePartsRequests", "criticalStockCount", "machineStatusCounts",
+]
+
+
+@pytest.mark.parametrize("role, visible", [
+    ("ADMIN", set(SECTIONS)),
+    ("MAINTENANCE_TECH", {"availableRequests", "myOpenWork"}),
+    ("INVENTORY_MANAGER", {"sparePartsRequests", "criticalStockCount"}),
+    ("SUPERVISOR", {"requestCounts", "requestTotals", "openWorkByTechnician", "machineStatusCounts"}),
+])
+def test_summary_sections_follow_the_role(client, auth, role, visible):
+    response = client.get("/api/v1/dashboard/summary", headers=auth(role))
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert {section for section in SECTIONS if body[section] is not None} == visible
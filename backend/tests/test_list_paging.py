@@ -0,0 +1,80 @@
+"""
+Keyset paging and batched hydration of the maintenance request list.
+"""
+from datetime import datetime
+
+from app.models import MaintenanceRequest, RequestPriority, RequestStatus
+
+from conftest import add_attachments, user_id
+
+
+def walk_pages(client, headers, url):
+    """Follow nextCursor from the first page to the last; returns the pages."""
+    pages = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get(url, params={"cursor": cursor}, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.json()["nextCursor"]
+    return pages
+
+
+def test_cursor_pages_match_offset_order(client, auth, machine, make_requests):
+    ids = make_requests(25)
+    url = f"/api/v1/maintenance-requests?machineId={machine.id}&limit=10"
+    pages = walk_pages(client, auth(), url)
+
+    assert [len(page["requests"]) for page in pages] == [10, 10, 5]
+    assert [request["id"] for page in pages for request in page["requests"]] == ids
+    offset_ids = [
+        request["id"]
+        for number in (1, 2, 3)
+        for request in client.get(f"{url}&page={number}", headers=auth()).json()["requests"]
+    ]
+    assert offset_ids == ids
+
+
+def test_cursor_pages_do_not_skip_rows_with_equal_dates(client, auth, db, machine):
+    requested_by = user_id(db, "SUPERVISOR")
+    same_moment = datetime(2026, 3, 1, 8, 30)
+    db.add_all(
+        MaintenanceRequest(
+            title=f"Tied {index}", description="Same requestedDate", priority=RequestPriority.LOW,
+            status=RequestStatus.PENDING, requestedDate=same_moment, machineId=machine.id, requestedById=requested_by
+        )
+        for index in range(7)
+    )
+    db.commit()
+
+    pages = walk_pages(client, auth(), f"/api/v1/maintenance-requests?machineId={machine.id}&limit=3")
+    ids = [request["id"] for page in pages for request in page["requests"]]
+    assert len(ids) == 7
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_cursor_mode_total_is_opt_in(client, auth, machine, make_requests):
+    make_requests(4)
+    url = f"/api/v1/maintenance-requests?machineId={machine.id}&limit=2&cursor="
+    assert client.get(url, headers=auth()).json()["total"] is None
+    assert client.get(f"{url}&includeTotal=true", headers=auth()).json()["total"] == 4
+
+
+def test_invalid_cursor_is_rejected(client, auth):
+    response = client.get("/api/v1/maintenance-requests?cursor=not-a-cursor", headers=auth())
+    assert response.status_code == 400
+
+
+def test_hydrated_rows_keep_their_own_attachments_and_requesters(client, auth, db, machine, make_requests):
+    supervisor_ids = make_requests(3, "SUPERVISOR")
+    tech_ids = make_requests(3, "MAINTENANCE_TECH")
+    add_attachments(db, tech_ids, "MAINTENANCE_TECH")
+
+    response = client.get(f"/api/v1/maintenance-requests?machineId={machine.id}&limit=10", headers=auth())
+    requests = {request["id"]: request for request in response.json()["requests"]}
+    for request_id in supervisor_ids:
+        assert requests[request_id]["requestedByName"] == "Supervisor"
+        assert requests[request_id]["attachments"] == []
+    for request_id in tech_ids:
+        assert requests[request_id]["requestedByName"] == "Maintenance_Tech"
+        assert [attachment["fileName"] for attachment in requests[request_id]["attachments"]] == [f"photo-{request_id}.jpg"]
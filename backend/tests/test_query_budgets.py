@@ -0,0 +1,49 @@
+"""
+Statement budgets of the list endpoints (X-DB-Queries, see app.core.query_monitor).
+
+Each list is measured on a short and a long page of rows with related data;
+the count must stay within budget and must not grow with the number of rows.
+"""
+from app.core.query_monitor import assert_query_budget
+
+from conftest import add_attachments
+
+
+def query_count(response) -> int:
+    assert response.status_code == 200, response.text
+    return int(response.headers["X-DB-Queries"])
+
+
+def test_request_list_budget_does_not_grow_with_rows(client, auth, db, machine, make_requests):
+    url = f"/api/v1/maintenance-requests?machineId={machine.id}&limit=50"
+    add_attachments(db, make_requests(2))
+    short_page = client.get(url, headers=auth())
+    assert len(short_page.json()["requests"]) == 2
+
+    # More rows, more requesters, an attachment on each
+    for role in ("SUPERVISOR", "MAINTENANCE_TECH", "MAINTENANCE_MANAGER"):
+        add_attachments(db, make_requests(10, role), role)
+    long_page = client.get(url, headers=auth())
+    assert len(long_page.json()["requests"]) == 32
+    assert all(request["attachments"] for request in long_page.json()["requests"])
+
+    # count, page, requesters, attachments
+    assert_query_budget(long_page, 4)
+    assert query_count(long_page) == query_count(short_page)
+
+
+def test_request_list_cursor_mode_skips_the_count(client, auth, machine, make_requests):
+    make_requests(30)
+    response = client.get(f"/api/v1/maintenance-requests?machineId={machine.id}&limit=10&cursor=", headers=auth())
+    assert query_count(response) == 3
+    assert response.json()["total"] is None
+
+
+def test_machine_and_spare_part_lists_stay_within_budget(client, auth, machine, make_part):
+    for _ in range(5):
+        make_part()
+    # count and page, plus one IN query for the parts' categories
+    for url, budget in (("/api/v1/machines", 2), ("/api/v1/spare-parts", 3)):
+        response = client.get(url, headers=auth())
+        assert response.json()["total"] >= 1
+        assert_query_budget(response, budget)
@@ -0,0 +1,90 @@
+"""
+Search on the maintenance request list through the in-process fallback index
+(the tests run on SQLite; MySQL uses its FULLTEXT index instead).
+"""
+from datetime import datetime, timedelta
+
+from app.models import MaintenanceRequest, RequestPriority, RequestStatus
+
+from conftest import user_id
+
+
+def add_requests(db, machine, rows, status=RequestStatus.PENDING):
+    """rows: (title, description) pairs, one minute apart; returns their ids in order."""
+    requested_by = user_id(db, "SUPERVISOR")
+    requests = [
+        MaintenanceRequest(
+            title=title, description=description, priority=RequestPriority.MEDIUM, status=status,
+            requestedDate=datetime(2026, 2, 1) + timedelta(minutes=index),
+            machineId=machine.id, requestedById=requested_by
+        )
+        for index, (title, description) in enumerate(rows)
+    ]
+    db.add_all(requests)
+    db.commit()
+    return [request.id for request in requests]
+
+
+def search(client, auth, machine, text, **params):
+    response = client.get(
+        "/api/v1/maintenance-requests", headers=auth(),
+        params={"machineId": machine.id, "search": text, **params}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_title_hits_rank_first_and_every_word_must_match(client, auth, db, machine):
+    in_description, in_title, other = add_requests(db, machine, [
+        ("Noisy drive", "Gearbox bearing worn"),
+        ("Bearing replacement", "Gearbox is loud"),
+        ("Bearing check", "Spindle only"),
+    ])
+    body = search(client, auth, machine, "gearbox bear")
+    assert [request["id"] for request in body["requests"]] == [in_title, in_description]
+    assert body["total"] == 2
+    assert other not in [request["id"] for request in body["requests"]]
+
+
+def test_search_respects_the_other_filters(client, auth, db, machine):
+    pending, = add_requests(db, machine, [("Hydraulic leak", "Hose")])
+    add_requests(db, machine, [("Hydraulic leak", "Hose")], status=RequestStatus.COMPLETED)
+    body = search(client, auth, machine, "hydraulic", status="PENDING")
+    assert [request["id"] for request in body["requests"]] == [pending]
+    assert body["total"] == 1
+
+
+def test_large_match_sets_are_paged_without_binding_every_id(client, auth, db, machine):
+    ids = add_requests(db, machine, [(f"Coolant pump {index}", "Coolant") for index in range(55)])
+    newest_first = list(reversed(ids))
+
+    first = search(client, auth, machine, "coolant", limit=25)
+    third = search(client, auth, machine, "coolant", limit=25, page=3)
+    assert first["total"] == 55
+    assert [request["id"] for request in first["requests"]] == newest_first[:25]
+    assert [request["id"] for request in third["requests"]] == newest_first[50:]
+    # Two for the index re-sync (edited and new rows), one for the filters, then
+    # the page and its attachments and requesters, however many rows match
+    assert int(client.get(
+        "/api/v1/maintenance-requests", headers=auth(),
+        params={"machineId": machine.id, "search": "coolant", "limit": 25}
+    ).headers["X-DB-Queries"]) <= 6
+
+    walked, cursor = [], ""
+    while cursor is not None:
+        body = search(client, auth, machine, "coolant", limit=20, cursor=cursor)
+        walked += [request["id"] for request in body["requests"]]
+        cursor = body["nextCursor"]
+    assert walked == newest_first
+
+
+def test_edits_made_outside_the_endpoints_reach_the_index(client, auth, db, machine):
+    request_id, = add_requests(db, machine, [("Conveyor belt slipping", "Tension")])
+    assert [request["id"] for request in search(client, auth, machine, "conveyor")["requests"]] == [request_id]
+
+    # As another worker process or a script would
+    db.get(MaintenanceRequest, request_id).title = "Chain drive slipping"
+    db.commit()
+
+    assert search(client, auth, machine, "conveyor")["requests"] == []
+    assert [request["id"] for request in search(client, auth, machine, "chain")["requests"]] == [request_id]
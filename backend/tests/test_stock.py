@@ -0,0 +1,134 @@
+"""
+Stock invariant: a part's currentStock equals its ledger (the last ADJUSTMENT
+plus the INs and minus the OUTs after it), never goes below zero, and
+reservedStock never exceeds it: manual transactions cannot take reserved
+units.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func
+
+from app.models import InventoryTransaction, SparePart, TransactionType
+
+TRANSACTIONS = "/api/v1/inventory-transactions"
+
+
+def move(client, auth, part_id, transaction_type, quantity):
+    return client.post(TRANSACTIONS, headers=auth("INVENTORY_MANAGER"), json={
+        "sparePartId": part_id, "transactionType": transaction_type, "quantity": quantity
+    })
+
+
+def stock_of(db, part_id):
+    db.expire_all()
+    part = db.get(SparePart, part_id)
+    return part.currentStock, part.reservedStock
+
+
+def ledger_stock(db, part_id):
+    """Stock the ledger implies: the last ADJUSTMENT, then the INs and OUTs after it."""
+    rows = (
+        db.query(InventoryTransaction.transactionType, InventoryTransaction.quantity)
+        .filter(InventoryTransaction.sparePartId == part_id)
+        .order_by(InventoryTransaction.id)
+        .all()
+    )
+    stock = 0
+    for transaction_type, quantity in rows:
+        if transaction_type == TransactionType.ADJUSTMENT:
+            stock = quantity
+        elif transaction_type == TransactionType.IN:
+            stock += quantity
+        else:
+            stock -= quantity
+    return stock
+
+
+def test_stock_follows_the_ledger_and_refuses_overdraws(client, auth, db, make_part):
+    part = make_part(stock=0)
+    assert move(client, auth, part.id, "ADJUSTMENT", 5).status_code == 200
+    assert move(client, auth, part.id, "IN", 3).status_code == 200
+    assert move(client, auth, part.id, "OUT", 4).status_code == 200
+
+    overdraw = move(client, auth, part.id, "OUT", 10)
+    assert overdraw.status_code == 400
+    assert move(client, auth, part.id, "OUT", 4).status_code == 200
+
+    assert stock_of(db, part.id) == (0, 0)
+    assert ledger_stock(db, part.id) == 0
+    # The refused OUT left no ledger row
+    out_rows = db.query(func.count()).filter(
+        InventoryTransaction.sparePartId == part.id, InventoryTransaction.transactionType == TransactionType.OUT
+    ).scalar()
+    assert out_rows == 2
+
+
+def test_parallel_outs_never_overdraw(client, auth, db, make_part):
+    # Read the id here: the test session must not be used from the threads
+    part_id = make_part(stock=10).id
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(lambda _: move(client, auth, part_id, "OUT", 1).status_code, range(25)))
+
+    assert statuses.count(200) == 10
+    assert set(statuses) == {200, 400}
+    assert stock_of(db, part_id) == (0, 0)
+
+
+def test_reservations_stay_within_stock(client, auth, db, make_requests, make_part):
+    part = make_part(stock=5)
+    request_id, = make_requests(1)
+    assert client.post(f"/api/v1/maintenance-requests/{request_id}/accept", headers=auth("MAINTENANCE_TECH")).status_code == 200
+    work_id = client.get(f"/api/v1/maintenance-work/by-request/{request_id}", headers=auth()).json()["id"]
+
+    def request_parts(quantity):
+        response = client.post("/api/v1/spare-parts-requests", headers=auth("MAINTENANCE_TECH"), json={
+            "maintenanceWorkId": work_id, "sparePartId": part.id, "quantityRequested": quantity
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    first, second = request_parts(4), request_parts(2)
+    approve = lambda parts_request_id: client.patch(
+        f"/api/v1/spare-parts-requests/{parts_request_id}/approve", headers=auth(), json={}
+    )
+    assert approve(first).status_code == 200
+    assert stock_of(db, part.id) == (5, 4)
+    # Only one unit is left unreserved
+    assert approve(second).status_code == 400
+    assert stock_of(db, part.id) == (5, 4)
+
+    issue = lambda: client.patch(f"/api/v1/spare-parts-requests/{first}/issue", headers=auth("INVENTORY_MANAGER"))
+    assert issue().status_code == 200
+    assert issue().status_code == 400
+    assert stock_of(db, part.id) == (1, 0)
+
+
+def test_manual_transactions_leave_reserved_units_alone(client, auth, db, make_requests, make_part):
+    part = make_part(stock=5)
+    request_id, = make_requests(1)
+    assert client.post(f"/api/v1/maintenance-requests/{request_id}/accept", headers=auth("MAINTENANCE_TECH")).status_code == 200
+    work_id = client.get(f"/api/v1/maintenance-work/by-request/{request_id}", headers=auth()).json()["id"]
+    parts_request = client.post("/api/v1/spare-parts-requests", headers=auth("MAINTENANCE_TECH"), json={
+        "maintenanceWorkId": work_id, "sparePartId": part.id, "quantityRequested": 4
+    }).json()["id"]
+    assert client.patch(f"/api/v1/spare-parts-requests/{parts_request}/approve", headers=auth(), json={}).status_code == 200
+
+    # One of the five units is not reserved
+    assert move(client, auth, part.id, "OUT", 2).status_code == 400
+    assert move(client, auth, part.id, "TRANSFER", 2).status_code == 400
+    assert move(client, auth, part.id, "ADJUSTMENT", 3).status_code == 400
+    assert move(client, auth, part.id, "OUT", 1).status_code == 200
+    assert stock_of(db, part.id) == (4, 4)
+
+    csv = f"partNumber,transactionType,quantity\n{part.partNumber},OUT,1\n{part.partNumber},ADJUSTMENT,2\n"
+    imported = client.post(
+        f"{TRANSACTIONS}/import", headers=auth("INVENTORY_MANAGER"),
+        files={"file": ("transactions.csv", csv, "text/csv")}
+    ).json()
+    assert imported["imported"] == 0
+    assert [error["row"] for error in imported["errors"]] == [2, 3]
+    assert stock_of(db, part.id) == (4, 4)
+
+    # The approved request still gets its units
+    assert client.patch(f"/api/v1/spare-parts-requests/{parts_request}/issue", headers=auth("INVENTORY_MANAGER")).status_code == 200
+    assert stock_of(db, part.id) == (0, 0)
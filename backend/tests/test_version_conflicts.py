@@ -0,0 +1,65 @@
+"""
+A write that loses a race on a versioned row gets 409 (412 with If-Match),
+not a 500 carrying the database error.
+"""
+import pytest
+from sqlalchemy import text
+
+from app.core.etag import PRECONDITION_FAILED_DETAIL
+from app.models import MaintenanceRequest, RequestStatus
+from app.services import audit_service
+
+
+@pytest.fixture
+def waiting_parts_request(client, auth, db, make_requests, make_part):
+    """A request in WAITING_PARTS with one pending spare parts request; returns both ids."""
+    part = make_part(stock=5)
+    request_id, = make_requests(1)
+    assert client.post(f"/api/v1/maintenance-requests/{request_id}/accept", headers=auth("MAINTENANCE_TECH")).status_code == 200
+    work_id = client.get(f"/api/v1/maintenance-work/by-request/{request_id}", headers=auth()).json()["id"]
+    response = client.post("/api/v1/spare-parts-requests", headers=auth("MAINTENANCE_TECH"), json={
+        "maintenanceWorkId": work_id, "sparePartId": part.id, "quantityRequested": 1
+    })
+    assert response.status_code == 200, response.text
+    db.expire_all()
+    assert db.get(MaintenanceRequest, request_id).status == RequestStatus.WAITING_PARTS
+    return request_id, response.json()["id"]
+
+
+@pytest.fixture
+def concurrent_edit(monkeypatch):
+    """Bump the maintenance request's version under the handler, as another worker would."""
+    record_status_change = audit_service.record_status_change
+
+    def bump_then_record(db, **kwargs):
+        db.execute(
+            text("UPDATE maintenance_requests SET version = version + 1 WHERE id = :id"),
+            {"id": kwargs["requestId"]}
+        )
+        return record_status_change(db=db, **kwargs)
+
+    monkeypatch.setattr(audit_service, "record_status_change", bump_then_record)
+
+
+def test_reject_conflict_is_409(client, auth, db, waiting_parts_request, concurrent_edit):
+    request_id, parts_request_id = waiting_parts_request
+    response = client.patch(
+        f"/api/v1/spare-parts-requests/{parts_request_id}/reject",
+        headers=auth("MAINTENANCE_MANAGER"), json={"rejectionReason": "Wrong part"}
+    )
+
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"] == PRECONDITION_FAILED_DETAIL
+    db.expire_all()
+    assert db.get(MaintenanceRequest, request_id).status == RequestStatus.WAITING_PARTS
+
+
+def test_bulk_conflict_is_409_and_nothing_is_committed(client, auth, db, waiting_parts_request, concurrent_edit):
+    request_id, parts_request_id = waiting_parts_request
+    response = client.post("/api/v1/spare-parts-requests/bulk", headers=auth("MAINTENANCE_MANAGER"), json={
+        "items": [{"id": parts_request_id, "action": "REJECT", "notes": "Wrong part"}]
+    })
+
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"] == PRECONDITION_FAILED_DETAIL
+    assert client.get(f"/api/v1/spare-parts-requests/{parts_request_id}", headers=auth()).json()["status"] == "PENDING"
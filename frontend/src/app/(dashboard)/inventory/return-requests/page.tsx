@@ -23,7 +23,6 @@ export default function ReturnRequestsPage() {
       isRequestedReturn: true,
       isReturned: false,
     }),
-    refetchInterval: 30000, // Refetch every 30 seconds
   });
 
   // Process return mutation
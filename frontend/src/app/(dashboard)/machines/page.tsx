@@ -69,8 +69,8 @@ export default function MachineManagementPage() {
 
   // Update machine mutation
   const updateMachineMutation = useMutation({
-    mutationFn: ({ id, data }: { id: number; data: MachineUpdate }) =>
-      machineApi.updateMachine(id, data),
+    mutationFn: ({ id, data, version }: { id: number; data: MachineUpdate; version?: number }) =>
+      machineApi.updateMachine(id, data, version),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['machines'] });
       setEditingMachine(null);
@@ -91,7 +91,7 @@ export default function MachineManagementPage() {
 
   const handleUpdateMachine = async (data: MachineUpdate) => {
     if (!editingMachine) return;
-    await updateMachineMutation.mutateAsync({ id: editingMachine.id, data });
+    await updateMachineMutation.mutateAsync({ id: editingMachine.id, data, version: editingMachine.version });
   };
 
   const handleDeleteMachine = async (machineId: number) => {
@@ -48,7 +48,6 @@ export function useSparePartsRequests() {
   const { data, isLoading, isError } = useQuery({
     queryKey: ['maintenance', 'spare-parts-requests', filters],
     queryFn: () => sparePartsRequestsApi.getRequests(filters),
-    refetchInterval: 30_000,
   });
 
   const approveMutation = useMutation({
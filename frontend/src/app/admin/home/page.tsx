@@ -2,33 +2,35 @@
 
 import { useQuery } from '@tanstack/react-query';
 import ProtectedRoute from '@/components/ProtectedRoute';
-import { MachineStatus, UserRole } from '@/lib/types';
-import { maintenanceRequestApi } from '@/lib/api/maintenance-requests';
-import { machineApi } from '@/lib/api/machines';
+import { MachineStatus, RequestStatus, UserRole } from '@/lib/types';
+import { dashboardApi } from '@/lib/api/dashboard';
 
 export default function AdminHomePage() {
   const {
-    data: activeFaultsCount,
-    isLoading: isActiveFaultsLoading,
-    isError: isActiveFaultsError,
+    data: summary,
+    isLoading: isSummaryLoading,
+    isError: isSummaryError,
   } = useQuery({
-    queryKey: ['admin-home', 'active-faults'],
-    queryFn: maintenanceRequestApi.getActiveFaultsCount,
-    refetchInterval: 30000,
+    queryKey: ['admin-home', 'summary'],
+    queryFn: dashboardApi.getSummary,
   });
 
-  const {
-    data: stoppedMachinesCount,
-    isLoading: isStoppedMachinesLoading,
-    isError: isStoppedMachinesError,
-  } = useQuery({
-    queryKey: ['admin-home', 'stopped-machines'],
-    queryFn: () => machineApi.countByStatuses([MachineStatus.DOWN, MachineStatus.MAINTENANCE]),
-    refetchInterval: 30000,
-  });
+  // Active faults: unresolved requests (PENDING, IN_PROGRESS, WAITING_PARTS)
+  const requestTotals = summary?.requestTotals;
+  const machineStatusCounts = summary?.machineStatusCounts;
+  const activeFaultsCount = requestTotals
+    ? requestTotals[RequestStatus.PENDING] +
+      requestTotals[RequestStatus.IN_PROGRESS] +
+      requestTotals[RequestStatus.WAITING_PARTS]
+    : undefined;
+  const stoppedMachinesCount = machineStatusCounts
+    ? machineStatusCounts[MachineStatus.DOWN] + machineStatusCounts[MachineStatus.MAINTENANCE]
+    : undefined;
+  const isActiveFaultsError = isSummaryError;
+  const isStoppedMachinesError = isSummaryError;
 
-  const activeFaultsDisplay = isActiveFaultsLoading ? '...' : activeFaultsCount ?? 0;
-  const stoppedMachinesDisplay = isStoppedMachinesLoading ? '...' : stoppedMachinesCount ?? 0;
+  const activeFaultsDisplay = isSummaryLoading ? '...' : activeFaultsCount ?? 0;
+  const stoppedMachinesDisplay = isSummaryLoading ? '...' : stoppedMachinesCount ?? 0;
 
   return (
     <ProtectedRoute requiredRoles={[UserRole.ADMIN]}>
@@ -2,14 +2,13 @@
 
 import { useAuth } from '@/lib/auth';
 import ProtectedRoute from '@/components/ProtectedRoute';
-import { Machine, MachineStatus, SparePartsRequestStatus, RequestStatus, UserRole } from '@/lib/types';
+import { Machine, MachineStatus, UserRole } from '@/lib/types';
 import { useState } from 'react';
 import { useQuery } from '@tanstack/react-query';
 import QRScanner from '@/components/qr-scanner/QRScanner';
 import MachineDisplay from '@/components/qr-scanner/MachineDisplay';
 import { machineApi } from '@/lib/api/machines';
-import { maintenanceRequestApi } from '@/lib/api/maintenance-requests';
-import { sparePartsRequestsApi } from '@/lib/api/spare-parts-requests';
+import { dashboardApi } from '@/lib/api/dashboard';
 import ClientOnly from '@/components/ClientOnly';
 import Link from 'next/link';
 
@@ -20,109 +19,38 @@ export default function DashboardPage() {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  // Get stopped machines count (DOWN only)
+  // All dashboard counts come from one summary call
   const {
-    data: stoppedMachinesCount,
-    isLoading: isStoppedMachinesLoading,
-    isError: isStoppedMachinesError,
+    data: summary,
+    isLoading: isSummaryLoading,
+    isError: isSummaryError,
   } = useQuery({
-    queryKey: ['home-dashboard', 'stopped-machines'],
-    queryFn: () => machineApi.countByStatuses([MachineStatus.DOWN]),
-    refetchInterval: 30000,
+    queryKey: ['home-dashboard', 'summary'],
+    queryFn: dashboardApi.getSummary,
   });
 
-  // Get machines under maintenance count (MAINTENANCE only)
-  const {
-    data: maintenanceMachinesCount,
-    isLoading: isMaintenanceMachinesLoading,
-    isError: isMaintenanceMachinesError,
-  } = useQuery({
-    queryKey: ['home-dashboard', 'maintenance-machines'],
-    queryFn: () => machineApi.countByStatuses([MachineStatus.MAINTENANCE]),
-    refetchInterval: 30000,
-  });
-
-  const stoppedMachinesDisplay = isStoppedMachinesLoading ? '...' : stoppedMachinesCount ?? 0;
-  const maintenanceMachinesDisplay = isMaintenanceMachinesLoading ? '...' : maintenanceMachinesCount ?? 0;
-  const {
-    data: pendingSparePartsRequestsCount,
-    isLoading: isPendingSparePartsRequestsLoading,
-    isError: isPendingSparePartsRequestsError,
-  } = useQuery({
-    queryKey: ['home-dashboard', 'pending-spare-parts-requests'],
-    queryFn: async () => {
-      const response = await sparePartsRequestsApi.getRequests({
-        status: 'PENDING' as SparePartsRequestStatus,
-        pageSize: 1,
-      });
-      return response.total;
-    },
-    refetchInterval: 30000,
-  });
-  const pendingSparePartsRequestsDisplay = isPendingSparePartsRequestsLoading
-    ? '...'
-    : pendingSparePartsRequestsCount ?? 0;
-
-  // Get approved spare parts requests count (for Inventory Managers)
-  const {
-    data: approvedSparePartsRequestsCount,
-    isLoading: isApprovedSparePartsRequestsLoading,
-    isError: isApprovedSparePartsRequestsError,
-  } = useQuery({
-    queryKey: ['home-dashboard', 'approved-spare-parts-requests'],
-    queryFn: async () => {
-      const response = await sparePartsRequestsApi.getRequests({
-        status: 'APPROVED' as SparePartsRequestStatus,
-        pageSize: 1,
-      });
-      return response.total;
-    },
-    refetchInterval: 30000,
-    enabled: user?.role === UserRole.INVENTORY_MANAGER || user?.role === UserRole.ADMIN,
-  });
-  const approvedSparePartsRequestsDisplay = isApprovedSparePartsRequestsLoading
-    ? '...'
-    : approvedSparePartsRequestsCount ?? 0;
-
-  // Get available requests count (PENDING without MaintenanceWork)
-  const {
-    data: availableRequestsCount,
-    isLoading: isAvailableRequestsLoading,
-    isError: isAvailableRequestsError,
-  } = useQuery({
-    queryKey: ['home-dashboard', 'available-requests-count'],
-    queryFn: async () => {
-      const response = await maintenanceRequestApi.getAvailableRequests({
-        status: RequestStatus.PENDING,
-        page: 1,
-        limit: 1,
-      });
-      return response.total;
-    },
-    refetchInterval: 30000,
-    enabled: user?.role === UserRole.MAINTENANCE_MANAGER || user?.role === UserRole.ADMIN || user?.role === UserRole.MAINTENANCE_TECH,
-  });
-
-  // Get my work requests count (IN_PROGRESS and WAITING_PARTS with MaintenanceWork)
-  const {
-    data: myWorkRequestsCount,
-    isLoading: isMyWorkRequestsLoading,
-    isError: isMyWorkRequestsError,
-  } = useQuery({
-    queryKey: ['home-dashboard', 'my-work-requests-count'],
-    queryFn: async () => {
-      const response = await maintenanceRequestApi.getMyWorkRequests({
-        page: 1,
-        limit: 1,
-      });
-      return response.total;
-    },
-    refetchInterval: 30000,
-    enabled: user?.role === UserRole.MAINTENANCE_MANAGER || user?.role === UserRole.ADMIN || user?.role === UserRole.MAINTENANCE_TECH,
-  });
-
-  const availableRequestsDisplay = isAvailableRequestsLoading ? '...' : availableRequestsCount ?? 0;
-  const myWorkRequestsDisplay = isMyWorkRequestsLoading ? '...' : myWorkRequestsCount ?? 0;
+  const stoppedMachinesCount = summary?.machineStatusCounts?.[MachineStatus.DOWN];
+  const maintenanceMachinesCount = summary?.machineStatusCounts?.[MachineStatus.MAINTENANCE];
+  const pendingSparePartsRequestsCount = summary?.sparePartsRequests?.pending;
+  const approvedSparePartsRequestsCount = summary?.sparePartsRequests?.approved;
+  // Available requests: PENDING without MaintenanceWork
+  const availableRequestsCount = summary?.availableRequests;
+  // My work: IN_PROGRESS and WAITING_PARTS (everyone's for managers)
+  const myWorkRequestsCount = summary?.myOpenWork;
+
+  const isStoppedMachinesError = isSummaryError;
+  const isMaintenanceMachinesError = isSummaryError;
+  const isPendingSparePartsRequestsError = isSummaryError;
+  const isApprovedSparePartsRequestsError = isSummaryError;
+  const isAvailableRequestsError = isSummaryError;
+  const isMyWorkRequestsError = isSummaryError;
+
+  const stoppedMachinesDisplay = isSummaryLoading ? '...' : stoppedMachinesCount ?? 0;
+  const maintenanceMachinesDisplay = isSummaryLoading ? '...' : maintenanceMachinesCount ?? 0;
+  const pendingSparePartsRequestsDisplay = isSummaryLoading ? '...' : pendingSparePartsRequestsCount ?? 0;
+  const approvedSparePartsRequestsDisplay = isSummaryLoading ? '...' : approvedSparePartsRequestsCount ?? 0;
+  const availableRequestsDisplay = isSummaryLoading ? '...' : availableRequestsCount ?? 0;
+  const myWorkRequestsDisplay = isSummaryLoading ? '...' : myWorkRequestsCount ?? 0;
   const totalMaintenanceDisplay = (availableRequestsCount ?? 0) + (myWorkRequestsCount ?? 0);
 
   const getRoleDisplayName = (role: UserRole) => {
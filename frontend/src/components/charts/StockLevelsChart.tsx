@@ -122,7 +122,7 @@ export function StockLevelsChart({ filters, onFiltersChange }: StockLevelsChartP
         </div>
         <div className="bg-white rounded-lg shadow p-4">
           <div className="text-sm text-gray-600">Adequate Stock</div>
-          <div className="text-2xl font-bold text-green-600">{data.totalItems - data.criticalCount - data.lowStockCount}</div>
+          <div className="text-2xl font-bold text-green-600">{data.totalItems - data.criticalCount - data.lowStockCount - (data.unknownCount || 0)}</div>
         </div>
       </div>
 
@@ -210,7 +210,7 @@ export function StockLevelsChart({ filters, onFiltersChange }: StockLevelsChartP
                       {item.location || 'N/A'}
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
-                      {item.quantity}
+                      {item.quantity ?? 'Unknown'}
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
                       {item.minQuantity}
@@ -106,6 +106,11 @@ export function ValuationChart({ filters, onFiltersChange }: ValuationChartProps
         <div className="text-center">
           <div className="text-sm text-gray-600 mb-2">Total Inventory Valuation</div>
           <div className="text-4xl font-bold text-blue-600">${data.totalValuation.toFixed(2)}</div>
+          {!!data.unknownPartCount && (
+            <div className="text-sm text-gray-500 mt-2">
+              {data.unknownPartCount} part(s) with unknown stock on this day are not included
+            </div>
+          )}
         </div>
       </div>
 
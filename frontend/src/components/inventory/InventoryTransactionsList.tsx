@@ -72,7 +72,6 @@ export function InventoryTransactionsList({ onView, onCreate, sparePartId }: Inv
   const { data, isLoading, error } = useQuery({
     queryKey: ['inventory-transactions', filters],
     queryFn: () => inventoryTransactionsApi.getTransactions(filters),
-    refetchInterval: 30000, // Refetch every 30 seconds for real-time updates
   });
 
   const handleSearchChange = (value: string) => {
@@ -24,7 +24,6 @@ export function LowStockAlerts({ limit = 10 }: LowStockAlertsProps) {
   const { data, isLoading, error } = useQuery({
     queryKey: ['low-stock-parts', { page: 1, pageSize: limit }],
     queryFn: () => sparePartsApi.getLowStockParts({ page: 1, pageSize: limit }),
-    refetchInterval: 30000, // Refetch every 30 seconds
   });
 
   if (isLoading) {
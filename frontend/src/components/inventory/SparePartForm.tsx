@@ -76,7 +76,7 @@ export function SparePartForm({ sparePart, onSave, onCancel }: SparePartFormProp
 
   const updateMutation = useMutation({
     mutationFn: ({ id, data }: { id: number; data: SparePartUpdate }) =>
-      sparePartsApi.updateSparePart(id, data),
+      sparePartsApi.updateSparePart(id, data, sparePart?.version),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['spare-parts'] });
       queryClient.invalidateQueries({ queryKey: ['low-stock-parts'] });
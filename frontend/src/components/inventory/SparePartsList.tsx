@@ -189,7 +189,6 @@ export function SparePartsList({ onEdit, onCreate }: SparePartsListProps) {
   const { data, isLoading, isFetching, error, refetch } = useQuery({
     queryKey: ['spare-parts', filters],
     queryFn: () => sparePartsApi.getSpareParts(filters),
-    refetchInterval: 30000, // Refetch every 30 seconds for real-time updates
     placeholderData: keepPreviousData, // Keep previous data visible while fetching
     staleTime: 5000, // Consider data fresh for 5 seconds
   });
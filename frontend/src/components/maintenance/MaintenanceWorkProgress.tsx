@@ -47,7 +47,7 @@ export function MaintenanceWorkProgress({ request, onWorkUpdate }: MaintenanceWo
       if (!work?.id) {
         throw new Error('Work ID is required to update progress');
       }
-      return maintenanceWorkApi.updateProgress(work.id, data);
+      return maintenanceWorkApi.updateProgress(work.id, data, work.version);
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['maintenance-work-by-request', request.id] });
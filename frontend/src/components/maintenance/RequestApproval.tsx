@@ -83,6 +83,14 @@ export function RequestApproval({ request, onComplete }: RequestApprovalProps) {
             </p>
           </div>
         )}
+        {request.availableStock !== undefined && (
+          <div>
+            <p className="text-sm font-medium text-gray-700">Available Stock</p>
+            <p className={request.availableStock < request.quantityRequested ? 'text-red-600' : 'text-gray-900'}>
+              {request.availableStock} {request.availableStock < request.quantityRequested && '(Insufficient)'}
+            </p>
+          </div>
+        )}
       </div>
 
       {action === null && (
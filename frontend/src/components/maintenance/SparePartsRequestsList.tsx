@@ -48,7 +48,6 @@ export function SparePartsRequestsList({ maintenanceWorkId, onRequestClick, onCr
   const { data, isLoading, error } = useQuery({
     queryKey: ['spare-parts-requests', filters],
     queryFn: () => sparePartsRequestsApi.getRequests(filters),
-    refetchInterval: 30000, // Refetch every 30 seconds for real-time updates
   });
 
   // Return request mutation
@@ -37,7 +37,6 @@ export function TechnicianDashboard({ onRequestSelect }: TechnicianDashboardProp
   const { data: availableData, isLoading: isLoadingAvailable, error: availableError } = useQuery({
     queryKey: ['available-requests', availableFilters],
     queryFn: () => maintenanceRequestApi.getAvailableRequests({ ...availableFilters, status: RequestStatus.PENDING }),
-    refetchInterval: 30000, // Refetch every 30 seconds for real-time updates
     enabled: true, // Always fetch to show badge counts
   });
 
@@ -45,7 +44,6 @@ export function TechnicianDashboard({ onRequestSelect }: TechnicianDashboardProp
   const { data: myWorkData, isLoading: isLoadingMyWork, error: myWorkError } = useQuery({
     queryKey: ['my-work-requests', myWorkFilters],
     queryFn: () => maintenanceRequestApi.getMyWorkRequests({ ...myWorkFilters }), // Remove status filter to get all assigned work
-    refetchInterval: 30000, // Refetch every 30 seconds for real-time updates
     enabled: true, // Always fetch to show badge counts
   });
 
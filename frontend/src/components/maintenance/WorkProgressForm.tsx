@@ -40,7 +40,7 @@ export function WorkProgressForm({ request, work, onSave }: WorkProgressFormProp
       if (!work?.id) {
         throw new Error('Work ID is required for update');
       }
-      return maintenanceWorkApi.updateWork(work.id, data);
+      return maintenanceWorkApi.updateWork(work.id, data, work.version);
     },
     onSuccess: () => {
       setIsDirty(false);
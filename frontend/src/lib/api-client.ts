@@ -76,4 +76,9 @@ apiClient.interceptors.response.use(
   }
 );
 
+// If-Match header for a PATCH of a versioned record; the server answers 412
+// when someone else saved the record after `version` was read
+export const ifMatch = (version?: number) =>
+  version !== undefined ? { 'If-Match': `"${version}"` } : {};
+
 export default apiClient;
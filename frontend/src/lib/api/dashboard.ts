@@ -0,0 +1,10 @@
+import { apiClient } from '../api-client';
+import { DashboardSummary } from '../types';
+
+export const dashboardApi = {
+  // Counts for the home dashboards in one request (cached briefly on the server)
+  getSummary: async (): Promise<DashboardSummary> => {
+    const response = await apiClient.get('/dashboard/summary');
+    return response.data;
+  },
+};
@@ -5,6 +5,7 @@ import {
   InventoryTransactionUpdate,
   InventoryTransactionListResponse,
   InventoryTransactionFilters,
+  InventoryTransactionImportResponse,
 } from '../types';
 
 // Inventory Transactions API
@@ -40,5 +41,13 @@ export const inventoryTransactionsApi = {
     const response = await apiClient.post('/inventory-transactions', transactionData);
     return response.data;
   },
+
+  // Import transactions from a CSV or XLSX file (partNumber, transactionType, quantity, ...)
+  importTransactions: async (file: File, dryRun = false): Promise<InventoryTransactionImportResponse> => {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await apiClient.post(`/inventory-transactions/import?dryRun=${dryRun}`, formData);
+    return response.data;
+  },
 };
 
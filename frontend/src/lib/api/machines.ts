@@ -1,4 +1,4 @@
-import { apiClient } from '../api-client';
+import { apiClient, ifMatch } from '../api-client';
 import { 
   Machine, 
   MachineCreate, 
@@ -62,8 +62,8 @@ export const machineApi = {
   },
 
   // Update machine
-  updateMachine: async (machineId: number, machineData: MachineUpdate): Promise<Machine> => {
-    const response = await apiClient.patch(`/machines/${machineId}`, machineData);
+  updateMachine: async (machineId: number, machineData: MachineUpdate, version?: number): Promise<Machine> => {
+    const response = await apiClient.patch(`/machines/${machineId}`, machineData, { headers: ifMatch(version) });
     return response.data;
   },
 
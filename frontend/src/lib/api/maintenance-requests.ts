@@ -119,7 +119,10 @@ export const maintenanceRequestApi = {
 
   // Accept a request
   acceptRequest: async (requestId: number): Promise<MaintenanceRequest> => {
-    const response = await apiClient.post(`/maintenance-requests/${requestId}/accept`);
+    // Accepting is one-shot per request, so a double-tap or retry reuses the same key
+    const response = await apiClient.post(`/maintenance-requests/${requestId}/accept`, undefined, {
+      headers: { 'Idempotency-Key': `accept-${requestId}` },
+    });
     return response.data;
   },
 };
@@ -1,4 +1,4 @@
-import { apiClient } from '../api-client';
+import { apiClient, ifMatch } from '../api-client';
 import { WorkStatus } from '../types';
 
 export interface MaintenanceStep {
@@ -27,6 +27,7 @@ export interface MaintenanceWork {
   maintenanceSteps?: MaintenanceStep[];
   createdAt: string;
   updatedAt: string;
+  version?: number;
 }
 
 export interface MaintenanceWorkCreate {
@@ -54,6 +55,11 @@ export interface MaintenanceWorkProgressUpdate {
   maintenanceSteps: MaintenanceStep[];
 }
 
+export interface MaintenanceStepUpdate {
+  description?: string;
+  completed?: boolean;
+}
+
 export interface MaintenanceWorkComplete {
   workDescription: string;
   maintenanceSteps?: MaintenanceStep[];
@@ -87,26 +93,36 @@ export const maintenanceWorkApi = {
   },
 
   // Update maintenance work (generic patch)
-  updateWork: async (workId: number, data: MaintenanceWorkUpdate): Promise<MaintenanceWork> => {
-    const response = await apiClient.patch(`/maintenance-work/${workId}`, data);
+  updateWork: async (workId: number, data: MaintenanceWorkUpdate, version?: number): Promise<MaintenanceWork> => {
+    const response = await apiClient.patch(`/maintenance-work/${workId}`, data, { headers: ifMatch(version) });
     return response.data;
   },
 
   // Start work
   startWork: async (workId: number, data: MaintenanceWorkStart): Promise<MaintenanceWork> => {
-    const response = await apiClient.patch(`/maintenance-work/${workId}/start`, data);
+    const response = await apiClient.patch(`/maintenance-work/${workId}/start`, data, {
+      headers: { 'Idempotency-Key': `start-${workId}` },
+    });
     return response.data;
   },
 
   // Update progress (dedicated endpoint)
-  updateProgress: async (workId: number, data: MaintenanceWorkProgressUpdate): Promise<MaintenanceWork> => {
-    const response = await apiClient.patch(`/maintenance-work/${workId}/update-progress`, data);
+  updateProgress: async (workId: number, data: MaintenanceWorkProgressUpdate, version?: number): Promise<MaintenanceWork> => {
+    const response = await apiClient.patch(`/maintenance-work/${workId}/update-progress`, data, { headers: ifMatch(version) });
+    return response.data;
+  },
+
+  // Update a single step by its 0-based index
+  updateStep: async (workId: number, stepIndex: number, data: MaintenanceStepUpdate, version?: number): Promise<MaintenanceWork> => {
+    const response = await apiClient.patch(`/maintenance-work/${workId}/steps/${stepIndex}`, data, { headers: ifMatch(version) });
     return response.data;
   },
 
   // Complete work
   completeWork: async (workId: number, data: MaintenanceWorkComplete): Promise<MaintenanceWork> => {
-    const response = await apiClient.patch(`/maintenance-work/${workId}/complete`, data);
+    const response = await apiClient.patch(`/maintenance-work/${workId}/complete`, data, {
+      headers: { 'Idempotency-Key': `complete-${workId}` },
+    });
     return response.data;
   },
 };
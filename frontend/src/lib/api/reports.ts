@@ -109,7 +109,7 @@ export interface StockLevelItem {
   description?: string;
   categoryNumber?: string;
   categoryName?: string;
-  quantity: number;
+  quantity: number | null; // null when the stock on the asOf day is not known
   minQuantity: number;
   maxQuantity?: number;
   unitPrice?: number;
@@ -122,12 +122,15 @@ export interface StockLevelsReportResponse {
   totalItems: number;
   criticalCount: number;
   lowStockCount: number;
+  unknownCount?: number;
+  asOf?: string | null;
 }
 
 export interface StockLevelsFilters {
   groupNumber?: string;
   groupName?: string;
   location?: string;
+  asOf?: string; // YYYY-MM-DD: stock at the end of that day (UTC)
   export?: 'csv' | 'excel';
 }
 
@@ -167,10 +170,13 @@ export interface ValuationByGroup {
 export interface ValuationReportResponse {
   totalValuation: number;
   byGroup: ValuationByGroup[];
+  unknownPartCount?: number; // parts left out because their stock on the asOf day is not known
+  asOf?: string | null;
 }
 
 export interface ValuationFilters {
   groupNumber?: string;
+  asOf?: string; // YYYY-MM-DD: valuation at the end of that day (UTC)
   export?: 'csv' | 'excel';
 }
 
@@ -264,6 +270,7 @@ export const reportsApi = {
     if (filters.groupNumber) params.append('groupNumber', filters.groupNumber);
     if (filters.groupName) params.append('groupName', filters.groupName);
     if (filters.location) params.append('location', filters.location);
+    if (filters.asOf) params.append('asOf', filters.asOf);
     if (filters.export) params.append('export', filters.export);
 
     const responseType = filters.export ? 'blob' : 'json';
@@ -298,6 +305,7 @@ export const reportsApi = {
     const params = new URLSearchParams();
     
     if (filters.groupNumber) params.append('groupNumber', filters.groupNumber);
+    if (filters.asOf) params.append('asOf', filters.asOf);
     if (filters.export) params.append('export', filters.export);
 
     const responseType = filters.export ? 'blob' : 'json';
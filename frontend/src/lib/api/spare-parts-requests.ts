@@ -6,6 +6,8 @@ import {
   SparePartsRequestFilters,
   ApproveRequest,
   RejectRequest,
+  SparePartsRequestBulkItem,
+  SparePartsRequestBulkResponse,
 } from '../types';
 
 // Spare Parts Requests API
@@ -57,6 +59,12 @@ export const sparePartsRequestsApi = {
     return response.data;
   },
 
+  // Approve, reject or issue many requests in one call (one result per item)
+  bulkProcess: async (items: SparePartsRequestBulkItem[]): Promise<SparePartsRequestBulkResponse> => {
+    const response = await apiClient.post('/spare-parts-requests/bulk', { items });
+    return response.data;
+  },
+
   // Request return of issued spare parts
   requestReturn: async (requestId: number): Promise<SparePartsRequest> => {
     const response = await apiClient.post(`/spare-parts-requests/${requestId}/return-request`);
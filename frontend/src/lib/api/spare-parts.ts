@@ -1,10 +1,11 @@
-import { apiClient } from '../api-client';
+import { apiClient, ifMatch } from '../api-client';
 import {
   SparePart,
   SparePartCreate,
   SparePartUpdate,
   SparePartListResponse,
   SparePartFilters,
+  SparePartImportResponse,
 } from '../types';
 
 // Spare Parts Management API
@@ -49,8 +50,23 @@ export const sparePartsApi = {
   },
 
   // Update spare part
-  updateSparePart: async (partId: number, sparePartData: SparePartUpdate): Promise<SparePart> => {
-    const response = await apiClient.patch(`/spare-parts/${partId}`, sparePartData);
+  updateSparePart: async (partId: number, sparePartData: SparePartUpdate, version?: number): Promise<SparePart> => {
+    const response = await apiClient.patch(`/spare-parts/${partId}`, sparePartData, { headers: ifMatch(version) });
+    return response.data;
+  },
+
+  // Create or update parts in bulk from a CSV or XLSX file, keyed on partNumber
+  importSpareParts: async (
+    file: File,
+    options: { createCategories?: boolean; logEachRow?: boolean; dryRun?: boolean } = {}
+  ): Promise<SparePartImportResponse> => {
+    const params = new URLSearchParams();
+    if (options.createCategories) params.append('createCategories', 'true');
+    if (options.logEachRow) params.append('logEachRow', 'true');
+    if (options.dryRun) params.append('dryRun', 'true');
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await apiClient.post(`/spare-parts/import?${params.toString()}`, formData);
     return response.data;
   },
 
@@ -0,0 +1,164 @@
+'use client';
+
+import { useEffect } from 'react';
+import { QueryClient, useQueryClient } from '@tanstack/react-query';
+import { getApiBaseUrl } from './api-config';
+
+type QueryKeyPrefix = readonly unknown[];
+
+const REQUEST_QUERIES: QueryKeyPrefix[] = [
+  ['available-requests'],
+  ['my-work-requests'],
+  ['maintenance-request'],
+  ['maintenance-work'],
+  ['maintenance-work-by-request'],
+  ['home-dashboard'],
+  ['admin-home'],
+];
+
+const SPARE_PARTS_REQUEST_QUERIES: QueryKeyPrefix[] = [
+  ['spare-parts-requests'],
+  ['maintenance', 'spare-parts-requests'],
+  ['spare-parts-requests-approved'],
+  ['return-requests'],
+  ['my-work-requests'],
+  ['home-dashboard'],
+];
+
+const STOCK_QUERIES: QueryKeyPrefix[] = [
+  ['spare-parts'],
+  ['spare-part'],
+  ['spare-parts-available'],
+  ['low-stock-parts'],
+  ['inventory-transactions'],
+  ['stock-levels-report'],
+  ['valuation-report'],
+  ['reorder-report'],
+  ['consumption-report'],
+];
+
+const MACHINE_QUERIES: QueryKeyPrefix[] = [
+  ['machines'],
+  ['machine'],
+  ['home-dashboard'],
+  ['admin-home'],
+];
+
+// Queries to refetch for each event type sent by /api/v1/events
+const INVALIDATIONS: Record<string, QueryKeyPrefix[]> = {
+  'maintenance_request.created': REQUEST_QUERIES,
+  'maintenance_request.accepted': REQUEST_QUERIES,
+  'maintenance_request.updated': REQUEST_QUERIES,
+  'maintenance_work.updated': REQUEST_QUERIES,
+  'maintenance_work.completed': [...REQUEST_QUERIES, ...MACHINE_QUERIES],
+  'spare_parts_request.created': SPARE_PARTS_REQUEST_QUERIES,
+  'spare_parts_request.approved': SPARE_PARTS_REQUEST_QUERIES,
+  'spare_parts_request.rejected': SPARE_PARTS_REQUEST_QUERIES,
+  'spare_parts_request.issued': SPARE_PARTS_REQUEST_QUERIES,
+  'spare_parts_request.return_requested': SPARE_PARTS_REQUEST_QUERIES,
+  'spare_parts_request.returned': SPARE_PARTS_REQUEST_QUERIES,
+  'stock.changed': STOCK_QUERIES,
+  'machine.status_changed': MACHINE_QUERIES,
+};
+
+const ALL_QUERIES = Array.from(
+  new Map(Object.values(INVALIDATIONS).flat().map((key) => [JSON.stringify(key), key])).values()
+);
+
+const MIN_RETRY_MS = 5000;
+const MAX_RETRY_MS = 60000;
+
+function invalidate(queryClient: QueryClient, keys: QueryKeyPrefix[]) {
+  keys.forEach((queryKey) => queryClient.invalidateQueries({ queryKey }));
+}
+
+/**
+ * Keep React Query caches fresh from the server's change event stream.
+ *
+ * Opens /api/v1/events (Server-Sent Events) with the stored access token and
+ * invalidates the queries affected by each event, replacing interval polling.
+ * After a dropped connection everything is refetched once, since events may
+ * have been missed while offline.
+ */
+export function useChangeEvents(enabled: boolean) {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    const controller = new AbortController();
+    let retryMs = MIN_RETRY_MS;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let connectedBefore = false;
+
+    const handleFrame = (frame: string) => {
+      let eventType = 'message';
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event:')) {
+          eventType = line.slice(6).trim();
+        } else if (line.startsWith('retry:')) {
+          retryMs = Number(line.slice(6).trim()) || retryMs;
+        }
+      }
+      if (eventType === 'resync') {
+        invalidate(queryClient, ALL_QUERIES);
+      } else if (INVALIDATIONS[eventType]) {
+        invalidate(queryClient, INVALIDATIONS[eventType]);
+      }
+    };
+
+    const connect = async () => {
+      try {
+        const token = localStorage.getItem('access_token');
+        const response = await fetch(`${getApiBaseUrl()}/events`, {
+          headers: {
+            Accept: 'text/event-stream',
+            ...(token ? { Authorization: `Bearer ${token}` } : {}),
+          },
+          signal: controller.signal,
+        });
+        if (!response.ok || !response.body) {
+          throw new Error(`Event stream responded with ${response.status}`);
+        }
+
+        if (connectedBefore) {
+          invalidate(queryClient, ALL_QUERIES);
+        }
+        connectedBefore = true;
+        retryMs = MIN_RETRY_MS;
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let boundary = buffer.indexOf('\n\n');
+          while (boundary !== -1) {
+            handleFrame(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf('\n\n');
+          }
+        }
+      } catch (error) {
+        if (controller.signal.aborted) return;
+        if (process.env.NODE_ENV === 'development') {
+          console.log('Change event stream error:', error);
+        }
+        // Back off while the server is down or the token is being refreshed
+        retryMs = Math.min(retryMs * 2, MAX_RETRY_MS);
+      }
+      if (!controller.signal.aborted) {
+        retryTimer = setTimeout(connect, retryMs);
+      }
+    };
+
+    connect();
+
+    return () => {
+      controller.abort();
+      if (retryTimer) clearTimeout(retryTimer);
+    };
+  }, [enabled, queryClient]);
+}
@@ -3,9 +3,16 @@
 import { QueryClient, QueryClientProvider } from "@tanstack/react-query";
 import { ReactQueryDevtools } from "@tanstack/react-query-devtools";
 import { useState } from "react";
-import { AuthProvider } from "./auth";
+import { AuthProvider, useAuth } from "./auth";
+import { useChangeEvents } from "./change-events";
 import ClientOnly from "@/components/ClientOnly";
 
+function ChangeEventsListener() {
+  const { isAuthenticated } = useAuth();
+  useChangeEvents(isAuthenticated);
+  return null;
+}
+
 export function Providers({ children }: { children: React.ReactNode }) {
   const [queryClient] = useState(
     () =>
@@ -22,6 +29,7 @@ export function Providers({ children }: { children: React.ReactNode }) {
   return (
     <QueryClientProvider client={queryClient}>
       <AuthProvider>
+        <ChangeEventsListener />
         {children}
         <ClientOnly>
           <ReactQueryDevtools initialIsOpen={false} />
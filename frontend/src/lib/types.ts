@@ -103,6 +103,7 @@ export interface Machine {
   departmentId: number;
   createdAt: string;
   updatedAt: string;
+  version?: number; // row version, sent back as If-Match when saving
   department: Department;
 }
 
@@ -140,6 +141,28 @@ export interface MachineStatusSummaryResponse {
   total: number;
 }
 
+export interface TechnicianWorkload {
+  technicianId: number;
+  technicianName: string;
+  openWork: number;
+}
+
+export interface DashboardSummary {
+  // Sections the user's role may not see are null
+  requestCounts: Record<RequestStatus, Record<RequestPriority, number>> | null;
+  requestTotals: Record<RequestStatus, number> | null;
+  availableRequests: number | null;
+  openWorkByTechnician: TechnicianWorkload[] | null;
+  myOpenWork: number | null;
+  sparePartsRequests: {
+    pending: number;
+    approved: number;
+  } | null;
+  criticalStockCount: number | null;
+  machineStatusCounts: Record<MachineStatus, number> | null;
+  generatedAt: string;
+}
+
 export interface QRCodeResponse {
   qrCode: string;
   qrCodeImage: string;
@@ -196,6 +219,8 @@ export interface SparePart {
   categoryId?: number;
   category?: SparePartCategory;
   currentStock: number;
+  reservedStock: number; // held by approved requests until they are issued
+  availableStock: number; // currentStock - reservedStock
   minimumStock: number;
   maximumStock?: number;
   unitPrice?: number;
@@ -206,6 +231,17 @@ export interface SparePart {
   transactionCount?: number;
   createdAt: string;
   updatedAt: string;
+  version?: number; // row version, sent back as If-Match when saving
+}
+
+export interface SparePartImportResponse {
+  totalRows: number;
+  created: number;
+  updated: number;
+  failed: number;
+  dryRun: boolean;
+  categoriesCreated: string[];
+  errors: { row: number; partNumber?: string; error: string }[];
 }
 
 export interface SparePartCreate {
@@ -342,6 +378,7 @@ export interface MaintenanceRequest {
   maintenanceTypeId?: number;
   createdAt: string;
   updatedAt: string;
+  version?: number; // row version, sent back as If-Match when saving
   attachments?: AttachmentBasicInfo[];
 }
 
@@ -446,6 +483,26 @@ export interface InventoryTransactionListResponse {
   totalPages: number;
 }
 
+export interface InventoryTransactionImportError {
+  row: number; // line number in the file; the header is row 1
+  partNumber?: string;
+  error: string;
+}
+
+export interface InventoryTransactionImportResponse {
+  totalRows: number;
+  imported: number;
+  failed: number;
+  dryRun: boolean;
+  errors: InventoryTransactionImportError[];
+  stockChanges: {
+    sparePartId: number;
+    partNumber: string;
+    beforeQuantity: number;
+    afterQuantity: number;
+  }[];
+}
+
 export interface InventoryTransactionFilters {
   page?: number;
   pageSize?: number;
@@ -483,6 +540,7 @@ export interface SparePartsRequest {
   sparePartNumber?: string;
   sparePartName?: string;
   currentStock?: number;
+  availableStock?: number;
   createdAt: string;
   updatedAt: string;
 }
@@ -501,6 +559,28 @@ export interface RejectRequest {
   rejectionReason: string;
 }
 
+export type SparePartsRequestBulkAction = 'APPROVE' | 'REJECT' | 'ISSUE';
+
+export interface SparePartsRequestBulkItem {
+  id: number;
+  action: SparePartsRequestBulkAction;
+  notes?: string; // approval notes, or the rejection reason (required to reject)
+}
+
+export interface SparePartsRequestBulkItemResult {
+  id: number;
+  action: SparePartsRequestBulkAction;
+  success: boolean;
+  error?: string;
+  request?: SparePartsRequest;
+}
+
+export interface SparePartsRequestBulkResponse {
+  results: SparePartsRequestBulkItemResult[];
+  succeeded: number;
+  failed: number;
+}
+
 export interface SparePartsRequestListResponse {
   requests: SparePartsRequest[];
   total: number;
@@ -555,6 +635,7 @@ export interface MaintenanceWork {
   maintenanceSteps?: MaintenanceStep[];
   createdAt: string;
   updatedAt: string;
+  version?: number; // row version, sent back as If-Match when saving
 }
 
 export interface MaintenanceWorkCreate {